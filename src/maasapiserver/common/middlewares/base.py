@@ -0,0 +1,34 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+import abc
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class ASGIMiddleware(abc.ABC):
+    """Base class for the HTTP middlewares.
+
+    Unlike starlette's `BaseHTTPMiddleware`, the next app is called directly with the ASGI messages, without running it
+    in a separate task and wrapping the response in a stream. Responses are sent as they are produced, unless a
+    middleware wraps `send` to hold them.
+
+    Non-HTTP requests (i.e. lifespan and websocket) are passed through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        await self.handle(Request(scope, receive), send)
+
+    @abc.abstractmethod
+    async def handle(self, request: Request, send: Send) -> None:
+        """Handle the request, calling `call_next` to run the next app."""
+
+    async def call_next(self, request: Request, send: Send) -> None:
+        await self.app(request.scope, request.receive, send)
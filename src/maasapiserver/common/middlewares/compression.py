@@ -0,0 +1,88 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Send
+
+from maasapiserver.common.middlewares.base import ASGIMiddleware
+from maascommon.utils.compression import (
+    is_compressible,
+    negotiate_encoding,
+    StreamCompressor,
+)
+
+
+class CompressionMiddleware(ASGIMiddleware):
+    """Compress the responses with the encoding negotiated with the client.
+
+    Responses sent in a single message are compressed only if they're at least `minimum_size` bytes long. Streaming
+    responses are always compressed, flushing the compressor at every chunk.
+
+    The ETags are left strong, even if the compressed payload isn't byte-for-byte identical to the uncompressed one,
+    since they identify the version of a resource: clients send them back in If-Match, which only matches strong ETags.
+
+    The bytes saved are stored in the request state, for the PrometheusMiddleware to collect them.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, level: int):
+        super().__init__(app)
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def handle(self, request: Request, send: Send) -> None:
+        encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+        if encoding is None:
+            await self.call_next(request, send)
+            return
+
+        start_message: Message | None = None
+        compressor: StreamCompressor | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                # Hold the start of the response until the first chunk of the body tells whether it's worth compressing.
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            headers: MutableHeaders | None = None
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if "Content-Encoding" not in headers and is_compressible(
+                    headers.get("Content-Type")
+                ):
+                    headers.add_vary_header("Accept-Encoding")
+                    if more_body or len(body) >= self.minimum_size:
+                        compressor = StreamCompressor(encoding, self.level)
+                        headers["Content-Encoding"] = encoding
+                        del headers["Content-Length"]
+
+            if compressor is not None:
+                if more_body:
+                    body = compressor.compress(body)
+                else:
+                    body = compressor.finish(body)
+                    request.state.compression_metrics = {
+                        "encoding": compressor.encoding,
+                        "saved": compressor.saved_size,
+                    }
+                message = {**message, "body": body}
+
+            if start_message is not None:
+                if (
+                    compressor is not None
+                    and not more_body
+                    and headers is not None
+                ):
+                    headers["Content-Length"] = str(len(body))
+                await send(start_message)
+                start_message = None
+            await send(message)
+
+        await self.call_next(request, send_wrapper)
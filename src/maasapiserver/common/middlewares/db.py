@@ -1,16 +1,24 @@
+import asyncio
 from contextlib import asynccontextmanager
 import time
-from typing import Any, AsyncIterator, Awaitable, Callable
+from typing import Any, AsyncIterator
 
-from fastapi import Request, Response
+from fastapi import Request
 from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncConnection
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Send
 import structlog
 
-from maasservicelayer.db import Database
+from maasapiserver.common.middlewares.base import ASGIMiddleware
+from maasapiserver.common.utils.http import get_handler_path
+from maascommon.utils.slowqueries import SlowQueryLog, SlowStatements
+from maasservicelayer.db import (
+    Database,
+    explain_statement,
+    is_statement_prepared,
+)
 from maasservicelayer.exceptions.catalog import (
     BaseExceptionDetail,
     ValidationException,
@@ -21,11 +29,36 @@ from maasservicelayer.exceptions.constants import (
 
 logger = structlog.get_logger()
 
+# HTTP methods that don't change anything, whose requests are served by the
+# read-only pool.
+READ_ONLY_METHODS = frozenset(["GET", "HEAD"])
+
+
+def is_read_only_request(request: Request) -> bool:
+    """Whether the request can run in a read-only transaction.
+
+    Users authenticated with macaroons are periodically re-validated against
+    the external authentication service, and the result of the check is
+    stored in the database, so their requests always need a read-write
+    transaction.
+    """
+    if request.method not in READ_ONLY_METHODS:
+        return False
+    if "Macaroons" in request.headers:
+        return False
+    return not any(
+        cookie.lower().startswith("macaroon-") for cookie in request.cookies
+    )
 
-class TransactionMiddleware(BaseHTTPMiddleware):
+
+class TransactionMiddleware(ASGIMiddleware):
     """Run a request in a transaction, handling commit/rollback.
 
     This makes the database connection available as `request.state.context.get_connection()`.
+
+    The response is sent only after the transaction has been committed, so that a failure to commit is reported to the
+    client. Streaming responses are sent as they are produced instead, and the transaction is kept open until they
+    complete.
     """
 
     def __init__(self, app: ASGIApp, db: Database):
@@ -33,10 +66,20 @@ class TransactionMiddleware(BaseHTTPMiddleware):
         self.db = db
 
     @asynccontextmanager
-    async def get_connection(self) -> AsyncIterator[AsyncConnection]:
-        """Return the connection in a transaction context manager."""
+    async def get_connection(
+        self, read_only: bool = False
+    ) -> AsyncIterator[AsyncConnection]:
+        """Return the connection in a transaction context manager.
+
+        Read-only transactions are started as READ ONLY, and use the
+        read-only pool, if configured.
+        """
         try:
-            async with self.db.engine.connect() as conn:
+            async with self.db.get_engine(read_only).connect() as conn:
+                if read_only:
+                    # This is reset when the connection is returned to the
+                    # pool.
+                    await conn.execution_options(postgresql_readonly=True)
                 async with conn.begin():
                     yield conn
         # Foreign key exceptions are raised only when the transaction is committed, so we have to capture them here.
@@ -51,14 +94,34 @@ class TransactionMiddleware(BaseHTTPMiddleware):
                 ]
             )
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
-        async with self.get_connection() as conn:
+    async def handle(self, request: Request, send: Send) -> None:
+        read_only = is_read_only_request(request)
+        held_messages: list[Message] = []
+        streaming = False
+
+        async def send_after_commit(message: Message) -> None:
+            nonlocal streaming
+            if streaming:
+                await send(message)
+                return
+            held_messages.append(message)
+            if message["type"] == "http.response.body" and message.get(
+                "more_body", False
+            ):
+                streaming = True
+                for held_message in held_messages:
+                    await send(held_message)
+                held_messages.clear()
+
+        start = time.perf_counter()
+        async with self.get_connection(read_only=read_only) as conn:
+            request.state.db_pool_metrics = {
+                "pool": "read" if read_only else "write",
+                "wait": time.perf_counter() - start,
+                "usage": self.db.get_pool_usage(read_only),
+            }
             request.state.context.set_connection(conn)
-            response = await call_next(request)
+            await self.call_next(request, send_after_commit)
 
         # TODO: rewrite the temporal service in order to just register the post commit hooks with no additional logic
         # After the transaction has been committed, we execute all the post commit hooks in the order they were registered.
@@ -69,49 +132,113 @@ class TransactionMiddleware(BaseHTTPMiddleware):
         #         logger.error("The transaction has been committed but a post commit hook has failed.", exc_info=e)
         #         raise e
 
-        if hasattr(request.state, "services") and hasattr(
-            request.state.services, "temporal"
+        # Read-only requests can't register workflows to start.
+        if (
+            not read_only
+            and hasattr(request.state, "services")
+            and hasattr(request.state.services, "temporal")
         ):
             await request.state.services.temporal.post_commit()
 
-        return response
+        for message in held_messages:
+            await send(message)
 
 
-class DatabaseMetricsMiddleware(BaseHTTPMiddleware):
+class DatabaseMetricsMiddleware(ASGIMiddleware):
     """Track database-related metrics.
 
+    Besides the number and latency of the queries, it counts the hits and misses of the caches of the compiled and of
+    the prepared statements.
+
+    If a `slow_query_log` is given, the statements slower than its threshold are recorded in it, keyed by the method
+    and the route of the request, and a sample of them is profiled with `EXPLAIN` before the transaction ends.
+
     It requires the database connection to be available as
     `request.state.context.get_connection()`.
     """
 
-    def __init__(self, app: ASGIApp, db: Database):
+    def __init__(
+        self,
+        app: ASGIApp,
+        db: Database,
+        slow_query_log: SlowQueryLog | None = None,
+    ):
         super().__init__(app)
         self.db = db
-
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
-        query_metrics = {"latency": 0.0, "count": 0}
+        self.slow_query_log = slow_query_log
+
+    async def handle(self, request: Request, send: Send) -> None:
+        query_metrics: dict[str, Any] = {
+            "latency": 0.0,
+            "count": 0,
+            "cache_hits": {"compiled": 0, "prepared": 0},
+            "cache_misses": {"compiled": 0, "prepared": 0},
+        }
         request.state.query_metrics = query_metrics
+        slow_statements = (
+            self.slow_query_log.statements()
+            if self.slow_query_log is not None
+            else None
+        )
 
-        def before(*args: Any) -> None:
-            request.state.cur_query_start = time.perf_counter()
+        def count_cache_access(cache: str, hit: bool) -> None:
+            counts = query_metrics["cache_hits" if hit else "cache_misses"]
+            counts[cache] += 1
 
-        def after(*args: Any) -> None:
-            request.state.query_metrics["latency"] += (
-                time.perf_counter() - request.state.cur_query_start
+        def before(conn, cursor, statement, parameters, context, *args):
+            request.state.cur_query_start = time.perf_counter()
+            if context.cache_hit in (CACHE_HIT, CACHE_MISS):
+                count_cache_access("compiled", context.cache_hit == CACHE_HIT)
+            prepared = is_statement_prepared(
+                conn.connection.dbapi_connection, statement
             )
+            if prepared is not None:
+                count_cache_access("prepared", prepared)
+
+        def after(
+            conn, cursor, statement, parameters, context, executemany
+        ) -> None:
+            latency = time.perf_counter() - request.state.cur_query_start
+            request.state.query_metrics["latency"] += latency
             request.state.query_metrics["count"] += 1
             del request.state.cur_query_start
+            if slow_statements is not None:
+                slow_statements.add(
+                    statement, None if executemany else parameters, latency
+                )
 
         conn = request.state.context.get_connection().sync_connection
         event.listen(conn, "before_cursor_execute", before)
         event.listen(conn, "after_cursor_execute", after)
         try:
-            response = await call_next(request)
+            await self.call_next(request, send)
         finally:
             event.remove(conn, "before_cursor_execute", before)
             event.remove(conn, "after_cursor_execute", after)
-        return response
+
+        if slow_statements is not None and slow_statements.statements:
+            await self._record_slow_queries(request, slow_statements)
+
+    async def _record_slow_queries(
+        self, request: Request, slow_statements: SlowStatements
+    ) -> None:
+        assert self.slow_query_log is not None
+        key = f"{request.method} {get_handler_path(request)}"
+        samples = self.slow_query_log.record(key, slow_statements.statements)
+        connection = request.state.context.get_connection()
+        for query, statement, parameters in samples:
+            try:
+                explain = await explain_statement(
+                    connection, statement, parameters
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Failed to explain the slow query of {key}", exc_info=e
+                )
+            else:
+                self.slow_query_log.set_explain(query, explain)
+        try:
+            # Don't block the event loop writing the file.
+            await asyncio.to_thread(self.slow_query_log.flush)
+        except OSError as e:
+            logger.warning("Failed to save the slow queries", exc_info=e)
@@ -1,12 +1,10 @@
 # Copyright 2024 Canonical Ltd.  This software is licensed under the
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
-from typing import Awaitable, Callable
-
 from fastapi.exceptions import RequestValidationError
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
+from starlette.types import Message, Send
 import structlog
 
 from maasapiserver.common.api.models.responses.errors import (
@@ -21,6 +19,7 @@ from maasapiserver.common.api.models.responses.errors import (
     UnauthorizedResponse,
     ValidationErrorResponse,
 )
+from maasapiserver.common.middlewares.base import ASGIMiddleware
 from maasservicelayer.exceptions.catalog import (
     AlreadyExistsException,
     BadRequestException,
@@ -51,44 +50,57 @@ class ExceptionHandlers:
         )
 
 
-class ExceptionMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
+class ExceptionMiddleware(ASGIMiddleware):
+    """Turn the exceptions raised by the next app into error responses.
+
+    Exceptions raised after the response has been started can't be reported to the client anymore, so they are
+    raised again.
+    """
+
+    async def handle(self, request: Request, send: Send) -> None:
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            return await call_next(request)
-        except AlreadyExistsException as e:
-            logger.debug(e)
-            return ConflictResponse(details=e.details)
-        except ConflictException as e:
+            await self.call_next(request, send_wrapper)
+        except Exception as e:
+            if response_started:
+                raise
+            response = self.get_error_response(e)
+            await response(request.scope, request.receive, send)
+
+    def get_error_response(self, e: Exception) -> Response:
+        if isinstance(e, (AlreadyExistsException, ConflictException)):
             logger.debug(e)
             return ConflictResponse(details=e.details)
-        except BadRequestException as e:
+        if isinstance(e, BadRequestException):
             logger.debug(e)
             return BadRequestResponse(e.details)
-        except UnauthorizedException as e:
+        if isinstance(e, UnauthorizedException):
             logger.debug(e)
             return UnauthorizedResponse(e.details)
-        except DischargeRequiredException as e:
+        if isinstance(e, DischargeRequiredException):
             logger.debug(e)
             return DischargeRequiredErrorResponse(e.macaroon)
-        except ForbiddenException as e:
+        if isinstance(e, ForbiddenException):
             logger.debug(e)
             return ForbiddenResponse(e.details)
-        except ValidationException as e:
+        if isinstance(e, ValidationException):
             logger.debug(e)
             return ValidationErrorResponse(e.details)
-        except NotFoundException as e:
+        if isinstance(e, NotFoundException):
             logger.debug(e)
             return NotFoundResponse()
-        except PreconditionFailedException as e:
+        if isinstance(e, PreconditionFailedException):
             logger.debug(e)
             return PreconditionFailedResponse(e.details)
-        except ServiceUnavailableException as e:
+        if isinstance(e, ServiceUnavailableException):
             logger.error(e)
             return ServiceUnavailableErrorResponse(e.details)
-        except Exception as e:
-            logger.exception(e)
-            return InternalServerErrorResponse()
+        logger.exception(e)
+        return InternalServerErrorResponse()
@@ -1,11 +1,15 @@
-from typing import Awaitable, Callable
+import time
 
-from fastapi import Request, Response
+from fastapi import Request
 from prometheus_client import CollectorRegistry
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.routing import Match
-from starlette.types import ASGIApp
+from prometheus_client.core import CounterMetricFamily
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Send
 
+from maasapiserver.common.middlewares.base import ASGIMiddleware
+from maasapiserver.common.utils.http import get_handler_path
+from maasservicelayer.services import CacheForServices, ConfigurationsService
+from maasservicelayer.services.configurations import ConfigurationsServiceCache
 from provisioningserver.prometheus.utils import (
     create_metrics,
     MetricDefinition,
@@ -15,49 +19,94 @@ from provisioningserver.utils.env import MAAS_UUID
 from provisioningserver.utils.ipaddr import get_machine_default_gateway_ip
 
 
-class PrometheusMiddleware(BaseHTTPMiddleware):
+class PrometheusMiddleware(ASGIMiddleware):
     """Collect Prometheus metrics for the call.
 
     This requires the DatabaseMetricsMiddleware to be configured.
     """
 
-    def __init__(self, app: ASGIApp):
+    def __init__(
+        self, app: ASGIApp, services_cache: CacheForServices | None = None
+    ):
         super().__init__(app)
         self.metrics = _get_metrics()
+        # The registry is not set if the prometheus client is not available.
+        if services_cache is not None and self.metrics.registry is not None:
+            self.metrics.registry.register(
+                ConfigurationsCacheCollector(services_cache)
+            )
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
+    async def handle(self, request: Request, send: Send) -> None:
         # make metrics accessible everywhere
         request.state.prometheus_metrics = self.metrics
 
-        def get_labels(request, response):
-            return {
-                "handler": self._get_handler(request),
-                "method": request.method,
-                "status": response.status_code,
-            }
+        status_code = None
+        response_size = 0
 
-        # wrap the call to time request latency and call the next handler
-        call_next = self.metrics.record_call_latency(
-            "maas_apiserver_request_latency",
-            get_labels=lambda args, kwargs, response: get_labels(
-                request, response
-            ),
-        )(call_next)
-        response = await call_next(request)
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = Headers(raw=message["headers"])
+                response_size = int(headers.get("Content-Length", 0))
+            await send(message)
 
-        labels = get_labels(request, response)
+        # time the request latency and call the next handler
+        before = time.perf_counter()
+        await self.call_next(request, send_wrapper)
+        latency = time.perf_counter() - before
+
+        labels = {
+            "handler": get_handler_path(request),
+            "method": request.method,
+            "status": status_code,
+        }
+        self.metrics.update(
+            "maas_apiserver_request_latency",
+            "observe",
+            latency,
+            labels=labels,
+        )
         # update HTTP metrics
         self.metrics.update(
             "maas_apiserver_response_size",
             "observe",
-            int(response.headers.get("Content-Length", 0)),
+            response_size,
             labels=labels,
         )
 
+        # update the bytes saved by compressing the response
+        compression_metrics = getattr(
+            request.state, "compression_metrics", None
+        )
+        if compression_metrics is not None:
+            self.metrics.update(
+                "maas_apiserver_response_compression_saved_bytes",
+                "inc",
+                compression_metrics["saved"],
+                labels={
+                    **labels,
+                    "encoding": compression_metrics["encoding"],
+                },
+            )
+
+        # update DB pool metrics
+        pool_metrics = getattr(request.state, "db_pool_metrics", None)
+        if pool_metrics is not None:
+            pool_labels = {"pool": pool_metrics["pool"]}
+            self.metrics.update(
+                "maas_apiserver_db_pool_wait_time",
+                "observe",
+                pool_metrics["wait"],
+                labels=pool_labels,
+            )
+            self.metrics.update(
+                "maas_apiserver_db_pool_usage",
+                "set",
+                pool_metrics["usage"],
+                labels=pool_labels,
+            )
+
         # update DB metrics
         if query_count := request.state.query_metrics["count"]:
             self.metrics.update(
@@ -73,14 +122,56 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
                 labels=labels,
             )
 
-        return response
+        # update the hits and misses of the statement caches
+        for name, key in (
+            ("maas_apiserver_statement_cache_hits", "cache_hits"),
+            ("maas_apiserver_statement_cache_misses", "cache_misses"),
+        ):
+            for cache, count in request.state.query_metrics[key].items():
+                if count:
+                    self.metrics.update(
+                        name, "inc", count, labels={"cache": cache}
+                    )
+
+        # update the number of queries saved by the batching loaders
+        context = getattr(request.state, "context", None)
+        if context is not None and (
+            saved_queries := context.get_saved_queries()
+        ):
+            self.metrics.update(
+                "maas_apiserver_request_saved_query_count",
+                "inc",
+                saved_queries,
+                labels=labels,
+            )
+
+
+class ConfigurationsCacheCollector:
+    """Collect the hits and misses of the configurations cache."""
 
-    def _get_handler(self, request: Request) -> str:
-        for route in request.app.routes:
-            match, _ = route.matches(request.scope)
-            if match == Match.FULL:
-                return route.path
-        return request.url.path
+    def __init__(self, services_cache: CacheForServices):
+        self.services_cache = services_cache
+
+    def collect(self):
+        cache = self.services_cache.cache.get(ConfigurationsService.__name__)
+        if not isinstance(cache, ConfigurationsServiceCache):
+            return
+        for name, description, counts in (
+            (
+                "maas_apiserver_config_cache_hits",
+                "API server - number of configurations read from the cache",
+                cache.hits,
+            ),
+            (
+                "maas_apiserver_config_cache_misses",
+                "API server - number of configurations not found in the cache",
+                cache.misses,
+            ),
+        ):
+            metric = CounterMetricFamily(name, description, labels=["source"])
+            for source, count in counts.items():
+                metric.add_metric([source], count)
+            yield metric
 
 
 def _get_metrics() -> PrometheusMetrics:
@@ -99,12 +190,36 @@ def _get_metrics() -> PrometheusMetrics:
             labels=http_labels,
             buckets=[5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000],
         ),
+        MetricDefinition(
+            "Counter",
+            "maas_apiserver_response_compression_saved_bytes",
+            "API server - number of bytes saved by compressing the HTTP responses",
+            labels=(*http_labels, "encoding"),
+        ),
         MetricDefinition(
             "Counter",
             "maas_apiserver_request_query_count",
             "API server - number of database queries per request",
             labels=http_labels,
         ),
+        MetricDefinition(
+            "Counter",
+            "maas_apiserver_request_saved_query_count",
+            "API server - number of database queries saved by batching the loads per request",
+            labels=http_labels,
+        ),
+        MetricDefinition(
+            "Counter",
+            "maas_apiserver_statement_cache_hits",
+            "API server - number of statements found in the cache of the compiled or of the prepared statements",
+            labels=("cache",),
+        ),
+        MetricDefinition(
+            "Counter",
+            "maas_apiserver_statement_cache_misses",
+            "API server - number of statements not found in the cache of the compiled or of the prepared statements",
+            labels=("cache",),
+        ),
         MetricDefinition(
             "Histogram",
             "maas_apiserver_request_query_latency",
@@ -112,6 +227,19 @@ def _get_metrics() -> PrometheusMetrics:
             labels=http_labels,
             buckets=(0.001, 0.005, 0.01, 0.1, 0.25, 0.5, 1.0),
         ),
+        MetricDefinition(
+            "Histogram",
+            "maas_apiserver_db_pool_wait_time",
+            "API server - time waited for a database connection in seconds",
+            labels=("pool",),
+            buckets=(0.001, 0.005, 0.01, 0.1, 0.25, 0.5, 1.0, 5.0),
+        ),
+        MetricDefinition(
+            "Gauge",
+            "maas_apiserver_db_pool_usage",
+            "API server - ratio of the database connections in use",
+            labels=("pool",),
+        ),
     )
     return create_metrics(
         definitions,
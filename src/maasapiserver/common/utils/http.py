@@ -3,6 +3,7 @@
 
 from fastapi import Request
 from pydantic import BaseModel, IPvAnyAddress, ValidationError
+from starlette.routing import Match
 
 
 class _IPValidator(BaseModel):
@@ -35,3 +36,12 @@ def get_remote_ip(request: Request) -> IPvAnyAddress | None:
             pass
 
     return None
+
+
+def get_handler_path(request: Request) -> str:
+    """Return the path of the route that handles the request, e.g. `/MAAS/a/v3/machines/{id}`."""
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return request.url.path
@@ -9,11 +9,13 @@ import ssl
 from django.conf import settings as django_settings
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
+from sqlalchemy.ext.asyncio import AsyncConnection
 import structlog
 import uvicorn
 
 from maasapiserver.common.api.handlers import APICommon
 from maasapiserver.common.constants import API_PREFIX
+from maasapiserver.common.middlewares.compression import CompressionMiddleware
 from maasapiserver.common.middlewares.db import (
     DatabaseMetricsMiddleware,
     TransactionMiddleware,
@@ -41,11 +43,20 @@ from maasapiserver.v3.middlewares.auth import (
 )
 from maasapiserver.v3.middlewares.context import ContextMiddleware
 from maasapiserver.v3.middlewares.services import ServicesMiddleware
+from maascommon.utils.slowqueries import get_slow_queries_path, SlowQueryLog
+from maasservicelayer.context import Context
 from maasservicelayer.db import Database
 from maasservicelayer.db.listeners import PostgresListenersTaskFactory
 from maasservicelayer.db.locks import wait_for_startup
 from maasservicelayer.logging.configure import configure_logging
-from maasservicelayer.services import CacheForServices
+from maasservicelayer.services import (
+    CacheForServices,
+    ConfigurationsService,
+    ServiceCollectionV3,
+)
+from maasservicelayer.services.configurations import (
+    ConfigurationsPostgresListener,
+)
 from provisioningserver.certificates import get_maas_cluster_cert_paths
 
 logger = structlog.getLogger()
@@ -60,6 +71,25 @@ def config_uvicorn_logging(level=logging.INFO) -> None:
     )
 
 
+async def load_jwt_key(
+    connection: AsyncConnection, services_cache: CacheForServices
+) -> None:
+    """Load the key that signs the JWT tokens, creating it if needed, with a
+    read-write connection."""
+    services = await ServiceCollectionV3.produce(
+        Context(connection=connection), cache=services_cache
+    )
+    await services.auth.load_jwt_key()
+
+
+async def _load_jwt_key_on_startup(
+    db: Database, services_cache: CacheForServices
+) -> None:
+    async with db.engine.connect() as conn:
+        async with conn.begin():
+            await load_jwt_key(conn, services_cache)
+
+
 async def prepare_app(
     config: Config,
     transaction_middleware_class: type = TransactionMiddleware,
@@ -92,8 +122,25 @@ async def prepare_app(
 
     # The order here is important: the exception middleware must be the first one being executed (i.e. it must be the last
     # middleware added here)
-    app.add_middleware(PrometheusMiddleware)
-    app.add_middleware(DatabaseMetricsMiddleware, db=db)
+    if config.compression_level:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=config.compression_min_size,
+            level=config.compression_level,
+        )
+    app.add_middleware(PrometheusMiddleware, services_cache=services_cache)
+    slow_query_log = None
+    if config.slow_query_log_size:
+        slow_query_log = SlowQueryLog(
+            get_slow_queries_path(),
+            app_name,
+            size=config.slow_query_log_size,
+            threshold=config.slow_query_threshold / 1000,
+            explain_rate=config.slow_query_explain_rate / 100,
+        )
+    app.add_middleware(
+        DatabaseMetricsMiddleware, db=db, slow_query_log=slow_query_log
+    )
 
     if add_authentication_middleware:
         app.add_middleware(
@@ -124,9 +171,24 @@ async def prepare_app(
         partial(
             PostgresListenersTaskFactory.create,
             db_engine=db.engine,
-            listeners=[VaultMigrationPostgresListener()],
+            listeners=[
+                VaultMigrationPostgresListener(),
+                ConfigurationsPostgresListener(
+                    services_cache.get(
+                        ConfigurationsService.__name__,
+                        ConfigurationsService.build_cache_object,
+                    ),  # type: ignore
+                    secrets_ttl=config.config_cache_secrets_ttl,
+                ),
+            ],
         ),
     )
+    if add_authentication_middleware:
+        # The read-only requests can't create the key of the tokens.
+        app.add_event_handler(
+            "startup",
+            partial(_load_jwt_key_on_startup, db, services_cache),
+        )
     app.add_event_handler("shutdown", services_cache.close)
 
     return app
@@ -23,6 +23,12 @@ class Config:
     debug_queries: bool = False
     debug_http: bool = False
     num_workers: int = 4
+    config_cache_secrets_ttl: int = 60
+    compression_min_size: int = 1024
+    compression_level: int = 6
+    slow_query_threshold: int = 200
+    slow_query_log_size: int = 10
+    slow_query_explain_rate: int = 0
 
 
 def api_service_socket_path() -> Path:
@@ -78,12 +84,33 @@ async def _get_default_db_config(
             )
             pass
 
+    max_overflow = int(str(config.database_pool_max_overflow))
+    pool_recycle = int(str(config.database_pool_recycle))
+    pool_timeout = float(str(config.database_pool_timeout))
+    read_only_config = None
+    if config.database_read_pool_size:
+        read_only_config = DatabaseConfig(
+            name=str(database_name),
+            host=str(config.database_read_host or config.database_host),
+            username=str(database_user),
+            password=str(database_pass),
+            port=int(str(config.database_read_port or config.database_port)),
+            pool_size=int(str(config.database_read_pool_size)),
+            max_overflow=max_overflow,
+            pool_recycle=pool_recycle,
+            pool_timeout=pool_timeout,
+        )
     return DatabaseConfig(
         name=str(database_name),
         host=str(config.database_host),
         username=str(database_user),
         password=str(database_pass),
         port=int(str(config.database_port)),
+        pool_size=int(str(config.database_pool_size)),
+        max_overflow=max_overflow,
+        pool_recycle=pool_recycle,
+        pool_timeout=pool_timeout,
+        read_only=read_only_config,
     )
 
 
@@ -94,7 +121,15 @@ async def read_config() -> Config:
             debug = config.debug
             debug_queries = debug or config.debug_queries
             debug_http = debug or config.debug_http
-            num_workers = config.num_workers
+            num_workers = int(str(config.num_workers))
+            config_cache_secrets_ttl = int(
+                str(config.config_cache_secrets_ttl)
+            )
+            compression_min_size = int(str(config.http_compression_min_size))
+            compression_level = int(str(config.http_compression_level))
+            slow_query_threshold = int(str(config.slow_query_threshold))
+            slow_query_log_size = int(str(config.slow_query_log_size))
+            slow_query_explain_rate = int(str(config.slow_query_explain_rate))
     except (FileNotFoundError, KeyError, ValueError):
         # The regiond.conf will attempt to be loaded when the 'maas' command
         # is read by a standard user. We allow this to fail and miss configure the
@@ -105,11 +140,23 @@ async def read_config() -> Config:
         debug_queries = False
         debug_http = False
         num_workers = 4
+        config_cache_secrets_ttl = 60
+        compression_min_size = 1024
+        compression_level = 6
+        slow_query_threshold = 200
+        slow_query_log_size = 10
+        slow_query_explain_rate = 0
 
     return Config(
         db=database_config,
-        num_workers=num_workers,  # pyright: ignore[reportArgumentType, reportPossiblyUnboundVariable]
+        num_workers=num_workers,  # pyright: ignore[reportPossiblyUnboundVariable]
         debug=bool(debug),
         debug_queries=bool(debug_queries),
         debug_http=bool(debug_http),
+        config_cache_secrets_ttl=config_cache_secrets_ttl,  # pyright: ignore[reportPossiblyUnboundVariable]
+        compression_min_size=compression_min_size,  # pyright: ignore[reportPossiblyUnboundVariable]
+        compression_level=compression_level,  # pyright: ignore[reportPossiblyUnboundVariable]
+        slow_query_threshold=slow_query_threshold,  # pyright: ignore[reportPossiblyUnboundVariable]
+        slow_query_log_size=slow_query_log_size,  # pyright: ignore[reportPossiblyUnboundVariable]
+        slow_query_explain_rate=slow_query_explain_rate,  # pyright: ignore[reportPossiblyUnboundVariable]
     )
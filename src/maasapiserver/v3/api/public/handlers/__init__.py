@@ -9,6 +9,7 @@ from maasapiserver.v3.api.public.handlers.boot_sources import (
 from maasapiserver.v3.api.public.handlers.configurations import (
     ConfigurationsHandler,
 )
+from maasapiserver.v3.api.public.handlers.diagnostics import DiagnosticsHandler
 from maasapiserver.v3.api.public.handlers.discoveries import DiscoveriesHandler
 from maasapiserver.v3.api.public.handlers.domains import DomainsHandler
 from maasapiserver.v3.api.public.handlers.events import EventsHandler
@@ -50,6 +51,7 @@ APIv3 = API(
         BootSourcesHandler(),
         ConfigurationsHandler(),
         EventsHandler(),
+        DiagnosticsHandler(),
         DiscoveriesHandler(),
         DomainsHandler(),
         FabricsHandler(),
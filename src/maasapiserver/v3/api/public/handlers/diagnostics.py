@@ -0,0 +1,64 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+import asyncio
+
+from fastapi import Depends, Query
+
+from maasapiserver.common.api.base import Handler, handler
+from maasapiserver.common.api.models.responses.errors import (
+    ForbiddenBodyResponse,
+    UnauthorizedBodyResponse,
+)
+from maasapiserver.v3.api.public.models.responses.diagnostics import (
+    SlowQueriesListResponse,
+    SlowQueryResponse,
+)
+from maasapiserver.v3.auth.base import check_permissions
+from maascommon.utils.slowqueries import (
+    get_slow_queries_path,
+    read_slow_queries,
+)
+from maasservicelayer.auth.jwt import UserRole
+
+
+class DiagnosticsHandler(Handler):
+    """Diagnostics API handler."""
+
+    TAGS = ["Diagnostics"]
+
+    @handler(
+        path="/diagnostics/slow_queries",
+        methods=["GET"],
+        tags=TAGS,
+        responses={
+            200: {"model": SlowQueriesListResponse},
+            401: {"model": UnauthorizedBodyResponse},
+            403: {"model": ForbiddenBodyResponse},
+        },
+        response_model_exclude_none=True,
+        status_code=200,
+        dependencies=[
+            Depends(check_permissions(required_roles={UserRole.ADMIN}))
+        ],
+    )
+    async def list_slow_queries(
+        self,
+        size: int | None = Query(
+            description="The maximum number of statements returned for each endpoint",
+            default=None,
+            ge=1,
+        ),
+    ) -> SlowQueriesListResponse:
+        # Reading the snapshots of all the processes blocks, keep it off the
+        # event loop.
+        slow_queries = await asyncio.to_thread(
+            read_slow_queries, get_slow_queries_path(), size
+        )
+        return SlowQueriesListResponse(
+            items=[
+                SlowQueryResponse.from_model(endpoint, slow_query)
+                for endpoint, queries in slow_queries.items()
+                for slow_query in queries
+            ]
+        )
@@ -12,8 +12,12 @@ from maasapiserver.v3.api import services
 from maasapiserver.v3.api.public.models.requests.discoveries import (
     DiscoveriesIPAndMacFiltersParams,
 )
-from maasapiserver.v3.api.public.models.requests.query import PaginationParams
+from maasapiserver.v3.api.public.models.requests.query import (
+    PaginationParams,
+    StreamingParams,
+)
 from maasapiserver.v3.api.public.models.responses.base import (
+    NDJSONResponse,
     OPENAPI_ETAG_HEADER,
 )
 from maasapiserver.v3.api.public.models.responses.discoveries import (
@@ -50,8 +54,18 @@ class DiscoveriesHandler(Handler):
     async def list_discoveries(
         self,
         pagination_params: PaginationParams = Depends(),  # noqa: B008
+        streaming_params: StreamingParams = Depends(),  # noqa: B008
         services: ServiceCollectionV3 = Depends(services),  # noqa: B008
     ) -> DiscoveriesListResponse:
+        if streaming_params.is_enabled():
+            return NDJSONResponse(  # pyright: ignore [reportReturnType]
+                DiscoveryResponse.from_model(
+                    discovery=discovery,
+                    self_base_hyperlink=f"{V3_API_PREFIX}/discoveries",
+                )
+                async for discovery in services.discoveries.stream()
+            )
+
         # TODO: order by last seen
         discoveries = await services.discoveries.list(
             page=pagination_params.page,
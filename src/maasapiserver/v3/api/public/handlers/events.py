@@ -1,14 +1,24 @@
 # Copyright 2024-2025 Canonical Ltd.  This software is licensed under the
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
-from fastapi import Depends
+from fastapi import Depends, Response
 
 from maasapiserver.common.api.base import Handler, handler
 from maasapiserver.v3.api import services
 from maasapiserver.v3.api.public.models.requests.events import (
     EventsFiltersParams,
 )
-from maasapiserver.v3.api.public.models.requests.query import PaginationParams
+from maasapiserver.v3.api.public.models.requests.query import (
+    ConditionalParams,
+    PaginationParams,
+    StreamingParams,
+    TokenPaginationParams,
+)
+from maasapiserver.v3.api.public.models.responses.base import (
+    NDJSONResponse,
+    NotModifiedResponse,
+    OPENAPI_ETAG_HEADER,
+)
 from maasapiserver.v3.api.public.models.responses.events import (
     EventResponse,
     EventsListResponse,
@@ -32,7 +42,9 @@ class EventsHandler(Handler):
         responses={
             200: {
                 "model": EventsListResponse,
+                "headers": {"ETag": OPENAPI_ETAG_HEADER},
             },
+            304: {"description": "Not Modified"},
         },
         response_model_exclude_none=True,
         status_code=200,
@@ -42,14 +54,63 @@ class EventsHandler(Handler):
     )
     async def list_events(
         self,
+        response: Response,
         pagination_params: PaginationParams = Depends(),  # noqa: B008
         filters: EventsFiltersParams = Depends(),  # noqa: B008
+        token_params: TokenPaginationParams = Depends(),  # noqa: B008
+        streaming_params: StreamingParams = Depends(),  # noqa: B008
+        conditional_params: ConditionalParams = Depends(),  # noqa: B008
         services: ServiceCollectionV3 = Depends(services),  # noqa: B008
     ) -> EventsListResponse:
+        query = QuerySpec(where=filters.to_clause())
+        etag = await services.table_generations.get_collection_etag(
+            services.events.get_source_tables(query), conditional_params.key
+        )
+        if etag is not None:
+            if conditional_params.matches(etag):
+                return NotModifiedResponse(etag)  # pyright: ignore [reportReturnType]
+            response.headers["ETag"] = etag
+
+        if streaming_params.is_enabled():
+            return NDJSONResponse(  # pyright: ignore [reportReturnType]
+                (
+                    EventResponse.from_model(event, f"{V3_API_PREFIX}/events")
+                    async for event in services.events.stream(query=query)
+                ),
+                headers=dict(response.headers),
+            )
+
+        if token_params.is_enabled():
+            events_by_token = await services.events.list_by_token(
+                token=token_params.token,
+                size=pagination_params.size,
+                query=query,
+                count=token_params.count,
+            )
+            next_link = None
+            if events_by_token.next_token:
+                next_link = (
+                    f"{V3_API_PREFIX}/events?"
+                    + token_params.to_next_href_format(
+                        events_by_token.next_token, pagination_params.size
+                    )
+                )
+                if query_filters := filters.to_href_format():
+                    next_link += f"&{query_filters}"
+            return EventsListResponse(
+                items=[
+                    EventResponse.from_model(event, f"{V3_API_PREFIX}/events")
+                    for event in events_by_token.items
+                ],
+                total=events_by_token.total,
+                total_is_estimate=events_by_token.total_is_estimate,
+                next=next_link,
+            )
+
         events = await services.events.list(
             page=pagination_params.page,
             size=pagination_params.size,
-            query=QuerySpec(where=filters.to_clause()),
+            query=query,
         )
         next_link = None
         if events.has_next(pagination_params.page, pagination_params.size):
@@ -14,8 +14,12 @@ from maasapiserver.common.api.models.responses.errors import (
 )
 from maasapiserver.v3.api import services
 from maasapiserver.v3.api.public.models.requests.fabrics import FabricRequest
-from maasapiserver.v3.api.public.models.requests.query import PaginationParams
+from maasapiserver.v3.api.public.models.requests.query import (
+    ConditionalParams,
+    PaginationParams,
+)
 from maasapiserver.v3.api.public.models.responses.base import (
+    NotModifiedResponse,
     OPENAPI_ETAG_HEADER,
 )
 from maasapiserver.v3.api.public.models.responses.fabrics import (
@@ -41,7 +45,9 @@ class FabricsHandler(Handler):
         responses={
             200: {
                 "model": FabricsListResponse,
+                "headers": {"ETag": OPENAPI_ETAG_HEADER},
             },
+            304: {"description": "Not Modified"},
         },
         response_model_exclude_none=True,
         status_code=200,
@@ -51,9 +57,19 @@ class FabricsHandler(Handler):
     )
     async def list_fabrics(
         self,
+        response: Response,
         pagination_params: PaginationParams = Depends(),  # noqa: B008
+        conditional_params: ConditionalParams = Depends(),  # noqa: B008
         services: ServiceCollectionV3 = Depends(services),  # noqa: B008
     ) -> FabricsListResponse:
+        etag = await services.table_generations.get_collection_etag(
+            services.fabrics.get_source_tables(), conditional_params.key
+        )
+        if etag is not None:
+            if conditional_params.matches(etag):
+                return NotModifiedResponse(etag)  # pyright: ignore [reportReturnType]
+            response.headers["ETag"] = etag
+
         fabrics = await services.fabrics.list(
             page=pagination_params.page,
             size=pagination_params.size,
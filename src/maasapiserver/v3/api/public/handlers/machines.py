@@ -1,14 +1,24 @@
 # Copyright 2024-2025 Canonical Ltd.  This software is licensed under the
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
-from fastapi import Depends
+from fastapi import Depends, Response
 
 from maasapiserver.common.api.base import Handler, handler
 from maasapiserver.common.api.models.responses.errors import (
     NotFoundBodyResponse,
 )
 from maasapiserver.v3.api import services
-from maasapiserver.v3.api.public.models.requests.query import PaginationParams
+from maasapiserver.v3.api.public.models.requests.query import (
+    ConditionalParams,
+    PaginationParams,
+    StreamingParams,
+    TokenPaginationParams,
+)
+from maasapiserver.v3.api.public.models.responses.base import (
+    NDJSONResponse,
+    NotModifiedResponse,
+    OPENAPI_ETAG_HEADER,
+)
 from maasapiserver.v3.api.public.models.responses.machines import (
     MachineResponse,
     MachinesListResponse,
@@ -44,7 +54,9 @@ class MachinesHandler(Handler):
         responses={
             200: {
                 "model": MachinesListResponse,
+                "headers": {"ETag": OPENAPI_ETAG_HEADER},
             },
+            304: {"description": "Not Modified"},
         },
         response_model_exclude_none=True,
         status_code=200,
@@ -63,7 +75,11 @@ class MachinesHandler(Handler):
     )
     async def list_machines(
         self,
+        response: Response,
         pagination_params: PaginationParams = Depends(),  # noqa: B008
+        token_params: TokenPaginationParams = Depends(),  # noqa: B008
+        streaming_params: StreamingParams = Depends(),  # noqa: B008
+        conditional_params: ConditionalParams = Depends(),  # noqa: B008
         services: ServiceCollectionV3 = Depends(services),  # noqa: B008
         authenticated_user: AuthenticatedUser = Depends(  # noqa: B008
             get_authenticated_user
@@ -108,6 +124,53 @@ class MachinesHandler(Handler):
                     ]
                 )
         query = QuerySpec(where=where_clause)
+        etag = await services.table_generations.get_collection_etag(
+            services.machines.get_source_tables(query),
+            conditional_params.key_for(query),
+        )
+        if etag is not None:
+            if conditional_params.matches(etag):
+                return NotModifiedResponse(etag)  # pyright: ignore [reportReturnType]
+            response.headers["ETag"] = etag
+
+        if streaming_params.is_enabled():
+            return NDJSONResponse(  # pyright: ignore [reportReturnType]
+                (
+                    MachineResponse.from_model(
+                        machine=machine,  # pyright: ignore [reportArgumentType]
+                        self_base_hyperlink=f"{V3_API_PREFIX}/machines",
+                    )
+                    async for machine in services.machines.stream(query=query)
+                ),
+                headers=dict(response.headers),
+            )
+
+        if token_params.is_enabled():
+            machines_by_token = await services.machines.list_by_token(
+                token=token_params.token,
+                size=pagination_params.size,
+                query=query,
+                count=token_params.count,
+            )
+            return MachinesListResponse(
+                items=[
+                    MachineResponse.from_model(
+                        machine=machine,  # pyright: ignore [reportArgumentType]
+                        self_base_hyperlink=f"{V3_API_PREFIX}/machines",
+                    )
+                    for machine in machines_by_token.items
+                ],
+                total=machines_by_token.total,
+                total_is_estimate=machines_by_token.total_is_estimate,
+                next=(
+                    f"{V3_API_PREFIX}/machines?"
+                    + token_params.to_next_href_format(
+                        machines_by_token.next_token, pagination_params.size
+                    )
+                    if machines_by_token.next_token
+                    else None
+                ),
+            )
 
         machines = await services.machines.list(
             page=pagination_params.page,
@@ -10,13 +10,17 @@ from maasapiserver.common.api.models.responses.errors import (
     NotFoundBodyResponse,
 )
 from maasapiserver.v3.api import services
-from maasapiserver.v3.api.public.models.requests.query import PaginationParams
+from maasapiserver.v3.api.public.models.requests.query import (
+    ConditionalParams,
+    PaginationParams,
+)
 from maasapiserver.v3.api.public.models.requests.subnets import SubnetRequest
 from maasapiserver.v3.api.public.models.requests.ui_subnets import (
     UISubnetFiltersParams,
     UISubnetOrderByQueryFilter,
 )
 from maasapiserver.v3.api.public.models.responses.base import (
+    NotModifiedResponse,
     OPENAPI_ETAG_HEADER,
 )
 from maasapiserver.v3.api.public.models.responses.subnets import (
@@ -53,7 +57,11 @@ class SubnetsHandler(Handler):
         methods=["GET"],
         tags=TAGS,
         responses={
-            200: {"model": SubnetsListResponse},
+            200: {
+                "model": SubnetsListResponse,
+                "headers": {"ETag": OPENAPI_ETAG_HEADER},
+            },
+            304: {"description": "Not Modified"},
         },
         response_model_exclude_none=True,
         status_code=200,
@@ -65,7 +73,9 @@ class SubnetsHandler(Handler):
         self,
         fabric_id: int,
         vlan_id: int,
+        response: Response,
         pagination_params: PaginationParams = Depends(),  # noqa: B008
+        conditional_params: ConditionalParams = Depends(),  # noqa: B008
         services: ServiceCollectionV3 = Depends(services),  # noqa: B008
     ) -> SubnetsListResponse:
         vlan_exists = await services.vlans.exists(
@@ -95,6 +105,14 @@ class SubnetsHandler(Handler):
                 ]
             )
         )
+        etag = await services.table_generations.get_collection_etag(
+            services.subnets.get_source_tables(query), conditional_params.key
+        )
+        if etag is not None:
+            if conditional_params.matches(etag):
+                return NotModifiedResponse(etag)  # pyright: ignore [reportReturnType]
+            response.headers["ETag"] = etag
+
         subnets = await services.subnets.list(
             page=pagination_params.page,
             size=pagination_params.size,
@@ -11,12 +11,16 @@ from maasapiserver.common.api.models.responses.errors import (
     NotFoundBodyResponse,
 )
 from maasapiserver.v3.api import services
-from maasapiserver.v3.api.public.models.requests.query import PaginationParams
+from maasapiserver.v3.api.public.models.requests.query import (
+    ConditionalParams,
+    PaginationParams,
+)
 from maasapiserver.v3.api.public.models.requests.vlans import (
     VlanCreateRequest,
     VlanUpdateRequest,
 )
 from maasapiserver.v3.api.public.models.responses.base import (
+    NotModifiedResponse,
     OPENAPI_ETAG_HEADER,
 )
 from maasapiserver.v3.api.public.models.responses.vlans import (
@@ -74,7 +78,11 @@ class VlansHandler(Handler):
         methods=["GET"],
         tags=TAGS,
         responses={
-            200: {"model": VlansListResponse},
+            200: {
+                "model": VlansListResponse,
+                "headers": {"ETag": OPENAPI_ETAG_HEADER},
+            },
+            304: {"description": "Not Modified"},
         },
         response_model_exclude_none=True,
         status_code=200,
@@ -85,15 +93,24 @@ class VlansHandler(Handler):
     async def list_fabric_vlans(
         self,
         fabric_id: int,
+        response: Response,
         pagination_params: PaginationParams = Depends(),  # noqa: B008
+        conditional_params: ConditionalParams = Depends(),  # noqa: B008
         services: ServiceCollectionV3 = Depends(services),  # noqa: B008
     ) -> VlansListResponse:
+        query = QuerySpec(where=VlansClauseFactory.with_fabric_id(fabric_id))
+        etag = await services.table_generations.get_collection_etag(
+            services.vlans.get_source_tables(query), conditional_params.key
+        )
+        if etag is not None:
+            if conditional_params.matches(etag):
+                return NotModifiedResponse(etag)  # pyright: ignore [reportReturnType]
+            response.headers["ETag"] = etag
+
         vlans = await services.vlans.list(
             page=pagination_params.page,
             size=pagination_params.size,
-            query=QuerySpec(
-                where=VlansClauseFactory.with_fabric_id(fabric_id)
-            ),
+            query=query,
         )
         return VlansListResponse(
             items=[
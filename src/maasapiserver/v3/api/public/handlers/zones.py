@@ -13,12 +13,16 @@ from maasapiserver.common.api.models.responses.errors import (
     NotFoundBodyResponse,
 )
 from maasapiserver.v3.api import services
-from maasapiserver.v3.api.public.models.requests.query import PaginationParams
+from maasapiserver.v3.api.public.models.requests.query import (
+    ConditionalParams,
+    PaginationParams,
+)
 from maasapiserver.v3.api.public.models.requests.zones import (
     ZoneRequest,
     ZonesFiltersParams,
 )
 from maasapiserver.v3.api.public.models.responses.base import (
+    NotModifiedResponse,
     OPENAPI_ETAG_HEADER,
 )
 from maasapiserver.v3.api.public.models.responses.zones import (
@@ -47,7 +51,9 @@ class ZonesHandler(Handler):
         responses={
             200: {
                 "model": ZonesListResponse,
+                "headers": {"ETag": OPENAPI_ETAG_HEADER},
             },
+            304: {"description": "Not Modified"},
         },
         response_model_exclude_none=True,
         status_code=200,
@@ -57,14 +63,25 @@ class ZonesHandler(Handler):
     )
     async def list_zones(
         self,
+        response: Response,
         pagination_params: PaginationParams = Depends(),  # noqa: B008
         filters: ZonesFiltersParams = Depends(),  # noqa: B008
+        conditional_params: ConditionalParams = Depends(),  # noqa: B008
         services: ServiceCollectionV3 = Depends(services),  # noqa: B008
     ) -> ZonesListResponse:
+        query = QuerySpec(where=filters.to_clause())
+        etag = await services.table_generations.get_collection_etag(
+            services.zones.get_source_tables(query), conditional_params.key
+        )
+        if etag is not None:
+            if conditional_params.matches(etag):
+                return NotModifiedResponse(etag)  # pyright: ignore [reportReturnType]
+            response.headers["ETag"] = etag
+
         zones = await services.zones.list(
             page=pagination_params.page,
             size=pagination_params.size,
-            query=QuerySpec(where=filters.to_clause()),
+            query=query,
         )
         next_link = None
         if zones.has_next(pagination_params.page, pagination_params.size):
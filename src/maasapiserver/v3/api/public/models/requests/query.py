@@ -1,8 +1,16 @@
 # Copyright 2024-2025 Canonical Ltd.  This software is licensed under the
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
-from fastapi import Query
+import json
+from typing import Optional
+
+from fastapi import Header, Query, Request
 from pydantic import BaseModel, Field
+from sqlalchemy.dialects import postgresql
+
+from maasapiserver.v3.api.public.models.responses.base import NDJSON_MEDIA_TYPE
+from maasservicelayer.db.filters import QuerySpec
+from maasservicelayer.models.base import ListCount
 
 DEFAULT_PAGE = 1
 DEFAULT_PAGE_SIZE = 20
@@ -17,3 +25,87 @@ class PaginationParams(BaseModel):
 
     def to_next_href_format(self) -> str:
         return f"page={self.page + 1}&size={self.size}"
+
+
+class TokenPaginationParams(BaseModel):
+    """Parameters to switch a listing to token-based pagination.
+
+    The listing is token-paginated when a token is given, or when an exact
+    count of the items is not requested. The first page is requested without
+    a token, and the next pages with the token in the `next` link.
+    """
+
+    token: Optional[str] = Field(Query(default=None))
+    count: ListCount = Field(Query(default=ListCount.EXACT))
+
+    def is_enabled(self) -> bool:
+        return self.token is not None or self.count != ListCount.EXACT
+
+    def to_next_href_format(self, next_token: str, size: int) -> str:
+        return f"token={next_token}&size={size}&count={self.count.value}"
+
+
+class StreamingParams(BaseModel):
+    """Parameters to switch a listing to streaming.
+
+    When newline-delimited JSON is accepted, all the items are streamed, one
+    per line, and the pagination parameters are ignored.
+    """
+
+    accept: Optional[str] = Field(Header(default=None))
+
+    def is_enabled(self) -> bool:
+        return self.accept is not None and NDJSON_MEDIA_TYPE in self.accept
+
+
+class ConditionalParams:
+    """Parameters of a conditional listing.
+
+    The ETag of a listing is derived from the tables that it reads and from
+    everything else that the response depends on, i.e. the URL, the accepted
+    media types and the user the items are listed for. The listings that
+    filter the items by the permissions of the user must use `key_for`, so
+    that the filter is part of the key too.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        if_none_match: Optional[str] = Header(default=None),  # noqa: B008
+    ):
+        self.if_none_match = if_none_match
+        user = getattr(request.state, "authenticated_user", None)
+        self.key = json.dumps(
+            [
+                request.url.path,
+                request.url.query,
+                request.headers.get("accept"),
+                user.dict() if user is not None else None,
+            ],
+            sort_keys=True,
+            default=sorted,
+        )
+
+    def key_for(self, query: QuerySpec) -> str:
+        """Return the key of a listing of the items matching `query`.
+
+        The compiled filter and its values are added to `key`.
+        """
+        if query.where is None:
+            return self.key
+        compiled = query.where.condition.compile(dialect=postgresql.dialect())
+        return json.dumps(
+            [self.key, str(compiled), compiled.params],
+            sort_keys=True,
+            default=sorted,
+        )
+
+    def matches(self, etag: str) -> bool:
+        """Whether the client already has the listing with `etag`."""
+        if self.if_none_match is None:
+            return False
+        for tag in self.if_none_match.split(","):
+            tag = tag.strip().removeprefix("W/").strip('"')
+            if tag == "*" or tag == etag:
+                return True
+        return False
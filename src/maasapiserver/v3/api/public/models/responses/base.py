@@ -1,12 +1,27 @@
 # Copyright 2024-2025 Canonical Ltd.  This software is licensed under the
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
-from typing import Any, Dict, Generic, Optional, Sequence, TypeVar
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Generic,
+    Optional,
+    Sequence,
+    TypeVar,
+)
 
 from fastapi.openapi.models import Header as OpenApiHeader
 from fastapi.openapi.models import Schema
 from pydantic import BaseModel, Field
 from pydantic.generics import GenericModel
+from starlette.responses import Response, StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# The size of the chunks of a streamed response, in bytes.
+STREAMING_CHUNK_SIZE = 64 * 1024
 
 
 class BaseHref(BaseModel):
@@ -52,15 +67,52 @@ T = TypeVar("T", bound=HalResponse)
 
 class PaginatedResponse(GenericModel, Generic[T]):
     """
-    Base class for offset-paginated responses.
-    Derived classes should overwrite the items property
+    Base class for offset-paginated and token-paginated responses.
+    Derived classes should overwrite the items property.
+    The total is not set when the items of a token-paginated response
+    were not counted, and `total_is_estimate` tells whether it's an
+    estimate, e.g. a lower bound, rather than the exact number.
     """
 
     items: Sequence[T]
-    total: int
+    total: Optional[int] = Field(default=None)
+    total_is_estimate: Optional[bool] = Field(default=None)
     next: Optional[str] = Field(default=None)
 
 
 OPENAPI_ETAG_HEADER = OpenApiHeader(
     description="The ETag for the resource", schema=Schema(type="string")
 )
+
+
+class NDJSONResponse(StreamingResponse):
+    """
+    Stream the items of a listing as newline-delimited JSON, one item per line, as they are produced. The lines are
+    sent in chunks of about `STREAMING_CHUNK_SIZE` bytes.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    def __init__(self, items: AsyncIterable[HalResponse], **kwargs: Any):
+        super().__init__(self._encode(items), **kwargs)
+
+    async def _encode(
+        self, items: AsyncIterable[HalResponse]
+    ) -> AsyncIterator[bytes]:
+        chunk = bytearray()
+        async for item in items:
+            chunk += item.json(by_alias=True, exclude_none=True).encode()
+            chunk += b"\n"
+            if len(chunk) >= STREAMING_CHUNK_SIZE:
+                yield bytes(chunk)
+                chunk.clear()
+        if chunk:
+            yield bytes(chunk)
+
+
+class NotModifiedResponse(Response):
+    """The response to a conditional request for a resource that didn't
+    change since the client got it with `etag`."""
+
+    def __init__(self, etag: str):
+        super().__init__(status_code=304, headers={"ETag": etag})
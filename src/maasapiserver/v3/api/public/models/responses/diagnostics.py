@@ -0,0 +1,48 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+from datetime import datetime, timezone
+from typing import List, Optional, Self
+
+from pydantic import Field
+
+from maasapiserver.v3.api.public.models.responses.base import (
+    BaseHal,
+    HalResponse,
+)
+from maascommon.utils.slowqueries import SlowQuery
+
+
+class SlowQueryResponse(HalResponse[BaseHal]):
+    kind = "SlowQuery"
+    endpoint: str = Field(
+        description="The API endpoint or the websocket method that executed the statement."
+    )
+    sql: str = Field(description="The normalized text of the statement.")
+    bind_shape: str = Field(
+        description="The types of the parameters of the statement."
+    )
+    duration: float = Field(description="The duration, in seconds.")
+    timestamp: datetime
+    explain: Optional[str] = Field(
+        default=None,
+        description="The output of EXPLAIN (ANALYZE, BUFFERS), if the statement was sampled to be profiled.",
+    )
+
+    @classmethod
+    def from_model(cls, endpoint: str, slow_query: SlowQuery) -> Self:
+        return cls(
+            endpoint=endpoint,
+            sql=slow_query.sql,
+            bind_shape=slow_query.bind_shape,
+            duration=slow_query.duration,
+            timestamp=datetime.fromtimestamp(
+                slow_query.timestamp, tz=timezone.utc
+            ),
+            explain=slow_query.explain,
+        )
+
+
+class SlowQueriesListResponse(HalResponse[BaseHal]):
+    kind = "SlowQueriesList"
+    items: List[SlowQueryResponse]
@@ -4,17 +4,17 @@
 import abc
 from datetime import timedelta
 import json
-from typing import Awaitable, Callable, Dict, Sequence
+from typing import Dict, Sequence
 
-from fastapi import Request, Response
+from fastapi import Request
 from jose import jwt
 from jose.exceptions import JWTError
 from macaroonbakery import bakery
 import macaroonbakery._utils as utils
 from pymacaroons import Macaroon
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Send
 
+from maasapiserver.common.middlewares.base import ASGIMiddleware
 from maasapiserver.common.utils.http import extract_absolute_uri
 from maasapiserver.v3.constants import V3_API_PREFIX
 from maasserver.macaroons import _get_macaroon_caveats_ops
@@ -387,7 +387,7 @@ class AuthenticationProvidersCache:
         return len(self.jwt_authentication_providers_cache)
 
 
-class V3AuthenticationMiddleware(BaseHTTPMiddleware):
+class V3AuthenticationMiddleware(ASGIMiddleware):
     """
     If the request targets a v3 endpoint and provides a bearer token we verify the token and add the AuthenticatedUser to
     the request context. Otherwise, we just forward the request to the next middleware.
@@ -401,15 +401,12 @@ class V3AuthenticationMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
         self.providers_cache = providers_cache
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
+    async def handle(self, request: Request, send: Send) -> None:
         # Just pass through the request if it's not for a V3 handler. The other V2 endpoints have another authentication
         # architecture/mechanism.
         if not request.url.path.startswith(V3_API_PREFIX):
-            return await call_next(request)
+            await self.call_next(request, send)
+            return
 
         auth_header = request.headers.get("Authorization", None)
         sessionid = request.cookies.get("sessionid", None)
@@ -433,7 +430,7 @@ class V3AuthenticationMiddleware(BaseHTTPMiddleware):
             user = await self._macaroon_authentication(request, macaroons)
         request.state.authenticated_user = user
 
-        return await call_next(request)
+        await self.call_next(request, send)
 
     async def _session_authentication(
         self, request: Request, sessionid: str
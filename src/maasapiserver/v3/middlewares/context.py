@@ -1,31 +1,22 @@
 #  Copyright 2024 Canonical Ltd.  This software is licensed under the
 #  GNU Affero General Public License version 3 (see the file LICENSE).
 
-from typing import Awaitable, Callable
-
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import Message, Send
 import structlog
 
+from maasapiserver.common.middlewares.base import ASGIMiddleware
 from maasservicelayer.context import Context
 
 logger = structlog.getLogger()
 
 
-class ContextMiddleware(BaseHTTPMiddleware):
+class ContextMiddleware(ASGIMiddleware):
     """Injects the Context object in the request state."""
 
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
-        context = Context()
+    async def handle(self, request: Request, send: Send) -> None:
+        # The context is used for the single transaction of the request.
+        context = Context(batch_loading=True)
         request.state.context = context
         structlog.contextvars.clear_contextvars()
         structlog.contextvars.bind_contextvars(
@@ -39,10 +30,18 @@ class ContextMiddleware(BaseHTTPMiddleware):
             # From our nginx config
             request_remote_ip=request.headers.get("x-real-ip"),
         )
-        response = await call_next(request)
+        status_code = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.call_next(request, send_wrapper)
         logger.info(
             "End processing request",
-            status_code=response.status_code,
+            status_code=status_code,
             elapsed_time_seconds=context.get_elapsed_time_seconds(),
+            saved_queries=context.get_saved_queries(),
         )
-        return response
@@ -1,10 +1,7 @@
-from typing import Awaitable, Callable
-
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Send
 
+from maasapiserver.common.middlewares.base import ASGIMiddleware
 from maasapiserver.v3.constants import V3_API_PREFIX
 from maasservicelayer.services import CacheForServices, ServiceCollectionV3
 
@@ -16,7 +13,7 @@ async def services(
     return request.state.services
 
 
-class ServicesMiddleware(BaseHTTPMiddleware):
+class ServicesMiddleware(ASGIMiddleware):
     """Injects the V3 services in the request context if the request targets a v3 endpoint."""
 
     def __init__(
@@ -27,18 +24,15 @@ class ServicesMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
         self.services_cache = cache
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
+    async def handle(self, request: Request, send: Send) -> None:
         # Just pass through the request if it's not a V3 endpoint.
         if not request.url.path.startswith(V3_API_PREFIX):
-            return await call_next(request)
+            await self.call_next(request, send)
+            return
 
         services = await ServiceCollectionV3.produce(
             request.state.context,
             cache=self.services_cache,
         )
         request.state.services = services
-        return await call_next(request)
+        await self.call_next(request, send)
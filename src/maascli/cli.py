@@ -266,6 +266,7 @@ REGIOND_COMMANDS = (
     ("msm", "maasserver"),
     ("createadmin", "maasserver"),
     ("changepassword", "maasserver"),
+    ("slow-queries", "maasserver"),
 )
 
 
@@ -0,0 +1,137 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+"""Negotiation and compression of the HTTP response payloads."""
+
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# The encodings that can be applied to the responses, in order of preference.
+# zstd needs python3-zstandard, which the packages depend on, but it's left
+# optional so that the responses are still gzipped without it.
+SUPPORTED_ENCODINGS = (("zstd",) if zstandard is not None else ()) + ("gzip",)
+
+# The media types that are worth compressing. Images, archives and the like
+# are already compressed.
+_COMPRESSIBLE_TYPES = frozenset(
+    (
+        "application/javascript",
+        "application/json",
+        "application/x-ndjson",
+        "application/xml",
+        "application/yaml",
+    )
+)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Return the encoding to use for a request with the given
+    `Accept-Encoding` header, or None if the response must not be encoded.
+
+    The preference of the client takes precedence, ties are broken by the
+    order of `SUPPORTED_ENCODINGS`.
+    """
+    if not accept_encoding:
+        return None
+    qvalues = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        qvalue = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[coding] = qvalue
+    wildcard = qvalues.get("*", 0.0)
+    candidates = [
+        (qvalues.get(encoding, wildcard), -index, encoding)
+        for index, encoding in enumerate(SUPPORTED_ENCODINGS)
+    ]
+    qvalue, _, encoding = max(candidates)
+    return encoding if qvalue > 0 else None
+
+
+def is_compressible(content_type: str | None) -> bool:
+    """Whether a payload of the given `Content-Type` is worth compressing."""
+    if not content_type:
+        return False
+    media_type = content_type.split(";")[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type.endswith("+json")
+        or media_type.endswith("+xml")
+        or media_type in _COMPRESSIBLE_TYPES
+    )
+
+
+class StreamCompressor:
+    """Compress a payload sent in chunks.
+
+    Each chunk is flushed as soon as it's compressed, so that the client can
+    decode it without waiting for the following ones.
+    """
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        self.original_size = 0
+        self.compressed_size = 0
+        if encoding == "zstd":
+            if zstandard is None:
+                raise ValueError("zstd compression is not available")
+            self._compressor = zstandard.ZstdCompressor(
+                level=level
+            ).compressobj()
+            self._sync_flush = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            self._finish_flush = zstandard.COMPRESSOBJ_FLUSH_FINISH
+        elif encoding == "gzip":
+            # With wbits=31 the deflate stream is wrapped in the gzip format.
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self._sync_flush = zlib.Z_SYNC_FLUSH
+            self._finish_flush = zlib.Z_FINISH
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    @property
+    def saved_size(self) -> int:
+        # Tiny payloads can grow when compressed, nothing is saved then.
+        return max(self.original_size - self.compressed_size, 0)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress and flush a chunk of the payload."""
+        compressed = b""
+        if data:
+            compressed = self._compressor.compress(data)
+            compressed += self._compressor.flush(self._sync_flush)
+        self.original_size += len(data)
+        self.compressed_size += len(compressed)
+        return compressed
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the last chunk of the payload and end the stream."""
+        compressed = self._compressor.compress(data) if data else b""
+        compressed += self._compressor.flush(self._finish_flush)
+        self.original_size += len(data)
+        self.compressed_size += len(compressed)
+        return compressed
+
+
+def weaken_etag(etag: str) -> str:
+    """Return the weak version of an entity tag.
+
+    A compressed representation is not byte-for-byte identical to the
+    uncompressed one, so it can't share its strong entity tag.
+    """
+    if etag.startswith("W/"):
+        return etag
+    tag = etag.strip('"')
+    return f'W/"{tag}"'
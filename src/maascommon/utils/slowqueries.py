@@ -0,0 +1,312 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+"""Log of the slowest database statements of each endpoint.
+
+Each process keeps the N slowest statements executed by every endpoint (or
+websocket method) in memory, and saves a snapshot of them in its own file
+under a directory shared by all the MAAS processes, so that the statements of
+the whole region can be listed at once.
+"""
+
+from dataclasses import asdict, dataclass
+import heapq
+from itertools import count
+import json
+import os
+from pathlib import Path
+import random
+import re
+import threading
+import time
+from typing import Any, Iterable
+
+from maascommon.path import get_maas_data_path
+
+# Touched when the log is cleared, the statements recorded before it are
+# discarded.
+CLEARED_MARKER = "cleared"
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![$\w])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|\$\d+|%\(\w+\)s)"
+_PLACEHOLDER_LIST_RE = re.compile(
+    rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)"
+)
+_SPACE_RE = re.compile(r"\s+")
+# Functions with side effects, and clauses that lock or create rows, that
+# `EXPLAIN ANALYZE` would run again.
+_SIDE_EFFECTS_RE = re.compile(
+    r"\b(?:pg_(?:try_)?advisory_\w+|nextval|setval|pg_notify|txid_current"
+    r"|pg_sleep\w*|set_config|lo_\w+|dblink\w*)\s*\("
+    r"|\bFOR\s+(?:NO\s+KEY\s+|KEY\s+)?(?:UPDATE|SHARE)\b"
+    r"|\bINTO\b",
+    re.IGNORECASE,
+)
+
+
+def get_slow_queries_path() -> Path:
+    """Return the directory where the processes save their slow statements."""
+    return Path(get_maas_data_path("slow-queries"))
+
+
+def normalize_sql(sql: str) -> str:
+    """Normalize a statement, so that the executions of the same query with
+    different values share the same text.
+
+    Literals are replaced with `?`, lists of placeholders (e.g. the ones of
+    an expanded `IN`) are collapsed, and whitespaces are squashed.
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _PLACEHOLDER_LIST_RE.sub("(...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def _value_shape(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (list, tuple, set, frozenset, dict)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def get_bind_shape(params: Any) -> str:
+    """Describe the types of the parameters of a statement, without their
+    values."""
+    if not params:
+        return ""
+    if isinstance(params, dict):
+        return ", ".join(
+            f"{name}: {_value_shape(value)}" for name, value in params.items()
+        )
+    if isinstance(params, (list, tuple)):
+        return ", ".join(_value_shape(value) for value in params)
+    return _value_shape(params)
+
+
+def is_explainable(sql: str) -> bool:
+    """Whether the statement can be profiled with `EXPLAIN ANALYZE`.
+
+    `EXPLAIN ANALYZE` executes the statement again, so only the queries that
+    don't change anything are profiled: the ones that call functions with
+    side effects (e.g. take advisory locks or advance sequences), lock rows
+    or create tables are left out.
+    """
+    return sql.lstrip(" \t\n(").upper().startswith(
+        "SELECT"
+    ) and not _SIDE_EFFECTS_RE.search(sql)
+
+
+@dataclass
+class SlowQuery:
+    sql: str
+    bind_shape: str
+    duration: float
+    timestamp: float
+    explain: str | None = None
+
+
+class SlowStatements:
+    """The statements of a request, or of a websocket call, that took longer
+    than `threshold` seconds."""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.statements: list[tuple[str, Any, float]] = []
+
+    def add(self, sql: str, params: Any, duration: float) -> None:
+        if duration >= self.threshold:
+            self.statements.append((sql, params, duration))
+
+
+class SlowQueryLog:
+    """Keep the `size` slowest statements of each endpoint.
+
+    A sample of the statements, chosen with probability `explain_rate`, is
+    meant to be profiled with `EXPLAIN (ANALYZE, BUFFERS)` by the caller,
+    since it has to be run on the connection that executed them.
+
+    The snapshot of the log is saved in `path` by `flush`.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        name: str,
+        size: int = 10,
+        threshold: float = 0.2,
+        explain_rate: float = 0.0,
+    ):
+        self.path = path
+        self.size = size
+        self.threshold = threshold
+        self.explain_rate = explain_rate
+        self.filename = f"{name}-{os.getpid()}.json"
+        self._queries: dict[str, list[tuple[float, int, SlowQuery]]] = {}
+        self._counter = count()
+        self._cleared_at = 0.0
+        self._dirty = False
+        self._pruned = False
+        self._lock = threading.Lock()
+
+    def statements(self) -> SlowStatements:
+        """Return a collector for the statements of a request."""
+        return SlowStatements(self.threshold)
+
+    def record(
+        self, key: str, statements: Iterable[tuple[str, Any, float]]
+    ) -> list[tuple[SlowQuery, str, Any]]:
+        """Record the slow statements executed by an endpoint.
+
+        Return the statements that are sampled to be profiled, along with the
+        original text and parameters to run `EXPLAIN` with.
+        """
+        samples = []
+        now = time.time()
+        with self._lock:
+            self._discard_cleared()
+            queries = self._queries.setdefault(key, [])
+            for sql, params, duration in statements:
+                if len(queries) >= self.size and duration <= queries[0][0]:
+                    continue
+                query = SlowQuery(
+                    sql=normalize_sql(sql),
+                    bind_shape=get_bind_shape(params),
+                    duration=duration,
+                    timestamp=now,
+                )
+                item = (duration, next(self._counter), query)
+                if len(queries) < self.size:
+                    heapq.heappush(queries, item)
+                else:
+                    heapq.heapreplace(queries, item)
+                self._dirty = True
+                if (
+                    self.explain_rate
+                    and is_explainable(sql)
+                    and random.random() < self.explain_rate
+                ):
+                    samples.append((query, sql, params))
+            if not queries:
+                del self._queries[key]
+        return samples
+
+    def get_queries(self) -> dict[str, list[SlowQuery]]:
+        """Return the slow statements of each endpoint, slowest first."""
+        with self._lock:
+            return {
+                key: [query for _, _, query in sorted(queries, reverse=True)]
+                for key, queries in self._queries.items()
+            }
+
+    def set_explain(self, query: SlowQuery, explain: str) -> None:
+        """Attach the output of `EXPLAIN` to a sampled statement."""
+        with self._lock:
+            query.explain = explain
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Save the snapshot of the log, if it changed.
+
+        The first time, the snapshots left by the processes that don't exist
+        anymore are removed.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            snapshot = {
+                key: [asdict(query) for _, _, query in queries]
+                for key, queries in self._queries.items()
+            }
+            self.path.mkdir(parents=True, exist_ok=True)
+            target = self.path / self.filename
+            tmp = target.with_suffix(".tmp")
+            tmp.write_text(json.dumps(snapshot))
+            tmp.replace(target)
+            if not self._pruned:
+                self._pruned = True
+                prune_slow_queries(self.path)
+
+    def _discard_cleared(self) -> None:
+        cleared_at = _get_cleared_at(self.path)
+        if cleared_at <= self._cleared_at:
+            return
+        self._cleared_at = cleared_at
+        for key, queries in list(self._queries.items()):
+            queries = [
+                item for item in queries if item[2].timestamp > cleared_at
+            ]
+            if queries:
+                heapq.heapify(queries)
+                self._queries[key] = queries
+            else:
+                del self._queries[key]
+        self._dirty = True
+
+
+def _get_cleared_at(path: Path) -> float:
+    try:
+        return (path / CLEARED_MARKER).stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def _pid_exists(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists, but belongs to another user.
+        return True
+    return True
+
+
+def prune_slow_queries(path: Path) -> None:
+    """Remove the snapshots saved by the processes that don't exist
+    anymore."""
+    for snapshot_path in path.glob("*-*.json"):
+        _, _, pid = snapshot_path.stem.rpartition("-")
+        if pid.isdigit() and not _pid_exists(int(pid)):
+            snapshot_path.unlink(missing_ok=True)
+
+
+def read_slow_queries(
+    path: Path, size: int | None = None
+) -> dict[str, list[SlowQuery]]:
+    """Merge the slow statements saved by all the processes.
+
+    The statements of each endpoint are sorted from the slowest, and at most
+    `size` of them are returned, if given.
+    """
+    cleared_at = _get_cleared_at(path)
+    merged: dict[str, list[SlowQuery]] = {}
+    for snapshot_path in sorted(path.glob("*.json")):
+        try:
+            snapshot = json.loads(snapshot_path.read_text())
+        except (OSError, ValueError):
+            # The process that owns the file might be replacing it.
+            continue
+        for key, queries in snapshot.items():
+            merged.setdefault(key, []).extend(
+                SlowQuery(**query)
+                for query in queries
+                if query["timestamp"] > cleared_at
+            )
+    return {
+        key: sorted(queries, key=lambda query: query.duration, reverse=True)[
+            :size
+        ]
+        for key, queries in sorted(merged.items())
+        if queries
+    }
+
+
+def clear_slow_queries(path: Path) -> None:
+    """Discard the slow statements recorded so far by all the processes."""
+    path.mkdir(parents=True, exist_ok=True)
+    for snapshot_path in path.glob("*.json"):
+        snapshot_path.unlink(missing_ok=True)
+    (path / CLEARED_MARKER).touch()
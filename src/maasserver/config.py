@@ -103,6 +103,133 @@ class RegionConfiguration(Configuration, metaclass=RegionConfigurationMeta):
         "Number of keeaplives that can be lost before connection is reset.",
         Int(if_missing=2),
     )
+    database_pool_size = ConfigurationOption(
+        "database_pool_size",
+        "Number of connections kept in the database pool of the API server "
+        "and the temporal worker.",
+        Int(if_missing=3, accept_python=False, min=1),
+    )
+    database_pool_max_overflow = ConfigurationOption(
+        "database_pool_max_overflow",
+        "Number of connections that can be opened beyond the size of each "
+        "pool, when all the pooled ones are in use.",
+        Int(if_missing=10, accept_python=False, min=0),
+    )
+    database_pool_recycle = ConfigurationOption(
+        "database_pool_recycle",
+        "Lifetime (in seconds) of the pooled connections. With -1, they're "
+        "never recycled.",
+        Int(if_missing=-1, accept_python=False, min=-1),
+    )
+    database_pool_timeout = ConfigurationOption(
+        "database_pool_timeout",
+        "Time (in seconds) to wait for a connection from the pool.",
+        Int(if_missing=30, accept_python=False, min=1),
+    )
+    database_read_pool_size = ConfigurationOption(
+        "database_read_pool_size",
+        "Number of connections kept in a separate pool for the read-only "
+        "requests of the API server. With 0, all the requests share the "
+        "same pool.",
+        Int(if_missing=0, accept_python=False, min=0),
+    )
+    database_read_host = ConfigurationOption(
+        "database_read_host",
+        "The address of the PostgreSQL database (e.g. a hot-standby "
+        "replica) used by the read-only pool. Defaults to database_host.",
+        UnicodeString(if_missing="", accept_python=False),
+    )
+    database_read_port = ConfigurationOption(
+        "database_read_port",
+        "The port of the PostgreSQL database used by the read-only pool. "
+        "With 0, database_port is used.",
+        Int(if_missing=0, accept_python=False, min=0, max=65535),
+    )
+
+    # Listener options.
+    listener_notify_window = ConfigurationOption(
+        "listener_notify_window",
+        "Time (in milliseconds) during which database notifications for the "
+        "same object are coalesced.",
+        Int(if_missing=500, accept_python=False, min=10),
+    )
+    listener_shared = ConfigurationOption(
+        "listener_shared",
+        "Only listen for database notifications in the master regiond "
+        "process, and relay them to the worker processes.",
+        OneWayStringBool(if_missing=False),
+    )
+
+    # Websocket options.
+    websocket_notify_batch_interval = ConfigurationOption(
+        "websocket_notify_batch_interval",
+        "Time (in milliseconds) during which notifications are batched for "
+        "websocket clients that requested it. With 0, the notifications are "
+        "sent at the next reactor iteration.",
+        Int(if_missing=0, accept_python=False, min=0),
+    )
+    websocket_dehydrate_cache_size = ConfigurationOption(
+        "websocket_dehydrate_cache_size",
+        "Memory budget (in MiB) of the cache of objects dehydrated by the "
+        "websocket handlers. With 0, the cache is disabled.",
+        Int(if_missing=64, accept_python=False, min=0),
+    )
+    websocket_deflate = ConfigurationOption(
+        "websocket_deflate",
+        "Compress the websocket messages with the permessage-deflate "
+        "extension, when the clients support it.",
+        OneWayStringBool(if_missing=True),
+    )
+    websocket_deflate_context_takeover = ConfigurationOption(
+        "websocket_deflate_context_takeover",
+        "Keep the compression context of each websocket connection between "
+        "messages. Disabling it saves memory, at the cost of a lower "
+        "compression ratio.",
+        OneWayStringBool(if_missing=True),
+    )
+
+    # Configurations cache options.
+    config_cache_secrets_ttl = ConfigurationOption(
+        "config_cache_secrets_ttl",
+        "Time (in seconds) the API server and the temporal worker cache the "
+        "configurations stored as secrets. With 0, they're not cached.",
+        Int(if_missing=60, accept_python=False, min=0),
+    )
+
+    # HTTP compression options.
+    http_compression_min_size = ConfigurationOption(
+        "http_compression_min_size",
+        "Minimum size (in bytes) of the API responses that are compressed. "
+        "Streamed responses are always compressed.",
+        Int(if_missing=1024, accept_python=False, min=0),
+    )
+    http_compression_level = ConfigurationOption(
+        "http_compression_level",
+        "Level of compression of the API responses, from 1 (fastest) to 9 "
+        "(smallest). With 0, the responses are not compressed.",
+        Int(if_missing=6, accept_python=False, min=0, max=9),
+    )
+
+    # Slow queries options.
+    slow_query_threshold = ConfigurationOption(
+        "slow_query_threshold",
+        "Time (in milliseconds) after which a database statement is "
+        "recorded in the log of the slow queries.",
+        Int(if_missing=200, accept_python=False, min=0),
+    )
+    slow_query_log_size = ConfigurationOption(
+        "slow_query_log_size",
+        "Number of the slowest statements kept for each API endpoint and "
+        "websocket method. With 0, the slow queries are not recorded.",
+        Int(if_missing=10, accept_python=False, min=0),
+    )
+    slow_query_explain_rate = ConfigurationOption(
+        "slow_query_explain_rate",
+        "Percentage of the recorded slow queries that are profiled with "
+        "EXPLAIN (ANALYZE, BUFFERS). The queries are executed again to be "
+        "profiled, and only the SELECT ones are.",
+        Int(if_missing=0, accept_python=False, min=0, max=100),
+    )
 
     # Vault options.
     vault_url = ConfigurationOption(
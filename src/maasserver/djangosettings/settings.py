@@ -112,6 +112,19 @@ DEBUG = False
 DEBUG_QUERIES = False
 DEBUG_HTTP = False
 
+# Compression of the HTTP responses. Responses smaller than
+# HTTP_COMPRESSION_MIN_SIZE bytes are sent as they are, and a level of 0
+# disables the compression.
+HTTP_COMPRESSION_MIN_SIZE = 1024
+HTTP_COMPRESSION_LEVEL = 6
+
+# Log of the slow queries. The SLOW_QUERY_LOG_SIZE statements of each endpoint
+# that took the longest, if longer than SLOW_QUERY_THRESHOLD milliseconds, are
+# recorded, and SLOW_QUERY_EXPLAIN_RATE percent of them are profiled.
+SLOW_QUERY_THRESHOLD = 200
+SLOW_QUERY_LOG_SIZE = 10
+SLOW_QUERY_EXPLAIN_RATE = 0
+
 # The following specify named URL patterns.
 LOGOUT_URL = "/MAAS/"
 LOGIN_URL = "/MAAS/"
@@ -158,6 +171,11 @@ try:
         DEBUG = config.debug
         DEBUG_QUERIES = config.debug_queries
         DEBUG_HTTP = config.debug_http
+        HTTP_COMPRESSION_MIN_SIZE = config.http_compression_min_size
+        HTTP_COMPRESSION_LEVEL = config.http_compression_level
+        SLOW_QUERY_THRESHOLD = config.slow_query_threshold
+        SLOW_QUERY_LOG_SIZE = config.slow_query_log_size
+        SLOW_QUERY_EXPLAIN_RATE = config.slow_query_explain_rate
         if DEBUG_QUERIES and not DEBUG:
             # For debug queries to work debug most also be on, so Django will
             # track the queries made.
@@ -241,9 +259,11 @@ TEMPLATES = [
 MIDDLEWARE = (
     # Update Prometheus metrics for requests
     "maasserver.prometheus.middleware.PrometheusRequestMetricsMiddleware",
+    # Compress the responses with the encoding accepted by the client.
+    "maasserver.middleware.CompressionMiddleware",
     # Prints request & response to the logs. FIXME: Do we use this? Keep
-    # DebuggingLoggerMiddleware underneath GZipMiddleware so that it deals
-    # with un-compressed responses.
+    # DebuggingLoggerMiddleware underneath CompressionMiddleware so that it
+    # deals with un-compressed responses.
     "maasserver.middleware.DebuggingLoggerMiddleware",
     # Used for session and cookies.
     "django.contrib.sessions.middleware.SessionMiddleware",
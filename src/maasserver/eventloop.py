@@ -124,9 +124,26 @@ def make_ImportResourcesProgressService():
 
 
 def make_PostgresListenerService():
+    from maasserver.config import RegionConfiguration
     from maasserver.listener import PostgresListenerService
 
-    return PostgresListenerService()
+    with RegionConfiguration.open() as config:
+        notify_window = config.listener_notify_window / 1000
+
+    return PostgresListenerService(notify_window=notify_window)
+
+
+def make_PostgresListenerWorkerService(ipcWorker):
+    from maasserver.config import RegionConfiguration
+
+    with RegionConfiguration.open() as config:
+        listener_shared = config.listener_shared
+
+    if listener_shared:
+        from maasserver.ipc import IPCListenerService
+
+        return IPCListenerService(ipcWorker)
+    return make_PostgresListenerService()
 
 
 def make_StatusWorkerService(dbtasks):
@@ -188,9 +205,27 @@ def make_TemporalService():
 
 
 def make_WebApplicationService(postgresListener, statusWorker):
+    from maasserver.config import RegionConfiguration
     from maasserver.webapp import WebApplicationService
 
-    site_service = WebApplicationService(postgresListener, statusWorker)
+    with RegionConfiguration.open() as config:
+        notify_batch_interval = config.websocket_notify_batch_interval / 1000
+        dehydrate_cache_size = (
+            config.websocket_dehydrate_cache_size * 1024 * 1024
+        )
+        websocket_deflate = config.websocket_deflate
+        websocket_deflate_context_takeover = (
+            config.websocket_deflate_context_takeover
+        )
+
+    site_service = WebApplicationService(
+        postgresListener,
+        statusWorker,
+        notify_batch_interval=notify_batch_interval,
+        dehydrate_cache_size=dehydrate_cache_size,
+        websocket_deflate=websocket_deflate,
+        websocket_deflate_context_takeover=websocket_deflate_context_takeover,
+    )
     return site_service
 
 
@@ -245,6 +280,14 @@ def make_VaultSecretsCleanupService():
     return VaultSecretsCleanupService(reactor)
 
 
+def make_TableGenerationsCompactionService():
+    from maasserver.regiondservices.table_generations_compaction import (
+        TableGenerationsCompactionService,
+    )
+
+    return TableGenerationsCompactionService(reactor)
+
+
 class MAASServices(MultiService):
     def __init__(self, eventloop):
         self.eventloop = eventloop
@@ -347,8 +390,8 @@ class RegionEventLoop:
         },
         "postgres-listener-worker": {
             "only_on_master": False,
-            "factory": make_PostgresListenerService,
-            "requires": [],
+            "factory": make_PostgresListenerWorkerService,
+            "requires": ["ipc-worker"],
         },
         "web": {
             "only_on_master": False,
@@ -433,6 +476,11 @@ class RegionEventLoop:
             "factory": make_VaultSecretsCleanupService,
             "requires": [],
         },
+        "table-generations-compaction": {
+            "only_on_master": True,
+            "factory": make_TableGenerationsCompactionService,
+            "requires": [],
+        },
         "temporal": {
             "only_on_master": True,
             "factory": make_TemporalService,
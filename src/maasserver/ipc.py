@@ -9,14 +9,23 @@ worker regiond processes. All worker regiond process connect to the master
 socket.
 """
 
+from collections import defaultdict
+from contextlib import contextmanager
 from datetime import timedelta
 from functools import partial
+import json
 import os
 from socket import gethostname
 
 from netaddr import IPAddress
 from twisted.application import service
-from twisted.internet.defer import CancelledError, inlineCallbacks
+from twisted.internet.defer import (
+    CancelledError,
+    DeferredList,
+    inlineCallbacks,
+    maybeDeferred,
+    succeed,
+)
 from twisted.internet.endpoints import (
     connectProtocol,
     UNIXClientEndpoint,
@@ -28,6 +37,10 @@ from twisted.protocols import amp
 
 from maasserver import eventloop, workers
 from maasserver.enum import SERVICE_STATUS
+from maasserver.listener import (
+    PostgresListenerRegistrationError,
+    PostgresListenerUnregistrationError,
+)
 from maasserver.models.node import RackController, RegionController
 from maasserver.models.regioncontrollerprocess import RegionControllerProcess
 from maasserver.models.regioncontrollerprocessendpoint import (
@@ -99,6 +112,51 @@ class RPCUnregisterConnection(amp.Command):
     errors = []
 
 
+class ListenerSubscribe(amp.Command):
+    """Subscribe worker to the database notifications of `channels`.
+
+    The channels replace the ones previously subscribed to by the worker.
+    """
+
+    arguments = [
+        (b"pid", amp.Integer()),
+        (b"channels", amp.ListOf(amp.Unicode())),
+    ]
+    response = []
+    errors = []
+
+
+class ListenerNotify(amp.Command):
+    """Relay a database notification from the master to a worker.
+
+    `changes` is the JSON encoded changes carried by the notification, if
+    any (see `maasserver.listener.decode_notify_payload`).
+    """
+
+    arguments = [
+        (b"channel", amp.Unicode()),
+        (b"action", amp.Unicode()),
+        (b"pk", amp.Unicode()),
+        (b"changes", amp.Unicode(optional=True)),
+    ]
+    response = []
+    errors = []
+
+
+class ListenerSystemNotify(amp.Command):
+    """Relay a notification of a system channel from the master to a worker.
+
+    The `payload` is passed as it is, see `PostgresListenerService`.
+    """
+
+    arguments = [
+        (b"channel", amp.Unicode()),
+        (b"payload", amp.Unicode()),
+    ]
+    response = []
+    errors = []
+
+
 class IPCMaster(RPCProtocol):
     """The IPC master side of the protocol."""
 
@@ -131,6 +189,12 @@ class IPCMaster(RPCProtocol):
         self.factory.service.unregisterWorkerRPCConnection(pid, connid)
         return {}
 
+    @ListenerSubscribe.responder
+    def listener_subscribe(self, pid, channels):
+        """Worker subscribes to the database notifications of `channels`."""
+        self.factory.service.registerWorkerChannels(pid, channels)
+        return {}
+
 
 class IPCMasterService(service.Service):
     """
@@ -145,10 +209,11 @@ class IPCMasterService(service.Service):
 
     connections = None
 
-    def __init__(self, reactor, workers=None, socket_path=None):
+    def __init__(self, reactor, workers=None, socket_path=None, listener=None):
         super().__init__()
         self.reactor = reactor
         self.workers = workers
+        self.listener = listener
         self.socket_path = socket_path
         if self.socket_path is None:
             self.socket_path = get_ipc_socket_path()
@@ -157,6 +222,10 @@ class IPCMasterService(service.Service):
         self.endpoint = UNIXServerEndpoint(reactor, self.socket_path)
         self.port = None
         self.connections = {}
+        # The database notification channels each worker subscribed to, and
+        # the handlers relaying them registered with the listener.
+        self.workerChannels = {}
+        self.channelRelays = {}
         self.factory = Factory.forProtocol(IPCMaster)
         self.factory.service = self
         self.updateLoop = LoopingCall(self.update)
@@ -280,6 +349,7 @@ class IPCMasterService(service.Service):
         """Unregister the worker with `pid` because of `reason`."""
         pid = self.getPIDFromConnection(conn)
         if pid:
+            self.registerWorkerChannels(pid, [])
 
             @transactional
             def delete_process(pid):
@@ -301,6 +371,82 @@ class IPCMasterService(service.Service):
             d.addCallback(log_disconnected)
             return d
 
+    def _getListener(self):
+        """Return the `PostgresListenerService` of the master process."""
+        if self.listener is None:
+            self.listener = eventloop.services.getServiceNamed(
+                "postgres-listener-master"
+            )
+        return self.listener
+
+    def registerWorkerChannels(self, pid, channels):
+        """Relay the database notifications of `channels` to worker `pid`.
+
+        The master listener only listens once to a channel, no matter how
+        many workers subscribed to it. System channels can only be relayed
+        when the master doesn't handle them itself.
+        """
+        previous = self.workerChannels.pop(pid, set())
+        channels = set(channels)
+        if channels:
+            self.workerChannels[pid] = channels
+        subscribed = set().union(*self.workerChannels.values())
+        for channel in channels - previous:
+            if channel not in self.channelRelays:
+                if channel.startswith("sys_"):
+                    relay = self.relaySystemNotification
+                else:
+                    relay = partial(self.relayNotification, channel)
+                try:
+                    self._getListener().register(channel, relay, changes=True)
+                except PostgresListenerRegistrationError:
+                    log.err(None, "Failed to relay %s." % channel)
+                else:
+                    self.channelRelays[channel] = relay
+        for channel in previous - subscribed:
+            relay = self.channelRelays.pop(channel, None)
+            if relay is not None:
+                try:
+                    self._getListener().unregister(channel, relay)
+                except PostgresListenerUnregistrationError:
+                    log.err(None, "Failed to stop relaying %s." % channel)
+
+    def relayNotification(self, channel, action, pk, changes):
+        """Send a database notification to the workers subscribed to it."""
+        if changes is not None:
+            changes = json.dumps(changes)
+        return self._relayToWorkers(
+            channel,
+            ListenerNotify,
+            channel=channel,
+            action=action,
+            pk=str(pk),
+            changes=changes,
+        )
+
+    def relaySystemNotification(self, channel, payload):
+        """Send a notification of a system channel to the workers subscribed
+        to it."""
+        return self._relayToWorkers(
+            channel, ListenerSystemNotify, channel=channel, payload=payload
+        )
+
+    def _relayToWorkers(self, channel, command, **kwargs):
+        defers = []
+        for pid, channels in self.workerChannels.items():
+            if channel not in channels or pid not in self.connections:
+                continue
+            d = self.connections[pid]["connection"].callRemote(
+                command, **kwargs
+            )
+            d.addErrback(
+                log.err,
+                "Failed to relay %s notification to worker pid:%d."
+                % (channel, pid),
+            )
+            defers.append(d)
+        return DeferredList(defers)
+
     def _getListenAddresses(self, port):
         """Return list of tuple (address, port) for the addresses the worker
         is listening on."""
@@ -645,10 +791,38 @@ class IPCWorker(RPCProtocol):
         def set_defers(result):
             self.service.protocol.set(self)
             self.service.processId.set(result["process_id"])
+            if self.service.listener is not None:
+                # The master forgets the channels of a worker when its
+                # connection is lost, subscribe to them again.
+                self.service.listener.runSubscribe()
 
         d.addCallback(set_defers)
         return d
 
+    def connectionLost(self, reason):
+        super().connectionLost(reason)
+        protocol = self.service.protocol
+        if protocol.isSet and protocol.value is self:
+            # Wait for the next connection to talk to the master.
+            self.service.protocol = DeferredValue()
+            self.service.processId = DeferredValue()
+
+    @ListenerNotify.responder
+    def listener_notify(self, channel, action, pk, changes=None):
+        """Master relayed a database notification."""
+        if changes is not None:
+            changes = json.loads(changes)
+        d = self.service.listenerNotify(channel, action, pk, changes)
+        d.addCallback(lambda _: {})
+        return d
+
+    @ListenerSystemNotify.responder
+    def listener_system_notify(self, channel, payload):
+        """Master relayed a notification of a system channel."""
+        d = self.service.listenerSystemNotify(channel, payload)
+        d.addCallback(lambda _: {})
+        return d
+
 
 class IPCWorkerService(service.Service):
     """
@@ -667,6 +841,7 @@ class IPCWorkerService(service.Service):
         self._protocol = None
         self.protocol = DeferredValue()
         self.processId = DeferredValue()
+        self.listener = None
 
     @asynchronous
     def startService(self):
@@ -743,3 +918,143 @@ class IPCWorkerService(service.Service):
             )
         )
         return d
+
+    @asynchronous
+    def listenerSubscribe(self, channels):
+        """Subscribe to the database notifications of `channels`."""
+        d = self.protocol.get()
+        d.addCallback(
+            lambda protocol: protocol.callRemote(
+                ListenerSubscribe, pid=os.getpid(), channels=sorted(channels)
+            )
+        )
+        return d
+
+    def listenerNotify(self, channel, action, pk, changes):
+        """Pass a database notification relayed by the master to the
+        listener of the worker."""
+        if self.listener is None:
+            return succeed(None)
+        return self.listener.handleNotify(channel, action, pk, changes)
+
+    def listenerSystemNotify(self, channel, payload):
+        """Pass a notification of a system channel relayed by the master to
+        the listener of the worker."""
+        if self.listener is None:
+            return succeed(None)
+        return self.listener.handleSystemNotify(channel, payload)
+
+
+class IPCListenerService(service.Service):
+    """
+    IPC listener service.
+
+    Provides the `register` and `unregister` interface of
+    `PostgresListenerService` to the services of a worker, without a
+    connection to the database. The master process listens on behalf of all
+    its workers and relays the decoded and coalesced notifications of the
+    channels each worker subscribed to over IPC.
+
+    As with `PostgresListenerService`, a system channel can only have one
+    handler, which is called with the channel and the payload. The master
+    can't relay the system channels it handles itself.
+    """
+
+    def __init__(self, ipcWorker):
+        super().__init__()
+        self.ipcWorker = ipcWorker
+        self.ipcWorker.listener = self
+        self.clock = ipcWorker.reactor
+        self.listeners = defaultdict(list)
+        self.changesHandlers = set()
+        self.subscribing = None
+
+    @asynchronous
+    def startService(self):
+        super().startService()
+        self.runSubscribe()
+
+    def register(self, channel, handler, changes=False):
+        """Register listening for notifications from a channel.
+
+        See `PostgresListenerService.register`.
+        """
+        if channel.startswith("sys_") and self.listeners.get(channel):
+            raise PostgresListenerRegistrationError(
+                "System channel '%s' has already been registered." % channel
+            )
+        self.listeners[channel].append(handler)
+        if changes:
+            self.changesHandlers.add(handler)
+        self.runSubscribe()
+
+    def unregister(self, channel, handler):
+        """Unregister listening for notifications from a channel.
+
+        See `PostgresListenerService.unregister`.
+        """
+        handlers = self.listeners.get(channel, [])
+        if handler not in handlers:
+            raise PostgresListenerUnregistrationError(
+                "Handler is not registered on that channel '%s'." % channel
+            )
+        handlers.remove(handler)
+        self.changesHandlers.discard(handler)
+        if not handlers:
+            del self.listeners[channel]
+        self.runSubscribe()
+
+    @contextmanager
+    def listen(self, channel, handler):
+        """
+        Helper for processes that register their channels temporarily
+        """
+        self.register(channel, handler)
+        try:
+            yield
+        finally:
+            self.unregister(channel, handler)
+
+    @asynchronous
+    def runSubscribe(self):
+        """Send the subscribed channels to the master.
+
+        Registrations made in the same reactor iteration are sent at once.
+        They can be made from other threads, as the import of the boot
+        resources does.
+        """
+        if self.running and self.subscribing is None:
+            self.subscribing = self.clock.callLater(0, self.subscribe)
+
+    def subscribe(self):
+        self.subscribing = None
+        d = self.ipcWorker.listenerSubscribe(list(self.listeners))
+        d.addErrback(log.err, "Failed to subscribe to notifications.")
+        return d
+
+    def handleNotify(self, channel, action, pk, changes):
+        """Call the handlers registered for `channel`."""
+        defers = []
+        for handler in self.listeners.get(channel, []):
+            if handler in self.changesHandlers:
+                d = maybeDeferred(handler, action, pk, changes)
+            else:
+                d = maybeDeferred(handler, action, pk)
+            d.addErrback(
+                log.err,
+                "Failure while handling notification to %r: %r"
+                % (channel, pk),
+            )
+            defers.append(d)
+        return DeferredList(defers)
+
+    def handleSystemNotify(self, channel, payload):
+        """Call the handler registered for the system `channel`."""
+        handlers = self.listeners.get(channel)
+        if not handlers:
+            return succeed(None)
+        d = maybeDeferred(handlers[0], channel, payload)
+        d.addErrback(
+            log.err, "Failure while handling notification to %r." % channel
+        )
+        return d
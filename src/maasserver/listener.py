@@ -3,7 +3,7 @@
 
 """Listens for NOTIFY events from the postgres database."""
 
-from collections import defaultdict, deque
+from collections import defaultdict, OrderedDict
 from contextlib import contextmanager
 from errno import ENOENT
 import json
@@ -26,6 +26,7 @@ from twisted.logger import Logger
 from twisted.python.failure import Failure
 from zope.interface import implementer
 
+from provisioningserver.prometheus.metrics import PROMETHEUS_METRICS
 from provisioningserver.utils.enum import map_enum
 from provisioningserver.utils.events import EventGroup
 from provisioningserver.utils.twisted import callOut, suppress, synchronous
@@ -73,17 +74,28 @@ class PostgresListenerService(Service):
 
     # Seconds to wait to handle new notifications. When the notifications set
     # is empty it will wait this amount of time to check again for new
-    # notifications.
+    # notifications. Notifications for the same object received within this
+    # window are coalesced into one.
     HANDLE_NOTIFY_DELAY = 0.5
     CHANNEL_REGISTRAR_DELAY = 0.5
 
-    def __init__(self, alias="default"):
+    def __init__(self, alias="default", notify_window=None):
         self.alias = alias
+        if notify_window is not None:
+            self.HANDLE_NOTIFY_DELAY = notify_window
         self.listeners = defaultdict(list)
         self.autoReconnect = False
         self.connection = None
         self.connectionFileno = None
-        self.notifications = deque()
+        # Pending notifications, keyed by the channel and object id they are
+        # coalesced on. See `queueNotification`.
+        self.notifications = OrderedDict()
+        # Handlers that want the changes carried by enriched notifications.
+        self.changesHandlers = set()
+        # Number of notifications received from the database and dispatched
+        # to the handlers, the difference being what coalescing saved.
+        self.notificationsReceived = 0
+        self.notificationsDispatched = 0
         self.notifier = task.LoopingCall(self.handleNotifies)
         self.notifierDone = None
         self.connecting = None
@@ -178,11 +190,13 @@ class PostgresListenerService(Service):
         finally:
             self.connectionFileno = None
 
-    def register(self, channel, handler):
+    def register(self, channel, handler, changes=False):
         """Register listening for notifications from a channel.
 
         When a notification is received for that `channel` the `handler` will
-        be called with the action and object id.
+        be called with the action and object id. If `changes` is True, the
+        changes carried by the notification are passed as third argument (see
+        `decode_notify_payload`).
         """
         if self.shutting_down:
             raise PostgresListenerRegistrationError(
@@ -201,6 +215,8 @@ class PostgresListenerService(Service):
             )
         else:
             handlers.append(handler)
+            if changes:
+                self.changesHandlers.add(handler)
         self.runChannelRegistrar()
 
     def unregister(self, channel, handler):
@@ -223,6 +239,7 @@ class PostgresListenerService(Service):
         handlers = self.listeners[channel]
         if handler in handlers:
             handlers.remove(handler)
+            self.changesHandlers.discard(handler)
         else:
             raise PostgresListenerUnregistrationError(
                 "Handler is not registered on that channel '%s'." % channel
@@ -461,7 +478,8 @@ class PostgresListenerService(Service):
 
         def gen_notifications(notifications):
             while notifications:
-                yield notifications.popleft()
+                _, notification = notifications.popitem(last=False)
+                yield notification
 
         return task.coiterate(
             self.handleNotify(notification, clock=clock)
@@ -470,7 +488,7 @@ class PostgresListenerService(Service):
 
     def handleNotify(self, notification, clock=reactor):
         """Process a notify message in the notifications set."""
-        channel, payload = notification
+        channel, payload, changes = notification
         try:
             channel, action = self.convertChannel(channel)
         except PostgresListenerNotifyError:
@@ -480,12 +498,21 @@ class PostgresListenerService(Service):
                 "Failed to convert channel {channel!r}.", channel=channel
             )
         else:
+            self.notificationsDispatched += 1
+            PROMETHEUS_METRICS.update(
+                "maas_listener_notifications_dispatched",
+                "inc",
+                labels={"channel": channel},
+            )
             defers = []
             handlers = self.listeners[channel]
             # XXX: There could be an arbitrary number of listeners. Should we
             # limit concurrency here? Perhaps even do one at a time.
             for handler in handlers:
-                d = defer.maybeDeferred(handler, action, payload)
+                if handler in self.changesHandlers:
+                    d = defer.maybeDeferred(handler, action, payload, changes)
+                else:
+                    d = defer.maybeDeferred(handler, action, payload)
                 d.addErrback(
                     lambda failure: self.log.failure(
                         "Failure while handling notification to {channel!r}: "
@@ -498,6 +525,60 @@ class PostgresListenerService(Service):
                 defers.append(d)
             return defer.DeferredList(defers)
 
+    def queueNotification(self, channel, payload):
+        """Add a notification to the pending notifications.
+
+        Notifications are coalesced on the channel and the object id, so that
+        when an object is changed multiple times within `HANDLE_NOTIFY_DELAY`
+        its handlers are only called once. For the create, update and delete
+        actions a pending notification is replaced if the new one supersedes
+        it (see `_supersedes`), otherwise the changes they carry are merged.
+
+        Batched notifications are queued as one notification per object id.
+        """
+        for object_payload in split_notify_payload(payload):
+            self._queueObjectNotification(channel, object_payload)
+
+    def _queueObjectNotification(self, channel, payload):
+        """Add the notification for a single object, see
+        `queueNotification`."""
+        self.notificationsReceived += 1
+        name, _, action = channel.partition("_")
+        PROMETHEUS_METRICS.update(
+            "maas_listener_notifications_received",
+            "inc",
+            labels={"channel": name},
+        )
+        pk, changes = decode_notify_payload(payload)
+        if action in map_enum(ACTIONS).values():
+            key = (name, pk)
+        else:
+            key = (channel, pk)
+        pending = self.notifications.get(key)
+        if pending is None:
+            self.notifications[key] = (channel, pk, changes)
+        elif self._supersedes(action, pending[0].partition("_")[2]):
+            self.notifications[key] = (channel, pk, changes)
+            self.notifications.move_to_end(key)
+        else:
+            pending_channel, _, pending_changes = pending
+            self.notifications[key] = (
+                pending_channel,
+                pk,
+                merge_notify_changes(pending_changes, changes),
+            )
+
+    def _supersedes(self, action, pending_action):
+        """Return whether `action` supersedes a pending `pending_action`.
+
+        A delete always wins, and a create wins over a pending delete as the
+        object was created again. Anything else is covered by the pending
+        notification, since handlers fetch the latest state of the object.
+        """
+        if action == ACTIONS.DELETE:
+            return True
+        return action == ACTIONS.CREATE and pending_action == ACTIONS.DELETE
+
     def _process_notifies(self):
         """Add each notify to to the notifications set.
 
@@ -529,9 +610,7 @@ class PostgresListenerService(Service):
             else:
                 # Place non-system messages into the queue to be
                 # processed.
-                notification = (notify.channel, notify.payload)
-                if notification not in self.notifications:
-                    self.notifications.append(notification)
+                self.queueNotification(notify.channel, notify.payload)
         # Delete the contents of the connection's notifies list so
         # that we don't process them a second time.
         del notifies[:]
@@ -548,6 +627,66 @@ class PostgresListenerService(Service):
             self.unregister(channel, handler)
 
 
+def split_notify_payload(payload: str) -> list[str]:
+    """Return the payloads of the notifications batched in `payload`.
+
+    Statement-level triggers send a single notification for all the objects
+    changed by a statement, the payload being a JSON object with their ids as
+    `pks` (see `maasserver.triggers.register_statement_trigger`). Other
+    payloads are returned as they are.
+    """
+    if not payload.startswith('{"pks"'):
+        return [payload]
+    try:
+        pks = json.loads(payload)["pks"]
+    except (ValueError, TypeError, KeyError):
+        return [payload]
+    if not isinstance(pks, list):
+        return [payload]
+    return [str(pk) for pk in pks]
+
+
+def decode_notify_payload(payload: str) -> tuple[str, dict | None]:
+    """Return the object id and the changes carried by a NOTIFY payload.
+
+    Most triggers only send the object id. Enriched notifications send a JSON
+    object with the id as `pk`, the names of the `changed` columns (null when
+    not an update) and a few denormalized `fields` of the row. For those the
+    changes are returned as a dict with the `changed` and `fields` keys,
+    otherwise `None`.
+    """
+    if not payload.startswith("{"):
+        return payload, None
+    try:
+        data = json.loads(payload)
+        pk = data["pk"]
+    except (ValueError, TypeError, KeyError):
+        return payload, None
+    return pk, {
+        "changed": data.get("changed"),
+        "fields": data.get("fields") or {},
+    }
+
+
+def merge_notify_changes(
+    pending: dict | None, changes: dict | None
+) -> dict | None:
+    """Merge the changes of two coalesced notifications for an object.
+
+    The result is `None` (unknown changes) if any of them is unknown.
+    """
+    if pending is None or changes is None:
+        return None
+    if pending["changed"] is None or changes["changed"] is None:
+        changed = None
+    else:
+        changed = sorted(set(pending["changed"]) | set(changes["changed"]))
+    return {
+        "changed": changed,
+        "fields": {**pending["fields"], **changes["fields"]},
+    }
+
+
 def notify_action(target: str, action: str, identifier: Any):
     """Send a notification for an action on a target."""
     with connection.cursor() as cursor:
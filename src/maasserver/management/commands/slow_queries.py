@@ -0,0 +1,92 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+"""Django command: show the slowest database statements of the region."""
+
+from dataclasses import asdict
+from datetime import datetime, timezone
+import json
+from textwrap import indent
+
+from django.core.management.base import BaseCommand
+
+from maascommon.utils.slowqueries import (
+    clear_slow_queries,
+    get_slow_queries_path,
+    read_slow_queries,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the slowest database statements of each API endpoint and "
+        "websocket method, recorded by all the processes of the region."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=None,
+            help="Maximum number of statements to show for each endpoint.",
+        )
+        parser.add_argument(
+            "--endpoint",
+            default=None,
+            help="Only show the endpoints that contain this text.",
+        )
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help="Show the EXPLAIN output of the profiled statements.",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Output in JSON format."
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Discard the statements recorded so far.",
+        )
+
+    def handle(self, *args, **options):
+        path = get_slow_queries_path()
+        if options.get("clear"):
+            clear_slow_queries(path)
+            return
+
+        slow_queries = read_slow_queries(path, options.get("size"))
+        endpoint_filter = options.get("endpoint")
+        if endpoint_filter:
+            slow_queries = {
+                endpoint: queries
+                for endpoint, queries in slow_queries.items()
+                if endpoint_filter in endpoint
+            }
+
+        if options.get("json"):
+            self.stdout.write(
+                json.dumps(
+                    {
+                        endpoint: [asdict(query) for query in queries]
+                        for endpoint, queries in slow_queries.items()
+                    },
+                    indent=2,
+                )
+            )
+            return
+
+        for endpoint, queries in slow_queries.items():
+            self.stdout.write(endpoint)
+            for query in queries:
+                timestamp = datetime.fromtimestamp(
+                    query.timestamp, tz=timezone.utc
+                )
+                self.stdout.write(
+                    f"  {query.duration * 1000:.1f} ms at "
+                    f"{timestamp.isoformat(timespec='seconds')}: {query.sql}"
+                )
+                if query.bind_shape:
+                    self.stdout.write(f"    params: {query.bind_shape}")
+                if options.get("explain") and query.explain:
+                    self.stdout.write(indent(query.explain, " " * 4))
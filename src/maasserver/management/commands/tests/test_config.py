@@ -100,7 +100,7 @@ class TestConfigurationSet(MAASTestCase):
     def test_options_are_saved(self):
         self.useFixture(RegionConfigurationFixture())
         # Set the option to a random value.
-        if self.option == "database_port":
+        if self.option in ("database_port", "database_read_port"):
             value = factory.pick_port()
         elif self.option in (
             "database_conn_max_age",
@@ -109,6 +109,32 @@ class TestConfigurationSet(MAASTestCase):
             "database_keepalive_idle",
         ):
             value = random.randint(0, 60)
+        elif self.option in (
+            "database_pool_size",
+            "database_pool_max_overflow",
+            "database_pool_recycle",
+            "database_pool_timeout",
+            "database_read_pool_size",
+        ):
+            value = random.randint(1, 60)
+        elif self.option == "listener_notify_window":
+            value = random.randint(10, 1000)
+        elif self.option == "websocket_notify_batch_interval":
+            value = random.randint(0, 1000)
+        elif self.option == "websocket_dehydrate_cache_size":
+            value = random.randint(0, 256)
+        elif self.option == "config_cache_secrets_ttl":
+            value = random.randint(0, 600)
+        elif self.option == "http_compression_min_size":
+            value = random.randint(0, 65536)
+        elif self.option == "http_compression_level":
+            value = random.randint(0, 9)
+        elif self.option == "slow_query_threshold":
+            value = random.randint(0, 5000)
+        elif self.option == "slow_query_log_size":
+            value = random.randint(0, 100)
+        elif self.option == "slow_query_explain_rate":
+            value = random.randint(0, 100)
         elif self.option == "num_workers":
             value = random.randint(1, 16)
         elif self.option in [
@@ -116,6 +142,9 @@ class TestConfigurationSet(MAASTestCase):
             "debug_queries",
             "debug_http",
             "database_keepalive",
+            "listener_shared",
+            "websocket_deflate",
+            "websocket_deflate_context_takeover",
         ]:
             value = random.choice([True, False])
         else:
@@ -0,0 +1,70 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+"""Tests for the `slow_queries` command."""
+
+from io import StringIO
+import json
+from pathlib import Path
+
+from django.core.management import call_command
+
+from maascommon.utils.slowqueries import read_slow_queries, SlowQueryLog
+from maasserver.management.commands import slow_queries
+from maastesting.testcase import MAASTestCase
+
+
+class TestSlowQueriesCommand(MAASTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = Path(self.make_dir())
+        self.patch(
+            slow_queries, "get_slow_queries_path"
+        ).return_value = self.path
+        slow_query_log = SlowQueryLog(
+            self.path, "test", threshold=0, explain_rate=1.0
+        )
+        [(query, _, _)] = slow_query_log.record(
+            "GET /MAAS/api/2.0/machines/",
+            [("SELECT * FROM node WHERE id = %s", (1,), 0.25)],
+        )
+        slow_query_log.set_explain(query, "Seq Scan on node")
+        slow_query_log.record(
+            "machine.list", [("UPDATE node SET hostname = %s", ("a",), 0.5)]
+        )
+        slow_query_log.flush()
+
+    def call_command(self, *args):
+        stdout = StringIO()
+        call_command("slow_queries", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_show(self):
+        output = self.call_command()
+        self.assertIn("GET /MAAS/api/2.0/machines/\n", output)
+        self.assertIn(
+            ": SELECT * FROM node WHERE id = %s\n    params: int\n", output
+        )
+        self.assertIn("  500.0 ms at ", output)
+        self.assertNotIn("Seq Scan on node", output)
+
+    def test_show_explain(self):
+        output = self.call_command("--explain")
+        self.assertIn("    Seq Scan on node\n", output)
+
+    def test_show_endpoint(self):
+        output = self.call_command("--endpoint", "machine.")
+        self.assertIn("machine.list", output)
+        self.assertNotIn("GET /MAAS/api/2.0/machines/", output)
+
+    def test_show_json(self):
+        output = json.loads(self.call_command("--json"))
+        self.assertEqual(
+            sorted(output), ["GET /MAAS/api/2.0/machines/", "machine.list"]
+        )
+        [query] = output["GET /MAAS/api/2.0/machines/"]
+        self.assertEqual(query["explain"], "Seq Scan on node")
+
+    def test_clear(self):
+        self.call_command("--clear")
+        self.assertEqual(read_slow_queries(self.path), {})
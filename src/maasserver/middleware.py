@@ -23,14 +23,22 @@ from django.http import (
     HttpResponseRedirect,
 )
 from django.urls import get_resolver, get_urlconf, reverse
+from django.utils.cache import patch_vary_headers
 from django.utils.encoding import force_str
 
+from maascommon.utils.compression import (
+    is_compressible,
+    negotiate_encoding,
+    StreamCompressor,
+    weaken_etag,
+)
 from maasserver import logger
 from maasserver.clusterrpc.utils import get_error_message_for_exception
 from maasserver.exceptions import MAASAPIException
 from maasserver.rbac import rbac
 from maasserver.sqlalchemy import service_layer
 from maasserver.utils.orm import is_retryable_failure
+from provisioningserver.prometheus.metrics import PROMETHEUS_METRICS
 from provisioningserver.rpc.exceptions import NoConnectionsAvailable
 from provisioningserver.utils.shell import ExternalProcessError
 
@@ -290,6 +298,66 @@ class DebuggingLoggerMiddleware:
         return response
 
 
+class CompressionMiddleware:
+    """Compress the responses with the encoding negotiated with the client.
+
+    Responses are compressed only if they're at least
+    `settings.HTTP_COMPRESSION_MIN_SIZE` bytes long, except for streaming ones
+    which are always compressed, flushing the compressor at every chunk.
+    """
+
+    def __init__(self, get_response, prometheus_metrics=PROMETHEUS_METRICS):
+        self.get_response = get_response
+        self.prometheus_metrics = prometheus_metrics
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        level = settings.HTTP_COMPRESSION_LEVEL
+        if (
+            not level
+            or response.has_header("Content-Encoding")
+            or not is_compressible(response.get("Content-Type"))
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING"))
+        if encoding is None:
+            return response
+
+        compressor = StreamCompressor(encoding, level)
+        if response.streaming:
+            response.streaming_content = self._compress_stream(
+                compressor, response.streaming_content
+            )
+            del response["Content-Length"]
+        elif len(response.content) >= settings.HTTP_COMPRESSION_MIN_SIZE:
+            response.content = compressor.finish(response.content)
+            response["Content-Length"] = str(len(response.content))
+            self._update_metrics(compressor)
+        else:
+            return response
+
+        response["Content-Encoding"] = encoding
+        if response.has_header("ETag"):
+            response["ETag"] = weaken_etag(response["ETag"])
+        return response
+
+    def _compress_stream(self, compressor, streaming_content):
+        for chunk in streaming_content:
+            yield compressor.compress(chunk)
+        yield compressor.finish()
+        self._update_metrics(compressor)
+
+    def _update_metrics(self, compressor):
+        self.prometheus_metrics.update(
+            "maas_http_response_compression_saved_bytes",
+            "inc",
+            value=compressor.saved_size,
+            labels={"encoding": compressor.encoding},
+        )
+
+
 class RPCErrorsMiddleware:
     """A middleware for handling RPC errors."""
 
@@ -2,24 +2,35 @@
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
 from contextlib import contextmanager
+from functools import lru_cache
 from time import time
 
-from django.db import connections
+from django.conf import settings
+from django.db import connections, transaction
 from django.db.backends.utils import CursorWrapper
 from django.urls import resolve, reverse
 
+from maascommon.utils.slowqueries import get_slow_queries_path, SlowQueryLog
+from provisioningserver.logger import LegacyLogger
 from provisioningserver.prometheus.metrics import PROMETHEUS_METRICS
 
+log = LegacyLogger()
+
 
 class QueryCountCursorWrapper(CursorWrapper):
-    """Track execution times for queries."""
+    """Track execution times for queries.
+
+    If `slow_statements` is given, the statements slower than its threshold
+    are collected in it as well.
+    """
 
-    def __init__(self, cursor, db, times):
+    def __init__(self, cursor, db, times, slow_statements=None):
         super().__init__(cursor, db)
         self.times = times
+        self.slow_statements = slow_statements
 
     def execute(self, sql, params=None):
-        with self._track_time():
+        with self._track_time(sql, params):
             return super().execute(sql, params=params)
 
     # XXX this doesn't support executemany as it's not really possible to get
@@ -30,33 +41,59 @@ class QueryCountCursorWrapper(CursorWrapper):
             return super().callproc(procname, params=None, kparams=None)
 
     @contextmanager
-    def _track_time(self):
+    def _track_time(self, sql=None, params=None):
         start = time()
         try:
             yield
         finally:
-            self.times.append(time() - start)
+            duration = time() - start
+            self.times.append(duration)
+            if sql is not None and self.slow_statements is not None:
+                self.slow_statements.add(sql, params, duration)
 
 
 class PrometheusRequestMetricsMiddleware:
     """Middleware to set Prometheus metrics related to HTTP requests."""
 
-    def __init__(self, get_response, prometheus_metrics=PROMETHEUS_METRICS):
+    def __init__(
+        self,
+        get_response,
+        prometheus_metrics=PROMETHEUS_METRICS,
+        slow_query_log=None,
+    ):
         self.get_response = get_response
         self.prometheus_metrics = prometheus_metrics
+        self.slow_query_log = (
+            slow_query_log
+            if slow_query_log is not None
+            else get_slow_query_log()
+        )
 
     def __call__(self, request):
         latencies = []
+        slow_statements = (
+            self.slow_query_log.statements()
+            if self.slow_query_log is not None
+            else None
+        )
 
-        with wrap_query_counter_cursor(latencies):
+        with wrap_query_counter_cursor(
+            latencies, slow_statements=slow_statements
+        ):
             start_time = time()
             response = self.get_response(request)
             latency = time() - start_time
 
-        self._process_metrics(request, response, latency, latencies)
+        labels = self._get_labels(request, response)
+        self._process_metrics(labels, response, latency, latencies)
+        if slow_statements is not None:
+            key = f"{labels['method']} {labels['path']}"
+            if labels["op"]:
+                key += f" op={labels['op']}"
+            record_slow_queries(self.slow_query_log, key, slow_statements)
         return response
 
-    def _process_metrics(self, request, response, latency, query_latencies):
+    def _get_labels(self, request, response):
         labels = {
             "method": request.method,
             "status": response.status_code,
@@ -71,7 +108,9 @@ class PrometheusRequestMetricsMiddleware:
         except Exception:
             # use the request path as-is
             pass
+        return labels
 
+    def _process_metrics(self, labels, response, latency, query_latencies):
         self.prometheus_metrics.update(
             "maas_http_request_latency",
             "observe",
@@ -101,14 +140,72 @@ class PrometheusRequestMetricsMiddleware:
 
 
 @contextmanager
-def wrap_query_counter_cursor(query_latencies, dbconn_name="default"):
+def wrap_query_counter_cursor(
+    query_latencies, dbconn_name="default", slow_statements=None
+):
     """Context manager replacing the cursor with a QueryCountCursorWrapper."""
     dbconn = connections[dbconn_name]
     orig_make_cursor = dbconn.make_cursor
     dbconn.make_cursor = lambda cursor: QueryCountCursorWrapper(
-        cursor, dbconn, query_latencies
+        cursor, dbconn, query_latencies, slow_statements=slow_statements
     )
     try:
         yield
     finally:
         dbconn.make_cursor = orig_make_cursor
+
+
+@lru_cache(maxsize=1)
+def get_slow_query_log():
+    """Return the log of the slow queries of the process.
+
+    None is returned if the log is disabled.
+    """
+    if not settings.SLOW_QUERY_LOG_SIZE:
+        return None
+    return SlowQueryLog(
+        get_slow_queries_path(),
+        "regiond",
+        size=settings.SLOW_QUERY_LOG_SIZE,
+        threshold=settings.SLOW_QUERY_THRESHOLD / 1000,
+        explain_rate=settings.SLOW_QUERY_EXPLAIN_RATE / 100,
+    )
+
+
+def explain_statement(sql, params=None, dbconn_name="default"):
+    """Profile a statement with `EXPLAIN (ANALYZE, BUFFERS)`.
+
+    The statement is executed again in a savepoint that is rolled back, so
+    that the transaction is left as it was, even if it fails.
+    """
+    with transaction.atomic(using=dbconn_name):
+        with connections[dbconn_name].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+            rows = cursor.fetchall()
+        transaction.set_rollback(True, using=dbconn_name)
+    return "\n".join(row[0] for row in rows)
+
+
+def record_slow_queries(
+    slow_query_log, key, slow_statements, dbconn_name="default"
+):
+    """Record the slow statements of a request or of a websocket call.
+
+    A sample of them is profiled, unless the transaction already failed.
+    """
+    if not slow_statements.statements:
+        return
+    samples = slow_query_log.record(key, slow_statements.statements)
+    if connections[dbconn_name].needs_rollback:
+        samples = []
+    for query, sql, params in samples:
+        try:
+            explain = explain_statement(sql, params, dbconn_name=dbconn_name)
+        except Exception:
+            log.err(None, f"Failed to explain a slow query of {key}.")
+        else:
+            slow_query_log.set_explain(query, explain)
+    try:
+        slow_query_log.flush()
+    except OSError:
+        log.err(None, "Failed to save the slow queries.")
@@ -1,8 +1,13 @@
+from pathlib import Path
+
 from django.http import HttpResponse
 import prometheus_client
 
+from maascommon.utils.slowqueries import SlowQueryLog
+from maasserver.models import Zone
 from maasserver.prometheus.middleware import PrometheusRequestMetricsMiddleware
 from maasserver.testing.factory import factory
+from maasserver.testing.testcase import MAASServerTestCase
 from maastesting.testcase import MAASTestCase
 from provisioningserver.prometheus.metrics import METRICS_DEFINITIONS
 from provisioningserver.prometheus.utils import create_metrics
@@ -69,3 +74,48 @@ class TestPrometheusRequestMetricsMiddleware(MAASTestCase):
             'path="/MAAS/accounts/login/",status="200"} 2.0',
             metrics_text,
         )
+
+
+class TestPrometheusRequestMetricsMiddlewareSlowQueries(MAASServerTestCase):
+    def get_response(self, request):
+        list(Zone.objects.filter(name__in=["a", "b", "c"]))
+        Zone.objects.update(description="")
+        return HttpResponse()
+
+    def make_slow_query_log(self, explain_rate=1.0):
+        return SlowQueryLog(
+            Path(self.make_dir()),
+            "test",
+            threshold=0,
+            explain_rate=explain_rate,
+        )
+
+    def test_record_slow_queries(self):
+        slow_query_log = self.make_slow_query_log()
+        middleware = PrometheusRequestMetricsMiddleware(
+            self.get_response, slow_query_log=slow_query_log
+        )
+        middleware(
+            factory.make_fake_request("/MAAS/accounts/login/", method="POST")
+        )
+        [(endpoint, queries)] = slow_query_log.get_queries().items()
+        self.assertEqual(endpoint, "POST /MAAS/accounts/login/")
+        select, update = sorted(queries, key=lambda query: query.sql)
+        self.assertIn('WHERE "maasserver_zone"."name" IN (...)', select.sql)
+        self.assertEqual(select.bind_shape, "str, str, str")
+        self.assertIn("Scan", select.explain)
+        # Only the SELECT statements are executed again to be profiled.
+        self.assertTrue(update.sql.startswith("UPDATE"))
+        self.assertIsNone(update.explain)
+        self.assertTrue(
+            (slow_query_log.path / slow_query_log.filename).exists()
+        )
+
+    def test_record_slow_queries_without_explain(self):
+        slow_query_log = self.make_slow_query_log(explain_rate=0)
+        middleware = PrometheusRequestMetricsMiddleware(
+            self.get_response, slow_query_log=slow_query_log
+        )
+        middleware(factory.make_fake_request("/MAAS/accounts/login/"))
+        [queries] = slow_query_log.get_queries().values()
+        self.assertEqual([query.explain for query in queries], [None, None])
@@ -0,0 +1,51 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+from contextlib import closing
+from datetime import timedelta
+
+from django.db import connection
+from twisted.internet.defer import inlineCallbacks
+
+from maasserver.utils.orm import transactional
+from maasserver.utils.threads import deferToDatabase
+from provisioningserver.utils.services import SingleInstanceService
+from provisioningserver.utils.twisted import synchronous
+
+# Replace the rows added by the transactions that changed a table with a
+# single one holding the sum of their generations, so that the generation of
+# the table stays the same. The rows of the transactions that are still in
+# progress aren't visible, so they're left alone. The new row is keyed by the
+# txid of the compaction itself, which doesn't change any tracked table.
+COMPACT_TABLE_GENERATIONS = """\
+WITH compacted AS (
+  DELETE FROM maasserver_tablegeneration
+  WHERE txid <> 0
+  RETURNING table_name, generation
+)
+INSERT INTO maasserver_tablegeneration (table_name, txid, generation)
+SELECT table_name, txid_current(), sum(generation)
+FROM compacted
+GROUP BY table_name
+"""
+
+
+class TableGenerationsCompactionService(SingleInstanceService):
+    """Service to periodically merge the rows of maasserver_tablegeneration.
+
+    Every transaction that changes a tracked table adds a row for it, so that
+    concurrent writers don't conflict on a shared counter.
+    """
+
+    LOCK_NAME = SERVICE_NAME = "table-generations-compaction"
+    INTERVAL = timedelta(minutes=5)
+
+    @inlineCallbacks
+    def do_action(self):
+        yield deferToDatabase(self._run)
+
+    @synchronous
+    @transactional
+    def _run(self):
+        with closing(connection.cursor()) as cursor:
+            cursor.execute(COMPACT_TABLE_GENERATIONS)
@@ -0,0 +1,55 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+from contextlib import closing
+
+from django.db import connection
+from twisted.internet import reactor
+from twisted.internet.defer import inlineCallbacks
+
+from maasserver.regiondservices.table_generations_compaction import (
+    TableGenerationsCompactionService,
+)
+from maasserver.testing.factory import factory
+from maasserver.testing.testcase import MAASTransactionServerTestCase
+from maasserver.triggers.system import register_system_triggers
+from maasserver.utils.orm import transactional
+from maasserver.utils.threads import deferToDatabase
+from maastesting.crochet import wait_for
+
+wait_for_reactor = wait_for()
+
+
+@transactional
+def get_generation_rows():
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(
+            "SELECT count(*), sum(generation) "
+            "FROM maasserver_tablegeneration "
+            "WHERE table_name = 'maasserver_zone'"
+        )
+        return cursor.fetchone()
+
+
+class TestTableGenerationsCompactionService(MAASTransactionServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.service = TableGenerationsCompactionService(reactor)
+
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_compacts_generations(self):
+        yield deferToDatabase(register_system_triggers)
+        for _ in range(3):
+            yield deferToDatabase(transactional(factory.make_Zone))
+        _, generation = yield deferToDatabase(get_generation_rows)
+
+        yield self.service.startService()
+        yield self.service.stopService()
+
+        count, compacted_generation = yield deferToDatabase(
+            get_generation_rows
+        )
+        # The first row is the one that marks the table as tracked.
+        self.assertEqual(count, 2)
+        self.assertEqual(compacted_generation, generation)
@@ -8,9 +8,12 @@ See the docstring for get_sqlalchemy_django_connection() for more info.
 
 import asyncio
 from asyncio import AbstractEventLoop
+import ipaddress
+import json
 import threading
 from typing import Any, Callable, Coroutine, TypeVar
 
+import psycopg2.extensions
 from sqlalchemy import util
 from sqlalchemy.dialects.postgresql.psycopg2 import PGDialect_psycopg2
 from sqlalchemy.engine.base import Connection, Engine
@@ -247,6 +250,52 @@ class SharedConnection(Connection):
         return {}
 
 
+def cast_ip(s, cur):
+    if s is None:
+        return None
+    return ipaddress.ip_address(str(s))
+
+
+def cast_cidr(s, cur):
+    if s is None:
+        return None
+    return ipaddress.ip_network(str(s))
+
+
+def cast_jsonb(s, cur):
+    if s is None:
+        return None
+    return json.loads(s)
+
+
+_JSONB = psycopg2.extensions.new_type((3802,), "JSONB", cast_jsonb)
+
+# The type casters of the service layer cursors. They're built only once, and
+# they take precedence over the ones registered on the connection by Django.
+SERVICE_LAYER_TYPE_CASTERS = (
+    _JSONB,
+    psycopg2.extensions.new_array_type((3807,), "JSONBARRAY", _JSONB),
+    psycopg2.extensions.new_type((650,), "CIDR", cast_cidr),
+    psycopg2.extensions.new_type((869,), "INET", cast_ip),
+)
+
+
+class ServiceLayerCursor(psycopg2.extensions.cursor):
+    """A cursor returning the values with the same types as asyncpg.
+
+    Django expects `jsonb` columns as strings, to parse them in `JSONField`,
+    and `inet` and `cidr` ones as strings too, while the service layer expects
+    them parsed as asyncpg does. The type casters are registered on the
+    cursor, so that the cursors of Django on the same connection are not
+    affected.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for caster in SERVICE_LAYER_TYPE_CASTERS:
+            psycopg2.extensions.register_type(caster, self)
+
+
 class SharedDBAPIConnection(PoolProxiedConnection):
     def __init__(self, dbapi_connection):
         self.dbapi_connection = dbapi_connection
@@ -256,7 +305,7 @@ class SharedDBAPIConnection(PoolProxiedConnection):
         return self.dbapi_connection
 
     def cursor(self):
-        return self.dbapi_connection.cursor()
+        return self.dbapi_connection.cursor(cursor_factory=ServiceLayerCursor)
 
     @property
     def is_valid(self) -> bool:
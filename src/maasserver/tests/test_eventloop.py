@@ -23,12 +23,16 @@ from maasserver import (
     workers,
 )
 from maasserver.eventloop import MAASServices
+from maasserver.listener import PostgresListenerService
 from maasserver.prometheus.service import REGION_PROMETHEUS_PORT
 from maasserver.prometheus.stats import PrometheusService
 from maasserver.regiondservices import ntp, service_monitor_service, syslog
 from maasserver.regiondservices.certificate_expiration_check import (
     CertificateExpirationCheckService,
 )
+from maasserver.regiondservices.table_generations_compaction import (
+    TableGenerationsCompactionService,
+)
 from maasserver.regiondservices.vault_secrets_cleanup import (
     VaultSecretsCleanupService,
 )
@@ -36,6 +40,7 @@ from maasserver.regiondservices.version_update_check import (
     RegionVersionUpdateCheckService,
 )
 from maasserver.rpc import regionservice
+from maasserver.testing.config import RegionConfigurationFixture
 from maasserver.testing.eventloop import RegionEventLoopFixture
 from maasserver.testing.listener import FakePostgresListenerService
 from maasserver.testing.testcase import MAASServerTestCase
@@ -500,6 +505,62 @@ class TestFactories(MAASServerTestCase):
         )
         self.assertFalse(eventloop.loop.factories["web"]["only_on_master"])
 
+    def test_make_WebApplicationService_sets_notify_batch_interval(self):
+        self.useFixture(
+            RegionConfigurationFixture(websocket_notify_batch_interval=250)
+        )
+        service = eventloop.make_WebApplicationService(
+            FakePostgresListenerService(), sentinel.status_worker
+        )
+        self.assertEqual(0.25, service.websocket.notify_batch_interval)
+
+    def test_make_WebApplicationService_sets_dehydrate_cache_size(self):
+        self.useFixture(
+            RegionConfigurationFixture(websocket_dehydrate_cache_size=2)
+        )
+        service = eventloop.make_WebApplicationService(
+            FakePostgresListenerService(), sentinel.status_worker
+        )
+        self.assertEqual(
+            2 * 1024 * 1024, service.websocket.dehydrate_cache_size
+        )
+
+    def test_make_WebApplicationService_sets_websocket_deflate(self):
+        self.useFixture(
+            RegionConfigurationFixture(
+                websocket_deflate=False,
+                websocket_deflate_context_takeover=False,
+            )
+        )
+        service = eventloop.make_WebApplicationService(
+            FakePostgresListenerService(), sentinel.status_worker
+        )
+        self.assertFalse(service.websocket_deflate)
+        self.assertFalse(service.websocket_deflate_context_takeover)
+
+    def test_make_PostgresListenerWorkerService(self):
+        self.useFixture(RegionConfigurationFixture(listener_shared=False))
+        ipc_worker = ipc.IPCWorkerService(sentinel.reactor)
+        service = eventloop.make_PostgresListenerWorkerService(ipc_worker)
+        self.assertIsInstance(service, PostgresListenerService)
+        self.assertIsNone(ipc_worker.listener)
+        # It is registered as a factory in RegionEventLoop.
+        self.assertIs(
+            eventloop.make_PostgresListenerWorkerService,
+            eventloop.loop.factories["postgres-listener-worker"]["factory"],
+        )
+        self.assertEqual(
+            ["ipc-worker"],
+            eventloop.loop.factories["postgres-listener-worker"]["requires"],
+        )
+
+    def test_make_PostgresListenerWorkerService_relays_when_shared(self):
+        self.useFixture(RegionConfigurationFixture(listener_shared=True))
+        ipc_worker = ipc.IPCWorkerService(sentinel.reactor)
+        service = eventloop.make_PostgresListenerWorkerService(ipc_worker)
+        self.assertIsInstance(service, ipc.IPCListenerService)
+        self.assertIs(service, ipc_worker.listener)
+
     def test_make_VersionUpdateCheckService(self):
         service = eventloop.make_VersionUpdateCheckService()
         self.assertIsInstance(service, RegionVersionUpdateCheckService)
@@ -646,6 +707,16 @@ class TestFactories(MAASServerTestCase):
             eventloop.make_VaultSecretsCleanupService,
         )
 
+    def test_make_TableGenerationsCompactionService(self):
+        service = eventloop.make_TableGenerationsCompactionService()
+        self.assertIsInstance(service, TableGenerationsCompactionService)
+        self.assertIs(
+            eventloop.loop.factories["table-generations-compaction"][
+                "factory"
+            ],
+            eventloop.make_TableGenerationsCompactionService,
+        )
+
 
 class TestDisablingDatabaseConnections(MAASServerTestCase):
     @wait_for_reactor
@@ -6,20 +6,30 @@
 from datetime import timedelta
 import os
 import random
-from unittest.mock import MagicMock
+from unittest.mock import ANY, MagicMock
 import uuid
 
 from fixtures import EnvironmentVariableFixture
 from twisted.internet import reactor
 from twisted.internet.defer import DeferredList, inlineCallbacks, succeed
+from twisted.internet.error import ConnectionDone
+from twisted.internet.testing import StringTransport
+from twisted.python.failure import Failure
 
 from maasserver import ipc, workers
 from maasserver.enum import SERVICE_STATUS
 from maasserver.ipc import (
     get_ipc_socket_path,
+    IPCListenerService,
     IPCMasterService,
+    IPCWorker,
     IPCWorkerService,
 )
+from maasserver.listener import (
+    PostgresListenerRegistrationError,
+    PostgresListenerService,
+    PostgresListenerUnregistrationError,
+)
 from maasserver.models import timestampedmodel
 from maasserver.models.node import RegionController
 from maasserver.models.regioncontrollerprocess import RegionControllerProcess
@@ -179,6 +189,98 @@ class TestIPCCommunication(MAASTransactionServerTestCase):
 
         workers.killWorker.assert_called_once_with(pid)
 
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_worker_receives_relayed_notifications(self):
+        yield deferToDatabase(load_builtin_scripts)
+        pid = random.randint(1, 512)
+        self.patch(os, "getpid").return_value = pid
+        (
+            master,
+            connected,
+            disconnected,
+        ) = self.make_IPCMasterService_with_wrap()
+        master.listener = PostgresListenerService()
+        yield master.startService()
+        worker = IPCWorkerService(reactor, socket_path=self.ipc_path)
+        relay = IPCListenerService(worker)
+        yield worker.startService()
+        yield connected.get(timeout=2)
+
+        handler = MagicMock()
+        relay.register("service", handler, changes=True)
+        yield relay.subscribe()
+        self.assertEqual({pid: {"service"}}, master.workerChannels)
+        [relay_notification] = master.listener.listeners["service"]
+
+        changes = {"changed": ["status"], "fields": {"status": "running"}}
+        yield relay_notification("update", 5, changes)
+        handler.assert_called_once_with("update", "5", changes)
+
+        yield worker.stopService()
+        yield disconnected.get(timeout=2)
+        self.assertEqual({}, master.workerChannels)
+        self.assertNotIn("service", master.listener.listeners)
+        yield master.stopService()
+
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_worker_receives_relayed_system_notifications(self):
+        yield deferToDatabase(load_builtin_scripts)
+        pid = random.randint(1, 512)
+        self.patch(os, "getpid").return_value = pid
+        (
+            master,
+            connected,
+            disconnected,
+        ) = self.make_IPCMasterService_with_wrap()
+        master.listener = PostgresListenerService()
+        yield master.startService()
+        worker = IPCWorkerService(reactor, socket_path=self.ipc_path)
+        relay = IPCListenerService(worker)
+        yield worker.startService()
+        yield connected.get(timeout=2)
+
+        handler = MagicMock()
+        relay.register("sys_stop_import", handler)
+        yield relay.subscribe()
+        [relay_notification] = master.listener.listeners["sys_stop_import"]
+
+        yield relay_notification("sys_stop_import", "")
+        handler.assert_called_once_with("sys_stop_import", "")
+
+        yield worker.stopService()
+        yield disconnected.get(timeout=2)
+        self.assertNotIn("sys_stop_import", master.listener.listeners)
+        yield master.stopService()
+
+    def test_registerWorkerChannels_skips_system_channels_of_master(self):
+        listener = PostgresListenerService()
+        listener.register("sys_dns", MagicMock())
+        log_err = self.patch(ipc.log, "err")
+        master = IPCMasterService(
+            reactor, socket_path=self.ipc_path, listener=listener
+        )
+        master.registerWorkerChannels(1, ["sys_dns"])
+        self.assertEqual(1, len(listener.listeners["sys_dns"]))
+        self.assertEqual({}, master.channelRelays)
+        log_err.assert_called_once_with(None, "Failed to relay sys_dns.")
+
+    def test_registerWorkerChannels_listens_once_per_channel(self):
+        listener = MagicMock()
+        master = IPCMasterService(
+            reactor, socket_path=self.ipc_path, listener=listener
+        )
+        master.registerWorkerChannels(1, ["node", "service"])
+        master.registerWorkerChannels(2, ["node"])
+        self.assertEqual(2, listener.register.call_count)
+        master.registerWorkerChannels(1, ["node"])
+        listener.unregister.assert_called_once_with("service", ANY)
+        master.registerWorkerChannels(1, [])
+        master.registerWorkerChannels(2, [])
+        self.assertEqual(3, listener.unregister.call_count)
+        self.assertEqual({}, master.channelRelays)
+
     @wait_for_reactor
     @inlineCallbacks
     def test_worker_registers_rpc_endpoints(self):
@@ -655,3 +757,86 @@ class TestIPCCommunication(MAASTransactionServerTestCase):
 
         count = yield deferToDatabase(_get_conn_count)
         self.assertEqual(count, 1)
+
+
+class TestIPCWorker(MAASTestCase):
+    def make_protocol(self):
+        service = IPCWorkerService(reactor)
+        listener = IPCListenerService(service)
+        self.patch(listener, "runSubscribe")
+        protocol = IPCWorker()
+        protocol.service = service
+        self.patch(protocol, "callRemote").return_value = succeed(
+            {"process_id": 1}
+        )
+        protocol.makeConnection(StringTransport())
+        return protocol
+
+    def test_connectionMade_subscribes_again(self):
+        protocol = self.make_protocol()
+        self.assertIs(protocol, protocol.service.protocol.value)
+        protocol.service.listener.runSubscribe.assert_called_once_with()
+
+    def test_connectionLost_waits_for_next_connection(self):
+        protocol = self.make_protocol()
+        protocol.connectionLost(Failure(ConnectionDone()))
+        self.assertFalse(protocol.service.protocol.isSet)
+        self.assertFalse(protocol.service.processId.isSet)
+
+
+class TestIPCListenerService(MAASTestCase):
+    def make_listener(self):
+        return IPCListenerService(IPCWorkerService(reactor))
+
+    def test_register_refuses_second_system_handler(self):
+        listener = self.make_listener()
+        listener.register("sys_stop_import", MagicMock())
+        self.assertRaises(
+            PostgresListenerRegistrationError,
+            listener.register,
+            "sys_stop_import",
+            MagicMock(),
+        )
+
+    def test_handleSystemNotify_calls_handler(self):
+        listener = self.make_listener()
+        handler = MagicMock()
+        listener.register("sys_stop_import", handler)
+        listener.handleSystemNotify("sys_stop_import", "")
+        handler.assert_called_once_with("sys_stop_import", "")
+
+    def test_listen_registers_temporarily(self):
+        listener = self.make_listener()
+        handler = MagicMock()
+        with listener.listen("sys_stop_import", handler):
+            self.assertEqual(
+                {"sys_stop_import": [handler]}, listener.listeners
+            )
+        self.assertEqual({}, listener.listeners)
+
+    def test_unregister_refuses_unknown_handler(self):
+        listener = self.make_listener()
+        self.assertRaises(
+            PostgresListenerUnregistrationError,
+            listener.unregister,
+            "node",
+            MagicMock(),
+        )
+
+    def test_handleNotify_calls_handlers(self):
+        listener = self.make_listener()
+        handler = MagicMock()
+        changes_handler = MagicMock()
+        listener.register("node", handler)
+        listener.register("node", changes_handler, changes=True)
+        changes = {"changed": ["status"], "fields": {}}
+        listener.handleNotify("node", "update", "abc", changes)
+        handler.assert_called_once_with("update", "abc")
+        changes_handler.assert_called_once_with("update", "abc", changes)
+
+    def test_unregister_removes_channel(self):
+        listener = self.make_listener()
+        handler = MagicMock()
+        listener.register("node", handler)
+        listener.unregister("node", handler)
+        self.assertEqual({}, listener.listeners)
@@ -5,6 +5,7 @@
 
 from collections import namedtuple
 import errno
+import json
 from re import escape
 from textwrap import dedent
 from unittest.mock import ANY, call, MagicMock, Mock, sentinel
@@ -24,16 +25,20 @@ from twisted.python.failure import Failure
 
 from maasserver import listener as listener_module
 from maasserver.listener import (
+    decode_notify_payload,
+    merge_notify_changes,
     PostgresListenerNotifyError,
     PostgresListenerRegistrationError,
     PostgresListenerService,
     PostgresListenerUnregistrationError,
+    split_notify_payload,
 )
 from maasserver.testing.factory import factory
 from maasserver.testing.testcase import MAASServerTestCase
 from maasserver.utils.orm import transactional
 from maasserver.utils.threads import deferToDatabase
 from maastesting.crochet import wait_for
+from maastesting.testcase import MAASTestCase
 from maastesting.twisted import TwistedLoggerFixture
 from provisioningserver.utils.twisted import DeferredValue
 
@@ -516,7 +521,152 @@ class TestPostgresListenerService(MAASServerTestCase):
         self.patch(listener, "handleNotify")
 
         listener.doRead()
-        self.assertCountEqual(listener.notifications, set(notifications))
+        self.assertCountEqual(
+            listener.notifications.values(),
+            {
+                (notify.channel, notify.payload, None)
+                for notify in notifications
+            },
+        )
+
+    def test_queueNotification_coalesces_updates(self):
+        listener = PostgresListenerService()
+        listener.queueNotification("node_update", "abc")
+        listener.queueNotification("node_update", "def")
+        listener.queueNotification("node_update", "abc")
+        self.assertEqual(
+            [("node_update", "abc", None), ("node_update", "def", None)],
+            list(listener.notifications.values()),
+        )
+        self.assertEqual(3, listener.notificationsReceived)
+
+    def test_queueNotification_keeps_create_over_update(self):
+        listener = PostgresListenerService()
+        listener.queueNotification("node_create", "abc")
+        listener.queueNotification("node_update", "abc")
+        self.assertEqual(
+            [("node_create", "abc", None)],
+            list(listener.notifications.values()),
+        )
+
+    def test_queueNotification_delete_overrides_update(self):
+        listener = PostgresListenerService()
+        listener.queueNotification("node_update", "abc")
+        listener.queueNotification("node_update", "def")
+        listener.queueNotification("node_delete", "abc")
+        listener.queueNotification("node_update", "abc")
+        self.assertEqual(
+            [("node_update", "def", None), ("node_delete", "abc", None)],
+            list(listener.notifications.values()),
+        )
+
+    def test_queueNotification_create_overrides_delete(self):
+        listener = PostgresListenerService()
+        listener.queueNotification("node_delete", "abc")
+        listener.queueNotification("node_create", "abc")
+        self.assertEqual(
+            [("node_create", "abc", None)],
+            list(listener.notifications.values()),
+        )
+
+    def test_queueNotification_coalesces_per_channel(self):
+        listener = PostgresListenerService()
+        listener.queueNotification("node_update", "1")
+        listener.queueNotification("vlan_update", "1")
+        self.assertEqual(
+            [("node_update", "1", None), ("vlan_update", "1", None)],
+            list(listener.notifications.values()),
+        )
+
+    def test_queueNotification_splits_batched_notifications(self):
+        listener = PostgresListenerService()
+        listener.queueNotification("node_update", "abc")
+        listener.queueNotification("node_update", '{"pks" : ["abc", "def"]}')
+        self.assertEqual(
+            [("node_update", "abc", None), ("node_update", "def", None)],
+            list(listener.notifications.values()),
+        )
+        self.assertEqual(3, listener.notificationsReceived)
+
+    def test_handleNotify_counts_dispatched_notifications(self):
+        listener = PostgresListenerService()
+        listener.register("node", lambda *args: None)
+        listener.queueNotification("node_update", "abc")
+        listener.queueNotification("node_update", "abc")
+        [notification] = listener.notifications.values()
+        listener.handleNotify(notification)
+        self.assertEqual(2, listener.notificationsReceived)
+        self.assertEqual(1, listener.notificationsDispatched)
+
+    def test_queueNotification_merges_changes(self):
+        listener = PostgresListenerService()
+        listener.queueNotification(
+            "node_update",
+            json.dumps(
+                {
+                    "pk": "abc",
+                    "changed": ["status"],
+                    "fields": {"status": 1, "power_state": "off"},
+                }
+            ),
+        )
+        listener.queueNotification(
+            "node_update",
+            json.dumps(
+                {
+                    "pk": "abc",
+                    "changed": ["power_state"],
+                    "fields": {"status": 1, "power_state": "on"},
+                }
+            ),
+        )
+        self.assertEqual(
+            [
+                (
+                    "node_update",
+                    "abc",
+                    {
+                        "changed": ["power_state", "status"],
+                        "fields": {"status": 1, "power_state": "on"},
+                    },
+                )
+            ],
+            list(listener.notifications.values()),
+        )
+
+    def test_queueNotification_unknown_changes_win_when_merging(self):
+        listener = PostgresListenerService()
+        listener.queueNotification(
+            "node_update",
+            json.dumps({"pk": "abc", "changed": ["status"], "fields": {}}),
+        )
+        listener.queueNotification("node_update", "abc")
+        self.assertEqual(
+            [("node_update", "abc", None)],
+            list(listener.notifications.values()),
+        )
+
+    def test_handleNotify_passes_changes_to_changes_handlers(self):
+        listener = PostgresListenerService()
+        handler = Mock()
+        changes_handler = Mock()
+        listener.register("node", handler)
+        listener.register("node", changes_handler, changes=True)
+        changes = {"changed": ["status"], "fields": {"status": 1}}
+        listener.handleNotify(("node_update", "abc", changes))
+        handler.assert_called_once_with("update", "abc")
+        changes_handler.assert_called_once_with("update", "abc", changes)
+
+    def test_unregister_forgets_changes_handler(self):
+        listener = PostgresListenerService()
+        handler = Mock()
+        listener.register("node", handler, changes=True)
+        listener.unregister("node", handler)
+        self.assertEqual(set(), listener.changesHandlers)
+
+    def test_notify_window_sets_handle_notify_delay(self):
+        listener = PostgresListenerService(notify_window=0.1)
+        self.assertEqual(0.1, listener.HANDLE_NOTIFY_DELAY)
 
     @wait_for_reactor
     @inlineCallbacks
@@ -683,3 +833,53 @@ class TestPostgresListenerService(MAASServerTestCase):
                 )
                 raise Exception(exception_text)
         listener.unregister.assert_called_once_with(channel, sentinel.handler)
+
+
+class TestDecodeNotifyPayload(MAASTestCase):
+    def test_plain_payload(self):
+        self.assertEqual(("abc", None), decode_notify_payload("abc"))
+
+    def test_enriched_payload(self):
+        payload = json.dumps(
+            {"pk": "abc", "changed": None, "fields": {"status": 4}}
+        )
+        self.assertEqual(
+            ("abc", {"changed": None, "fields": {"status": 4}}),
+            decode_notify_payload(payload),
+        )
+
+    def test_invalid_json_payload_is_plain(self):
+        self.assertEqual(("{abc", None), decode_notify_payload("{abc"))
+
+
+class TestSplitNotifyPayload(MAASTestCase):
+    def test_plain_payload(self):
+        self.assertEqual(["abc"], split_notify_payload("abc"))
+
+    def test_batched_payload(self):
+        self.assertEqual(
+            ["abc", "1"], split_notify_payload('{"pks" : ["abc", 1]}')
+        )
+
+    def test_enriched_payload_is_not_batched(self):
+        payload = json.dumps({"pk": "abc", "changed": None, "fields": {}})
+        self.assertEqual([payload], split_notify_payload(payload))
+
+    def test_invalid_batched_payload_is_plain(self):
+        self.assertEqual(['{"pks"'], split_notify_payload('{"pks"'))
+
+
+class TestMergeNotifyChanges(MAASTestCase):
+    def test_unknown_changes(self):
+        changes = {"changed": ["status"], "fields": {}}
+        self.assertIsNone(merge_notify_changes(None, changes))
+        self.assertIsNone(merge_notify_changes(changes, None))
+
+    def test_unknown_changed_columns(self):
+        self.assertEqual(
+            {"changed": None, "fields": {"status": 2}},
+            merge_notify_changes(
+                {"changed": None, "fields": {"status": 1}},
+                {"changed": ["status"], "fields": {"status": 2}},
+            ),
+        )
@@ -1,6 +1,7 @@
 # Copyright 2012-2025 Canonical Ltd.  This software is licensed under the
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
+import gzip
 import http.client
 import json
 import logging
@@ -10,14 +11,16 @@ from crochet import TimeoutError
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import PermissionDenied, ValidationError
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from fixtures import FakeLogger
+import prometheus_client
 
 from maasserver import middleware as middleware_module
 from maasserver.exceptions import MAASAPIException, MAASAPINotFound
 from maasserver.middleware import (
     AccessMiddleware,
     APIRPCErrorsMiddleware,
+    CompressionMiddleware,
     CSRFHelperMiddleware,
     DebuggingLoggerMiddleware,
     ExceptionMiddleware,
@@ -39,6 +42,8 @@ from maasserver.utils.orm import (
 )
 from maasservicelayer.auth.external_auth import ExternalAuthType
 from maastesting.utils import sample_binary_data
+from provisioningserver.prometheus.metrics import METRICS_DEFINITIONS
+from provisioningserver.prometheus.utils import create_metrics
 from provisioningserver.rpc.exceptions import NoConnectionsAvailable
 from provisioningserver.utils.shell import ExternalProcessError
 
@@ -319,6 +324,101 @@ class TestDebuggingLoggerMiddleware(MAASServerTestCase):
         self.assertIn("non-utf-8 (binary?) content", logger.output)
 
 
+class TestCompressionMiddleware(MAASServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.patch(settings, "HTTP_COMPRESSION_MIN_SIZE", 1024)
+        self.patch(settings, "HTTP_COMPRESSION_LEVEL", 6)
+        self.prometheus_metrics = create_metrics(
+            METRICS_DEFINITIONS, registry=prometheus_client.CollectorRegistry()
+        )
+
+    def process_request(self, response, accept_encoding="gzip"):
+        request = factory.make_fake_request("/MAAS/api/2.0/machines/")
+        if accept_encoding is not None:
+            request.META["HTTP_ACCEPT_ENCODING"] = accept_encoding
+        middleware = CompressionMiddleware(
+            lambda request: response,
+            prometheus_metrics=self.prometheus_metrics,
+        )
+        return middleware(request)
+
+    def make_json_response(self, size=2048):
+        return HttpResponse(
+            content=json.dumps(["a" * size]),
+            content_type="application/json",
+        )
+
+    def test_compresses_response(self):
+        content = json.dumps(["a" * 2048]).encode()
+        response = self.process_request(self.make_json_response())
+        self.assertEqual("gzip", response["Content-Encoding"])
+        self.assertEqual("Accept-Encoding", response["Vary"])
+        self.assertEqual(
+            str(len(response.content)), response["Content-Length"]
+        )
+        self.assertEqual(content, gzip.decompress(response.content))
+
+    def test_weakens_etag(self):
+        response = self.make_json_response()
+        response["ETag"] = '"abc"'
+        response = self.process_request(response)
+        self.assertEqual('W/"abc"', response["ETag"])
+
+    def test_updates_metrics(self):
+        response = self.process_request(self.make_json_response())
+        saved = len(json.dumps(["a" * 2048])) - len(response.content)
+        metrics_text = self.prometheus_metrics.generate_latest().decode(
+            "ascii"
+        )
+        self.assertIn(
+            "maas_http_response_compression_saved_bytes_total"
+            f'{{encoding="gzip"}} {float(saved)}',
+            metrics_text,
+        )
+
+    def test_compresses_streaming_response(self):
+        chunks = [json.dumps({"id": i}) + "\n" for i in range(10)]
+        response = self.process_request(
+            StreamingHttpResponse(
+                iter(chunks), content_type="application/x-ndjson"
+            )
+        )
+        self.assertEqual("gzip", response["Content-Encoding"])
+        self.assertFalse(response.has_header("Content-Length"))
+        self.assertEqual(
+            "".join(chunks).encode(),
+            gzip.decompress(b"".join(response.streaming_content)),
+        )
+
+    def test_does_not_compress_small_response(self):
+        response = self.process_request(self.make_json_response(size=10))
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual("Accept-Encoding", response["Vary"])
+
+    def test_does_not_compress_if_not_accepted(self):
+        response = self.process_request(
+            self.make_json_response(), accept_encoding=None
+        )
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual("Accept-Encoding", response["Vary"])
+
+    def test_does_not_compress_binary_response(self):
+        response = self.process_request(
+            HttpResponse(
+                content=sample_binary_data * 1024,
+                content_type="application/octet-stream",
+            )
+        )
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertFalse(response.has_header("Vary"))
+
+    def test_does_not_compress_if_disabled(self):
+        self.patch(settings, "HTTP_COMPRESSION_LEVEL", 0)
+        response = self.process_request(self.make_json_response())
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
 class TestRPCErrorsMiddleware(MAASServerTestCase):
     def process_request(self, request, exception=None):
         def get_response(request):
@@ -250,6 +250,7 @@ class TestRegionMasterServiceMaker(TestServiceMaker):
             "workers",
             "ipc-master",
             "vault-secrets-cleanup",
+            "table-generations-compaction",
             "temporal",
         }
         self.assertEqual(expected_services, service.namedServices.keys())
@@ -371,6 +372,7 @@ class TestRegionAllInOneServiceMaker(TestServiceMaker):
             "reverse-dns",
             "reverse-proxy",
             "vault-secrets-cleanup",
+            "table-generations-compaction",
             "certificate-expiration-check",
             "ntp",
             "syslog",
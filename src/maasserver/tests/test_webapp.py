@@ -189,6 +189,20 @@ class TestWebApplicationService(MAASServerTestCase):
         self.assertIsNone(service.site.timeOut)
         self.assertIsInstance(service.websocket, WebSocketFactory)
 
+    def test_installApplication_configures_websocket_deflate(self):
+        service = webapp.WebApplicationService(
+            FakePostgresListenerService(),
+            sentinel.status_worker,
+            websocket_deflate=False,
+            websocket_deflate_context_takeover=False,
+        )
+        service.installApplication(sentinel.application)
+        ws = service.site.resource.getChildWithDefault(
+            b"MAAS", request=None
+        ).getChildWithDefault(b"ws", request=None)
+        self.assertFalse(ws._deflate)
+        self.assertFalse(ws._deflateContextTakeover)
+
     def test_start_and_stop_the_service(self):
         service = self.make_webapp()
         # Both privileged and and normal start must be called, as twisted
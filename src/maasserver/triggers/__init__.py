@@ -43,6 +43,35 @@ EVENTS_LUU = (
 )
 
 
+# Number of object ids sent in each batched notification. Object ids are
+# expected to be at most 64 characters long, so that a batch fits in the
+# 8000 bytes allowed for a NOTIFY payload.
+NOTIFY_BATCH_SIZE = 100
+
+# Procedure sending the object ids in `pks` as batched notifications on
+# `channel`. The payload is a JSON object holding the ids as `pks`, which
+# `maasserver.listener.split_notify_payload` splits back into one
+# notification per id.
+NOTIFY_BATCH_PROCEDURE = dedent(
+    f"""\
+    CREATE OR REPLACE FUNCTION notify_batch(channel text, pks text[])
+    RETURNS void AS $$
+    BEGIN
+      FOR i IN 1..coalesce(array_length(pks, 1), 0) BY {NOTIFY_BATCH_SIZE}
+      LOOP
+        PERFORM pg_notify(
+          channel,
+          json_build_object(
+            'pks', pks[i:i + {NOTIFY_BATCH_SIZE - 1}]
+          )::text
+        );
+      END LOOP;
+    END;
+    $$ LANGUAGE plpgsql;
+    """
+)
+
+
 def register_procedure(procedure):
     """Register the `procedure` SQL."""
     with closing(connection.cursor()) as cursor:
@@ -127,14 +156,19 @@ def _make_when_clause(is_update, params, fields):
     return f"WHEN ({and_clauses})"
 
 
+def _get_trigger_name(table, procedure):
+    """Return the name of the trigger calling `procedure` on `table`."""
+    table_name = table
+    if table.startswith("maasserver_"):
+        table_name = table_name[11:]
+    return f"{table_name}_{procedure}"
+
+
 def register_trigger(
     table, procedure, event, params=None, fields=None, when="after"
 ):
     """(Re-)create `trigger` on `table`."""
-    table_name = table
-    if table.startswith("maasserver_"):
-        table_name = table_name[11:]
-    trigger_name = f"{table_name}_{procedure}"
+    trigger_name = _get_trigger_name(table, procedure)
     is_update = event == "update"
     when_clause = _make_when_clause(is_update, params, fields)
     trigger_sql = dedent(
@@ -151,6 +185,46 @@ def register_trigger(
     register_procedure(trigger_sql)
 
 
+def register_statement_trigger(
+    table, procedure, event, transition_tables=True
+):
+    """(Re-)create a statement-level `trigger` on `table`.
+
+    The procedure is called once per statement, not once per row. The rows
+    affected by the statement are available to it in the `new_table`
+    (insert and update) and `old_table` (update and delete) transition
+    tables, so that it can send a single batched notification for all of
+    them with `notify_batch`.
+
+    Procedures that don't look at the rows can pass `transition_tables` as
+    False, in which case `event` can also be a combination of events, like
+    "insert or update".
+    """
+    trigger_name = _get_trigger_name(table, procedure)
+    referencing = ""
+    if transition_tables:
+        referencing = (
+            "REFERENCING "
+            + {
+                "insert": "NEW TABLE AS new_table",
+                "update": "OLD TABLE AS old_table NEW TABLE AS new_table",
+                "delete": "OLD TABLE AS old_table",
+            }[event]
+        )
+    trigger_sql = dedent(
+        f"""\
+        DROP TRIGGER IF EXISTS {trigger_name} ON {table};
+
+        CREATE TRIGGER {trigger_name}
+        AFTER {event.upper()} ON {table}
+        {referencing}
+        FOR EACH STATEMENT
+        EXECUTE PROCEDURE {procedure}();
+        """
+    )
+    register_procedure(trigger_sql)
+
+
 @transactional
 def register_all_triggers():
     """Register all triggers into the database."""
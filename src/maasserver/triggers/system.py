@@ -13,7 +13,11 @@ from textwrap import dedent
 
 from maasserver.enum import NODE_TYPE
 from maasserver.models.dnspublication import zone_serial
-from maasserver.triggers import register_procedure, register_trigger
+from maasserver.triggers import (
+    register_procedure,
+    register_statement_trigger,
+    register_trigger,
+)
 from maasserver.utils.orm import transactional
 
 # Note that the corresponding test module (test_system) only tests that the
@@ -1265,6 +1269,88 @@ def render_sys_proxy_procedure(proc_name, on_delete=False):
     )
 
 
+def render_sys_config_procedure(proc_name, on_delete=False):
+    """Render a database procedure with name `proc_name` that notifies that a
+    configuration changed, so that the processes caching them drop them.
+
+    The payload is the id of the transaction, which lets the processes know
+    whether the change is visible to the transaction loading the
+    configurations again.
+
+    :param proc_name: Name of the procedure.
+    :param on_delete: True when procedure will be used as a delete trigger.
+    """
+    entry = "OLD" if on_delete else "NEW"
+    return dedent(
+        f"""\
+        CREATE OR REPLACE FUNCTION {proc_name}() RETURNS trigger AS $$
+        BEGIN
+          PERFORM pg_notify('sys_config', txid_current()::text);
+          RETURN {entry};
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+
+
+# The tables whose changes are counted in maasserver_tablegeneration. The
+# v3 API derives the ETags of its collections from the generations of the
+# tables that a listing reads, and only for listings that read tracked
+# tables, so a table must be added here to make its listings conditional.
+TABLE_GENERATION_TABLES = [
+    "auth_user",
+    "maasserver_bmc",
+    "maasserver_domain",
+    "maasserver_event",
+    "maasserver_eventtype",
+    "maasserver_fabric",
+    "maasserver_node",
+    "maasserver_subnet",
+    "maasserver_vlan",
+    "maasserver_zone",
+]
+
+# The generation of a table is the sum of the generations of its rows. Each
+# transaction that changes a table adds its own row, keyed by its txid, so
+# that concurrent writers never update the same row: under REPEATABLE READ
+# that would make them wait on each other's row lock until they commit, and
+# then fail with a serialization error. The rows are merged periodically by
+# the 'table-generations-compaction' service.
+TABLE_GENERATION_BUMP = dedent(
+    """\
+    CREATE OR REPLACE FUNCTION sys_table_generation() RETURNS trigger AS $$
+    BEGIN
+      INSERT INTO maasserver_tablegeneration (table_name, txid, generation)
+      VALUES (TG_TABLE_NAME, txid_current(), 1)
+      ON CONFLICT (table_name, txid) DO NOTHING;
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """
+)
+
+
+def register_table_generation_trigger(table):
+    """Count the changes to `table` in maasserver_tablegeneration."""
+    register_statement_trigger(
+        table,
+        "sys_table_generation",
+        "insert or update or delete or truncate",
+        transition_tables=False,
+    )
+    # The table is tracked from now on, even if it doesn't change.
+    register_procedure(
+        dedent(
+            f"""\
+            INSERT INTO maasserver_tablegeneration
+              (table_name, txid, generation)
+            VALUES ('{table}', 0, 0)
+            ON CONFLICT (table_name, txid) DO NOTHING;
+            """
+        )
+    )
+
+
 @transactional
 def register_system_triggers():
     """Register all system triggers into the database."""
@@ -1363,6 +1449,21 @@ def register_system_triggers():
         "maasserver_config", "sys_proxy_config_use_peer_proxy_update", "update"
     )
 
+    # Configurations cache
+    register_procedure(render_sys_config_procedure("sys_config_insert"))
+    register_trigger("maasserver_config", "sys_config_insert", "insert")
+    register_procedure(render_sys_config_procedure("sys_config_update"))
+    register_trigger("maasserver_config", "sys_config_update", "update")
+    register_procedure(
+        render_sys_config_procedure("sys_config_delete", on_delete=True)
+    )
+    register_trigger("maasserver_config", "sys_config_delete", "delete")
+
+    # Table generations
+    register_procedure(TABLE_GENERATION_BUMP)
+    for table in TABLE_GENERATION_TABLES:
+        register_table_generation_trigger(table)
+
     # - RBACSync
     register_procedure(RBAC_SYNC)
     register_trigger("maasserver_rbacsync", "sys_rbac_sync", "insert")
@@ -4,11 +4,16 @@
 """Tests for `maasserver.triggers`."""
 
 from contextlib import closing
+from textwrap import dedent
 
 from django.db import connection
 
 from maasserver.testing.testcase import MAASServerTestCase
-from maasserver.triggers import register_procedure, register_trigger
+from maasserver.triggers import (
+    register_procedure,
+    register_statement_trigger,
+    register_trigger,
+)
 from maasserver.triggers.system import register_system_triggers
 from maasserver.triggers.websocket import (
     register_websocket_triggers,
@@ -52,14 +57,82 @@ class TestTriggers(MAASServerTestCase):
 
         self.assertEqual(1, len(triggers), "Trigger was not created.")
 
+    def test_register_statement_trigger_creates_statement_trigger(self):
+        register_procedure(
+            dedent(
+                """\
+                CREATE OR REPLACE FUNCTION node_batch_notify()
+                RETURNS trigger AS $$
+                BEGIN
+                  RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+                """
+            )
+        )
+        register_statement_trigger(
+            "maasserver_node", "node_batch_notify", "update"
+        )
+
+        with closing(connection.cursor()) as cursor:
+            cursor.execute(
+                "SELECT tgtype & 1, tgoldtable, tgnewtable FROM pg_trigger "
+                "WHERE tgname = 'node_node_batch_notify'"
+            )
+            triggers = cursor.fetchall()
+
+        # The lowest bit of tgtype is set for row-level triggers.
+        self.assertEqual([(0, "old_table", "new_table")], triggers)
+
+    def test_register_statement_trigger_without_transition_tables(self):
+        register_procedure(
+            dedent(
+                """\
+                CREATE OR REPLACE FUNCTION node_changed()
+                RETURNS trigger AS $$
+                BEGIN
+                  RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+                """
+            )
+        )
+        register_statement_trigger(
+            "maasserver_node",
+            "node_changed",
+            "insert or truncate",
+            transition_tables=False,
+        )
+
+        with closing(connection.cursor()) as cursor:
+            cursor.execute(
+                "SELECT tgtype & 1, tgtype & 4, tgtype & 32, tgoldtable, "
+                "tgnewtable FROM pg_trigger "
+                "WHERE tgname = 'node_node_changed'"
+            )
+            triggers = cursor.fetchall()
+
+        # The bits of tgtype with values 4 and 32 are set for insert and
+        # truncate triggers.
+        self.assertEqual([(0, 4, 32, None, None)], triggers)
+
 
 class TestTriggersUsed(MAASServerTestCase):
     """Tests relating to those triggers the MAAS application uses."""
 
     triggers_system = {
+        "auth_user_sys_table_generation",
+        "bmc_sys_table_generation",
+        "config_sys_config_delete",
+        "config_sys_config_insert",
+        "config_sys_config_update",
         "config_sys_dns_config_insert",
         "config_sys_dns_config_update",
         "dnspublication_sys_dns_publish",
+        "domain_sys_table_generation",
+        "event_sys_table_generation",
+        "eventtype_sys_table_generation",
+        "fabric_sys_table_generation",
         "interface_ip_addresses_sys_dns_nic_ip_link",
         "interface_ip_addresses_sys_dns_nic_ip_unlink",
         "interface_ip_addresses_sys_dns_updates_interface_ip_insert",
@@ -71,6 +144,7 @@ class TestTriggersUsed(MAASServerTestCase):
         "node_sys_dns_updates_maasserver_node_insert",
         "node_sys_dns_updates_maasserver_node_update",
         "node_sys_dns_updates_maasserver_node_delete",
+        "node_sys_table_generation",
         "rbacsync_sys_rbac_sync",
         "regionrackrpcconnection_sys_core_rpc_delete",
         "regionrackrpcconnection_sys_core_rpc_insert",
@@ -82,6 +156,9 @@ class TestTriggersUsed(MAASServerTestCase):
         "subnet_sys_proxy_subnet_delete",
         "subnet_sys_proxy_subnet_insert",
         "subnet_sys_proxy_subnet_update",
+        "subnet_sys_table_generation",
+        "vlan_sys_table_generation",
+        "zone_sys_table_generation",
     }
 
     triggers_websocket = {
@@ -5,11 +5,13 @@
 from contextlib import closing
 
 from django.db import connection
+from psycopg2.extensions import ISOLATION_LEVEL_REPEATABLE_READ
 from twisted.internet.defer import inlineCallbacks
 
 from maasserver.enum import NODE_STATUS, NODE_TYPE
 from maasserver.models import Domain
 from maasserver.models.dnspublication import zone_serial
+from maasserver.testing.factory import factory
 from maasserver.testing.testcase import (
     MAASServerTestCase,
     MAASTransactionServerTestCase,
@@ -43,12 +45,25 @@ class TestTriggers(MAASServerTestCase):
             "interface_sys_dns_interface_update",
             "config_sys_dns_config_insert",
             "config_sys_dns_config_update",
+            "config_sys_config_insert",
+            "config_sys_config_update",
+            "config_sys_config_delete",
             "subnet_sys_proxy_subnet_insert",
             "subnet_sys_proxy_subnet_update",
             "subnet_sys_proxy_subnet_delete",
             "resourcepool_sys_rbac_rpool_insert",
             "resourcepool_sys_rbac_rpool_update",
             "resourcepool_sys_rbac_rpool_delete",
+            "auth_user_sys_table_generation",
+            "bmc_sys_table_generation",
+            "domain_sys_table_generation",
+            "event_sys_table_generation",
+            "eventtype_sys_table_generation",
+            "fabric_sys_table_generation",
+            "node_sys_table_generation",
+            "subnet_sys_table_generation",
+            "vlan_sys_table_generation",
+            "zone_sys_table_generation",
         ]
         sql, args = psql_array(triggers, sql_type="text")
         with closing(connection.cursor()) as cursor:
@@ -77,6 +92,68 @@ class TestTriggers(MAASServerTestCase):
         register_system_triggers()
         mock_create.assert_called_once_with()
 
+    def test_table_generations(self):
+        register_system_triggers()
+
+        def get_generation():
+            with closing(connection.cursor()) as cursor:
+                cursor.execute(
+                    "SELECT sum(generation) FROM maasserver_tablegeneration "
+                    "WHERE table_name = 'maasserver_zone'"
+                )
+                return cursor.fetchone()[0]
+
+        # The tracked tables have a generation before they change.
+        generation = get_generation()
+        self.assertIsNotNone(generation)
+        zone = factory.make_Zone()
+        self.assertGreater(get_generation(), generation)
+        # A transaction bumps the generation once, however many statements
+        # change the table.
+        generation = get_generation()
+        zone.delete()
+        self.assertEqual(get_generation(), generation)
+
+
+class TestTableGenerationsConcurrency(MAASTransactionServerTestCase):
+    def get_generation(self, cursor):
+        cursor.execute(
+            "SELECT sum(generation) FROM maasserver_tablegeneration "
+            "WHERE table_name = 'maasserver_zone'"
+        )
+        return cursor.fetchone()[0]
+
+    def test_concurrent_writers_dont_conflict(self):
+        register_system_triggers()
+        params = connection.get_connection_params()
+        first = connection.get_new_connection(params)
+        second = connection.get_new_connection(params)
+        with closing(first), closing(second):
+            for conn in (first, second):
+                conn.set_session(
+                    isolation_level=ISOLATION_LEVEL_REPEATABLE_READ
+                )
+            with first.cursor() as cursor1, second.cursor() as cursor2:
+                # Fail instead of waiting if the writers share a row lock.
+                cursor1.execute("SET lock_timeout = '1s'")
+                generation = self.get_generation(cursor1)
+                cursor2.execute(
+                    "INSERT INTO maasserver_zone "
+                    "(name, description, created, updated) "
+                    "VALUES ('zone-a', '', now(), now())"
+                )
+                cursor1.execute(
+                    "INSERT INTO maasserver_zone "
+                    "(name, description, created, updated) "
+                    "VALUES ('zone-b', '', now(), now())"
+                )
+                second.commit()
+                # The snapshot of the first transaction was taken before
+                # the second one committed.
+                first.commit()
+                self.assertEqual(self.get_generation(cursor1), generation + 2)
+                first.commit()
+
 
 class TestSysDNSUpdates(
     MAASTransactionServerTestCase, TransactionalHelpersMixin, NotifyHelperMixin
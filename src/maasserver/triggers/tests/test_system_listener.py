@@ -1964,6 +1964,59 @@ class TestProxyListener(
             yield listener.stopService()
 
 
+class TestConfigListener(
+    MAASTransactionServerTestCase, TransactionalHelpersMixin
+):
+    """End-to-end test for the configurations triggers code."""
+
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_sends_message_for_config_insert(self):
+        yield deferToDatabase(register_system_triggers)
+        dv = DeferredValue()
+        listener = self.make_listener_without_delay()
+        listener.register("sys_config", lambda *args: dv.set(args))
+        yield listener.startService()
+        try:
+            yield deferToDatabase(self.create_config, "theme", "dark")
+            yield dv.get(timeout=2)
+        finally:
+            yield listener.stopService()
+        channel, payload = dv.value
+        self.assertEqual("sys_config", channel)
+        self.assertTrue(payload.isdigit())
+
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_sends_message_for_config_update(self):
+        yield deferToDatabase(register_system_triggers)
+        yield deferToDatabase(self.create_config, "theme", "dark")
+        dv = DeferredValue()
+        listener = self.make_listener_without_delay()
+        listener.register("sys_config", lambda *args: dv.set(args))
+        yield listener.startService()
+        try:
+            yield deferToDatabase(self.set_config, "theme", "light")
+            yield dv.get(timeout=2)
+        finally:
+            yield listener.stopService()
+
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_sends_message_for_config_delete(self):
+        yield deferToDatabase(register_system_triggers)
+        config = yield deferToDatabase(self.create_config, "theme", "dark")
+        dv = DeferredValue()
+        listener = self.make_listener_without_delay()
+        listener.register("sys_config", lambda *args: dv.set(args))
+        yield listener.startService()
+        try:
+            yield deferToDatabase(transactional(config.delete))
+            yield dv.get(timeout=2)
+        finally:
+            yield listener.stopService()
+
+
 class TestRBACResourcePoolListener(
     MAASTransactionServerTestCase, TransactionalHelpersMixin, RBACHelpersMixin
 ):
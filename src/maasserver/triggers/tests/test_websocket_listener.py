@@ -533,6 +533,34 @@ class TestNodeTagListener(
         finally:
             yield listener.stopService()
 
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_calls_handler_for_each_node_tagged_at_once(self):
+        nodes = []
+        for _ in range(3):
+            node = yield deferToDatabase(self.create_node, self.params)
+            nodes.append(node)
+        tag = yield deferToDatabase(self.create_tag)
+
+        @transactional
+        def add_nodes_to_tag():
+            tag.node_set.add(*nodes)
+
+        listener = self.make_listener_without_delay()
+        q = DeferredQueue()
+        listener.register(self.listener, lambda *args: q.put(args))
+        yield listener.startService()
+        try:
+            yield deferToDatabase(add_nodes_to_tag)
+            updates = set()
+            for _ in nodes:
+                updates.add((yield deferWithTimeout(2, q.get)))
+            self.assertEqual(
+                {("update", node.system_id) for node in nodes}, updates
+            )
+        finally:
+            yield listener.stopService()
+
     @wait_for_reactor
     @inlineCallbacks
     def test_calls_handler_with_update_on_delete(self):
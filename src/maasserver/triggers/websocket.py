@@ -18,7 +18,9 @@ from maasserver.enum import BMC_TYPE, NODE_TYPE
 from maasserver.triggers import (
     EVENTS_IUD,
     EVENTS_LUU,
+    NOTIFY_BATCH_PROCEDURE,
     register_procedure,
+    register_statement_trigger,
     register_trigger,
     register_triggers,
 )
@@ -35,34 +37,55 @@ TYPE_CONTROLLERS = (
     f"{NODE_TYPE.REGION_AND_RACK_CONTROLLER})"
 )
 
-# Procedure that is called when a tag is added or removed from a node/device.
-# Sends a notify message for machine_update or device_update depending on if
-# the node type is node.
+# Statements sending batched notifications for the nodes with the ids
+# selected by {node_ids}: machine_update, controller_update or device_update
+# depending on the node type. Devices with a parent notify the parent
+# machine instead.
+NODES_UPDATE_BATCH_NOTIFY = """\
+      PERFORM notify_batch('machine_update', ARRAY(
+        SELECT node.system_id
+        FROM maasserver_node node
+        WHERE node.id IN ({node_ids})
+        AND node.node_type = {type_machine}
+        UNION
+        SELECT parent.system_id
+        FROM maasserver_node node
+        JOIN maasserver_node parent ON parent.id = node.parent_id
+        WHERE node.id IN ({node_ids})
+        AND node.node_type != {type_machine}
+        AND node.node_type NOT IN {type_controllers}
+      ));
+      PERFORM notify_batch('controller_update', ARRAY(
+        SELECT node.system_id
+        FROM maasserver_node node
+        WHERE node.id IN ({node_ids})
+        AND node.node_type IN {type_controllers}
+      ));
+      PERFORM notify_batch('device_update', ARRAY(
+        SELECT node.system_id
+        FROM maasserver_node node
+        WHERE node.id IN ({node_ids})
+        AND node.node_type != {type_machine}
+        AND node.node_type NOT IN {type_controllers}
+        AND node.parent_id IS NULL
+      ));
+"""
+
+# Procedure that is called once per statement adding or removing tags from
+# nodes/devices. Sends batched notify messages for machine_update,
+# controller_update or device_update depending on the node type, and for
+# tag_update. {entry} is the transition table of the statement.
 NODE_TAG_NOTIFY = dedent(
     """\
     CREATE OR REPLACE FUNCTION {function_name}() RETURNS trigger AS $$
-    DECLARE
-      node RECORD;
-      pnode RECORD;
     BEGIN
-      SELECT system_id, node_type, parent_id INTO node
-      FROM maasserver_node
-      WHERE id = {entry}.node_id;
-
-      IF node.node_type = {type_machine} THEN
-        PERFORM pg_notify('machine_update', CAST(node.system_id AS text));
-      ELSIF node.node_type IN {type_controllers} THEN
-        PERFORM pg_notify('controller_update', CAST(node.system_id AS text));
-      ELSIF node.parent_id IS NOT NULL THEN
-        SELECT system_id INTO pnode
-        FROM maasserver_node
-        WHERE id = node.parent_id;
-        PERFORM pg_notify('machine_update', CAST(pnode.system_id AS text));
-      ELSE
-        PERFORM pg_notify('device_update', CAST(node.system_id AS text));
-      END IF;
-      PERFORM pg_notify('tag_update', CAST({entry}.tag_id AS text));
-      RETURN NEW;
+"""
+    + NODES_UPDATE_BATCH_NOTIFY
+    + """\
+      PERFORM notify_batch('tag_update', ARRAY(
+        SELECT DISTINCT CAST(tag_id AS text) FROM {entry}
+      ));
+      RETURN NULL;
     END;
     $$ LANGUAGE plpgsql;
     """
@@ -70,37 +93,16 @@ NODE_TAG_NOTIFY = dedent(
 
 
 # Procedure that is called when a tag is updated. This will send the correct
-# machine_update or device_update notify message for all nodes with this tag.
+# machine_update, controller_update or device_update batched notify messages
+# for all nodes with this tag.
 TAG_NODES_NOTIFY = dedent(
     """\
     CREATE OR REPLACE FUNCTION tag_update_machine_device_notify()
     RETURNS trigger AS $$
-    DECLARE
-      node RECORD;
-      pnode RECORD;
     BEGIN
-      FOR node IN (
-        SELECT
-          maasserver_node.system_id,
-          maasserver_node.node_type,
-          maasserver_node.parent_id
-        FROM maasserver_node_tags, maasserver_node
-        WHERE maasserver_node_tags.tag_id = NEW.id
-        AND maasserver_node_tags.node_id = maasserver_node.id)
-      LOOP
-        IF node.node_type = {type_machine} THEN
-          PERFORM pg_notify('machine_update',CAST(node.system_id AS text));
-        ELSIF node.node_type IN {type_controllers} THEN
-          PERFORM pg_notify('controller_update',CAST(node.system_id AS text));
-        ELSIF node.parent_id IS NOT NULL THEN
-          SELECT system_id INTO pnode
-          FROM maasserver_node
-          WHERE id = node.parent_id;
-          PERFORM pg_notify('machine_update',CAST(pnode.system_id AS text));
-        ELSE
-          PERFORM pg_notify('device_update',CAST(node.system_id AS text));
-        END IF;
-      END LOOP;
+"""
+    + NODES_UPDATE_BATCH_NOTIFY
+    + """\
       RETURN NEW;
     END;
     $$ LANGUAGE plpgsql;
@@ -1364,6 +1366,63 @@ def render_notification_procedure(proc_name, event_name, cast):
     )
 
 
+# Postgres refuses NOTIFY payloads of 8000 bytes or more. Enriched payloads
+# bigger than this fall back to carrying only the primary key.
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+
+def render_notification_procedure_with_changes(
+    proc_name, event_name, obj, pk, changed_fields, payload_fields=None
+):
+    """Render a procedure sending an enriched notification.
+
+    The payload is a JSON object holding the primary key, the name of the
+    `changed_fields` that changed (only for updates, otherwise null), and the
+    `payload_fields` values, an optional mapping of names to SQL expressions
+    evaluated against `obj`. When the payload doesn't fit in a NOTIFY only
+    the primary key is sent, as `render_notification_procedure` does.
+
+    `maasserver.listener.decode_notify_payload` decodes both formats.
+    """
+    compare = "\n".join(
+        f"            IF NEW.{field} IS DISTINCT FROM OLD.{field} THEN\n"
+        f"              changed := changed || '{field}'::text;\n"
+        f"            END IF;"
+        for field in changed_fields
+    )
+    fields = ",".join(
+        f"\n              '{name}', {expr.format(obj=obj)}"
+        for name, expr in (payload_fields or {}).items()
+    )
+    if fields:
+        fields += "\n            "
+    return dedent(
+        f"""\
+        CREATE OR REPLACE FUNCTION {proc_name}() RETURNS trigger AS $$
+        DECLARE
+          changed text[] := NULL;
+          payload text;
+        BEGIN
+          IF TG_OP = 'UPDATE' THEN
+            changed := ARRAY[]::text[];
+{compare}
+          END IF;
+          payload := json_build_object(
+            'pk', CAST({obj}.{pk} AS text),
+            'changed', to_json(changed),
+            'fields', json_build_object({fields})
+          )::text;
+          IF octet_length(payload) > {NOTIFY_PAYLOAD_LIMIT} THEN
+            payload := CAST({obj}.{pk} AS text);
+          END IF;
+          PERFORM pg_notify('{event_name}', payload);
+          RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+
+
 def render_device_notification_procedure(proc_name, event_name, obj):
     return dedent(
         f"""\
@@ -1603,6 +1662,8 @@ node_fields = (
 @transactional
 def register_websocket_triggers():
     """Register all websocket triggers into the database."""
+    register_procedure(NOTIFY_BATCH_PROCEDURE)
+
     for proc_name_prefix, event_name_prefix, node_type in (
         ("machine", "machine", NODE_TYPE.MACHINE),
         ("rack_controller", "controller", NODE_TYPE.RACK_CONTROLLER),
@@ -2117,21 +2178,24 @@ def register_websocket_triggers():
     )
 
     # Service table
-    register_procedure(
-        render_notification_procedure(
-            "service_create_notify", "service_create", "NEW.id"
-        )
-    )
-    register_procedure(
-        render_notification_procedure(
-            "service_update_notify", "service_update", "NEW.id"
-        )
-    )
-    register_procedure(
-        render_notification_procedure(
-            "service_delete_notify", "service_delete", "OLD.id"
+    for action, obj in (
+        ("create", "NEW"),
+        ("update", "NEW"),
+        ("delete", "OLD"),
+    ):
+        register_procedure(
+            render_notification_procedure_with_changes(
+                f"service_{action}_notify",
+                f"service_{action}",
+                obj,
+                "id",
+                ("name", "node_id", "status", "status_info"),
+                {
+                    "status": "{obj}.status",
+                    "status_info": "{obj}.status_info",
+                },
+            )
         )
-    )
     register_triggers("maasserver_service", "service")
 
     # Tag table
@@ -2152,11 +2216,13 @@ def register_websocket_triggers():
     )
     register_triggers("maasserver_tag", "tag")
 
-    # Node tag link table
+    # Node tag link table, with statement-level triggers as tags are linked
+    # to and unlinked from many nodes at once when evaluated.
     register_procedure(
         NODE_TAG_NOTIFY.format(
             function_name="machine_device_tag_link_notify",
-            entry="NEW",
+            entry="new_table",
+            node_ids="SELECT node_id FROM new_table",
             type_machine=NODE_TYPE.MACHINE,
             type_controllers=TYPE_CONTROLLERS,
         )
@@ -2164,21 +2230,26 @@ def register_websocket_triggers():
     register_procedure(
         NODE_TAG_NOTIFY.format(
             function_name="machine_device_tag_unlink_notify",
-            entry="OLD",
+            entry="old_table",
+            node_ids="SELECT node_id FROM old_table",
             type_machine=NODE_TYPE.MACHINE,
             type_controllers=TYPE_CONTROLLERS,
         )
     )
-    register_trigger(
+    register_statement_trigger(
         "maasserver_node_tags", "machine_device_tag_link_notify", "insert"
     )
-    register_trigger(
+    register_statement_trigger(
         "maasserver_node_tags", "machine_device_tag_unlink_notify", "delete"
     )
 
     # Tag table, update to linked nodes.
     register_procedure(
         TAG_NODES_NOTIFY.format(
+            node_ids=(
+                "SELECT node_id FROM maasserver_node_tags "
+                "WHERE tag_id = NEW.id"
+            ),
             type_machine=NODE_TYPE.MACHINE,
             type_controllers=TYPE_CONTROLLERS,
         )
@@ -149,7 +149,15 @@ class WebApplicationService(StreamServerEndpointService):
         the web application.
     """
 
-    def __init__(self, listener, status_worker):
+    def __init__(
+        self,
+        listener,
+        status_worker,
+        notify_batch_interval=0,
+        dehydrate_cache_size=0,
+        websocket_deflate=True,
+        websocket_deflate_context_takeover=True,
+    ):
         self.starting = False
         # Start with an empty `Resource`, `installApplication` will configure
         # the root resource. This must be seperated because Django must be
@@ -161,11 +169,19 @@ class WebApplicationService(StreamServerEndpointService):
         # `endpoint` is set in `privilegedStartService`, at this point the
         # `endpoint` is None.
         super().__init__(None, self.site)
-        self.websocket = WebSocketFactory(listener)
+        self.websocket = WebSocketFactory(
+            listener,
+            notify_batch_interval=notify_batch_interval,
+            dehydrate_cache_size=dehydrate_cache_size,
+        )
         self.threadpool = ThreadPoolLimiter(
             reactor.threadpoolForDatabase, concurrency.webapp
         )
         self.status_worker = status_worker
+        self.websocket_deflate = websocket_deflate
+        self.websocket_deflate_context_takeover = (
+            websocket_deflate_context_takeover
+        )
 
     def prepareApplication(self):
         """Return the WSGI application.
@@ -194,7 +210,14 @@ class WebApplicationService(StreamServerEndpointService):
         maas = Resource()
         maas.putChild(b"metadata", metadata)
         maas.putChild(
-            b"ws", WebSocketsResource(lookupProtocolForFactory(self.websocket))
+            b"ws",
+            WebSocketsResource(
+                lookupProtocolForFactory(self.websocket),
+                deflate=self.websocket_deflate,
+                deflateContextTakeover=(
+                    self.websocket_deflate_context_takeover
+                ),
+            ),
         )
 
         root = Resource()
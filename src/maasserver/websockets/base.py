@@ -11,8 +11,10 @@ __all__ = [
 ]
 
 import asyncio
+from collections import OrderedDict
 from functools import reduce, wraps
 from operator import attrgetter
+import time
 
 from django.contrib.auth.models import User
 from django.contrib.postgres.fields import ArrayField
@@ -25,17 +27,26 @@ from twisted.internet.defer import ensureDeferred
 
 from maasserver import concurrency
 from maasserver.permissions import NodePermission
-from maasserver.prometheus.middleware import wrap_query_counter_cursor
+from maasserver.prometheus.middleware import (
+    get_slow_query_log,
+    record_slow_queries,
+    wrap_query_counter_cursor,
+)
 from maasserver.rbac import rbac
 from maasserver.utils.forms import get_QueryDict
 from maasserver.utils.orm import transactional
 from maasserver.utils.threads import deferToDatabase
+from maasserver.websockets.cache import dehydrate_cache
 from provisioningserver.certificates import Certificate
 from provisioningserver.prometheus.metrics import PROMETHEUS_METRICS
 from provisioningserver.utils.twisted import asynchronous, IAsynchronous
 
 DATETIME_FORMAT = "%a, %d %b. %Y %H:%M:%S"
 
+# Time (in seconds) during which the user isn't reloaded from the database
+# when processing notifications.
+USER_REFRESH_TTL = 5
+
 
 def dehydrate_datetime(datetime):
     """Convert the `datetime` to string with `DATETIME_FORMAT`."""
@@ -114,6 +125,13 @@ class HandlerOptions:
     form = None
     form_requires_request = True
     listen_channels = []
+    listen_fields = None
+    listen_snapshots_size = 100
+    listen_patch = False
+    listen_patch_snapshots_size = 100
+    listen_loaded_only = False
+    dehydrate_cache = False
+    dehydrate_cache_exclude = None
     batch_key = "id"
     create_permission = None
     view_permission = None
@@ -201,9 +219,56 @@ class Handler(metaclass=HandlerMetaclass):
     def full_dehydrate(self, obj, for_list: bool = False) -> dict:
         """Convert the given object into a dictionary.
 
+        The result is taken from the dehydrate cache when `Meta.dehydrate_cache`
+        is set and the object didn't change since it was cached. The fields in
+        `Meta.dehydrate_cache_exclude` are dehydrated again on every hit.
+
         :param for_list: True when the object is being converted to belong
             in a list.
         """
+        key = self.get_dehydrate_cache_key(obj, for_list)
+        if key is not None:
+            data = dehydrate_cache.get(key)
+            if data is not None:
+                for field_name in self._meta.dehydrate_cache_exclude or ():
+                    if field_name in data:
+                        dehydrate_method = getattr(
+                            self, "dehydrate_%s" % field_name
+                        )
+                        data[field_name] = dehydrate_method(
+                            getattr(obj, field_name)
+                        )
+                return data
+            generation = dehydrate_cache.get_generation(key)
+        data = self._full_dehydrate(obj, for_list=for_list)
+        if key is not None:
+            dehydrate_cache.set(key, data, generation)
+        return data
+
+    def get_dehydrate_cache_key(self, obj, for_list: bool = False):
+        """Return the key of `obj` in the dehydrate cache.
+
+        The data is cached per user, as the permissions and actions
+        included in it depend on the user. `None` is returned when the data
+        can't be cached, including when RBAC is enabled, since the
+        permissions of the users can then change without MAAS knowing.
+        """
+        if not self._meta.dehydrate_cache:
+            return None
+        updated = getattr(obj, "updated", None)
+        if updated is None:
+            return None
+        if rbac.is_enabled():
+            return None
+        return (
+            self._meta.handler_name,
+            getattr(obj, self._meta.pk),
+            updated,
+            for_list,
+            (self.user.id, self.user.is_superuser),
+        )
+
+    def _full_dehydrate(self, obj, for_list: bool = False) -> dict:
         if for_list:
             allowed_fields = self._meta.list_fields
             exclude_fields = self._meta.list_exclude
@@ -461,8 +526,14 @@ class Handler(metaclass=HandlerMetaclass):
     def _call_method_track_queries(self, method_name, method, params):
         """Call the specified method tracking query-related metrics."""
         latencies = []
+        slow_query_log = get_slow_query_log()
+        slow_statements = (
+            slow_query_log.statements() if slow_query_log is not None else None
+        )
 
-        with wrap_query_counter_cursor(latencies):
+        with wrap_query_counter_cursor(
+            latencies, slow_statements=slow_statements
+        ):
             result = method(params)
 
         labels = _get_call_latency_metrics_label((self, method_name))
@@ -479,6 +550,10 @@ class Handler(metaclass=HandlerMetaclass):
                 value=latency,
                 labels=labels,
             )
+        if slow_statements is not None:
+            record_slow_queries(
+                slow_query_log, labels["call"], slow_statements
+            )
 
         return result
 
@@ -486,7 +561,11 @@ class Handler(metaclass=HandlerMetaclass):
         """Cache all loaded object pks."""
         getpk = attrgetter(self._meta.pk)
         objs = list(objs)
-        self.cache["loaded_pks"].update(getpk(obj) for obj in objs)
+        pks = {getpk(obj) for obj in objs}
+        self.cache["loaded_pks"].update(pks)
+        # The client gets the full objects, the data kept from earlier
+        # notifications is no longer what it has.
+        self._forget_snapshots(pks)
         return objs
 
     def _filter(self, qs, action, params):
@@ -848,11 +927,13 @@ class Handler(metaclass=HandlerMetaclass):
         if action == "delete":
             if pk in self.cache["loaded_pks"]:
                 self.cache["loaded_pks"].remove(pk)
-                return (self._meta.handler_name, action, pk)
+                result = (self._meta.handler_name, action, pk)
+                self._remember_listen_data(pk, result)
+                return result
             else:
                 return None
 
-        self.user.refresh_from_db()
+        self.refresh_user()
         try:
             obj = self.listen(channel, action, pk)
         except HandlerDoesNotExistError:
@@ -871,7 +952,9 @@ class Handler(metaclass=HandlerMetaclass):
                     # The user no longer has access to this object. To the
                     # client this is a delete action.
                     self.cache["loaded_pks"].remove(pk)
-                    return (self._meta.handler_name, "delete", pk)
+                    result = (self._meta.handler_name, "delete", pk)
+                    self._remember_listen_data(pk, result)
+                    return result
                 else:
                     # Just a normal update to the client.
                     return self.on_listen_for_active_pk(action, pk, obj)
@@ -889,12 +972,65 @@ class Handler(metaclass=HandlerMetaclass):
             pass
         return None
 
+    def refresh_user(self):
+        """Reload the user from the database, unless it was reloaded less
+        than `USER_REFRESH_TTL` seconds ago.
+
+        This keeps the permissions used by `on_listen` up to date without
+        querying the user for every notification.
+        """
+        now = time.monotonic()
+        refreshed = self.cache.get("user_refreshed")
+        if refreshed is not None:
+            user_id, timestamp = refreshed
+            if user_id == self.user.id and now - timestamp < USER_REFRESH_TTL:
+                return
+        self.user.refresh_from_db()
+        self.cache["user_refreshed"] = (self.user.id, now)
+
+    def get_listen_group_key(self, pk):
+        """Return the key used to group this handler with the handlers of
+        other clients for a notification about `pk`.
+
+        Handlers sharing a key produce the same result from `on_listen`, so
+        the object only needs to be fetched and dehydrated once for all of
+        them. `None` is returned when the result can't be shared, which is
+        the case for handlers overriding `on_listen`.
+        """
+        if type(self).on_listen is not Handler.on_listen:
+            return None
+        try:
+            pk = self._meta.pk_type(pk)
+        except (TypeError, ValueError):
+            return None
+        return (
+            self.user.id,
+            pk in self.cache["loaded_pks"],
+            pk == self.cache.get("active_pk"),
+        )
+
+    def apply_listen_result(self, pk, result):
+        """Update the cache as `on_listen` would have when returning `result`.
+
+        Used for handlers sharing a group key with the handler that actually
+        processed the notification.
+        """
+        if result is None:
+            return
+        pk = self._meta.pk_type(pk)
+        _, action, _ = result
+        if action == "delete":
+            self.cache["loaded_pks"].discard(pk)
+        else:
+            self.cache["loaded_pks"].add(pk)
+        self._remember_listen_data(pk, result)
+
     def on_listen_for_active_pk(self, action, pk, obj):
         """Return the correct data for `obj` depending on if its the
         active primary key."""
         if "active_pk" in self.cache and pk == self.cache["active_pk"]:
             # Active so send all the data for the object.
-            return (
+            result = (
                 self._meta.handler_name,
                 action,
                 self.full_dehydrate(obj, for_list=False),
@@ -902,11 +1038,123 @@ class Handler(metaclass=HandlerMetaclass):
         else:
             # Not active so only send the data like it was comming from
             # the list call.
-            return (
+            result = (
                 self._meta.handler_name,
                 action,
                 self.full_dehydrate(obj, for_list=True),
             )
+        self._remember_listen_data(pk, result)
+        return result
+
+    def on_listen_changes(self, channel, action, pk, changes):
+        """Return the result of `on_listen` from the `changes` carried by the
+        notification, without fetching the object.
+
+        This is only possible for updates of objects listed by the client,
+        but not active, where all the changed columns are in
+        `Meta.listen_fields` and the data last sent to the client for the
+        object is known. `None` is
+        returned when the object needs to be fetched through `on_listen`.
+        """
+        listen_fields = self._meta.listen_fields
+        if not listen_fields or changes is None or action != "update":
+            return None
+        if type(self).on_listen is not Handler.on_listen:
+            return None
+        changed = changes["changed"]
+        if changed is None or not set(changed).issubset(listen_fields):
+            return None
+        pk = self._meta.pk_type(pk)
+        if pk not in self.cache["loaded_pks"]:
+            return None
+        if pk == self.cache.get("active_pk"):
+            return None
+        data = self.cache.get("listen_snapshots", {}).get(pk)
+        if data is None:
+            return None
+        data = self.dehydrate_listen_changes(dict(data), changes["fields"])
+        result = (self._meta.handler_name, action, data)
+        self._remember_listen_data(pk, result)
+        return result
+
+    def dehydrate_listen_changes(self, data: dict, fields: dict) -> dict:
+        """Update `data` with the `fields` carried by a notification.
+
+        By default the values of `Meta.listen_fields` are copied as they are.
+        """
+        for field in self._meta.listen_fields:
+            if field in fields:
+                data[field] = fields[field]
+        return data
+
+    def _remember_listen_data(self, pk, result):
+        """Keep the data of `result` for `on_listen_changes`.
+
+        Only the list data of the most recently notified objects is kept, up
+        to `Meta.listen_snapshots_size`.
+        """
+        if not self._meta.listen_fields:
+            return
+        snapshots = self.cache.setdefault("listen_snapshots", OrderedDict())
+        if (
+            result is None
+            or result[1] == "delete"
+            or pk == self.cache.get("active_pk")
+        ):
+            snapshots.pop(pk, None)
+            return
+        snapshots[pk] = result[2]
+        snapshots.move_to_end(pk)
+        while len(snapshots) > self._meta.listen_snapshots_size:
+            snapshots.popitem(last=False)
+
+    def _forget_snapshots(self, pks):
+        """Drop the data kept for `pks` by `_remember_listen_data` and
+        `make_listen_patch`."""
+        for key in ("listen_snapshots", "patch_snapshots"):
+            snapshots = self.cache.get(key)
+            if snapshots:
+                for pk in pks:
+                    snapshots.pop(self._meta.pk_type(pk), None)
+
+    def make_listen_patch(self, pk, result):
+        """Return `result` as a patch of the data last sent for `pk`.
+
+        Used for clients that accept patch notifications, when
+        `Meta.listen_patch` is set. Updates are turned into a "patch" action
+        carrying only the fields that changed and the ones that were removed
+        since the previous notification. The data sent for the most recently
+        notified objects is kept, up to `Meta.listen_patch_snapshots_size`;
+        when it has been evicted, `result` is returned untouched so the
+        client gets the full object. `None` is returned when nothing changed.
+        """
+        if result is None or not self._meta.listen_patch:
+            return result
+        pk = self._meta.pk_type(pk)
+        snapshots = self.cache.setdefault("patch_snapshots", OrderedDict())
+        name, action, data = result
+        previous = snapshots.pop(pk, None)
+        if action == "delete":
+            return result
+        snapshots[pk] = data
+        while len(snapshots) > self._meta.listen_patch_snapshots_size:
+            snapshots.popitem(last=False)
+        if action != "update" or previous is None:
+            return result
+        changed = {
+            key: value
+            for key, value in data.items()
+            if key not in previous or previous[key] != value
+        }
+        removed = [key for key in previous if key not in data]
+        if not changed and not removed:
+            return None
+        patch = {
+            self._meta.pk: data.get(self._meta.pk, pk),
+            "changed": changed,
+            "removed": removed,
+        }
+        return name, "patch", patch
 
     def listen(self, channel, action, pk):
         """Called when the handler listens for events on channels with
@@ -932,12 +1180,14 @@ class Handler(metaclass=HandlerMetaclass):
             if pk == self.cache.get("active_pk"):
                 del self.cache["active_pk"]
             self.cache["loaded_pks"] = self.cache["loaded_pks"] - set(pk)
+            self._forget_snapshots([pk])
             return [pk]
         elif self._meta.bulk_pk in params:
             pks = set(params[self._meta.bulk_pk])
             if self.cache.get("active_pk") in pks:
                 del self.cache["active_pk"]
             self.cache["loaded_pks"] = self.cache["loaded_pks"] - pks
+            self._forget_snapshots(pks)
             return list(pks)
         else:
             raise HandlerValidationError(
@@ -0,0 +1,175 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+"""Cache of dehydrated objects for the websocket handlers."""
+
+from collections import OrderedDict
+import copy
+import ipaddress
+import json
+import threading
+
+import netaddr
+
+from provisioningserver.prometheus.metrics import PROMETHEUS_METRICS
+
+
+def json_default(obj):
+    """Encode the objects the handlers can return that aren't natively
+    supported by JSON.
+
+    Byte strings are decoded as UTF-8 and IP addresses and networks are
+    converted to their string representation.
+    """
+    if isinstance(obj, bytes):
+        return obj.decode(encoding="utf-8", errors="ignore")
+    elif isinstance(
+        obj,
+        (
+            ipaddress.IPv4Address,
+            ipaddress.IPv6Address,
+            netaddr.IPAddress,
+            netaddr.IPNetwork,
+        ),
+    ):
+        return str(obj)
+    else:
+        raise TypeError("Could not convert object to JSON: %r" % obj)
+
+
+class DehydrateCache:
+    """Process-wide cache of the data returned by `Handler.full_dehydrate`.
+
+    Entries are deep copies of the data, and the memory used by the cache is
+    bounded to `budget` bytes, estimating the size of each entry from its
+    JSON encoding. The least recently used entries are evicted first. Keys
+    start with the handler name and the primary key of the object, which
+    allows dropping all the entries for an object when a notification is
+    received for it.
+
+    The data is dehydrated in the database threads, while notifications are
+    processed in the reactor, so data dehydrated before a notification could
+    be cached after it. Each object has a generation, bumped whenever its
+    entries are dropped, and `set` only caches data dehydrated at the current
+    generation of the object.
+
+    The cache is disabled while `budget` is 0.
+    """
+
+    def __init__(self, budget=0):
+        self.budget = budget
+        self.size = 0
+        self._entries = OrderedDict()
+        self._object_keys = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def configure(self, budget):
+        """Set the memory budget of the cache, in bytes."""
+        with self._lock:
+            self.budget = budget
+            if not budget:
+                self._clear()
+            else:
+                self._evict()
+
+    def get(self, key):
+        """Return the data cached for `key`, or `None`."""
+        if not self.budget:
+            return None
+        labels = {"handler": key[0]}
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            PROMETHEUS_METRICS.update(
+                "maas_websocket_dehydrate_cache_misses", "inc", labels=labels
+            )
+            return None
+        PROMETHEUS_METRICS.update(
+            "maas_websocket_dehydrate_cache_hits", "inc", labels=labels
+        )
+        return copy.deepcopy(entry[0])
+
+    def get_generation(self, key):
+        """Return the generation of the object of `key`.
+
+        It must be read before dehydrating the data to cache with `set`.
+        """
+        with self._lock:
+            return self._generations.get(key[:2], 0)
+
+    def set(self, key, data, generation=0):
+        """Cache `data` for `key`.
+
+        Data that was dehydrated before the entries of its object were
+        dropped, that can't be encoded as JSON, or that doesn't fit in the
+        budget, isn't cached.
+        """
+        if not self.budget:
+            return
+        try:
+            size = len(json.dumps(data, default=json_default))
+            data = copy.deepcopy(data)
+        except (TypeError, ValueError, copy.Error):
+            return
+        with self._lock:
+            if size > self.budget:
+                return
+            if self._generations.get(key[:2], 0) != generation:
+                return
+            self._remove(key)
+            self._entries[key] = (data, size)
+            self.size += size
+            self._object_keys.setdefault(key[:2], set()).add(key)
+            self._evict()
+
+    def invalidate(self, handler_name, pk):
+        """Drop all the entries for the object `pk` of `handler_name`."""
+        object_key = (handler_name, pk)
+        with self._lock:
+            self._generations[object_key] = (
+                self._generations.get(object_key, 0) + 1
+            )
+            for key in self._object_keys.pop(object_key, ()):
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self.size -= entry[1]
+            self._update_size_metric()
+
+    def clear(self):
+        """Drop all the entries."""
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self._entries.clear()
+        self._object_keys.clear()
+        self._generations.clear()
+        self.size = 0
+        self._update_size_metric()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size -= entry[1]
+        keys = self._object_keys.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._object_keys[key[:2]]
+
+    def _evict(self):
+        while self.size > self.budget and self._entries:
+            self._remove(next(iter(self._entries)))
+        self._update_size_metric()
+
+    def _update_size_metric(self):
+        PROMETHEUS_METRICS.update(
+            "maas_websocket_dehydrate_cache_size", "set", value=self.size
+        )
+
+
+dehydrate_cache = DehydrateCache()
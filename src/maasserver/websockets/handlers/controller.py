@@ -122,6 +122,7 @@ class ControllerHandler(NodeHandler):
             "vault_configured",
         ]
         listen_channels = ["controller"]
+        dehydrate_cache = True
         create_permission = NodePermission.admin
         view_permission = NodePermission.view
         edit_permission = NodePermission.admin
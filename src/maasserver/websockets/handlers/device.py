@@ -163,6 +163,7 @@ class DeviceHandler(NodeHandler):
             "pxe_mac",
         ]
         listen_channels = ["device"]
+        dehydrate_cache = True
         view_permission = NodePermission.view
         edit_permission = NodePermission.edit
         delete_permission = NodePermission.edit
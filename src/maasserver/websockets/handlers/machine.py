@@ -328,6 +328,9 @@ class MachineHandler(NodeHandler):
             "commissioning_status",
         ] + exclude
         listen_channels = ["machine"]
+        listen_patch = True
+        listen_loaded_only = True
+        dehydrate_cache = True
         create_permission = NodePermission.admin
         view_permission = NodePermission.view
         edit_permission = NodePermission.admin
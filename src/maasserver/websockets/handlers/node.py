@@ -171,6 +171,8 @@ class NodeHandler(TimestampedModelHandler):
         bulk_pk = "system_ids"
         pk_type = str
         use_paginated_list = False
+        # Renaming these doesn't change the nodes, nor notify about them.
+        dehydrate_cache_exclude = ["domain", "pool", "zone"]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -16,3 +16,4 @@ class ServiceHandler(TimestampedModelHandler):
         allowed_methods = ["list", "get", "set_active"]
         list_fields = ["id", "name", "status", "status_info"]
         listen_channels = ["service"]
+        listen_fields = ["status", "status_info"]
@@ -7,7 +7,6 @@ from collections import deque
 from contextlib import ExitStack
 from functools import partial
 from http.cookies import SimpleCookie
-import ipaddress
 import json
 from typing import Optional
 from urllib.parse import parse_qs, urlparse
@@ -17,7 +16,7 @@ from django.contrib.auth import BACKEND_SESSION_KEY, load_backend, SESSION_KEY
 from django.core.exceptions import ValidationError
 from django.http import HttpRequest
 from django.utils import timezone
-import netaddr
+from twisted.internet import reactor
 from twisted.internet.defer import fail, inlineCallbacks, returnValue, succeed
 from twisted.internet.protocol import Factory, Protocol
 from twisted.internet.task import LoopingCall
@@ -29,8 +28,11 @@ from maasserver.eventloop import services
 from maasserver.utils.orm import transactional
 from maasserver.utils.threads import deferToDatabase
 from maasserver.websockets import handlers
+from maasserver.websockets.base import Handler
+from maasserver.websockets.cache import dehydrate_cache, json_default
 from maasserver.websockets.websockets import STATUSES
 from provisioningserver.logger import LegacyLogger
+from provisioningserver.prometheus.metrics import PROMETHEUS_METRICS
 from provisioningserver.utils.twisted import synchronous
 
 log = LegacyLogger()
@@ -50,6 +52,10 @@ class MSG_TYPE:
     PING = 3
     PING_REPLY = 4
 
+    # Batch of notify messages from server, only sent to clients that
+    # requested it with the `notify_batch` query parameter.
+    NOTIFY_BATCH = 5
+
 
 class RESPONSE_TYPE:
     #
@@ -74,8 +80,14 @@ class WebSocketProtocol(Protocol):
     """The web-socket protocol that supports the web UI.
 
     :ivar factory: Set by the factory that spawned this protocol.
+    :ivar notify_batch: Whether the client asked for notifications to be
+        sent in batches.
+    :ivar notify_patch: Whether the client accepts "patch" notifications,
+        carrying only the fields that changed since the last notification.
     """
 
+    clock = reactor
+
     def __init__(self):
         self.messages = deque()
         self.user = None
@@ -83,6 +95,12 @@ class WebSocketProtocol(Protocol):
         self.request = None
         self.cache = {}
         self.sequence_number = 0
+        self.notify_batch = False
+        self.notify_patch = False
+        self.indexed_pks = {}
+        self.pending_notifications = []
+        self.pending_notifications_index = {}
+        self.notify_flush_call = None
 
     @inlineCallbacks
     def connectionMade(self):
@@ -123,6 +141,9 @@ class WebSocketProtocol(Protocol):
             }
         )
 
+        self.notify_batch = self.getURIFlag("notify_batch")
+        self.notify_patch = self.getURIFlag("notify_patch")
+
         # Be sure to process messages after the metadata is populated,
         # in order to avoid bug #1802390.
         self.processMessages()
@@ -134,6 +155,27 @@ class WebSocketProtocol(Protocol):
         # 'client' will not have been added to the list.
         if self in self.factory.clients:
             self.factory.clients.remove(self)
+        self.factory.unindexClient(self)
+        if self.notify_flush_call is not None:
+            if self.notify_flush_call.active():
+                self.notify_flush_call.cancel()
+            self.notify_flush_call = None
+        self.pending_notifications = []
+        self.pending_notifications_index = {}
+
+    def getURIFlag(self, name):
+        """Return whether the `name` flag is set in the websocket URI.
+
+        Clients opt in to protocol features by adding e.g. `notify_batch=1`
+        to the URI.
+        """
+        uri = self.transport.uri
+        if isinstance(uri, str):
+            uri = uri.encode("ascii")
+        values = parse_qs(urlparse(uri).query).get(name.encode("ascii"))
+        if not values:
+            return False
+        return values[-1].lower() in (b"1", b"true", b"yes", b"on")
 
     def loseConnection(self, status, reason):
         """Close connection with status and reason."""
@@ -303,8 +345,15 @@ class WebSocketProtocol(Protocol):
             partial(self.sendResult, request_id),
             partial(self.sendError, request_id, handler, method),
         )
+        d.addBoth(self._indexHandler, handler_name)
         return d
 
+    def _indexHandler(self, result, handler_name):
+        """Update the factory's index of listening clients once a request
+        was handled, as it might have changed the loaded objects."""
+        self.factory.indexClientHandler(self, handler_name)
+        return result
+
     def _json_encode(self, obj):
         """
         Encodes specific object types into JSON-compatible formats.
@@ -315,20 +364,7 @@ class WebSocketProtocol(Protocol):
 
         If the object type is unsupported, a `TypeError` is raised.
         """
-        if isinstance(obj, bytes):
-            return obj.decode(encoding="utf-8", errors="ignore")
-        elif isinstance(
-            obj,
-            (
-                ipaddress.IPv4Address,
-                ipaddress.IPv6Address,
-                netaddr.IPAddress,
-                netaddr.IPNetwork,
-            ),
-        ):
-            return str(obj)
-        else:
-            raise TypeError("Could not convert object to JSON: %r" % obj)
+        return json_default(obj)
 
     def sendResult(self, request_id, result, msg_type=MSG_TYPE.RESPONSE):
         """Send final result to client."""
@@ -373,7 +409,14 @@ class WebSocketProtocol(Protocol):
         return None
 
     def sendNotify(self, name, action, data):
-        """Send the notify message with data."""
+        """Send the notify message with data.
+
+        If the client asked for batched notifications, the message is queued
+        and sent with the others on the next flush.
+        """
+        if self.notify_batch:
+            self.queueNotify(name, action, data)
+            return
         notify_msg = {
             "type": MSG_TYPE.NOTIFY,
             "name": name,
@@ -384,6 +427,64 @@ class WebSocketProtocol(Protocol):
             json.dumps(notify_msg, default=self._json_encode).encode("ascii")
         )
 
+    def _getNotifyKey(self, name, data):
+        """Return the key identifying the object a notification is about."""
+        if isinstance(data, (int, str)):
+            # Delete notifications only carry the primary key.
+            return name, data
+        if not isinstance(data, dict):
+            return None
+        handler_class = self.factory.getHandler(name)
+        if handler_class is None:
+            return None
+        pk = data.get(handler_class._meta.pk)
+        if pk is None:
+            return None
+        return name, pk
+
+    def queueNotify(self, name, action, data):
+        """Queue the notify message to be sent in the next batch.
+
+        An update for an object that already has a create or update queued
+        replaces the data of the queued notification, so that only the
+        latest state is sent.
+        """
+        key = self._getNotifyKey(name, data)
+        if key is not None:
+            index = self.pending_notifications_index.get(key)
+            if index is not None and action == "update":
+                self.pending_notifications[index]["data"] = data
+                return
+            if action in ("create", "update"):
+                self.pending_notifications_index[key] = len(
+                    self.pending_notifications
+                )
+            else:
+                self.pending_notifications_index.pop(key, None)
+        self.pending_notifications.append(
+            {"name": name, "action": action, "data": data}
+        )
+        if self.notify_flush_call is None:
+            self.notify_flush_call = self.clock.callLater(
+                self.factory.notify_batch_interval, self.flushNotify
+            )
+
+    def flushNotify(self):
+        """Send all the queued notify messages in a single message."""
+        self.notify_flush_call = None
+        notifications = self.pending_notifications
+        if not notifications:
+            return
+        self.pending_notifications = []
+        self.pending_notifications_index = {}
+        notify_msg = {
+            "type": MSG_TYPE.NOTIFY_BATCH,
+            "notifications": notifications,
+        }
+        self.transport.write(
+            json.dumps(notify_msg, default=self._json_encode).encode("ascii")
+        )
+
     def buildHandler(self, handler_class):
         """Return an initialised instance of `handler_class`."""
         handler_name = handler_class._meta.handler_name
@@ -392,14 +493,29 @@ class WebSocketProtocol(Protocol):
 
 
 class WebSocketFactory(Factory):
-    """Factory for WebSocketProtocol."""
+    """Factory for WebSocketProtocol.
+
+    :ivar notify_batch_interval: Time (in seconds) during which the
+        notifications for clients that asked for batching are queued. With
+        zero, they're sent at the next reactor iteration.
+    :ivar dehydrate_cache_size: Memory budget (in bytes) of the cache of
+        dehydrated objects. With zero, the cache is disabled.
+    """
 
     protocol = WebSocketProtocol
 
-    def __init__(self, listener):
+    def __init__(
+        self, listener, notify_batch_interval=0, dehydrate_cache_size=0
+    ):
         self.handlers = {}
         self.clients = []
+        # Index of the clients that used each handler, and of the clients
+        # that loaded each object, by handler name.
+        self.handler_clients = {}
+        self.loaded_pk_clients = {}
         self.listener = listener
+        self.notify_batch_interval = notify_batch_interval
+        self.dehydrate_cache_size = dehydrate_cache_size
         self.session_checker = LoopingCall(self._check_sessions)
         self.session_checker_done = None
         self.cacheHandlers()
@@ -407,6 +523,8 @@ class WebSocketFactory(Factory):
 
     def startFactory(self):
         self._cleanup_stack = ExitStack()
+        dehydrate_cache.configure(self.dehydrate_cache_size)
+        self._cleanup_stack.callback(dehydrate_cache.configure, 0)
         self.registerRPCEvents()
         self._cleanup_stack.callback(self.unregisterRPCEvents)
         self.session_checker_done = self.session_checker.start(5, now=True)
@@ -453,20 +571,213 @@ class WebSocketFactory(Factory):
         for handler in self.handlers.values():
             for channel in handler._meta.listen_channels:
                 self.listener.register(
-                    channel, partial(self.onNotify, handler, channel)
+                    channel,
+                    partial(self.onNotify, handler, channel),
+                    changes=True,
                 )
 
-    @inlineCallbacks
-    def onNotify(self, handler_class, channel, action, obj_id):
-        for client in self.clients:
+    def indexClientHandler(self, client, handler_name):
+        """Index `client` as using the handler `handler_name`, along with the
+        objects it loaded from it."""
+        cache = client.cache.get(handler_name)
+        if cache is None or client not in self.clients:
+            return
+        self.handler_clients.setdefault(handler_name, set()).add(client)
+        pks = set(cache.get("loaded_pks", ()))
+        active_pk = cache.get("active_pk")
+        if active_pk is not None:
+            pks.add(active_pk)
+        previous = client.indexed_pks.get(handler_name, set())
+        index = self.loaded_pk_clients.setdefault(handler_name, {})
+        for pk in previous - pks:
+            self._unindexClientPk(index, client, pk)
+        for pk in pks - previous:
+            index.setdefault(pk, set()).add(client)
+        client.indexed_pks[handler_name] = pks
+
+    def indexClientPk(self, client, handler_name, pk, loaded):
+        """Update the index after `client` was notified about `pk`."""
+        pks = client.indexed_pks.get(handler_name)
+        if pks is None:
+            return
+        index = self.loaded_pk_clients.setdefault(handler_name, {})
+        if loaded:
+            pks.add(pk)
+            index.setdefault(pk, set()).add(client)
+        elif pk in pks and pk != client.cache[handler_name].get("active_pk"):
+            pks.discard(pk)
+            self._unindexClientPk(index, client, pk)
+
+    def _unindexClientPk(self, index, client, pk):
+        clients = index.get(pk)
+        if clients is not None:
+            clients.discard(client)
+            if not clients:
+                del index[pk]
+
+    def unindexClient(self, client):
+        """Remove `client` from the index."""
+        for handler_name, pks in client.indexed_pks.items():
+            self.handler_clients.get(handler_name, set()).discard(client)
+            index = self.loaded_pk_clients.get(handler_name, {})
+            for pk in pks:
+                self._unindexClientPk(index, client, pk)
+        client.indexed_pks = {}
+
+    def getListeningClients(self, handler_class, action, obj_id):
+        """Return the clients that could be sent a message for a
+        notification about `obj_id`.
+
+        Clients that never used the handler are skipped, as well as clients
+        that didn't load the object when only those can be notified about
+        it. Clients whose handler overrides `on_listen` are never skipped.
+        """
+        if handler_class.on_listen is not Handler.on_listen:
+            return self.clients
+        handler_name = handler_class._meta.handler_name
+        if action == "delete" or handler_class._meta.listen_loaded_only:
+            try:
+                pk = handler_class._meta.pk_type(obj_id)
+            except (TypeError, ValueError):
+                return self.clients
+            listening = self.loaded_pk_clients.get(handler_name, {}).get(pk)
+        else:
+            listening = self.handler_clients.get(handler_name)
+        if not listening:
+            return []
+        return [client for client in self.clients if client in listening]
+
+    def groupClientsForNotify(self, handler_class, obj_id, action=None):
+        """Group the connected clients by the result they'd get for a
+        notification about `obj_id`.
+
+        Returns a list of groups, each being a list of `(client, handler)`
+        tuples. Clients whose handler can't share results end up in a group
+        of their own.
+        """
+        if action is None:
+            clients = self.clients
+        else:
+            clients = self.getListeningClients(handler_class, action, obj_id)
+        groups = {}
+        for client in clients:
             handler = client.buildHandler(handler_class)
-            data = yield deferToDatabase(
-                self.processNotify, handler, channel, action, obj_id
+            key = handler.get_listen_group_key(obj_id)
+            if key is None:
+                key = ("client", id(client))
+            groups.setdefault(key, []).append((client, handler))
+        return list(groups.values())
+
+    @inlineCallbacks
+    def onNotify(self, handler_class, channel, action, obj_id, changes=None):
+        handler_name = handler_class._meta.handler_name
+        self._invalidateDehydrateCache(handler_class, obj_id)
+        groups = self.groupClientsForNotify(handler_class, obj_id, action)
+        labels = {"handler": handler_name}
+        skipped = len(self.clients) - sum(len(group) for group in groups)
+        if skipped:
+            PROMETHEUS_METRICS.update(
+                "maas_websocket_notify_skipped_clients",
+                "inc",
+                value=skipped,
+                labels=labels,
+            )
+        if not groups:
+            return
+        results, groups_to_fetch = self.processNotifyChanges(
+            groups, channel, action, obj_id, changes
+        )
+        if groups_to_fetch:
+            fetched = yield deferToDatabase(
+                self.processNotifyGroups,
+                groups_to_fetch,
+                channel,
+                action,
+                obj_id,
             )
+            results.extend(fetched)
+        PROMETHEUS_METRICS.update(
+            "maas_websocket_notify_groups",
+            "inc",
+            value=len(groups),
+            labels=labels,
+        )
+        PROMETHEUS_METRICS.update(
+            "maas_websocket_notify_clients",
+            "inc",
+            value=len(results),
+            labels=labels,
+        )
+        self._indexNotifyResults(handler_class, obj_id, results)
+        for client, data in results:
+            if data is not None and client.notify_patch:
+                handler = client.buildHandler(handler_class)
+                data = handler.make_listen_patch(obj_id, data)
             if data is not None:
                 (name, client_action, data) = data
                 client.sendNotify(name, client_action, data)
 
+    def _invalidateDehydrateCache(self, handler_class, obj_id):
+        """Drop the cached data for the object a notification is about."""
+        if not handler_class._meta.dehydrate_cache:
+            return
+        try:
+            pk = handler_class._meta.pk_type(obj_id)
+        except (TypeError, ValueError):
+            return
+        dehydrate_cache.invalidate(handler_class._meta.handler_name, pk)
+
+    def _indexNotifyResults(self, handler_class, obj_id, results):
+        """Update the index with the objects the clients were notified
+        about."""
+        handler_name = handler_class._meta.handler_name
+        try:
+            pk = handler_class._meta.pk_type(obj_id)
+        except (TypeError, ValueError):
+            return
+        for client, data in results:
+            if data is not None:
+                loaded = data[1] != "delete"
+                self.indexClientPk(client, handler_name, pk, loaded)
+
+    def processNotifyChanges(self, groups, channel, action, obj_id, changes):
+        """Process the notification from the `changes` it carries.
+
+        Returns the results for the groups of clients that didn't need the
+        object to be fetched from the database, and the groups that do.
+        """
+        results, groups_to_fetch = [], []
+        if changes is None:
+            return results, groups
+        for group in groups:
+            (leader, handler), *followers = group
+            data = handler.on_listen_changes(channel, action, obj_id, changes)
+            if data is None:
+                groups_to_fetch.append(group)
+                continue
+            results.append((leader, data))
+            for client, handler in followers:
+                handler.apply_listen_result(obj_id, data)
+                results.append((client, data))
+        return results, groups_to_fetch
+
+    @transactional
+    def processNotifyGroups(self, groups, channel, action, obj_id):
+        """Process the notification once for each group of clients.
+
+        The first handler of each group fetches and dehydrates the object,
+        the result is then shared with the other clients of the group.
+        """
+        results = []
+        for group in groups:
+            (leader, handler), *followers = group
+            data = handler.on_listen(channel, action, obj_id)
+            results.append((leader, data))
+            for client, handler in followers:
+                handler.apply_listen_result(obj_id, data)
+                results.append((client, data))
+        return results
+
     @transactional
     def processNotify(self, handler, channel, action, obj_id):
         return handler.on_listen(channel, action, obj_id)
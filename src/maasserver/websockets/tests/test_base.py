@@ -31,7 +31,9 @@ from maasserver.websockets.base import (
     HandlerNoSuchMethodError,
     HandlerPermissionError,
     HandlerValidationError,
+    USER_REFRESH_TTL,
 )
+from maasserver.websockets.cache import DehydrateCache
 from maastesting import get_testing_timeout
 from maastesting.testcase import MAASTestCase
 from provisioningserver.prometheus.metrics import PROMETHEUS_METRICS
@@ -172,6 +174,65 @@ class TestHandler(MAASServerTestCase, FakeNodesHandlerMixin):
             handler.full_dehydrate(node),
         )
 
+    def test_full_dehydrate_uses_dehydrate_cache(self):
+        cache = self.patch(base, "dehydrate_cache", DehydrateCache(1024))
+        handler = self.make_nodes_handler(
+            fields=["hostname"], dehydrate_cache=True
+        )
+        node = factory.make_Node()
+        data = handler.full_dehydrate(node)
+        key = handler.get_dehydrate_cache_key(node)
+        self.assertEqual(data, cache.get(key))
+        self.patch(handler, "_full_dehydrate")
+        self.assertEqual(data, handler.full_dehydrate(node))
+        handler._full_dehydrate.assert_not_called()
+
+    def test_full_dehydrate_refreshes_dehydrate_cache_exclude(self):
+        self.patch(base, "dehydrate_cache", DehydrateCache(1024))
+        handler = self.make_nodes_handler(
+            fields=["hostname", "zone"],
+            dehydrate_cache=True,
+            dehydrate_cache_exclude=["zone"],
+        )
+        handler.dehydrate_zone = lambda zone: zone.name
+        node = factory.make_Node()
+        handler.full_dehydrate(node)
+        node.zone.name = "renamed"
+        self.patch(handler, "_full_dehydrate")
+        self.assertEqual(
+            {"hostname": node.hostname, "zone": "renamed"},
+            handler.full_dehydrate(node),
+        )
+        handler._full_dehydrate.assert_not_called()
+
+    def test_full_dehydrate_without_dehydrate_cache(self):
+        cache = self.patch(base, "dehydrate_cache", DehydrateCache(1024))
+        handler = self.make_nodes_handler(fields=["hostname"])
+        node = factory.make_Node()
+        handler.full_dehydrate(node)
+        self.assertIsNone(handler.get_dehydrate_cache_key(node))
+        self.assertEqual(0, cache.size)
+
+    def test_get_dehydrate_cache_key(self):
+        handler = self.make_nodes_handler(dehydrate_cache=True)
+        node = factory.make_Node()
+        self.assertEqual(
+            (
+                handler._meta.handler_name,
+                node.system_id,
+                node.updated,
+                True,
+                (handler.user.id, handler.user.is_superuser),
+            ),
+            handler.get_dehydrate_cache_key(node, for_list=True),
+        )
+
+    def test_get_dehydrate_cache_key_none_with_rbac(self):
+        self.patch(base.rbac, "is_enabled").return_value = True
+        handler = self.make_nodes_handler(dehydrate_cache=True)
+        node = factory.make_Node()
+        self.assertIsNone(handler.get_dehydrate_cache_key(node))
+
     def test_full_dehydrate_excludes_fields(self):
         handler = self.make_nodes_handler(
             fields=["hostname", "power_type"], exclude=["power_type"]
@@ -1004,6 +1065,271 @@ class TestHandler(MAASServerTestCase, FakeNodesHandlerMixin):
         )
         mock_dehydrate.assert_called_once_with(node, for_list=False)
 
+    def test_get_listen_group_key_matches_for_same_user_and_view(self):
+        handler = self.make_nodes_handler()
+        other = self.make_nodes_handler()
+        other.user = handler.user
+        pk = factory.make_name("system_id")
+        handler.cache["loaded_pks"].add(pk)
+        other.cache["loaded_pks"].add(pk)
+        self.assertEqual(
+            handler.get_listen_group_key(pk), other.get_listen_group_key(pk)
+        )
+
+    def test_get_listen_group_key_differs_for_active_pk(self):
+        handler = self.make_nodes_handler()
+        other = self.make_nodes_handler()
+        other.user = handler.user
+        pk = factory.make_name("system_id")
+        handler.cache["loaded_pks"].add(pk)
+        other.cache["loaded_pks"].add(pk)
+        other.cache["active_pk"] = pk
+        self.assertNotEqual(
+            handler.get_listen_group_key(pk), other.get_listen_group_key(pk)
+        )
+
+    def test_get_listen_group_key_differs_for_users(self):
+        handler = self.make_nodes_handler()
+        other = self.make_nodes_handler()
+        pk = factory.make_name("system_id")
+        self.assertNotEqual(
+            handler.get_listen_group_key(pk), other.get_listen_group_key(pk)
+        )
+
+    def test_get_listen_group_key_None_if_on_listen_overridden(self):
+        handler = self.make_nodes_handler()
+        self.assertIsNotNone(handler.get_listen_group_key("pk"))
+        # make_handler builds a new class for every handler.
+        type(handler).on_listen = lambda *args: None
+        self.assertIsNone(handler.get_listen_group_key("pk"))
+
+    def test_apply_listen_result_mirrors_on_listen(self):
+        handler = self.make_nodes_handler(fields=["hostname"])
+        other = self.make_nodes_handler(fields=["hostname"])
+        node = factory.make_Node(owner=handler.user)
+        result = handler.on_listen(sentinel.channel, "update", node.system_id)
+        other.apply_listen_result(node.system_id, result)
+        self.assertEqual(
+            handler.cache["loaded_pks"], other.cache["loaded_pks"]
+        )
+        result = handler.on_listen(sentinel.channel, "delete", node.system_id)
+        other.apply_listen_result(node.system_id, result)
+        self.assertEqual(set(), other.cache["loaded_pks"])
+
+    def test_on_listen_changes_patches_last_data(self):
+        handler = self.make_nodes_handler(
+            list_fields=["hostname", "status"], listen_fields=["status"]
+        )
+        node = factory.make_Node(owner=handler.user)
+        handler.on_listen(sentinel.channel, "update", node.system_id)
+        changes = {"changed": ["status"], "fields": {"status": 42}}
+        self.assertEqual(
+            (
+                handler._meta.handler_name,
+                "update",
+                {"hostname": node.hostname, "status": 42},
+            ),
+            handler.on_listen_changes(
+                sentinel.channel, "update", node.system_id, changes
+            ),
+        )
+
+    def test_on_listen_changes_None_without_listen_fields(self):
+        handler = self.make_nodes_handler(list_fields=["hostname", "status"])
+        node = factory.make_Node(owner=handler.user)
+        handler.on_listen(sentinel.channel, "update", node.system_id)
+        changes = {"changed": ["status"], "fields": {"status": 42}}
+        self.assertIsNone(
+            handler.on_listen_changes(
+                sentinel.channel, "update", node.system_id, changes
+            )
+        )
+
+    def test_on_listen_changes_None_for_other_changed_fields(self):
+        handler = self.make_nodes_handler(
+            list_fields=["hostname", "status"], listen_fields=["status"]
+        )
+        node = factory.make_Node(owner=handler.user)
+        handler.on_listen(sentinel.channel, "update", node.system_id)
+        for changed in (None, ["status", "hostname"]):
+            changes = {"changed": changed, "fields": {"status": 42}}
+            self.assertIsNone(
+                handler.on_listen_changes(
+                    sentinel.channel, "update", node.system_id, changes
+                )
+            )
+
+    def test_on_listen_changes_None_without_data_for_pk(self):
+        handler = self.make_nodes_handler(
+            list_fields=["hostname", "status"], listen_fields=["status"]
+        )
+        node = factory.make_Node(owner=handler.user)
+        handler.cache["loaded_pks"].add(node.system_id)
+        changes = {"changed": ["status"], "fields": {"status": 42}}
+        self.assertIsNone(
+            handler.on_listen_changes(
+                sentinel.channel, "update", node.system_id, changes
+            )
+        )
+
+    def test_on_listen_changes_None_for_active_pk(self):
+        handler = self.make_nodes_handler(
+            list_fields=["hostname", "status"], listen_fields=["status"]
+        )
+        node = factory.make_Node(owner=handler.user)
+        handler.on_listen(sentinel.channel, "update", node.system_id)
+        handler.cache["active_pk"] = node.system_id
+        changes = {"changed": ["status"], "fields": {"status": 42}}
+        self.assertIsNone(
+            handler.on_listen_changes(
+                sentinel.channel, "update", node.system_id, changes
+            )
+        )
+
+    def test_on_listen_keeps_limited_listen_snapshots(self):
+        handler = self.make_nodes_handler(
+            list_fields=["hostname"],
+            listen_fields=["status"],
+            listen_snapshots_size=2,
+        )
+        nodes = [factory.make_Node(owner=handler.user) for _ in range(3)]
+        for node in nodes:
+            handler.on_listen(sentinel.channel, "update", node.system_id)
+        self.assertEqual(
+            [node.system_id for node in nodes[1:]],
+            list(handler.cache["listen_snapshots"]),
+        )
+        handler.on_listen(sentinel.channel, "delete", nodes[1].system_id)
+        self.assertEqual(
+            [nodes[2].system_id], list(handler.cache["listen_snapshots"])
+        )
+
+    def test_make_listen_patch_returns_changed_fields(self):
+        handler = self.make_nodes_handler(listen_patch=True)
+        name = handler._meta.handler_name
+        handler.make_listen_patch(
+            "abc",
+            (name, "create", {"system_id": "abc", "status": 1, "old": 2}),
+        )
+        self.assertEqual(
+            (
+                name,
+                "patch",
+                {
+                    "system_id": "abc",
+                    "changed": {"status": 2, "new": 3},
+                    "removed": ["old"],
+                },
+            ),
+            handler.make_listen_patch(
+                "abc",
+                (name, "update", {"system_id": "abc", "status": 2, "new": 3}),
+            ),
+        )
+
+    def test_make_listen_patch_None_when_nothing_changed(self):
+        handler = self.make_nodes_handler(listen_patch=True)
+        result = (handler._meta.handler_name, "update", {"system_id": "abc"})
+        handler.make_listen_patch("abc", result)
+        self.assertIsNone(handler.make_listen_patch("abc", result))
+
+    def test_make_listen_patch_sends_full_data_without_snapshot(self):
+        handler = self.make_nodes_handler(
+            listen_patch=True, listen_patch_snapshots_size=1
+        )
+        name = handler._meta.handler_name
+        first = (name, "update", {"system_id": "abc", "status": 1})
+        second = (name, "update", {"system_id": "def", "status": 1})
+        handler.make_listen_patch("abc", first)
+        handler.make_listen_patch("def", second)
+        self.assertEqual(["def"], list(handler.cache["patch_snapshots"]))
+        # The snapshot for "abc" was evicted, so the full data is sent.
+        self.assertEqual(first, handler.make_listen_patch("abc", first))
+
+    def test_make_listen_patch_forgets_deleted_objects(self):
+        handler = self.make_nodes_handler(listen_patch=True)
+        name = handler._meta.handler_name
+        result = (name, "update", {"system_id": "abc"})
+        handler.make_listen_patch("abc", result)
+        delete = (name, "delete", "abc")
+        self.assertEqual(delete, handler.make_listen_patch("abc", delete))
+        self.assertEqual({}, handler.cache["patch_snapshots"])
+
+    def test_make_listen_patch_returns_result_without_listen_patch(self):
+        handler = self.make_nodes_handler()
+        result = (handler._meta.handler_name, "update", {"system_id": "abc"})
+        handler.make_listen_patch("abc", result)
+        self.assertEqual(result, handler.make_listen_patch("abc", result))
+        self.assertNotIn("patch_snapshots", handler.cache)
+
+    def test_get_forgets_snapshots(self):
+        handler = self.make_nodes_handler(
+            fields=["hostname", "status"],
+            list_fields=["hostname", "status"],
+            listen_fields=["status"],
+            listen_patch=True,
+        )
+        node = factory.make_Node(owner=handler.user)
+        result = handler.on_listen(sentinel.channel, "update", node.system_id)
+        handler.make_listen_patch(node.system_id, result)
+        handler.get({"system_id": node.system_id})
+        self.assertEqual({}, handler.cache["listen_snapshots"])
+        self.assertEqual({}, handler.cache["patch_snapshots"])
+
+    def test_list_forgets_snapshots(self):
+        handler = self.make_nodes_handler(
+            fields=["hostname", "status"],
+            list_fields=["hostname", "status"],
+            listen_fields=["status"],
+            listen_patch=True,
+        )
+        node = factory.make_Node(owner=handler.user)
+        result = handler.on_listen(sentinel.channel, "update", node.system_id)
+        handler.make_listen_patch(node.system_id, result)
+        handler.list({})
+        self.assertEqual({}, handler.cache["listen_snapshots"])
+        self.assertEqual({}, handler.cache["patch_snapshots"])
+
+    def test_unsubscribe_forgets_snapshots(self):
+        handler = self.make_nodes_handler(
+            list_fields=["hostname", "status"],
+            listen_fields=["status"],
+            listen_patch=True,
+        )
+        nodes = [factory.make_Node(owner=handler.user) for _ in range(2)]
+        for node in nodes:
+            result = handler.on_listen(
+                sentinel.channel, "update", node.system_id
+            )
+            handler.make_listen_patch(node.system_id, result)
+        handler.unsubscribe({"ids": [nodes[0].system_id]})
+        self.assertEqual(
+            [nodes[1].system_id], list(handler.cache["listen_snapshots"])
+        )
+        self.assertEqual(
+            [nodes[1].system_id], list(handler.cache["patch_snapshots"])
+        )
+
+    def test_refresh_user_reloads_user_once_per_ttl(self):
+        handler = self.make_nodes_handler()
+        refresh_from_db = self.patch(handler.user, "refresh_from_db")
+        monotonic = self.patch(base.time, "monotonic")
+        monotonic.return_value = 100
+        handler.refresh_user()
+        monotonic.return_value = 100 + USER_REFRESH_TTL - 1
+        handler.refresh_user()
+        refresh_from_db.assert_called_once_with()
+        monotonic.return_value = 100 + USER_REFRESH_TTL
+        handler.refresh_user()
+        self.assertEqual(2, refresh_from_db.call_count)
+
+    def test_on_listen_refreshes_user(self):
+        handler = self.make_nodes_handler(fields=["hostname"])
+        refresh_user = self.patch(handler, "refresh_user")
+        node = factory.make_Node(owner=handler.user)
+        handler.on_listen(sentinel.channel, "update", node.system_id)
+        refresh_user.assert_called_once_with()
+
     def test_listen_calls_get_object_with_pk_on_other_actions(self):
         handler = self.make_nodes_handler()
         mock_get_object = self.patch(handler, "get_object")
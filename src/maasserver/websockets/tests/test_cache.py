@@ -0,0 +1,112 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+import ipaddress
+
+import netaddr
+
+from maasserver.websockets.cache import DehydrateCache, json_default
+from maastesting.testcase import MAASTestCase
+
+
+class TestJSONDefault(MAASTestCase):
+    def test_encodes_bytes_and_addresses(self):
+        self.assertEqual("data", json_default(b"data"))
+        self.assertEqual(
+            "10.0.0.1", json_default(ipaddress.IPv4Address("10.0.0.1"))
+        )
+        self.assertEqual("::1", json_default(netaddr.IPAddress("::1")))
+        self.assertEqual(
+            "10.0.0.0/24", json_default(netaddr.IPNetwork("10.0.0.0/24"))
+        )
+
+    def test_raises_for_unknown_types(self):
+        self.assertRaises(TypeError, json_default, object())
+
+
+class TestDehydrateCache(MAASTestCase):
+    def make_key(self, pk="abc", updated=1, for_list=True):
+        return ("machine", pk, updated, for_list, (1, False))
+
+    def test_disabled_without_budget(self):
+        cache = DehydrateCache()
+        cache.set(self.make_key(), {"hostname": "foo"})
+        self.assertIsNone(cache.get(self.make_key()))
+        self.assertEqual(0, cache.size)
+
+    def test_get_returns_copy_of_data(self):
+        cache = DehydrateCache(1024)
+        key = self.make_key()
+        cache.set(key, {"hostname": "foo", "ip": b"10.0.0.1"})
+        data = cache.get(key)
+        self.assertEqual({"hostname": "foo", "ip": b"10.0.0.1"}, data)
+        data["hostname"] = "bar"
+        self.assertEqual("foo", cache.get(key)["hostname"])
+
+    def test_get_preserves_types(self):
+        cache = DehydrateCache(1024)
+        key = self.make_key()
+        data = {"numa": {0: [1, 2]}, "range": (1, 2)}
+        cache.set(key, data)
+        data["numa"][0].append(3)
+        self.assertEqual(
+            {"numa": {0: [1, 2]}, "range": (1, 2)}, cache.get(key)
+        )
+
+    def test_get_misses_other_updated(self):
+        cache = DehydrateCache(1024)
+        cache.set(self.make_key(updated=1), {"hostname": "foo"})
+        self.assertIsNone(cache.get(self.make_key(updated=2)))
+
+    def test_set_skips_data_not_encodable(self):
+        cache = DehydrateCache(1024)
+        cache.set(self.make_key(), {"obj": object()})
+        self.assertIsNone(cache.get(self.make_key()))
+        self.assertEqual(0, cache.size)
+
+    def test_set_evicts_least_recently_used(self):
+        cache = DehydrateCache(40)
+        for pk in ("a", "b"):
+            cache.set(self.make_key(pk), {"hostname": "host"})
+        # Using "a" makes "b" the least recently used.
+        cache.get(self.make_key("a"))
+        cache.set(self.make_key("c"), {"hostname": "host"})
+        self.assertIsNotNone(cache.get(self.make_key("a")))
+        self.assertIsNone(cache.get(self.make_key("b")))
+        self.assertIsNotNone(cache.get(self.make_key("c")))
+        self.assertLessEqual(cache.size, 40)
+
+    def test_set_replaces_entry(self):
+        cache = DehydrateCache(1024)
+        cache.set(self.make_key(), {"hostname": "foo"})
+        cache.set(self.make_key(), {"hostname": "foobar"})
+        self.assertEqual(len(b'{"hostname": "foobar"}'), cache.size)
+
+    def test_invalidate_drops_all_entries_for_object(self):
+        cache = DehydrateCache(1024)
+        cache.set(self.make_key(for_list=True), {"hostname": "foo"})
+        cache.set(self.make_key(for_list=False), {"hostname": "foo"})
+        cache.set(self.make_key("other"), {"hostname": "bar"})
+        cache.invalidate("machine", "abc")
+        self.assertIsNone(cache.get(self.make_key(for_list=True)))
+        self.assertIsNone(cache.get(self.make_key(for_list=False)))
+        self.assertIsNotNone(cache.get(self.make_key("other")))
+        self.assertEqual(len(b'{"hostname": "bar"}'), cache.size)
+
+    def test_configure_without_budget_clears(self):
+        cache = DehydrateCache(1024)
+        cache.set(self.make_key(), {"hostname": "foo"})
+        cache.configure(0)
+        self.assertEqual(0, cache.size)
+        cache.configure(1024)
+        self.assertIsNone(cache.get(self.make_key()))
+
+    def test_set_skips_data_dehydrated_before_invalidate(self):
+        cache = DehydrateCache(1024)
+        key = self.make_key()
+        generation = cache.get_generation(key)
+        cache.invalidate("machine", "abc")
+        cache.set(key, {"hostname": "foo"}, generation)
+        self.assertIsNone(cache.get(key))
+        cache.set(key, {"hostname": "bar"}, cache.get_generation(key))
+        self.assertEqual({"hostname": "bar"}, cache.get(key))
@@ -13,6 +13,7 @@ from django.http import HttpRequest
 from django.utils import timezone
 from twisted.internet import defer
 from twisted.internet.defer import fail, inlineCallbacks, succeed
+from twisted.internet.task import Clock
 from twisted.web.server import NOT_DONE_YET
 
 from apiclient.utils import ascii_url
@@ -25,7 +26,12 @@ from maasserver.utils.orm import transactional
 from maasserver.utils.threads import deferToDatabase
 from maasserver.websockets import protocol as protocol_module
 from maasserver.websockets.base import Handler
-from maasserver.websockets.handlers import DeviceHandler, MachineHandler
+from maasserver.websockets.handlers import (
+    ConfigHandler,
+    DeviceHandler,
+    MachineHandler,
+    SpaceHandler,
+)
 from maasserver.websockets.protocol import (
     MSG_TYPE,
     RESPONSE_TYPE,
@@ -685,6 +691,144 @@ class TestWebSocketProtocol(MAASTransactionServerTestCase):
         protocol.sendNotify(name, action, data)
         self.assertEqual(message, self.get_written_transport_message(protocol))
 
+    def test_connectionMade_enables_notify_batch(self):
+        protocol, _ = self.make_protocol(
+            transport_uri=b"/MAAS/ws?csrftoken=token&notify_batch=1"
+        )
+        protocol.authenticate.return_value = defer.succeed(True)
+        protocol.connectionMade()
+        self.addCleanup(protocol.connectionLost, "")
+        self.assertTrue(protocol.notify_batch)
+
+    def test_connectionMade_enables_notify_patch(self):
+        protocol, _ = self.make_protocol(
+            transport_uri=b"/MAAS/ws?csrftoken=token&notify_patch=true"
+        )
+        protocol.authenticate.return_value = defer.succeed(True)
+        protocol.connectionMade()
+        self.addCleanup(protocol.connectionLost, "")
+        self.assertTrue(protocol.notify_patch)
+        self.assertFalse(protocol.notify_batch)
+
+    def test_connectionMade_doesnt_enable_notify_batch_by_default(self):
+        protocol, _ = self.make_protocol(
+            transport_uri=b"/MAAS/ws?csrftoken=token"
+        )
+        protocol.authenticate.return_value = defer.succeed(True)
+        protocol.connectionMade()
+        self.addCleanup(protocol.connectionLost, "")
+        self.assertFalse(protocol.notify_batch)
+        self.assertFalse(protocol.notify_patch)
+
+    def make_batching_protocol(self):
+        protocol, factory = self.make_protocol()
+        protocol.notify_batch = True
+        protocol.clock = Clock()
+        return protocol, factory
+
+    def test_sendNotify_batches_notifications(self):
+        protocol, _ = self.make_batching_protocol()
+        protocol.sendNotify("machine", "create", {"system_id": "abc"})
+        protocol.sendNotify("device", "delete", "def")
+        protocol.transport.write.assert_not_called()
+        protocol.clock.advance(0)
+        self.assertEqual(
+            {
+                "type": MSG_TYPE.NOTIFY_BATCH,
+                "notifications": [
+                    {
+                        "name": "machine",
+                        "action": "create",
+                        "data": {"system_id": "abc"},
+                    },
+                    {"name": "device", "action": "delete", "data": "def"},
+                ],
+            },
+            self.get_written_transport_message(protocol),
+        )
+        self.assertEqual([], protocol.pending_notifications)
+        self.assertIsNone(protocol.notify_flush_call)
+
+    def test_sendNotify_batch_collapses_updates(self):
+        protocol, _ = self.make_batching_protocol()
+        protocol.sendNotify(
+            "machine", "update", {"system_id": "abc", "status": 1}
+        )
+        protocol.sendNotify(
+            "machine", "update", {"system_id": "def", "status": 1}
+        )
+        protocol.sendNotify(
+            "machine", "update", {"system_id": "abc", "status": 2}
+        )
+        protocol.clock.advance(0)
+        self.assertEqual(
+            [
+                {
+                    "name": "machine",
+                    "action": "update",
+                    "data": {"system_id": "abc", "status": 2},
+                },
+                {
+                    "name": "machine",
+                    "action": "update",
+                    "data": {"system_id": "def", "status": 1},
+                },
+            ],
+            self.get_written_transport_message(protocol)["notifications"],
+        )
+
+    def test_sendNotify_batch_keeps_create_with_latest_data(self):
+        protocol, _ = self.make_batching_protocol()
+        protocol.sendNotify(
+            "machine", "create", {"system_id": "abc", "status": 1}
+        )
+        protocol.sendNotify(
+            "machine", "update", {"system_id": "abc", "status": 2}
+        )
+        protocol.clock.advance(0)
+        self.assertEqual(
+            [
+                {
+                    "name": "machine",
+                    "action": "create",
+                    "data": {"system_id": "abc", "status": 2},
+                },
+            ],
+            self.get_written_transport_message(protocol)["notifications"],
+        )
+
+    def test_sendNotify_batch_doesnt_collapse_across_delete(self):
+        protocol, _ = self.make_batching_protocol()
+        protocol.sendNotify("machine", "update", {"system_id": "abc"})
+        protocol.sendNotify("machine", "delete", "abc")
+        protocol.sendNotify("machine", "update", {"system_id": "abc"})
+        protocol.clock.advance(0)
+        self.assertEqual(
+            ["update", "delete", "update"],
+            [
+                notification["action"]
+                for notification in self.get_written_transport_message(
+                    protocol
+                )["notifications"]
+            ],
+        )
+
+    def test_sendNotify_batch_waits_for_interval(self):
+        protocol, factory = self.make_batching_protocol()
+        factory.notify_batch_interval = 0.5
+        protocol.sendNotify("machine", "update", {"system_id": "abc"})
+        protocol.clock.advance(0.4)
+        protocol.transport.write.assert_not_called()
+        protocol.clock.advance(0.1)
+        protocol.transport.write.assert_called_once()
+
+    def test_connectionLost_cancels_notify_flush(self):
+        protocol, _ = self.make_batching_protocol()
+        protocol.sendNotify("machine", "update", {"system_id": "abc"})
+        protocol.connectionLost("")
+        self.assertEqual([], protocol.clock.getDelayedCalls())
+        self.assertEqual([], protocol.pending_notifications)
+
 
 class MakeProtocolFactoryMixin:
     def make_factory(self, rpc_service=None):
@@ -702,6 +846,7 @@ class MakeProtocolFactoryMixin:
         protocol = factory.buildProtocol(None)
         protocol.transport = MagicMock()
         protocol.transport.cookies = b""
+        protocol.transport.uri = b"/MAAS/ws"
         if user is None:
             user = maas_factory.make_User()
 
@@ -838,6 +983,104 @@ class TestWebSocketFactory(MAASTestCase, MakeProtocolFactoryMixin):
         factory = self.make_factory()
         self.assertEqual(ALL_NOTIFIERS, factory.listener.listeners.keys())
 
+    def make_client(self, factory, handler_name=None, loaded_pks=()):
+        client = factory.buildProtocol(None)
+        factory.clients.append(client)
+        if handler_name is not None:
+            client.cache[handler_name] = {"loaded_pks": set(loaded_pks)}
+            factory.indexClientHandler(client, handler_name)
+        return client
+
+    def test_indexClientHandler_indexes_loaded_and_active_pks(self):
+        factory = self.make_factory()
+        client = self.make_client(factory, "machine", ["a", "b"])
+        client.cache["machine"]["active_pk"] = "c"
+        factory.indexClientHandler(client, "machine")
+        self.assertEqual({client}, factory.handler_clients["machine"])
+        self.assertEqual(
+            {"a": {client}, "b": {client}, "c": {client}},
+            factory.loaded_pk_clients["machine"],
+        )
+        client.cache["machine"] = {"loaded_pks": {"b"}}
+        factory.indexClientHandler(client, "machine")
+        self.assertEqual({"b": {client}}, factory.loaded_pk_clients["machine"])
+
+    def test_indexClientHandler_ignores_disconnected_clients(self):
+        factory = self.make_factory()
+        client = factory.buildProtocol(None)
+        client.cache["machine"] = {"loaded_pks": {"a"}}
+        factory.indexClientHandler(client, "machine")
+        self.assertEqual({}, factory.handler_clients)
+        self.assertEqual({}, client.indexed_pks)
+
+    def test_indexClientPk_updates_index(self):
+        factory = self.make_factory()
+        client = self.make_client(factory, "machine", ["a"])
+        factory.indexClientPk(client, "machine", "b", True)
+        self.assertEqual(
+            {"a": {client}, "b": {client}},
+            factory.loaded_pk_clients["machine"],
+        )
+        factory.indexClientPk(client, "machine", "a", False)
+        self.assertEqual({"b": {client}}, factory.loaded_pk_clients["machine"])
+
+    def test_unindexClient_removes_client(self):
+        factory = self.make_factory()
+        client = self.make_client(factory, "machine", ["a"])
+        other = self.make_client(factory, "machine", ["a"])
+        factory.unindexClient(client)
+        self.assertEqual({other}, factory.handler_clients["machine"])
+        self.assertEqual({"a": {other}}, factory.loaded_pk_clients["machine"])
+        self.assertEqual({}, client.indexed_pks)
+
+    def test_getListeningClients_only_loaded_pk_for_listen_loaded_only(self):
+        factory = self.make_factory()
+        client = self.make_client(factory, "machine", ["a"])
+        self.make_client(factory, "machine", ["b"])
+        self.make_client(factory)
+        for action in ("create", "update", "delete"):
+            self.assertEqual(
+                [client],
+                factory.getListeningClients(MachineHandler, action, "a"),
+            )
+
+    def test_getListeningClients_handler_clients_for_updates(self):
+        factory = self.make_factory()
+        client = self.make_client(factory, "space", [1])
+        other = self.make_client(factory, "space", [2])
+        self.make_client(factory, "machine", ["a"])
+        self.assertEqual(
+            [client, other],
+            factory.getListeningClients(SpaceHandler, "update", "1"),
+        )
+        self.assertEqual(
+            [client],
+            factory.getListeningClients(SpaceHandler, "delete", "1"),
+        )
+
+    def test_getListeningClients_all_clients_when_on_listen_overridden(self):
+        factory = self.make_factory()
+        clients = [self.make_client(factory), self.make_client(factory)]
+        self.assertEqual(
+            clients,
+            factory.getListeningClients(ConfigHandler, "update", "name"),
+        )
+
+    def test_startFactory_configures_dehydrate_cache(self):
+        factory = self.make_factory()
+        factory.dehydrate_cache_size = 1024
+        factory.startFactory()
+        self.assertEqual(1024, protocol_module.dehydrate_cache.budget)
+        factory.stopFactory()
+        self.assertEqual(0, protocol_module.dehydrate_cache.budget)
+
+    def test_connectionLost_unindexes_client(self):
+        factory = self.make_factory()
+        client = self.make_client(factory, "machine", ["a"])
+        client.connectionLost("")
+        self.assertEqual({}, factory.loaded_pk_clients["machine"])
+        self.assertEqual(set(), factory.handler_clients["machine"])
+
 
 class TestWebSocketFactoryTransactional(
     MAASTransactionServerTestCase, MakeProtocolFactoryMixin
@@ -912,6 +1155,151 @@ class TestWebSocketFactoryTransactional(
         )
         mock_sendNotify.assert_called_with(name, action, data)
 
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_onNotify_sends_patch_to_clients_accepting_them(self):
+        user = yield deferToDatabase(self.make_user)
+        protocol, factory = self.make_protocol_with_factory(user=user)
+        protocol.notify_patch = True
+        name = maas_factory.make_name("name")
+        data = {"id": 1}
+        patch = {"id": 1, "changed": {}, "removed": []}
+        mock_class = MagicMock()
+        mock_class.return_value.on_listen.return_value = (name, "update", data)
+        mock_class.return_value.make_listen_patch.return_value = (
+            name,
+            "patch",
+            patch,
+        )
+        mock_sendNotify = self.patch(protocol, "sendNotify")
+        yield factory.onNotify(mock_class, sentinel.channel, "update", 1)
+        mock_class.return_value.make_listen_patch.assert_called_once_with(
+            1, (name, "update", data)
+        )
+        mock_sendNotify.assert_called_once_with(name, "patch", patch)
+
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_onNotify_skips_empty_patch(self):
+        user = yield deferToDatabase(self.make_user)
+        protocol, factory = self.make_protocol_with_factory(user=user)
+        protocol.notify_patch = True
+        name = maas_factory.make_name("name")
+        mock_class = MagicMock()
+        mock_class.return_value.on_listen.return_value = (name, "update", {})
+        mock_class.return_value.make_listen_patch.return_value = None
+        mock_sendNotify = self.patch(protocol, "sendNotify")
+        yield factory.onNotify(mock_class, sentinel.channel, "update", 1)
+        mock_sendNotify.assert_not_called()
+
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_onNotify_invalidates_dehydrate_cache(self):
+        user = yield deferToDatabase(self.make_user)
+        _, factory = self.make_protocol_with_factory(user=user)
+        invalidate = self.patch(protocol_module.dehydrate_cache, "invalidate")
+        yield factory.onNotify(
+            MachineHandler, sentinel.channel, "update", "abc"
+        )
+        invalidate.assert_called_once_with("machine", "abc")
+
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_onNotify_processes_once_per_group(self):
+        user = yield deferToDatabase(self.make_user)
+        protocol, factory = self.make_protocol_with_factory(user=user)
+        other_protocol = factory.buildProtocol(None)
+        other_protocol.transport = MagicMock()
+        other_protocol.user = user
+        other_protocol.request = protocol.request
+        factory.clients.append(other_protocol)
+        self.addCleanup(lambda: other_protocol.connectionLost(""))
+        name = maas_factory.make_name("name")
+        action = maas_factory.make_name("action")
+        data = maas_factory.make_name("data")
+        mock_class = MagicMock()
+        handler = mock_class.return_value
+        handler.get_listen_group_key.return_value = (user.id, False, False)
+        handler.on_listen.return_value = (name, action, data)
+        mock_sendNotify = self.patch(protocol, "sendNotify")
+        mock_other_sendNotify = self.patch(other_protocol, "sendNotify")
+        yield factory.onNotify(
+            mock_class, sentinel.channel, action, sentinel.obj_id
+        )
+        handler.on_listen.assert_called_once_with(
+            sentinel.channel, action, sentinel.obj_id
+        )
+        handler.apply_listen_result.assert_called_once_with(
+            sentinel.obj_id, (name, action, data)
+        )
+        mock_sendNotify.assert_called_once_with(name, action, data)
+        mock_other_sendNotify.assert_called_once_with(name, action, data)
+
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_onNotify_processes_ungrouped_clients_separately(self):
+        user = yield deferToDatabase(self.make_user)
+        protocol, factory = self.make_protocol_with_factory(user=user)
+        other_protocol = factory.buildProtocol(None)
+        other_protocol.transport = MagicMock()
+        other_protocol.user = user
+        other_protocol.request = protocol.request
+        factory.clients.append(other_protocol)
+        self.addCleanup(lambda: other_protocol.connectionLost(""))
+        mock_class = MagicMock()
+        handler = mock_class.return_value
+        handler.get_listen_group_key.return_value = None
+        handler.on_listen.return_value = None
+        yield factory.onNotify(
+            mock_class, sentinel.channel, sentinel.action, sentinel.obj_id
+        )
+        self.assertEqual(2, handler.on_listen.call_count)
+        handler.apply_listen_result.assert_not_called()
+
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_onNotify_uses_changes_without_fetching(self):
+        user = yield deferToDatabase(self.make_user)
+        protocol, factory = self.make_protocol_with_factory(user=user)
+        name = maas_factory.make_name("name")
+        data = maas_factory.make_name("data")
+        mock_class = MagicMock()
+        handler = mock_class.return_value
+        handler.get_listen_group_key.return_value = (user.id, True, False)
+        handler.on_listen_changes.return_value = (name, "update", data)
+        mock_sendNotify = self.patch(protocol, "sendNotify")
+        changes = {"changed": ["status"], "fields": {"status": 1}}
+        yield factory.onNotify(
+            mock_class, sentinel.channel, "update", sentinel.obj_id, changes
+        )
+        handler.on_listen_changes.assert_called_once_with(
+            sentinel.channel, "update", sentinel.obj_id, changes
+        )
+        handler.on_listen.assert_not_called()
+        mock_sendNotify.assert_called_once_with(name, "update", data)
+
+    @wait_for_reactor
+    @inlineCallbacks
+    def test_onNotify_fetches_when_changes_not_enough(self):
+        user = yield deferToDatabase(self.make_user)
+        protocol, factory = self.make_protocol_with_factory(user=user)
+        name = maas_factory.make_name("name")
+        data = maas_factory.make_name("data")
+        mock_class = MagicMock()
+        handler = mock_class.return_value
+        handler.get_listen_group_key.return_value = (user.id, True, False)
+        handler.on_listen_changes.return_value = None
+        handler.on_listen.return_value = (name, "update", data)
+        mock_sendNotify = self.patch(protocol, "sendNotify")
+        changes = {"changed": ["hostname"], "fields": {}}
+        yield factory.onNotify(
+            mock_class, sentinel.channel, "update", sentinel.obj_id, changes
+        )
+        handler.on_listen.assert_called_once_with(
+            sentinel.channel, "update", sentinel.obj_id
+        )
+        mock_sendNotify.assert_called_once_with(name, "update", data)
+
     @wait_for_reactor
     @inlineCallbacks
     def test_updateRackController_calls_onNotify_for_controller_update(self):
@@ -33,7 +33,10 @@ from maasserver.websockets.websockets import (
     _makeAccept,
     _makeFrame,
     _mask,
+    _negotiateDeflate,
+    _parseExtensions,
     _parseFrames,
+    _PerMessageDeflate,
     _WSException,
     CONTROLS,
     IWebSocketsFrameReceiver,
@@ -97,6 +100,18 @@ class TestFrameHelpers(MAASTestCase):
         key = b"\x37\xfa\x21\x3d"
         self.assertEqual(_mask(b"Hello", key), b"\x7f\x9f\x4d\x51\x58")
 
+    def test_maskLong(self):
+        """
+        Masking long buffers gives the same result as masking each byte.
+        """
+        key = b"\x37\xfa\x21\x3d"
+        buf = bytes(range(256)) * 10 + b"odd"
+        expected = bytes(b ^ key[i % 4] for i, b in enumerate(buf))
+        self.assertEqual(_mask(buf, key), expected)
+
+    def test_maskEmpty(self):
+        self.assertEqual(_mask(b"", b"\x37\xfa\x21\x3d"), b"")
+
     def test_parseUnmaskedText(self):
         """
         A sample unmasked frame of "Hello" from HyBi-10, 4.7.
@@ -281,6 +296,52 @@ class TestFrameHelpers(MAASTestCase):
         error = self.assertRaises(_WSException, list, _parseFrames(frame))
         self.assertEqual("Reserved flag in frame (114)", str(error))
 
+    def test_parseCompressedWithoutDeflate(self):
+        """
+        L{_parseFrames} refuses frames with the RSV1 flag set when
+        permessage-deflate wasn't negotiated.
+        """
+        frame = [b"\xc1\x05"]
+        error = self.assertRaises(_WSException, list, _parseFrames(frame))
+        self.assertEqual("Reserved flag in frame (193)", str(error))
+
+    def test_parseCompressedControlFrame(self):
+        """
+        L{_parseFrames} refuses control frames with the RSV1 flag set.
+        """
+        frame = [b"\xc9\x00"]
+        error = self.assertRaises(
+            _WSException,
+            list,
+            _parseFrames(frame, deflate=_PerMessageDeflate()),
+        )
+        self.assertEqual("Reserved flag in frame (201)", str(error))
+
+    def test_parseCompressedText(self):
+        """
+        L{_parseFrames} decompresses messages compressed with
+        permessage-deflate, including fragmented ones.
+        """
+        data = _PerMessageDeflate().compress(b"Hello Hello Hello")
+        frame = [
+            _makeFrame(data[:3], CONTROLS.TEXT, False, compressed=True)
+            + _makeFrame(data[3:], CONTROLS.CONTINUE, True)
+        ]
+        frames = list(
+            _parseFrames(frame, needMask=False, deflate=_PerMessageDeflate())
+        )
+        self.assertEqual(
+            b"Hello Hello Hello", b"".join(data for _, data, _ in frames)
+        )
+
+    def test_parseInvalidCompressedText(self):
+        frame = [_makeFrame(b"\xff\xff", CONTROLS.TEXT, True, compressed=True)]
+        self.assertRaises(
+            _WSException,
+            list,
+            _parseFrames(frame, needMask=False, deflate=_PerMessageDeflate()),
+        )
+
     def test_parseUnknownOpcode(self):
         """
         L{_parseFrames} raises a L{_WSException} error when the error uses an
@@ -332,6 +393,147 @@ class TestFrameHelpers(MAASTestCase):
         buf = _makeFrame(b"Hello", CONTROLS.TEXT, True, mask=b"7\xfa!=")
         self.assertEqual(frame, buf)
 
+    def test_makeCompressedFrame(self):
+        """
+        L{_makeFrame} sets the RSV1 flag on compressed frames.
+        """
+        frame = b"\xc1\x05Hello"
+        buf = _makeFrame(b"Hello", CONTROLS.TEXT, True, compressed=True)
+        self.assertEqual(frame, buf)
+
+
+class TestPerMessageDeflate(MAASTestCase):
+    def decompress(self, deflate, data):
+        [(_, data, _)] = _parseFrames(
+            [_makeFrame(data, CONTROLS.TEXT, True, compressed=True)],
+            needMask=False,
+            deflate=deflate,
+        )
+        return data
+
+    def test_compress_keeps_context(self):
+        deflate = _PerMessageDeflate()
+        client = _PerMessageDeflate()
+        message = b"machine " * 100
+        first = deflate.compress(message)
+        second = deflate.compress(message)
+        self.assertLess(len(second), len(first))
+        self.assertEqual(message, self.decompress(client, first))
+        self.assertEqual(message, self.decompress(client, second))
+
+    def test_compress_without_context_takeover(self):
+        deflate = _PerMessageDeflate(serverNoContextTakeover=True)
+        message = b"machine " * 100
+        first = deflate.compress(message)
+        second = deflate.compress(message)
+        self.assertEqual(first, second)
+        self.assertEqual(
+            message, self.decompress(_PerMessageDeflate(), second)
+        )
+
+    def test_decompress_up_to_maxMessageSize(self):
+        deflate = _PerMessageDeflate()
+        self.patch(deflate, "maxMessageSize", 800)
+        message = b"machine " * 100
+        compressed = _PerMessageDeflate().compress(message)
+        self.assertEqual(message, self.decompress(deflate, compressed))
+
+    def test_decompress_fails_above_maxMessageSize(self):
+        deflate = _PerMessageDeflate()
+        self.patch(deflate, "maxMessageSize", 799)
+        compressed = _PerMessageDeflate().compress(b"machine " * 100)
+        error = self.assertRaises(
+            _WSException, self.decompress, deflate, compressed
+        )
+        self.assertEqual(
+            "Compressed message bigger than 799 bytes", str(error)
+        )
+
+    def test_decompress_fails_above_maxMessageSize_across_frames(self):
+        deflate = _PerMessageDeflate()
+        self.patch(deflate, "maxMessageSize", 799)
+        compressed = _PerMessageDeflate().compress(b"machine " * 100)
+        half = len(compressed) // 2
+        frames = [
+            _makeFrame(
+                compressed[:half], CONTROLS.TEXT, False, compressed=True
+            ),
+            _makeFrame(compressed[half:], CONTROLS.CONTINUE, True),
+        ]
+        self.assertRaises(
+            _WSException,
+            list,
+            _parseFrames(frames, needMask=False, deflate=deflate),
+        )
+
+    def test_parseExtensions(self):
+        self.assertEqual(
+            [
+                ("permessage-deflate", [("client_max_window_bits", None)]),
+                ("x-webkit-deflate-frame", []),
+                ("permessage-deflate", [("server_max_window_bits", "10")]),
+            ],
+            _parseExtensions(
+                b"permessage-deflate; client_max_window_bits, "
+                b"x-webkit-deflate-frame, "
+                b'permessage-deflate; server_max_window_bits="10"'
+            ),
+        )
+
+    def test_negotiateDeflate(self):
+        deflate, response = _negotiateDeflate(
+            _parseExtensions(b"permessage-deflate; client_max_window_bits")
+        )
+        self.assertEqual(b"permessage-deflate", response)
+        self.assertFalse(deflate.serverNoContextTakeover)
+        self.assertEqual(15, deflate.serverMaxWindowBits)
+
+    def test_negotiateDeflate_without_context_takeover(self):
+        deflate, response = _negotiateDeflate(
+            _parseExtensions(b"permessage-deflate"), contextTakeover=False
+        )
+        self.assertEqual(
+            b"permessage-deflate; server_no_context_takeover", response
+        )
+        self.assertTrue(deflate.serverNoContextTakeover)
+
+    def test_negotiateDeflate_accepts_client_parameters(self):
+        deflate, response = _negotiateDeflate(
+            _parseExtensions(
+                b"permessage-deflate; client_no_context_takeover; "
+                b"server_max_window_bits=10"
+            )
+        )
+        self.assertEqual(
+            b"permessage-deflate; client_no_context_takeover; "
+            b"server_max_window_bits=10",
+            response,
+        )
+        self.assertTrue(deflate.clientNoContextTakeover)
+        self.assertEqual(10, deflate.serverMaxWindowBits)
+
+    def test_negotiateDeflate_declines_invalid_offers(self):
+        for offer in (
+            b"x-webkit-deflate-frame",
+            b"permessage-deflate; server_max_window_bits=8",
+            b"permessage-deflate; server_max_window_bits",
+            b"permessage-deflate; unknown",
+            b"permessage-deflate; server_no_context_takeover; "
+            b"server_no_context_takeover",
+        ):
+            self.assertIsNone(_negotiateDeflate(_parseExtensions(offer)))
+
+    def test_negotiateDeflate_uses_first_valid_offer(self):
+        _, response = _negotiateDeflate(
+            _parseExtensions(
+                b"permessage-deflate; server_max_window_bits=8, "
+                b"permessage-deflate; server_no_context_takeover"
+            )
+        )
+        self.assertEqual(
+            b"permessage-deflate; server_no_context_takeover", response
+        )
+
 
 @implementer(IWebSocketsFrameReceiver)
 class SavingEchoReceiver:
@@ -434,6 +636,30 @@ class TestWebSocketsTransport(MAASTestCase):
         webSocketsTranport.loseConnection(STATUSES.GOING_AWAY, b"Going away")
         self.assertEqual(b"\x88\x0c\x03\xe9Going away", transport.value())
 
+    def test_sendFrameCompresses(self):
+        """
+        L{WebSocketsTransport.sendFrame} compresses the messages when
+        permessage-deflate was negotiated.
+        """
+        transport = StringTransportWithDisconnection()
+        deflate = _PerMessageDeflate()
+        webSocketsTranport = WebSocketsTransport(transport, deflate)
+        message = b"x" * deflate.minSize
+        webSocketsTranport.sendFrame(CONTROLS.TEXT, message, True)
+        [(_, data, _)] = _parseFrames(
+            [transport.value()], needMask=False, deflate=_PerMessageDeflate()
+        )
+        self.assertEqual(0x40, transport.value()[0] & 0x40)
+        self.assertEqual(message, data)
+
+    def test_sendFrameDoesntCompressSmallMessages(self):
+        transport = StringTransportWithDisconnection()
+        webSocketsTranport = WebSocketsTransport(
+            transport, _PerMessageDeflate()
+        )
+        webSocketsTranport.sendFrame(CONTROLS.TEXT, b"Hello", True)
+        self.assertEqual(b"\x81\x05Hello", transport.value())
+
 
 class TestWebSocketsProtocolWrapper(MAASTestCase):
     def setUp(self):
@@ -628,6 +854,59 @@ class TestWebSocketsResource(MAASTestCase):
         self.assertEqual(request.getHeader(b"cookie"), transport.cookies)
         self.assertEqual(request.uri, transport.uri)
 
+    def make_deflate_request(self, extensions):
+        request = DummyRequest(b"/")
+        request.requestHeaders = Headers(
+            {b"user-agent": [b"user-agent"], b"host": [b"host"]}
+        )
+        transport = StringTransportWithDisconnection()
+        transport.protocol = Protocol()
+        request.transport = transport
+        self.update_headers(
+            request,
+            headers={
+                b"upgrade": b"Websocket",
+                b"connection": b"Upgrade",
+                b"sec-websocket-key": b"secure",
+                b"sec-websocket-version": b"13",
+                b"sec-websocket-extensions": extensions,
+            },
+        )
+        return request
+
+    def test_renderDeflate(self):
+        """
+        L{WebSocketsResource} accepts the permessage-deflate extension when
+        offered by the client.
+        """
+        request = self.make_deflate_request(
+            b"permessage-deflate; client_max_window_bits"
+        )
+        self.assertEqual(NOT_DONE_YET, self.resource.render(request))
+        self.assertEqual(
+            [b"permessage-deflate"],
+            request.responseHeaders.getRawHeaders(b"Sec-WebSocket-Extensions"),
+        )
+        self.assertIsInstance(self.echoProtocol.deflate, _PerMessageDeflate)
+
+    def test_renderDeflateWithoutContextTakeover(self):
+        self.resource._deflateContextTakeover = False
+        request = self.make_deflate_request(b"permessage-deflate")
+        self.resource.render(request)
+        self.assertEqual(
+            [b"permessage-deflate; server_no_context_takeover"],
+            request.responseHeaders.getRawHeaders(b"Sec-WebSocket-Extensions"),
+        )
+
+    def test_renderDeflateDisabled(self):
+        self.resource._deflate = False
+        request = self.make_deflate_request(b"permessage-deflate")
+        self.resource.render(request)
+        self.assertIsNone(
+            request.responseHeaders.getRawHeaders(b"Sec-WebSocket-Extensions")
+        )
+        self.assertIsNone(self.echoProtocol.deflate)
+
     def test_renderProtocol(self):
         """
         If protocols are specified via the C{Sec-WebSocket-Protocol} header,
@@ -25,9 +25,9 @@ __all__ = [
 
 import base64
 from hashlib import sha1
-from itertools import cycle
 from struct import pack, unpack
 from typing import List, Sequence
+import zlib
 
 from twisted.internet.protocol import Protocol
 from twisted.protocols.tls import TLSMemoryBIOProtocol
@@ -114,10 +114,245 @@ def _mask(buf: bytes, key: bytes) -> bytes:
     @rtype: C{str}
     @return: A masked buffer of bytes.
     """
-    return bytes((b ^ k) for b, k in zip(buf, cycle(key)))
+    # XOR the buffer with the key repeated to the same length as two big
+    # integers, which is much faster than doing it byte per byte.
+    length = len(buf)
+    key = (key * (length // 4 + 1))[:length]
+    masked = int.from_bytes(buf, "big") ^ int.from_bytes(key, "big")
+    return masked.to_bytes(length, "big")
 
 
-def _makeFrame(buf: bytes, opcode, fin: bool, mask: bytes = None) -> bytes:
+# The empty stored block ending each compressed message, which is removed
+# when sending it and added back when receiving it (RFC 7692 7.2.1, 7.2.2).
+_DEFLATE_TAIL = b"\x00\x00\xff\xff"
+
+
+class _PerMessageDeflate:
+    """
+    The state of the permessage-deflate extension (RFC 7692) for a
+    connection.
+
+    @ivar serverNoContextTakeover: If C{True}, the compression context is
+        reset for each message sent.
+    @type serverNoContextTakeover: C{bool}
+
+    @ivar clientNoContextTakeover: If C{True}, the client resets its
+        compression context for each message, so the decompression context
+        is reset as well.
+    @type clientNoContextTakeover: C{bool}
+
+    @ivar serverMaxWindowBits: The size of the compression window.
+    @type serverMaxWindowBits: C{int}
+    """
+
+    # Messages smaller than this are sent uncompressed, as compressing them
+    # doesn't save much.
+    minSize = 128
+
+    # The connection fails if a compressed message received inflates to more
+    # than this, so that a small message can't exhaust the memory.
+    maxMessageSize = 16 * 1024 * 1024
+
+    def __init__(
+        self,
+        serverNoContextTakeover: bool = False,
+        clientNoContextTakeover: bool = False,
+        serverMaxWindowBits: int = 15,
+    ):
+        self.serverNoContextTakeover = serverNoContextTakeover
+        self.clientNoContextTakeover = clientNoContextTakeover
+        self.serverMaxWindowBits = serverMaxWindowBits
+        self._compressor = None
+        self._decompressor = None
+        self._decompressing = False
+        self._decompressedSize = 0
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        Compress the content of a message.
+
+        @type data: C{bytes}
+        @param data: The content of the message.
+
+        @rtype: C{bytes}
+        @return: The compressed content.
+        """
+        if self._compressor is None or self.serverNoContextTakeover:
+            self._compressor = zlib.compressobj(
+                zlib.Z_DEFAULT_COMPRESSION,
+                zlib.DEFLATED,
+                -self.serverMaxWindowBits,
+            )
+        data = self._compressor.compress(data)
+        data += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data[: -len(_DEFLATE_TAIL)]
+
+    def decompressFrame(self, opcode, data: bytes, compressed: bool, fin):
+        """
+        Decompress the content of a data frame, if it's part of a compressed
+        message.
+
+        @type opcode: C{CONTROLS}
+        @param opcode: The type of frame received.
+
+        @type data: C{bytes}
+        @param data: The content of the frame received.
+
+        @type compressed: C{bool}
+        @param compressed: Whether the frame has the RSV1 bit set, marking the
+            first frame of a compressed message.
+
+        @type fin: C{bool}
+        @param fin: Whether or not the frame is final.
+
+        @rtype: C{bytes}
+        @return: The decompressed content of the frame.
+
+        @raise _WSException: If the data is invalid, or the message inflates
+            to more than C{maxMessageSize} bytes.
+        """
+        if opcode in (CONTROLS.TEXT, CONTROLS.BINARY):
+            self._decompressing = compressed
+            self._decompressedSize = 0
+        elif opcode != CONTROLS.CONTINUE:
+            return data
+        if not self._decompressing:
+            return data
+        if self._decompressor is None:
+            # The client window is at most 15 bits, as it can't be bigger
+            # than what was agreed.
+            self._decompressor = zlib.decompressobj(-15)
+        # Inflate at most one byte more than allowed, to tell whether the
+        # message is too big without inflating all of it.
+        maxLength = self.maxMessageSize - self._decompressedSize + 1
+        try:
+            data = self._decompressor.decompress(data, maxLength)
+            if (
+                fin
+                and len(data) < maxLength
+                and not self._decompressor.unconsumed_tail
+            ):
+                data += self._decompressor.decompress(
+                    _DEFLATE_TAIL, maxLength - len(data)
+                )
+        except zlib.error as error:
+            raise _WSException("Invalid compressed data: %s" % error)  # noqa: B904
+        self._decompressedSize += len(data)
+        if (
+            self._decompressor.unconsumed_tail
+            or self._decompressedSize > self.maxMessageSize
+        ):
+            raise _WSException(
+                "Compressed message bigger than %d bytes"
+                % (self.maxMessageSize,)
+            )
+        if fin:
+            self._decompressing = False
+            if self.clientNoContextTakeover:
+                self._decompressor = None
+        return data
+
+
+def _parseExtensions(header: bytes):
+    """
+    Parse a I{Sec-WebSocket-Extensions} header.
+
+    @type header: C{bytes}
+    @param header: The header value.
+
+    @rtype: C{list}
+    @return: A list of C{(name, params)} tuples, C{params} being a list of
+        C{(name, value)} tuples, C{value} being C{None} for parameters
+        without value.
+    """
+    extensions = []
+    for offer in header.decode("ascii", "replace").split(","):
+        name, *params = (part.strip() for part in offer.split(";"))
+        if not name:
+            continue
+        parsed = []
+        for param in params:
+            key, sep, value = param.partition("=")
+            parsed.append(
+                (key.strip(), value.strip().strip('"') if sep else None)
+            )
+        extensions.append((name, parsed))
+    return extensions
+
+
+def _negotiateDeflate(offers, contextTakeover: bool = True):
+    """
+    Accept the first valid permessage-deflate offer, if any.
+
+    @param offers: The extensions offered by the client, as returned by
+        L{_parseExtensions}.
+
+    @type contextTakeover: C{bool}
+    @param contextTakeover: Whether the compression context can be kept
+        between messages sent. This compresses better, at the price of
+        keeping the context in memory for each connection.
+
+    @rtype: C{tuple} or C{NoneType}
+    @return: A tuple of the L{_PerMessageDeflate} and the
+        I{Sec-WebSocket-Extensions} response header value, or C{None} if no
+        offer was accepted.
+    """
+    for name, params in offers:
+        if name != "permessage-deflate":
+            continue
+        keys = [key for key, _ in params]
+        if len(keys) != len(set(keys)):
+            # 7.1 Offers with duplicate parameters must be declined.
+            continue
+        serverNoContextTakeover = not contextTakeover
+        clientNoContextTakeover = False
+        serverMaxWindowBits = 15
+        valid = True
+        for key, value in params:
+            if key == "server_no_context_takeover" and value is None:
+                serverNoContextTakeover = True
+            elif key == "client_no_context_takeover" and value is None:
+                clientNoContextTakeover = True
+            elif key == "server_max_window_bits":
+                # zlib doesn't support raw deflate with a window of 8 bits.
+                if value is None or not value.isdigit():
+                    valid = False
+                elif not 9 <= int(value) <= 15:
+                    valid = False
+                else:
+                    serverMaxWindowBits = int(value)
+            elif key == "client_max_window_bits":
+                if value is not None and not (
+                    value.isdigit() and 8 <= int(value) <= 15
+                ):
+                    valid = False
+            else:
+                valid = False
+        if not valid:
+            continue
+        response = [b"permessage-deflate"]
+        if serverNoContextTakeover:
+            response.append(b"server_no_context_takeover")
+        if clientNoContextTakeover:
+            response.append(b"client_no_context_takeover")
+        if serverMaxWindowBits != 15:
+            response.append(b"server_max_window_bits=%d" % serverMaxWindowBits)
+        deflate = _PerMessageDeflate(
+            serverNoContextTakeover,
+            clientNoContextTakeover,
+            serverMaxWindowBits,
+        )
+        return deflate, b"; ".join(response)
+    return None
+
+
+def _makeFrame(
+    buf: bytes,
+    opcode,
+    fin: bool,
+    mask: bytes = None,
+    compressed: bool = False,
+) -> bytes:
     """
     Make a frame.
 
@@ -136,6 +371,9 @@ def _makeFrame(buf: bytes, opcode, fin: bool, mask: bytes = None) -> bytes:
     @type mask: C{bytes} or C{NoneType}
     @param mask: If specified, the masking key to apply on the created frame.
 
+    @type compressed: C{bool}
+    @param compressed: Whether C{buf} is compressed with permessage-deflate.
+
     @rtype: C{bytes}
     @return: A packed frame.
     """
@@ -163,6 +401,9 @@ def _makeFrame(buf: bytes, opcode, fin: bool, mask: bytes = None) -> bytes:
     else:
         header = 0x01
 
+    if compressed:
+        header |= 0x40
+
     header = bytes([header | opcode.value])
     if mask is not None:
         buf = b"%s%s" % (mask, _mask(buf, mask))
@@ -170,7 +411,11 @@ def _makeFrame(buf: bytes, opcode, fin: bool, mask: bytes = None) -> bytes:
     return frame
 
 
-def _parseFrames(frameBuffer: List[bytes], needMask: bool = True):
+def _parseFrames(
+    frameBuffer: List[bytes],
+    needMask: bool = True,
+    deflate: _PerMessageDeflate = None,
+):
     """
     Parse frames in a highly compliant manner. It modifies C{frameBuffer}
     removing the parsed content from it.
@@ -180,6 +425,10 @@ def _parseFrames(frameBuffer: List[bytes], needMask: bool = True):
 
     @param needMask: If C{True}, refuse any frame which is not masked.
     @type needMask: C{bool}
+
+    @param deflate: If specified, the permessage-deflate state used to
+        decompress the compressed messages.
+    @type deflate: L{_PerMessageDeflate} or C{NoneType}
     """
     start = 0
     payload = b"".join(frameBuffer)
@@ -191,10 +440,6 @@ def _parseFrames(frameBuffer: List[bytes], needMask: bool = True):
 
         # Grab the header. This single byte holds some flags and an opcode
         header = payload[start]
-        if header & 0x70:
-            # At least one of the reserved flags is set. Pork chop sandwiches!
-            raise _WSException("Reserved flag in frame (%d)" % (header,))
-
         fin = header & 0x80
 
         # Get the opcode, and translate it to a local enum which we actually
@@ -205,6 +450,19 @@ def _parseFrames(frameBuffer: List[bytes], needMask: bool = True):
         except ValueError:
             raise _WSException("Unknown opcode %d in frame" % opcode)  # noqa: B904
 
+        # RSV1 marks the first frame of a compressed message, when
+        # permessage-deflate is in use.
+        compressed = bool(header & 0x40)
+        if header & 0x30 or (
+            compressed
+            and (
+                deflate is None
+                or opcode not in (CONTROLS.TEXT, CONTROLS.BINARY)
+            )
+        ):
+            # At least one of the reserved flags is set. Pork chop sandwiches!
+            raise _WSException("Reserved flag in frame (%d)" % (header,))
+
         # Get the payload length and determine whether we need to look for an
         # extra length.
         length = payload[start + 1]
@@ -255,6 +513,9 @@ def _parseFrames(frameBuffer: List[bytes], needMask: bool = True):
         if masked:
             data = _mask(data, key)
 
+        if deflate is not None:
+            data = deflate.decompressFrame(opcode, data, compressed, fin)
+
         if opcode == CONTROLS.CLOSE:
             if len(data) >= 2:
                 # Gotta unpack the opcode and return usable data here.
@@ -310,13 +571,17 @@ class WebSocketsTransport:
 
     @ivar _transport: A reference to the real transport.
 
+    @ivar _deflate: The permessage-deflate state used to compress the
+        messages sent, if negotiated.
+
     @since: 13.2
     """
 
     _disconnecting = False
 
-    def __init__(self, transport):
+    def __init__(self, transport, deflate: _PerMessageDeflate = None):
         self._transport = transport
+        self._deflate = deflate
 
     def sendFrame(self, opcode, data: bytes, fin: bool):
         """
@@ -331,7 +596,15 @@ class WebSocketsTransport:
         @type fin: C{bool}
         @param fin: Whether or not we're sending a final frame.
         """
-        packet = _makeFrame(data, opcode, fin)
+        compressed = (
+            self._deflate is not None
+            and fin
+            and opcode in (CONTROLS.TEXT, CONTROLS.BINARY)
+            and len(data) >= self._deflate.minSize
+        )
+        if compressed:
+            data = self._deflate.compress(data)
+        packet = _makeFrame(data, opcode, fin, compressed=compressed)
         self._transport.write(packet)
 
     def loseConnection(self, code=STATUSES.NORMAL, reason: bytes = b""):
@@ -374,10 +647,15 @@ class WebSocketsProtocol(Protocol):
     @ivar _buffer: The pending list of frames not processed yet.
     @type _buffer: C{list}
 
+    @ivar deflate: The permessage-deflate state of the connection, if
+        negotiated.
+    @type deflate: L{_PerMessageDeflate} or C{NoneType}
+
     @since: 13.2
     """
 
     _buffer = None
+    deflate = None
 
     def __init__(self, receiver):
         self._receiver = receiver
@@ -389,13 +667,17 @@ class WebSocketsProtocol(Protocol):
         peer = self.transport.getPeer()
         log.debug("Opening connection with {peer}", peer=peer)
         self._buffer = []
-        self._receiver.makeConnection(WebSocketsTransport(self.transport))
+        self._receiver.makeConnection(
+            WebSocketsTransport(self.transport, self.deflate)
+        )
 
     def _parseFrames(self):
         """
         Find frames in incoming data and pass them to the underlying protocol.
         """
-        for opcode, data, fin in _parseFrames(self._buffer):
+        for opcode, data, fin in _parseFrames(
+            self._buffer, deflate=self.deflate
+        ):
             self._receiver.frameReceived(opcode, data, fin)
             if opcode == CONTROLS.CLOSE:
                 # The other side wants us to close.
@@ -579,13 +861,29 @@ class WebSocketsResource:
         L{lookupProtocolForFactory}.
     @type lookupProtocol: C{callable}.
 
+    @param deflate: Whether to accept the permessage-deflate extension
+        (RFC 7692) when offered by the client.
+    @type deflate: C{bool}
+
+    @param deflateContextTakeover: Whether to keep the compression context
+        between the messages sent, which compresses better at the price of
+        memory for each connection.
+    @type deflateContextTakeover: C{bool}
+
     @since: 13.2
     """
 
     isLeaf = True
 
-    def __init__(self, lookupProtocol):
+    def __init__(
+        self,
+        lookupProtocol,
+        deflate: bool = True,
+        deflateContextTakeover: bool = True,
+    ):
         self._lookupProtocol = lookupProtocol
+        self._deflate = deflate
+        self._deflateContextTakeover = deflateContextTakeover
 
     def getChildWithDefault(self, name, request):
         """
@@ -688,6 +986,19 @@ class WebSocketsResource:
         # 4.2.2.5.5 Optional codec declaration
         if protocolName:
             request.setHeader(b"Sec-WebSocket-Protocol", protocolName)
+        # 4.2.2.5.6 Optional extensions, only permessage-deflate is supported.
+        deflate = None
+        extensions = request.requestHeaders.getRawHeaders(
+            b"Sec-WebSocket-Extensions"
+        )
+        if self._deflate and extensions:
+            negotiated = _negotiateDeflate(
+                _parseExtensions(b", ".join(extensions)),
+                contextTakeover=self._deflateContextTakeover,
+            )
+            if negotiated is not None:
+                deflate, response = negotiated
+                request.setHeader(b"Sec-WebSocket-Extensions", response)
 
         # Provoke request into flushing headers and finishing the handshake.
         request.write(b"")
@@ -721,6 +1032,7 @@ class WebSocketsResource:
 
         if not isinstance(protocol, WebSocketsProtocol):
             protocol = WebSocketsProtocolWrapper(protocol)
+        protocol.deflate = deflate
 
         # Connect the transport to our factory, and make things go. We need to
         # do some stupid stuff here; see #3204, which could fix it.
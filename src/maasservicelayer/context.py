@@ -8,6 +8,8 @@ from uuid import uuid4
 from sqlalchemy import Connection
 from sqlalchemy.ext.asyncio import AsyncConnection
 
+from maasservicelayer.db.loaders import BatchLoaders
+
 
 # TODO: make connection an AsyncConnection only.
 # For now it holds also the Connection type in order to be compatible with the
@@ -17,6 +19,7 @@ class Context:
         self,
         context_id: str | None = None,
         connection: AsyncConnection | Connection | None = None,
+        batch_loading: bool = False,
     ):
         self.context_id = context_id or self._generate_context_id()
         self._start_timestamp = time.time()
@@ -25,6 +28,10 @@ class Context:
         # A placeholder ATM. This is the place where all the services can append the post commits hooks to be executed after
         # the transaction has been committed.
         self._post_commit_hooks = []
+        # The repositories load the items by id through these loaders, if
+        # enabled. Since the loaded items are memoized, the context must be
+        # used for a single transaction.
+        self.loaders = BatchLoaders() if batch_loading else None
 
     def set_connection(self, connection: AsyncConnection | Connection):
         self._connection = connection
@@ -43,6 +50,12 @@ class Context:
     def add_post_commit_hook(self, callable: Callable) -> None:
         self._post_commit_hooks.append(callable)
 
+    def get_saved_queries(self) -> int:
+        """Return the number of queries saved by the batching loaders."""
+        if self.loaders is None:
+            return 0
+        return self.loaders.get_saved_queries()
+
     def get_elapsed_time_seconds(self) -> float:
         return time.time() - self._start_timestamp
 
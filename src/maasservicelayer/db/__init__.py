@@ -2,9 +2,14 @@
 #  GNU Affero General Public License version 3 (see the file LICENSE).
 
 from dataclasses import dataclass
+from typing import Any, cast
 
-from sqlalchemy import URL
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import QueuePool, URL
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    create_async_engine,
+)
 
 
 @dataclass
@@ -14,6 +19,19 @@ class DatabaseConfig:
     username: str | None = None
     password: str | None = None
     port: int | None = None
+    # Connection pool options, see `sqlalchemy.create_engine`.
+    pool_size: int = 3
+    max_overflow: int = 10
+    pool_recycle: int = -1
+    pool_timeout: float = 30
+    # Number of compiled statements cached by the engine, and of statements
+    # prepared by each connection.
+    query_cache_size: int = 1000
+    prepared_statement_cache_size: int = 500
+    # Configuration of the pool used for read-only requests. It can point to
+    # a hot-standby replica. When not set, all the requests share the same
+    # pool.
+    read_only: "DatabaseConfig | None" = None
 
     @property
     def dsn(self) -> URL:
@@ -27,13 +45,87 @@ class DatabaseConfig:
         )
 
 
+def _create_engine(config: DatabaseConfig, echo: bool) -> AsyncEngine:
+    return create_async_engine(
+        config.dsn,
+        echo=echo,
+        isolation_level="REPEATABLE READ",
+        pool_size=config.pool_size,
+        max_overflow=config.max_overflow,
+        pool_recycle=config.pool_recycle,
+        pool_timeout=config.pool_timeout,
+        query_cache_size=config.query_cache_size,
+        connect_args={
+            "prepared_statement_cache_size": (
+                config.prepared_statement_cache_size
+            )
+        },
+    )
+
+
+def is_statement_prepared(
+    dbapi_connection: Any, statement: str
+) -> bool | None:
+    """Whether `statement` is in the cache of the prepared statements of an
+    asyncpg connection, i.e. it's executed without being prepared again.
+
+    None is returned if the connection doesn't cache the prepared statements.
+    """
+    cache = getattr(dbapi_connection, "_prepared_statement_cache", None)
+    if cache is None:
+        return None
+    return statement in cache
+
+
+async def explain_statement(
+    connection: AsyncConnection, statement: str, parameters: Any
+) -> str:
+    """Profile a statement with `EXPLAIN (ANALYZE, BUFFERS)`.
+
+    The statement is executed again in a savepoint that is rolled back, so
+    that the transaction is left as it was, even if it fails.
+    """
+    savepoint = await connection.begin_nested()
+    try:
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+        )
+        return "\n".join(row[0] for row in result)
+    finally:
+        await savepoint.rollback()
+
+
 class Database:
     def __init__(self, config: DatabaseConfig, echo: bool = False):
         self.config = config
-        self.engine = create_async_engine(
-            config.dsn,
-            echo=echo,
-            isolation_level="REPEATABLE READ",
-            # Limit the connection pool size to 3 for the time being.
-            pool_size=3,
-        )
+        self.engine = _create_engine(config, echo)
+        self.read_only_engine = None
+        if config.read_only is not None:
+            self.read_only_engine = _create_engine(config.read_only, echo)
+
+    def get_engine(self, read_only: bool = False) -> AsyncEngine:
+        """Return the engine to use for a transaction.
+
+        The read-only engine is returned for read-only transactions if it's
+        configured.
+        """
+        if read_only and self.read_only_engine is not None:
+            return self.read_only_engine
+        return self.engine
+
+    def get_pool_usage(self, read_only: bool = False) -> float:
+        """Return the ratio of connections in use in the pool of the engine
+        used for the transaction."""
+        engine = self.get_engine(read_only)
+        config = self.config
+        if engine is self.read_only_engine and config.read_only is not None:
+            config = config.read_only
+        capacity = config.pool_size + max(config.max_overflow, 0)
+        # The engines are created with the default queue pool.
+        pool = cast(QueuePool, engine.pool)
+        return pool.checkedout() / capacity
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+        if self.read_only_engine is not None:
+            await self.read_only_engine.dispose()
@@ -0,0 +1,37 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+"""Add tablegeneration
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-07-14 09:12:41.209311+00:00
+
+"""
+
+from typing import Sequence
+
+from alembic import op  # type: ignore
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: str | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # The rows are added by the 'sys_table_generation' triggers, one for each
+    # transaction that changes a table.
+    op.create_table(
+        "maasserver_tablegeneration",
+        sa.Column("table_name", sa.Text(), nullable=False),
+        sa.Column("txid", sa.BigInteger(), nullable=False),
+        sa.Column("generation", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("table_name", "txid"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("maasserver_tablegeneration")
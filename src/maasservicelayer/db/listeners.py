@@ -20,6 +20,13 @@ class PostgresListener(ABC):
         """The handler to be executed when the notification is received on the channel"""
         pass
 
+    def registered(self):  # noqa: B027
+        """Called once the listener is registered on the connection."""
+
+    def terminated(self):  # noqa: B027
+        """Called when the connection the listener is registered on is closed,
+        after which no notification is received anymore."""
+
 
 class PostgresListenersTaskFactory:
     """
@@ -36,10 +43,18 @@ class PostgresListenersTaskFactory:
         async def register_listeners():
             async with db_engine.connect() as conn:
                 raw_connection = await conn.get_raw_connection()
+                driver_connection = raw_connection.driver_connection
+                assert driver_connection is not None
                 for listener in listeners:
-                    assert raw_connection.driver_connection is not None
-                    await raw_connection.driver_connection.add_listener(
+                    await driver_connection.add_listener(
                         listener.channel, listener.handler
                     )
+                    listener.registered()
+
+                def terminated(connection: Connection):
+                    for listener in listeners:
+                        listener.terminated()
+
+                driver_connection.add_termination_listener(terminated)
 
         return asyncio.create_task(register_listeners())
@@ -0,0 +1,101 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, Sequence, TypeVar
+
+from maasservicelayer.models.base import MaasBaseModel
+
+T = TypeVar("T", bound=MaasBaseModel)
+
+LoadMany = Callable[[list[int]], Awaitable[Sequence[T]]]
+
+
+class BatchLoader(Generic[T]):
+    """
+    Load the items by id, batching the loads.
+
+    The ids that are requested in the same event-loop tick are loaded with a single query, and the loaded items are
+    memoized until `clear` is called, so that each item is loaded only once.
+    """
+
+    def __init__(self, load_many: LoadMany[T]):
+        self._load_many = load_many
+        self._futures: dict[int, asyncio.Future[T | None]] = {}
+        self._pending: list[tuple[int, asyncio.Future[T | None]]] = []
+        self._dispatch_task: asyncio.Task | None = None
+        # The number of loads requested, each of them being a query
+        # without the loader, and the number of queries actually executed.
+        self.requests = 0
+        self.queries = 0
+
+    async def load(self, id: int) -> T | None:
+        self.requests += 1
+        return self._copy(await asyncio.shield(self._get_future(id)))
+
+    async def load_many(self, ids: Sequence[int]) -> list[T | None]:
+        self.requests += 1
+        futures = [self._get_future(id) for id in ids]
+        return [self._copy(await asyncio.shield(future)) for future in futures]
+
+    def clear(self) -> None:
+        """Forget the loaded items."""
+        self._futures = {}
+
+    def _get_future(self, id: int) -> asyncio.Future[T | None]:
+        future = self._futures.get(id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[id] = future
+            self._pending.append((id, future))
+            if self._dispatch_task is None:
+                # The task runs once the callbacks that are already scheduled
+                # have run, so that their loads are batched together.
+                self._dispatch_task = asyncio.create_task(self._dispatch())
+        return future
+
+    async def _dispatch(self) -> None:
+        pending, self._pending = self._pending, []
+        self._dispatch_task = None
+        self.queries += 1
+        try:
+            items = await self._load_many([id for id, _ in pending])
+        except Exception as e:
+            for id, future in pending:
+                # Let the next load try again.
+                if self._futures.get(id) is future:
+                    del self._futures[id]
+                future.set_exception(e)
+            return
+        items_by_id = {item.id: item for item in items}
+        for id, future in pending:
+            future.set_result(items_by_id.get(id))
+
+    def _copy(self, item: T | None) -> T | None:
+        # The memoized items are shared by all the callers.
+        return item.copy() if item is not None else None
+
+
+class BatchLoaders:
+    """The batching loaders of a transaction, by key."""
+
+    def __init__(self):
+        self._loaders: dict[Hashable, BatchLoader] = {}
+
+    def get(self, key: Hashable, load_many: LoadMany[T]) -> BatchLoader[T]:
+        loader = self._loaders.get(key)
+        if loader is None:
+            loader = self._loaders[key] = BatchLoader(load_many)
+        return loader
+
+    def clear(self) -> None:
+        """Forget the items loaded by all the loaders."""
+        for loader in self._loaders.values():
+            loader.clear()
+
+    def get_saved_queries(self) -> int:
+        """Return the number of queries that the loaders saved."""
+        return sum(
+            loader.requests - loader.queries
+            for loader in self._loaders.values()
+        )
@@ -0,0 +1,130 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+from datetime import datetime
+from enum import Enum
+from functools import cache
+from ipaddress import IPv4Address, IPv6Address
+from typing import Any, Callable, Generic, Mapping, TypeVar
+
+from netaddr import IPAddress
+from pydantic import IPvAnyAddress, ValidationError
+from pydantic.fields import ModelField, SHAPE_SINGLETON
+
+from maasservicelayer.models.base import MaasBaseModel
+
+M = TypeVar("M", bound=MaasBaseModel)
+
+# The types that the database drivers return as they are, so that the values
+# of the fields with these types don't need to be validated.
+TRUSTED_TYPES = frozenset([bool, int, str, datetime])
+
+
+def _is_trusted(field: ModelField) -> bool:
+    return (
+        field.shape == SHAPE_SINGLETON
+        and field.outer_type_ in TRUSTED_TYPES
+        and not field.class_validators
+    )
+
+
+def _get_converter(field: ModelField) -> Callable[[Any], Any] | None:
+    """Return a function converting the values of enum, IP address and
+    nested model fields without the overhead of the pydantic validation."""
+    field_type = field.outer_type_
+    if (
+        field.shape != SHAPE_SINGLETON
+        or field.class_validators
+        or not isinstance(field_type, type)
+    ):
+        return None
+    if issubclass(field_type, Enum):
+
+        def convert_enum(value: Any) -> Any:
+            if value is None or isinstance(value, field_type):
+                return value
+            return field_type(value)
+
+        return convert_enum
+    if issubclass(field_type, IPvAnyAddress):
+
+        def convert_ip(value: Any) -> Any:
+            if value is None:
+                return value
+            if isinstance(value, IPAddress):
+                # Avoid parsing the string representation of the addresses
+                # returned by the asyncpg codec.
+                if value.version == 4:
+                    return IPv4Address(int(value))
+                return IPv6Address(int(value))
+            return IPvAnyAddress.validate(value)
+
+        return convert_ip
+    if issubclass(field_type, MaasBaseModel):
+
+        def convert_model(value: Any) -> Any:
+            if value is None or isinstance(value, field_type):
+                return value
+            return get_trusted_row_adapter(field_type)(value)
+
+        return convert_model
+    return None
+
+
+class TrustedRowAdapter(Generic[M]):
+    """
+    Build the domain models from the rows read from our own schema.
+
+    The values of the fields with a trusted type are used as they are, enums, IP addresses and nested models are
+    converted directly, and only the other fields (networks, lists, ...) are validated. Models with root validators
+    are always fully validated.
+    """
+
+    def __init__(self, model: type[M]):
+        self.model = model
+        self.converters = {
+            name: _get_converter(field)
+            for name, field in model.__fields__.items()
+            if not _is_trusted(field)
+        }
+        self.full_validation = bool(
+            model.__pre_root_validators__ or model.__post_root_validators__
+        )
+
+    def __call__(self, values: Mapping[str, Any]) -> M:
+        if self.full_validation:
+            return self.model(**values)
+        data = {}
+        for name, field in self.model.__fields__.items():
+            if field.alias not in values:
+                if field.required:
+                    # Let pydantic report the missing field.
+                    return self.model(**values)
+                continue
+            value = values[field.alias]
+            if name in self.converters:
+                value = self._convert(name, field, value, data)
+            data[name] = value
+        return self.model.construct(_fields_set=set(data), **data)
+
+    def _convert(
+        self, name: str, field: ModelField, value: Any, data: dict[str, Any]
+    ) -> Any:
+        converter = self.converters[name]
+        if converter is not None:
+            try:
+                return converter(value)
+            except (ValueError, TypeError, ValidationError):
+                # Let pydantic report the invalid value.
+                pass
+        value, errors = field.validate(
+            value, data, loc=field.alias, cls=self.model
+        )
+        if errors:
+            raise ValidationError([errors], self.model)
+        return value
+
+
+@cache
+def get_trusted_row_adapter(model: type[M]) -> TrustedRowAdapter[M]:
+    return TrustedRowAdapter(model)
@@ -2,81 +2,157 @@
 #  GNU Affero General Public License version 3 (see the file LICENSE).
 
 from abc import ABC, abstractmethod
-import ipaddress
-from operator import eq
-from typing import Any, Generic, List, Sequence, TypeVar
+import base64
+import binascii
+import json
+from operator import eq, lt
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    List,
+    Mapping,
+    Sequence,
+    TypeVar,
+)
 
-import psycopg2.extensions
-import psycopg2.extras
 from sqlalchemy import (
+    and_,
+    any_,
+    bindparam,
+    cast,
+    Column,
+    column,
     Connection,
     CursorResult,
     delete,
     desc,
+    Executable,
     insert,
+    Integer,
     Row,
     Select,
     select,
     Table,
+    text,
     update,
 )
+from sqlalchemy import values as values_clause
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.sql.functions import count
+from sqlalchemy.sql.util import find_tables
 
 from maasservicelayer.context import Context
 from maasservicelayer.db.filters import Clause, QuerySpec
-from maasservicelayer.db.mappers.base import BaseDomainDataMapper
+from maasservicelayer.db.loaders import BatchLoader
+from maasservicelayer.db.mappers.base import (
+    BaseDomainDataMapper,
+    CreateOrUpdateResource,
+)
 from maasservicelayer.db.mappers.default import DefaultDomainDataMapper
+from maasservicelayer.db.mappers.rows import get_trusted_row_adapter
 from maasservicelayer.exceptions.catalog import (
     AlreadyExistsException,
     BaseExceptionDetail,
     NotFoundException,
+    ValidationException,
 )
 from maasservicelayer.exceptions.constants import (
     UNEXISTING_RESOURCE_VIOLATION_TYPE,
     UNIQUE_CONSTRAINT_VIOLATION_TYPE,
 )
 from maasservicelayer.models.base import (
+    ListCount,
     ListResult,
     MaasBaseModel,
     MaasTimestampedBaseModel,
     ResourceBuilder,
+    TokenListResult,
 )
 from maasservicelayer.utils.date import utcnow
 
+# The maximum number of items counted for an estimated count of a filtered
+# list.
+ESTIMATED_COUNT_CAP = 10000
 
-def cast_ip(s, cur):
-    if s is None:
-        return None
-    return ipaddress.ip_address(str(s))
+# The number of rows fetched at a time from the server-side cursors of the
+# streamed queries.
+STREAM_BATCH_SIZE = 1000
 
-
-def cast_cidr(s, cur):
-    if s is None:
-        return None
-    return ipaddress.ip_network(str(s))
+# The maximum number of bind parameters of a statement, as limited by the
+# PostgreSQL protocol. Bulk inserts are split in batches to stay below it.
+MAX_BIND_PARAMETERS = 32767
 
 
 class MultipleResultsException(Exception):
     pass
 
 
+def encode_list_token(last_id: int) -> str:
+    """Return the opaque token for the page after the item `last_id`."""
+    data = json.dumps({"id": last_id}).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def decode_list_token(token: str) -> int:
+    """Return the id of the last item of the previous page from `token`."""
+    try:
+        data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        last_id = json.loads(data)["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        last_id = None
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise ValidationException.build_for_field(
+            field="token", message="The pagination token is not valid."
+        )
+    return last_id
+
+
 T = TypeVar("T", bound=MaasBaseModel)
 
 
 class Repository(ABC):  # noqa: B024
+    # The statements built by `get_statement_template`, by repository class
+    # and name. They're shared by all the instances, since the repositories
+    # are built for every request.
+    _statement_templates: dict[tuple[type, Hashable], Any] = {}
+
     def __init__(self, context: Context):
         self.context = context
 
+    def get_statement_template(
+        self, name: Hashable, build: Callable[[], Executable]
+    ) -> Any:
+        """
+        Return the statement `name` of this repository, building it only the first time it's requested.
+
+        The statement must not depend on the arguments of the call: the values must be left as bound parameters and
+        passed to `execute_stmt`. This saves building the statement and computing its cache key, which is memoized by
+        the statement, for the hot queries. The compiled statement is then cached by SQLAlchemy, and the prepared one
+        by asyncpg.
+        """
+        key = (type(self), name)
+        stmt = self._statement_templates.get(key)
+        if stmt is None:
+            stmt = self._statement_templates[key] = build()
+        return stmt
+
     # TODO: remove this when the connection in context is changed back to the AsyncConnection type only.
-    async def execute_stmt(self, stmt) -> CursorResult[Any]:
+    async def execute_stmt(
+        self,
+        stmt,
+        params: Mapping[str, Any] | Sequence[Mapping[str, Any]] | None = None,
+    ) -> CursorResult[Any]:
         """
-        Execute the given SQL statement, handling type conversions appropriately
-        based on the database driver used.
+        Execute the given SQL statement, on either an asyncpg connection or a psycopg2 connection handled by django.
 
-        This method ensures consistent behavior between different database
-        drivers (asyncpg and psycopg2) by registering and restoring necessary
-        type casters on the connection executing the query.
+        `params` are the values of the bound parameters of the statement, if any.
+        A list of them executes the statement once for each item.
 
         Type Conversion Considerations:
         1. JSONB Handling:
@@ -94,59 +170,49 @@ class Repository(ABC):  # noqa: B024
            - `psycopg2`, by default, returns these types as plain strings.
 
         Important:
-        - Given that the service layer and its domain models are the future, we want to keep the default behavior of asyncpg
-        and install/remove casters as needed for psycopg2.
+        - Given that the service layer and its domain models are the future, we want to keep the default behavior of asyncpg.
+        The psycopg2 connection shared with django executes the statements with cursors that have the type casters
+        installed, while the cursors of django keep the default behavior. See maasserver.sqlalchemy.ServiceLayerCursor.
         - If you have to use `register_adapter`, do so in maasserver/djangosettings/__init__.py as
           it applies globally to all connections.
         """
+        loaders = self.context.loaders
+        if loaders is not None and not isinstance(stmt, Select):
+            # The statement might change the loaded items.
+            loaders.clear()
         connection = self.context.get_connection()
         if isinstance(connection, Connection):
-            # This is a psycopg2 connection handled by django, attach the casters so that psycopg2 ends up with the same
-            # behavior of asyncpg.
-            try:
-                psycopg2.extras.register_default_jsonb(
-                    conn_or_curs=connection.connection.dbapi_connection  # type: ignore
-                )
-                cidr = psycopg2.extensions.new_type((650,), "CIDR", cast_cidr)
-                inet = psycopg2.extensions.new_type((869,), "INET", cast_ip)
-                psycopg2.extensions.register_type(
-                    cidr,
-                    connection.connection.dbapi_connection,  # type: ignore
-                )
-                psycopg2.extensions.register_type(
-                    inet,
-                    connection.connection.dbapi_connection,  # type: ignore
-                )
+            return connection.execute(stmt, params)
+        return await connection.execute(stmt, params)
 
-                return connection.execute(stmt)
-            finally:
-                # Give this connection back to django and reset the default jsonb handler
-                # https://github.com/django/django/blob/f609a2da868b2320ecdc0551df3cca360d5b5bc3/django/db/backends/postgresql/base.py#L339
-                psycopg2.extras.register_default_jsonb(
-                    conn_or_curs=connection.connection.dbapi_connection,  # type: ignore
-                    loads=lambda x: x,
-                )
-                # Just return the string as is.
-                cidr = psycopg2.extensions.new_type(
-                    (650,), "CIDR", lambda x, y: x
-                )
-                inet = psycopg2.extensions.new_type(
-                    (869,), "INET", lambda x, y: x
-                )
-                psycopg2.extensions.register_type(
-                    cidr,
-                    connection.connection.dbapi_connection,  # type: ignore
-                )
-                psycopg2.extensions.register_type(
-                    inet,
-                    connection.connection.dbapi_connection,  # type: ignore
-                )
+    async def stream_stmt(self, stmt) -> AsyncIterator[Row[Any]]:
+        """
+        Execute the given SQL statement, yielding the rows as they are fetched from a server-side cursor, so that the
+        memory used doesn't depend on the number of rows.
 
-        else:
-            return await connection.execute(stmt)
+        The rows are fetched all at once with the psycopg2 connections handled by django.
+        """
+        connection = self.context.get_connection()
+        if isinstance(connection, Connection):
+            for row in (await self.execute_stmt(stmt)).all():
+                yield row
+            return
+        result = await connection.stream(
+            stmt.execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        try:
+            async for row in result:
+                yield row
+        finally:
+            await result.close()
 
 
 class ReadOnlyRepository(Repository, Generic[T]):
+    # Whether the models can be built from the rows read by the repository
+    # without validating the fields that the database driver already returns
+    # with the right type. See `TrustedRowAdapter`.
+    trusted_rows = False
+
     def __init__(self, context: Context):
         super().__init__(context)
         self.mapper = self.get_mapper()
@@ -168,14 +234,32 @@ class ReadOnlyRepository(Repository, Generic[T]):
         """
         return DefaultDomainDataMapper(self.get_repository_table())
 
+    def build_model(self, values: Mapping[str, Any]) -> T:
+        """
+        Build the domain model from the values of a row read from the database.
+        """
+        if self.trusted_rows:
+            return get_trusted_row_adapter(self.get_model_factory())(values)
+        return self.get_model_factory()(**values)
+
     def select_all_statement(self) -> Select[Any]:
         return select(self.get_repository_table()).select_from(
             self.get_repository_table()
         )
 
+    def _select_all(self) -> Select[Any]:
+        """Return the statement from `select_all_statement`, built only
+        once."""
+        return self.get_statement_template(
+            "select_all", self.select_all_statement
+        )
+
     async def exists(self, query: QuerySpec) -> bool:
-        exists_stmt = select(self.get_repository_table().c.id).select_from(
-            self.get_repository_table()
+        exists_stmt = self.get_statement_template(
+            "select_ids",
+            lambda: select(self.get_repository_table().c.id).select_from(
+                self.get_repository_table()
+            ),
         )
         exists_stmt = query.enrich_stmt(exists_stmt).exists()
         stmt = select(exists_stmt)
@@ -185,9 +269,48 @@ class ReadOnlyRepository(Repository, Generic[T]):
         return await self._get(query)
 
     async def get_by_id(self, id: int) -> T | None:
-        return await self.get_one(
-            QuerySpec(where=Clause(eq(self.get_repository_table().c.id, id)))
+        if (loader := self._get_loader()) is not None:
+            return await loader.load(id)
+        stmt = self.get_statement_template(
+            "get_by_id",
+            lambda: self.select_all_statement().where(
+                eq(self.get_repository_table().c.id, bindparam("id"))
+            ),
         )
+        row = (await self.execute_stmt(stmt, {"id": id})).one_or_none()
+        return self.build_model(row._asdict()) if row is not None else None
+
+    async def get_by_ids(self, ids: Sequence[int]) -> List[T]:
+        """
+        Return the items with the given ids, in the same order. The ids of the items that don't exist are skipped.
+        """
+        if (loader := self._get_loader()) is not None:
+            items = await loader.load_many(ids)
+        else:
+            items_by_id = {
+                item.id: item for item in await self._get_by_ids(list(ids))
+            }
+            items = [items_by_id.get(id) for id in ids]
+        return [item for item in items if item is not None]
+
+    def _get_loader(self) -> BatchLoader[T] | None:
+        """Return the batching loader of the context for this repository, if
+        the context has them enabled."""
+        if self.context.loaders is None:
+            return None
+        return self.context.loaders.get(type(self), self._get_by_ids)
+
+    async def _get_by_ids(self, ids: list[int]) -> List[T]:
+        def build() -> Select[Any]:
+            id_column = self.get_repository_table().c.id
+            ids_param = bindparam("ids", type_=ARRAY(id_column.type))
+            return self.select_all_statement().where(
+                eq(id_column, any_(ids_param))
+            )
+
+        stmt = self.get_statement_template("get_by_ids", build)
+        result = (await self.execute_stmt(stmt, {"ids": ids})).all()
+        return [self.build_model(row._asdict()) for row in result]
 
     async def get_one(self, query: QuerySpec) -> T | None:
         results = await self._get(query)
@@ -201,11 +324,11 @@ class ReadOnlyRepository(Repository, Generic[T]):
         return None
 
     async def _get(self, query: QuerySpec) -> List[T]:
-        stmt = self.select_all_statement()
+        stmt = self._select_all()
         stmt = query.enrich_stmt(stmt)
 
         result = (await self.execute_stmt(stmt)).all()
-        return [self.get_model_factory()(**row._asdict()) for row in result]
+        return [self.build_model(row._asdict()) for row in result]
 
     async def list(
         self, page: int, size: int, query: QuerySpec | None = None
@@ -218,7 +341,7 @@ class ReadOnlyRepository(Repository, Generic[T]):
         total = (await self.execute_stmt(total_stmt)).scalar_one()
 
         stmt = (
-            self.select_all_statement()
+            self._select_all()
             .order_by(desc(self.get_repository_table().c.id))
             .offset((page - 1) * size)
             .limit(size)
@@ -228,24 +351,107 @@ class ReadOnlyRepository(Repository, Generic[T]):
 
         result = (await self.execute_stmt(stmt)).all()
         return ListResult[T](
-            items=[
-                self.get_model_factory()(**row._asdict()) for row in result
-            ],
+            items=[self.build_model(row._asdict()) for row in result],
             total=total,
         )
 
+    async def stream(self, query: QuerySpec | None = None) -> AsyncIterator[T]:
+        """Yield all the items by id, in descending order, as they are read
+        from the database."""
+        stmt = self._select_all().order_by(
+            desc(self.get_repository_table().c.id)
+        )
+        if query:
+            stmt = query.enrich_stmt(stmt)
+        async for row in self.stream_stmt(stmt):
+            yield self.build_model(row._asdict())
+
+    def get_source_tables(self, query: QuerySpec | None = None) -> set[str]:
+        """
+        Return the names of the tables that are read to list the items matching `query`.
+        """
+        stmt = self._select_all()
+        if query:
+            stmt = query.enrich_stmt(stmt)
+        return {
+            table.name
+            for table in find_tables(stmt)
+            if isinstance(table, Table)
+        }
+
+    async def list_by_token(
+        self,
+        token: str | None,
+        size: int,
+        query: QuerySpec | None = None,
+        count: ListCount = ListCount.NONE,
+    ) -> TokenListResult[T]:
+        """List the items by id, in descending order, starting after the
+        item encoded in `token`.
+
+        Unlike `list`, the cost of getting a page doesn't depend on how deep
+        the page is, and the items are only counted if `count` asks for it.
+        """
+        id_column = self.get_repository_table().c.id
+        stmt = self._select_all()
+        if query:
+            stmt = QuerySpec(where=query.where).enrich_stmt(stmt)
+        total, total_is_estimate = await self._count(stmt, query, count)
+
+        if token is not None:
+            stmt = stmt.where(lt(id_column, decode_list_token(token)))
+        # Get one more item to know whether there is a next page.
+        stmt = stmt.order_by(desc(id_column)).limit(size + 1)
+        result = (await self.execute_stmt(stmt)).all()
+        items = [self.build_model(row._asdict()) for row in result[:size]]
+        next_token = None
+        if len(result) > size:
+            next_token = encode_list_token(items[-1].id)
+        return TokenListResult[T](
+            items=items,
+            next_token=next_token,
+            total=total,
+            total_is_estimate=total_is_estimate,
+        )
+
+    async def _count(
+        self, stmt: Select[Any], query: QuerySpec | None, mode: ListCount
+    ) -> tuple[int | None, bool | None]:
+        """Count the items selected by `stmt`, and tell whether the count is
+        an estimate rather than the exact number."""
+        capped = False
+        match mode:
+            case ListCount.NONE:
+                return None, None
+            case ListCount.ESTIMATE if (
+                query is None or query.where is None
+            ) and stmt.whereclause is None:
+                table = self.get_repository_table()
+                estimate_stmt = text(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = CAST(:name AS regclass)"
+                ).bindparams(name=table.name)
+                estimate = (await self.execute_stmt(estimate_stmt)).scalar()
+                # The table has never been analyzed if it's negative.
+                if estimate is not None and estimate >= 0:
+                    return estimate, True
+                stmt = stmt.limit(ESTIMATED_COUNT_CAP)
+                capped = True
+            case ListCount.ESTIMATE:
+                stmt = stmt.limit(ESTIMATED_COUNT_CAP)
+                capped = True
+        total_stmt = select(count()).select_from(stmt.subquery())
+        total = (await self.execute_stmt(total_stmt)).scalar_one()
+        # There might be more items than the capped count.
+        return total, capped and total >= ESTIMATED_COUNT_CAP
+
 
 class BaseRepository(ReadOnlyRepository[T], Generic[T]):
     def __init__(self, context: Context):
         super().__init__(context)
 
     async def create(self, builder: ResourceBuilder) -> T:
-        resource = self.mapper.build_resource(builder)
-        if self.has_timestamped_fields:
-            # Populate the fields only if the caller did not set them.
-            now = utcnow()
-            resource["created"] = resource.get("created", now)
-            resource["updated"] = resource.get("updated", now)
+        resource = self._build_create_resource(builder)
         stmt = (
             insert(self.get_repository_table())
             .returning(self.get_repository_table())
@@ -253,18 +459,180 @@ class BaseRepository(ReadOnlyRepository[T], Generic[T]):
         )
         try:
             result = (await self.execute_stmt(stmt)).one()
-            return self.get_model_factory()(**result._asdict())
+            return self.build_model(result._asdict())
         except IntegrityError:
             self._raise_already_existing_exception()
 
+    async def create_many(
+        self, builders: Sequence[ResourceBuilder]
+    ) -> List[T]:
+        """Create the resources with multi-row INSERT statements.
+
+        The created resources are returned in the same order as the
+        builders.
+        """
+        resources = [
+            self._build_create_resource(builder) for builder in builders
+        ]
+        stmt = insert(self.get_repository_table()).returning(
+            self.get_repository_table(), sort_by_parameter_order=True
+        )
+
+        async def execute_batch(
+            columns: Sequence[str], values: list[dict[str, Any]]
+        ) -> Sequence[Row]:
+            return (await self.execute_stmt(stmt, values)).all()
+
+        try:
+            rows = await self._execute_many(execute_batch, resources)
+        except IntegrityError:
+            self._raise_already_existing_exception()
+        return [self.build_model(row._asdict()) for row in rows]
+
+    async def upsert_many(
+        self,
+        builders: Sequence[ResourceBuilder],
+        conflict_columns: Sequence[Column],
+    ) -> List[T]:
+        """Create the resources, or update the existing ones that conflict
+        with them on `conflict_columns`, with multi-row INSERT ... ON
+        CONFLICT statements.
+
+        A row can't be updated twice by the same statement, so if more
+        builders conflict with each other only the last one is used. The
+        resources are returned in the order of the builders that were used.
+        """
+        table = self.get_repository_table()
+        conflict_names = [
+            conflict_column.name for conflict_column in conflict_columns
+        ]
+        unique_resources = {}
+        for builder in builders:
+            resource = self._build_create_resource(builder)
+            if any(name not in resource for name in conflict_names):
+                raise ValueError(
+                    f"The conflict columns {conflict_names} must be set."
+                )
+            key = tuple(resource[name] for name in conflict_names)
+            # Keep the position of the last builder.
+            unique_resources.pop(key, None)
+            unique_resources[key] = resource
+        resources = list(unique_resources.values())
+
+        async def execute_batch(
+            columns: Sequence[str], values: list[dict[str, Any]]
+        ) -> Sequence[Row]:
+            # SQLAlchemy sorts the rows returned by parameter order using the
+            # primary keys, which the existing rows don't get in that order.
+            # The rows are numbered instead, and the database matches the
+            # upserted rows with them on the conflict columns, comparing the
+            # values as the unique index does.
+            input_values = select(
+                values_clause(
+                    *(column(name, table.c[name].type) for name in columns),
+                    column("ordinal", Integer),
+                    name="input_values",
+                ).data(
+                    [
+                        (*(row[name] for name in columns), ordinal)
+                        for ordinal, row in enumerate(values)
+                    ]
+                )
+            ).cte("input_values")
+            input_columns = {
+                name: cast(input_values.c[name], table.c[name].type)
+                for name in columns
+            }
+            stmt = pg_insert(table).from_select(
+                columns, select(*input_columns.values())
+            )
+            updated_columns = [
+                name
+                for name in columns
+                if name not in conflict_names and name != "created"
+            ]
+            # If there is nothing else to update, the conflict columns are
+            # set to the same value, so that the existing rows are returned.
+            upserted = (
+                stmt.on_conflict_do_update(
+                    index_elements=conflict_columns,
+                    set_={
+                        name: stmt.excluded[name]
+                        for name in updated_columns or conflict_names
+                    },
+                )
+                .returning(*table.c)
+                .cte("upserted")
+            )
+            query = (
+                select(*upserted.c)
+                .join(
+                    input_values,
+                    and_(
+                        *(
+                            upserted.c[name] == input_columns[name]
+                            for name in conflict_names
+                        )
+                    ),
+                )
+                .order_by(input_values.c.ordinal)
+            )
+            return (await self.execute_stmt(query)).all()
+
+        try:
+            return [
+                self.build_model(row._asdict())
+                for row in await self._execute_many(execute_batch, resources)
+            ]
+        except IntegrityError:
+            self._raise_already_existing_exception()
+
+    def _build_create_resource(
+        self, builder: ResourceBuilder
+    ) -> CreateOrUpdateResource:
+        resource = self.mapper.build_resource(builder)
+        if self.has_timestamped_fields:
+            # Populate the fields only if the caller did not set them.
+            now = utcnow()
+            resource["created"] = resource.get("created", now)
+            resource["updated"] = resource.get("updated", now)
+        return resource
+
+    async def _execute_many(
+        self,
+        execute_batch: Callable[
+            [Sequence[str], list[dict[str, Any]]], Awaitable[Sequence[Row]]
+        ],
+        resources: Sequence[CreateOrUpdateResource],
+    ) -> List[Row]:
+        """Insert the resources in batches of multi-row statements.
+
+        A multi-row VALUES clause needs the same columns for all the rows, so
+        the resources are grouped by the columns they set, and
+        `execute_batch` is called with the columns and the values of each
+        batch. It must return the rows in the order of the values.
+        """
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for index, resource in enumerate(resources):
+            groups.setdefault(tuple(sorted(resource)), []).append(index)
+
+        rows: list[Row | None] = [None] * len(resources)
+        for columns, indexes in groups.items():
+            # Leave room for a parameter to number the rows.
+            batch_size = max(1, MAX_BIND_PARAMETERS // (len(columns) + 1))
+            for start in range(0, len(indexes), batch_size):
+                batch = indexes[start : start + batch_size]
+                values = [resources[index].get_values() for index in batch]
+                batch_rows = await execute_batch(columns, values)
+                for index, row in zip(batch, batch_rows, strict=True):
+                    rows[index] = row
+        return rows  # pyright: ignore [reportReturnType]
+
     async def update_many(
         self, query: QuerySpec, builder: ResourceBuilder
     ) -> List[T]:
         updated_resources = await self._update(query, builder)
-        return [
-            self.get_model_factory()(**row._asdict())
-            for row in updated_resources
-        ]
+        return [self.build_model(row._asdict()) for row in updated_resources]
 
     async def update_by_id(self, id: int, builder: ResourceBuilder) -> T:
         return await self.update_one(
@@ -282,7 +650,7 @@ class BaseRepository(ReadOnlyRepository[T], Generic[T]):
             self._raise_not_found_exception()
         if len(updated_resources) > 1:
             raise MultipleResultsException()
-        return self.get_model_factory()(**updated_resources[0]._asdict())
+        return self.build_model(updated_resources[0]._asdict())
 
     async def _update(
         self, query: QuerySpec, builder: ResourceBuilder
@@ -334,7 +702,7 @@ class BaseRepository(ReadOnlyRepository[T], Generic[T]):
         )
         stmt = query.enrich_stmt(stmt)
         results = (await self.execute_stmt(stmt)).all()
-        return [self.get_model_factory()(**row._asdict()) for row in results]
+        return [self.build_model(row._asdict()) for row in results]
 
     def _raise_already_existing_exception(self):
         raise AlreadyExistsException(
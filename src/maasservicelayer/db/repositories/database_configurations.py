@@ -1,7 +1,7 @@
 # Copyright 2025 Canonical Ltd.  This software is licensed under the
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.sql.operators import eq
 
@@ -26,14 +26,15 @@ class DatabaseConfigurationsClauseFactory(ClauseFactory):
 
 class DatabaseConfigurationsRepository(Repository):
     async def get(self, name: str) -> DatabaseConfiguration | None:
-        stmt = (
-            select(
+        stmt = self.get_statement_template(
+            "get",
+            lambda: select(
                 "*",
             )
             .select_from(ConfigTable)
-            .where(eq(ConfigTable.c.name, name))
+            .where(eq(ConfigTable.c.name, bindparam("name"))),
         )
-        result = (await self.execute_stmt(stmt)).one_or_none()
+        result = (await self.execute_stmt(stmt, {"name": name})).one_or_none()
         if result is None:
             return None
         return DatabaseConfiguration(**result._asdict())
@@ -46,6 +47,14 @@ class DatabaseConfigurationsRepository(Repository):
         result = (await self.execute_stmt(stmt)).all()
         return [DatabaseConfiguration(**row._asdict()) for row in result]
 
+    async def is_transaction_visible(self, txid: int) -> bool:
+        """Whether the changes committed by the transaction `txid` are visible
+        to the current transaction."""
+        stmt = select(
+            func.txid_visible_in_snapshot(txid, func.txid_current_snapshot())
+        )
+        return (await self.execute_stmt(stmt)).scalar_one()
+
     async def create_or_update(
         self, builder: DatabaseConfigurationBuilder
     ) -> DatabaseConfiguration:
@@ -92,6 +92,8 @@ class EventTypesRepository(BaseRepository[EventType]):
 
 
 class EventsRepository(BaseRepository[Event]):
+    trusted_rows = True
+
     def get_repository_table(self) -> Table:
         return EventTable
 
@@ -57,6 +57,8 @@ def build_interface_links(
 
 
 class InterfaceRepository(BaseRepository):
+    trusted_rows = True
+
     def get_repository_table(self) -> Table:
         return InterfaceTable
 
@@ -97,7 +99,7 @@ class InterfaceRepository(BaseRepository):
         await self._find_discovered_ip_for_dhcp_links(interfaces, node_id)
 
         return ListResult[Interface](
-            items=[Interface(**iface) for iface in interfaces],  # pyright: ignore [reportArgumentType]
+            items=[self.build_model(iface) for iface in interfaces],
             total=total,
         )
 
@@ -108,10 +110,8 @@ class InterfaceRepository(BaseRepository):
 
         result = (await self.execute_stmt(stmt)).all()
         return [
-            Interface(**data)  # pyright: ignore [reportArgumentType]
-            for data in [
-                build_interface_links(row._asdict()) for row in result
-            ]
+            self.build_model(build_interface_links(row._asdict()))
+            for row in result
         ]
 
     async def get_interfaces_in_fabric(
@@ -133,10 +133,8 @@ class InterfaceRepository(BaseRepository):
 
         result = (await self.execute_stmt(stmt)).all()
         return [
-            Interface(**data)  # pyright: ignore [reportArgumentType]
-            for data in [
-                build_interface_links(row._asdict()) for row in result
-            ]
+            self.build_model(build_interface_links(row._asdict()))
+            for row in result
         ]
 
     async def add_ip(self, interface: Interface, ip_id: int) -> None:
@@ -193,7 +191,9 @@ class InterfaceRepository(BaseRepository):
             eq(InterfaceTable.c.id, result[0])
         )
         created_instance = (await self.execute_stmt(get_instance)).one()
-        return Interface(**build_interface_links(created_instance._asdict()))  # pyright: ignore [reportArgumentType]
+        return self.build_model(
+            build_interface_links(created_instance._asdict())
+        )
 
     async def _find_discovered_ip_for_dhcp_links(
         self, interfaces, node_id
@@ -115,7 +115,7 @@ class MachinesRepository(AbstractNodesRepository[Machine]):
         total = (await self.execute_stmt(total_stmt)).scalar_one()
 
         stmt = (
-            self.select_all_statement()
+            self._select_all()
             .order_by(desc(self.get_repository_table().c.id))
             .offset((page - 1) * size)
             .limit(size)
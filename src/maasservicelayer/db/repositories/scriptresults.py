@@ -63,6 +63,8 @@ class ScriptResultClauseFactory(ClauseFactory):
 
 
 class ScriptResultsRepository(BaseRepository[ScriptResult]):
+    trusted_rows = True
+
     def get_repository_table(self) -> Table:
         return ScriptResultTable
 
@@ -4,7 +4,7 @@
 import datetime
 from typing import Any
 
-from sqlalchemy import delete, select
+from sqlalchemy import bindparam, delete, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql.operators import eq
 
@@ -26,12 +26,13 @@ class SecretsRepository(Repository):
         await self.execute_stmt(upsert_stmt)
 
     async def get(self, path: str) -> Secret | None:
-        stmt = (
-            select("*")
+        stmt = self.get_statement_template(
+            "get",
+            lambda: select("*")
             .select_from(SecretTable)
-            .where(eq(SecretTable.c.path, path))
+            .where(eq(SecretTable.c.path, bindparam("path"))),
         )
-        result = (await self.execute_stmt(stmt)).one_or_none()
+        result = (await self.execute_stmt(stmt, {"path": path})).one_or_none()
         return Secret(**result._asdict()) if result else None
 
     async def delete(self, path: str) -> None:
@@ -92,6 +92,8 @@ class StaticIPAddressClauseFactory(ClauseFactory):
 
 
 class StaticIPAddressRepository(BaseRepository):
+    trusted_rows = True
+
     def get_repository_table(self) -> Table:
         return StaticIPAddressTable
 
@@ -115,7 +117,7 @@ class StaticIPAddressRepository(BaseRepository):
         ).returning(StaticIPAddressTable)
 
         result = (await self.execute_stmt(upsert_stmt)).one()
-        return StaticIPAddress(**result._asdict())
+        return self.build_model(result._asdict())
 
     async def get_discovered_ips_in_family_for_interfaces(
         self,
@@ -157,7 +159,7 @@ class StaticIPAddressRepository(BaseRepository):
             )
         ).all()
 
-        return [StaticIPAddress(**row._asdict()) for row in result]
+        return [self.build_model(row._asdict()) for row in result]
 
     async def get_for_interfaces(
         self, interface_ids: list[int]
@@ -175,7 +177,7 @@ class StaticIPAddressRepository(BaseRepository):
 
         result = (await self.execute_stmt(stmt)).all()
 
-        return [StaticIPAddress(**row._asdict()) for row in result]
+        return [self.build_model(row._asdict()) for row in result]
 
     async def get_for_nodes(self, query: QuerySpec) -> list[StaticIPAddress]:
         stmt = (
@@ -207,7 +209,7 @@ class StaticIPAddressRepository(BaseRepository):
         )
         stmt = query.enrich_stmt(stmt)
         results = (await self.execute_stmt(stmt)).all()
-        return [StaticIPAddress(**row._asdict()) for row in results]
+        return [self.build_model(row._asdict()) for row in results]
 
     async def get_mac_addresses(self, query: QuerySpec) -> list[MacAddress]:
         stmt = (
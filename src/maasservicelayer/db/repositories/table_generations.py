@@ -0,0 +1,30 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+from sqlalchemy import func, select
+
+from maasservicelayer.db.repositories.base import Repository
+from maasservicelayer.db.tables import TableGenerationTable
+
+
+class TableGenerationsRepository(Repository):
+    async def get_generations(self, table_names: set[str]) -> dict[str, int]:
+        """Return the generations of the given tables, by name.
+
+        The generation of a table changes with every transaction that
+        changes the table.
+        The tables that are not tracked are left out.
+        """
+        stmt = (
+            select(
+                TableGenerationTable.c.table_name,
+                func.sum(TableGenerationTable.c.generation),
+            )
+            .select_from(TableGenerationTable)
+            .where(TableGenerationTable.c.table_name.in_(table_names))
+            .group_by(TableGenerationTable.c.table_name)
+        )
+        result = (await self.execute_stmt(stmt)).all()
+        return {
+            table_name: int(generation) for table_name, generation in result
+        }
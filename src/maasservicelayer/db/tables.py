@@ -1631,6 +1631,14 @@ UISubnetView = Table(
     Column("space_name", String(256), nullable=True),
 )
 
+TableGenerationTable = Table(
+    "maasserver_tablegeneration",
+    METADATA,
+    Column("table_name", Text, primary_key=True),
+    Column("txid", BigInteger, primary_key=True),
+    Column("generation", BigInteger, nullable=False),
+)
+
 TagTable = Table(
     "maasserver_tag",
     METADATA,
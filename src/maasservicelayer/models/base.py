@@ -3,6 +3,7 @@
 
 from dataclasses import dataclass
 from datetime import datetime
+from enum import Enum
 import hashlib
 from typing import Any, Generic, Sequence, TypeVar
 
@@ -27,6 +28,32 @@ class ListResult(Generic[T]):
         return bool(self.total) and page * size < self.total
 
 
+class ListCount(str, Enum):
+    """How to count the items matching a token-paginated list query."""
+
+    # Count all the matching items.
+    EXACT = "exact"
+    # Use the planner statistics when there is no filter, otherwise count up
+    # to a limited number of items.
+    ESTIMATE = "estimate"
+    # Don't count the items.
+    NONE = "none"
+
+
+@dataclass
+class TokenListResult(Generic[T]):
+    """
+    Encapsulates the result of a token-paginated list. `next_token` is the token to get the next page with, if there is
+    one, and `total` is the number of items that matched the query, if they were counted. `total_is_estimate` tells
+    whether `total` is an estimate, taken from the planner statistics or capped, rather than the exact number.
+    """
+
+    items: Sequence[T]
+    next_token: str | None
+    total: int | None = None
+    total_is_estimate: bool | None = None
+
+
 class MaasBaseModel(BaseModel):
     id: int
 
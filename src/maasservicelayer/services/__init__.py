@@ -1,7 +1,7 @@
 # Copyright 2024-2025 Canonical Ltd.  This software is licensed under the
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
-from typing import Callable, Self
+from typing import Any, Callable, Self
 
 from maasservicelayer.context import Context
 from maasservicelayer.db.repositories.bootsourcecache import (
@@ -73,6 +73,9 @@ from maasservicelayer.db.repositories.subnet_utilization import (
     SubnetUtilizationRepository,
 )
 from maasservicelayer.db.repositories.subnets import SubnetsRepository
+from maasservicelayer.db.repositories.table_generations import (
+    TableGenerationsRepository,
+)
 from maasservicelayer.db.repositories.tags import TagsRepository
 from maasservicelayer.db.repositories.tokens import TokensRepository
 from maasservicelayer.db.repositories.ui_subnets import UISubnetsRepository
@@ -82,7 +85,7 @@ from maasservicelayer.db.repositories.vmcluster import VmClustersRepository
 from maasservicelayer.db.repositories.zones import ZonesRepository
 from maasservicelayer.services.agents import AgentsService
 from maasservicelayer.services.auth import AuthService
-from maasservicelayer.services.base import ServiceCache
+from maasservicelayer.services.base import Service, ServiceCache
 from maasservicelayer.services.boot_sources import BootSourcesService
 from maasservicelayer.services.bootsourcecache import BootSourceCacheService
 from maasservicelayer.services.bootsourceselections import (
@@ -142,6 +145,7 @@ from maasservicelayer.services.subnet_utilization import (
     V3SubnetUtilizationService,
 )
 from maasservicelayer.services.subnets import SubnetsService
+from maasservicelayer.services.table_generations import TableGenerationsService
 from maasservicelayer.services.tags import TagsService
 from maasservicelayer.services.temporal import TemporalService
 from maasservicelayer.services.tokens import TokensService
@@ -176,7 +180,11 @@ class CacheForServices:
 
 
 class ServiceCollectionV3:
-    """Provide all v3 services."""
+    """Provide all v3 services.
+
+    The services are built the first time they're accessed, together with the services they depend on, so that a
+    request only pays for the services it uses.
+    """
 
     # Keep them in alphabetical order, please
     agents: AgentsService
@@ -221,6 +229,7 @@ class ServiceCollectionV3:
     staticipaddress: StaticIPAddressService
     staticroutes: StaticRoutesService
     subnets: SubnetsService
+    table_generations: TableGenerationsService
     tags: TagsService
     temporal: TemporalService
     tokens: TokensService
@@ -232,319 +241,444 @@ class ServiceCollectionV3:
     ui_subnets: UISubnetsService
     zones: ZonesService
 
+    def __init__(self, context: Context, cache: CacheForServices):
+        self._context = context
+        self._cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for the services that haven't been built yet.
+        builder = getattr(type(self), f"_build_{name}", None)
+        if builder is None:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        service = builder(self)
+        setattr(self, name, service)
+        return service
+
     @classmethod
     async def produce(
         cls,
         context: Context,
         cache: CacheForServices,
     ) -> Self:
-        services = cls()
-        services.ui_subnets = UISubnetsService(
-            context=context, ui_subnets_repository=UISubnetsRepository(context)
+        services = cls(context, cache)
+        # The secrets backend is detected once per process, so that the
+        # secrets service can be built synchronously when it's needed.
+        await SecretsServiceFactory.detect(services.database_configurations)
+        return services
+
+    def _get_cache(self, service_class: type[Service]) -> Any:
+        return self._cache.get(
+            service_class.__name__, service_class.build_cache_object
+        )
+
+    def _build_secrets(self) -> SecretsService:
+        return SecretsServiceFactory.build(
+            context=self._context,
+            cache=self._get_cache(SecretsService),
+        )
+
+    def _build_agents(self) -> AgentsService:
+        return AgentsService(
+            context=self._context,
+            configurations_service=self.configurations,
+            users_service=self.users,
+            cache=self._get_cache(AgentsService),
+        )
+
+    def _build_auth(self) -> AuthService:
+        return AuthService(
+            context=self._context,
+            secrets_service=self.secrets,
+            users_service=self.users,
+        )
+
+    def _build_boot_source_cache(self) -> BootSourceCacheService:
+        return BootSourceCacheService(
+            context=self._context,
+            repository=BootSourceCacheRepository(self._context),
         )
-        services.events = EventsService(
-            context=context,
-            events_repository=EventsRepository(context),
-            eventtypes_repository=EventTypesRepository(context),
+
+    def _build_boot_source_selections(self) -> BootSourceSelectionsService:
+        return BootSourceSelectionsService(
+            context=self._context,
+            repository=BootSourceSelectionsRepository(self._context),
+            boot_source_cache_service=self.boot_source_cache,
+        )
+
+    def _build_boot_sources(self) -> BootSourcesService:
+        return BootSourcesService(
+            context=self._context,
+            repository=BootSourcesRepository(self._context),
+            boot_source_cache_service=self.boot_source_cache,
+            boot_source_selections_service=self.boot_source_selections,
+            configuration_service=self.configurations,
+        )
+
+    def _build_configurations(self) -> ConfigurationsService:
+        return ConfigurationsService(
+            context=self._context,
+            database_configurations_service=self.database_configurations,
+            secrets_service=self.secrets,
+            events_service=self.events,
+            cache=self._get_cache(ConfigurationsService),
+        )
+
+    def _build_consumers(self) -> ConsumersService:
+        return ConsumersService(
+            context=self._context,
+            repository=ConsumersRepository(self._context),
+            tokens_service=self.tokens,
         )
-        services.database_configurations = DatabaseConfigurationsService(
-            context=context,
+
+    def _build_database_configurations(self) -> DatabaseConfigurationsService:
+        return DatabaseConfigurationsService(
+            context=self._context,
             database_configurations_repository=DatabaseConfigurationsRepository(
-                context
+                self._context
             ),
         )
-        services.service_status = ServiceStatusService(
-            context=context,
-            service_status_repository=ServiceStatusRepository(context),
-        )
-        services.secrets = await SecretsServiceFactory.produce(
-            context=context,
-            database_configurations_service=services.database_configurations,
-            cache=cache.get(
-                SecretsService.__name__, SecretsService.build_cache_object
-            ),  # type: ignore
-        )
-        services.configurations = ConfigurationsService(
-            context=context,
-            database_configurations_service=services.database_configurations,
-            secrets_service=services.secrets,
-            events_service=services.events,
-        )
-        services.temporal = TemporalService(
-            context=context,
-            cache=cache.get(
-                TemporalService.__name__, TemporalService.build_cache_object
-            ),
+
+    def _build_dhcpsnippets(self) -> DhcpSnippetsService:
+        return DhcpSnippetsService(
+            context=self._context,
+            dhcpsnippets_repository=DhcpSnippetsRepository(self._context),
+        )
+
+    def _build_discoveries(self) -> DiscoveriesService:
+        return DiscoveriesService(
+            context=self._context,
+            discoveries_repository=DiscoveriesRepository(self._context),
+            mdns_service=self.mdns,
+            rdns_service=self.rdns,
+            neighbours_service=self.neighbours,
+        )
+
+    def _build_dnsdata(self) -> DNSDataService:
+        return DNSDataService(
+            context=self._context,
+            dnspublications_service=self.dnspublications,
+            domains_service=self.domains,
+            dnsresources_service=self.dnsresources,
+            dnsdata_repository=DNSDataRepository(self._context),
         )
-        services.tags = TagsService(
-            context=context,
-            repository=TagsRepository(context),
-            events_service=services.events,
-            temporal_service=services.temporal,
-        )
-        services.scriptresults = ScriptResultsService(
-            context=context,
-            scriptresults_repository=ScriptResultsRepository(context),
-        )
-        services.nodes = NodesService(
-            context=context,
-            secrets_service=services.secrets,
-            events_service=services.events,
-            scriptresults_service=services.scriptresults,
-            nodes_repository=NodesRepository(context),
-        )
-        services.vmclusters = VmClustersService(
-            context=context, vmcluster_repository=VmClustersRepository(context)
-        )
-        services.zones = ZonesService(
-            context=context,
-            nodes_service=services.nodes,
-            vmcluster_service=services.vmclusters,
-            zones_repository=ZonesRepository(context),
-            cache=cache.get(
-                ZonesService.__name__, ZonesService.build_cache_object
-            ),  # type: ignore
-        )
-        services.resource_pools = ResourcePoolsService(
-            context=context,
-            resource_pools_repository=ResourcePoolRepository(context),
-        )
-        services.machines = MachinesService(
-            context=context,
-            secrets_service=services.secrets,
-            events_service=services.events,
-            scriptresults_service=services.scriptresults,
-            machines_repository=MachinesRepository(context),
-        )
-        services.machines_v2 = MachinesV2Service(context=context)
-        services.dnspublications = DNSPublicationsService(
-            context=context,
-            temporal_service=services.temporal,
-            dnspublication_repository=DNSPublicationRepository(context),
-        )
-        services.staticipaddress = StaticIPAddressService(
-            context=context,
-            temporal_service=services.temporal,
-            staticipaddress_repository=StaticIPAddressRepository(context),
-        )
-        services.dhcpsnippets = DhcpSnippetsService(
-            context=context,
-            dhcpsnippets_repository=DhcpSnippetsRepository(context),
-        )
-        services.ipranges = IPRangesService(
-            context=context,
-            temporal_service=services.temporal,
-            dhcpsnippets_service=services.dhcpsnippets,
-            ipranges_repository=IPRangesRepository(context),
-        )
-        services.sshkeys = SshKeysService(
-            context=context,
-            sshkeys_repository=SshKeysRepository(context),
-            cache=cache.get(
-                SshKeysService.__name__, SshKeysService.build_cache_object
-            ),  # type: ignore
-        )
-        services.sslkeys = SSLKeysService(
-            context=context,
-            sslkey_repository=SSLKeysRepository(context),
-        )
-        services.notifications = NotificationsService(
-            context=context, repository=NotificationsRepository(context)
-        )
-        services.filestorage = FileStorageService(
-            context=context, repository=FileStorageRepository(context)
-        )
-        services.tokens = TokensService(
-            context=context, repository=TokensRepository(context)
-        )
-        services.consumers = ConsumersService(
-            context=context,
-            repository=ConsumersRepository(context),
-            tokens_service=services.tokens,
-        )
-        services.users = UsersService(
-            context=context,
-            users_repository=UsersRepository(context),
-            staticipaddress_service=services.staticipaddress,
-            ipranges_service=services.ipranges,
-            nodes_service=services.nodes,
-            sshkey_service=services.sshkeys,
-            sslkey_service=services.sslkeys,
-            notification_service=services.notifications,
-            filestorage_service=services.filestorage,
-            consumers_service=services.consumers,
-            tokens_service=services.tokens,
-        )
-        services.domains = DomainsService(
-            context=context,
-            configurations_service=services.configurations,
-            dnspublications_service=services.dnspublications,
-            users_service=services.users,
-            domains_repository=DomainsRepository(context),
-        )
-        services.dnsresources = DNSResourcesService(
-            context=context,
-            domains_service=services.domains,
-            dnspublications_service=services.dnspublications,
-            dnsresource_repository=DNSResourceRepository(context),
-        )
-        services.interfaces = InterfacesService(
-            context=context,
-            temporal_service=services.temporal,
-            dnspublication_service=services.dnspublications,
-            dnsresource_service=services.dnsresources,
-            domain_service=services.domains,
-            node_service=services.nodes,
-            interface_repository=InterfaceRepository(context),
-        )
-        services.vlans = VlansService(
-            context=context,
-            temporal_service=services.temporal,
-            nodes_service=services.nodes,
-            vlans_repository=VlansRepository(context),
-        )
-        services.spaces = SpacesService(
-            context=context,
-            vlans_service=services.vlans,
-            spaces_repository=SpacesRepository(context),
-        )
-        services.reservedips = ReservedIPsService(
-            context=context,
-            temporal_service=services.temporal,
-            reservedips_repository=ReservedIPsRepository(context),
-        )
-        services.staticroutes = StaticRoutesService(
-            context=context,
-            staticroutes_repository=StaticRoutesRepository(context),
-        )
-        services.nodegrouptorackcontrollers = NodeGroupToRackControllersService(
-            context=context,
+
+    def _build_dnspublications(self) -> DNSPublicationsService:
+        return DNSPublicationsService(
+            context=self._context,
+            temporal_service=self.temporal,
+            dnspublication_repository=DNSPublicationRepository(self._context),
+        )
+
+    def _build_dnsresources(self) -> DNSResourcesService:
+        return DNSResourcesService(
+            context=self._context,
+            domains_service=self.domains,
+            dnspublications_service=self.dnspublications,
+            dnsresource_repository=DNSResourceRepository(self._context),
+        )
+
+    def _build_domains(self) -> DomainsService:
+        return DomainsService(
+            context=self._context,
+            configurations_service=self.configurations,
+            dnspublications_service=self.dnspublications,
+            users_service=self.users,
+            domains_repository=DomainsRepository(self._context),
+        )
+
+    def _build_events(self) -> EventsService:
+        return EventsService(
+            context=self._context,
+            events_repository=EventsRepository(self._context),
+            eventtypes_repository=EventTypesRepository(self._context),
+        )
+
+    def _build_external_auth(self) -> ExternalAuthService:
+        return ExternalAuthService(
+            context=self._context,
+            secrets_service=self.secrets,
+            users_service=self.users,
+            external_auth_repository=ExternalAuthRepository(self._context),
+            cache=self._get_cache(ExternalAuthService),
+        )
+
+    def _build_fabrics(self) -> FabricsService:
+        return FabricsService(
+            context=self._context,
+            vlans_service=self.vlans,
+            subnets_service=self.subnets,
+            interfaces_service=self.interfaces,
+            fabrics_repository=FabricsRepository(self._context),
+        )
+
+    def _build_filestorage(self) -> FileStorageService:
+        return FileStorageService(
+            context=self._context,
+            repository=FileStorageRepository(self._context),
+        )
+
+    def _build_hooked_configurations(self) -> HookedConfigurationsService:
+        return HookedConfigurationsService(
+            context=self._context,
+            configurations_service=self.configurations,
+            users_service=self.users,
+            vlans_service=self.vlans,
+        )
+
+    def _build_interfaces(self) -> InterfacesService:
+        return InterfacesService(
+            context=self._context,
+            temporal_service=self.temporal,
+            dnspublication_service=self.dnspublications,
+            dnsresource_service=self.dnsresources,
+            domain_service=self.domains,
+            node_service=self.nodes,
+            interface_repository=InterfaceRepository(self._context),
+        )
+
+    def _build_ipranges(self) -> IPRangesService:
+        return IPRangesService(
+            context=self._context,
+            temporal_service=self.temporal,
+            dhcpsnippets_service=self.dhcpsnippets,
+            ipranges_repository=IPRangesRepository(self._context),
+        )
+
+    def _build_leases(self) -> LeasesService:
+        return LeasesService(
+            context=self._context,
+            dnsresource_service=self.dnsresources,
+            node_service=self.nodes,
+            staticipaddress_service=self.staticipaddress,
+            subnet_service=self.subnets,
+            interface_service=self.interfaces,
+            iprange_service=self.ipranges,
+        )
+
+    def _build_machines(self) -> MachinesService:
+        return MachinesService(
+            context=self._context,
+            secrets_service=self.secrets,
+            events_service=self.events,
+            scriptresults_service=self.scriptresults,
+            machines_repository=MachinesRepository(self._context),
+        )
+
+    def _build_machines_v2(self) -> MachinesV2Service:
+        return MachinesV2Service(context=self._context)
+
+    def _build_mdns(self) -> MDNSService:
+        return MDNSService(
+            context=self._context,
+            mdns_repository=MDNSRepository(self._context),
+        )
+
+    def _build_neighbours(self) -> NeighboursService:
+        return NeighboursService(
+            context=self._context,
+            neighbours_repository=NeighboursRepository(self._context),
+        )
+
+    def _build_nodegrouptorackcontrollers(
+        self,
+    ) -> NodeGroupToRackControllersService:
+        return NodeGroupToRackControllersService(
+            context=self._context,
             nodegrouptorackcontrollers_repository=NodeGroupToRackControllersRepository(
-                context
+                self._context
             ),
         )
-        services.subnets = SubnetsService(
-            context=context,
-            temporal_service=services.temporal,
-            staticipaddress_service=services.staticipaddress,
-            ipranges_service=services.ipranges,
-            staticroutes_service=services.staticroutes,
-            reservedips_service=services.reservedips,
-            dhcpsnippets_service=services.dhcpsnippets,
-            dnspublications_service=services.dnspublications,
-            nodegrouptorackcontrollers_service=services.nodegrouptorackcontrollers,
-            subnets_repository=SubnetsRepository(context),
-        )
-        services.dnsdata = DNSDataService(
-            context=context,
-            dnspublications_service=services.dnspublications,
-            domains_service=services.domains,
-            dnsresources_service=services.dnsresources,
-            dnsdata_repository=DNSDataRepository(context),
-        )
-        services.fabrics = FabricsService(
-            context=context,
-            vlans_service=services.vlans,
-            subnets_service=services.subnets,
-            interfaces_service=services.interfaces,
-            fabrics_repository=FabricsRepository(context),
-        )
-        services.leases = LeasesService(
-            context=context,
-            dnsresource_service=services.dnsresources,
-            node_service=services.nodes,
-            staticipaddress_service=services.staticipaddress,
-            subnet_service=services.subnets,
-            interface_service=services.interfaces,
-            iprange_service=services.ipranges,
-        )
-        services.leases = LeasesService(
-            context=context,
-            dnsresource_service=services.dnsresources,
-            node_service=services.nodes,
-            staticipaddress_service=services.staticipaddress,
-            subnet_service=services.subnets,
-            interface_service=services.interfaces,
-            iprange_service=services.ipranges,
-        )
-        services.auth = AuthService(
-            context=context,
-            secrets_service=services.secrets,
-            users_service=services.users,
-        )
-        services.external_auth = ExternalAuthService(
-            context=context,
-            secrets_service=services.secrets,
-            users_service=services.users,
-            external_auth_repository=ExternalAuthRepository(context),
-            cache=cache.get(
-                ExternalAuthService.__name__,
-                ExternalAuthService.build_cache_object,
-            ),  # type: ignore
-        )
-        services.agents = AgentsService(
-            context=context,
-            configurations_service=services.configurations,
-            users_service=services.users,
-            cache=cache.get(
-                AgentsService.__name__, AgentsService.build_cache_object
-            ),  # type: ignore
-        )
-        services.v3dnsrrsets = V3DNSResourceRecordSetsService(
-            context=context,
-            domains_service=services.domains,
-            dnsresource_service=services.dnsresources,
-            dnsdata_service=services.dnsdata,
-            staticipaddress_service=services.staticipaddress,
-            subnets_service=services.subnets,
-        )
-        services.v3subnet_utilization = V3SubnetUtilizationService(
-            context=context,
-            subnets_service=services.subnets,
-            subnet_utilization_repository=SubnetUtilizationRepository(context),
-        )
-        services.mdns = MDNSService(
-            context=context, mdns_repository=MDNSRepository(context)
-        )
-        services.rdns = RDNSService(
-            context=context, rdns_repository=RDNSRepository(context)
-        )
-        services.neighbours = NeighboursService(
-            context=context,
-            neighbours_repository=NeighboursRepository(context),
-        )
-        services.discoveries = DiscoveriesService(
-            context=context,
-            discoveries_repository=DiscoveriesRepository(context),
-            mdns_service=services.mdns,
-            rdns_service=services.rdns,
-            neighbours_service=services.neighbours,
-        )
-        services.package_repositories = PackageRepositoriesService(
-            context=context,
-            repository=PackageRepositoriesRepository(context),
-            events_service=services.events,
-        )
-        services.boot_source_cache = BootSourceCacheService(
-            context=context,
-            repository=BootSourceCacheRepository(context),
-        )
-        services.boot_source_selections = BootSourceSelectionsService(
-            context=context,
-            repository=BootSourceSelectionsRepository(context),
-            boot_source_cache_service=services.boot_source_cache,
-        )
-        services.boot_sources = BootSourcesService(
-            context=context,
-            repository=BootSourcesRepository(context),
-            boot_source_cache_service=services.boot_source_cache,
-            boot_source_selections_service=services.boot_source_selections,
-            configuration_service=services.configurations,
-        )
-        services.hooked_configurations = HookedConfigurationsService(
-            context=context,
-            configurations_service=services.configurations,
-            users_service=services.users,
-            vlans_service=services.vlans,
+
+    def _build_nodes(self) -> NodesService:
+        return NodesService(
+            context=self._context,
+            secrets_service=self.secrets,
+            events_service=self.events,
+            scriptresults_service=self.scriptresults,
+            nodes_repository=NodesRepository(self._context),
+        )
+
+    def _build_notifications(self) -> NotificationsService:
+        return NotificationsService(
+            context=self._context,
+            repository=NotificationsRepository(self._context),
+        )
+
+    def _build_package_repositories(self) -> PackageRepositoriesService:
+        return PackageRepositoriesService(
+            context=self._context,
+            repository=PackageRepositoriesRepository(self._context),
+            events_service=self.events,
+        )
+
+    def _build_rdns(self) -> RDNSService:
+        return RDNSService(
+            context=self._context,
+            rdns_repository=RDNSRepository(self._context),
+        )
+
+    def _build_reservedips(self) -> ReservedIPsService:
+        return ReservedIPsService(
+            context=self._context,
+            temporal_service=self.temporal,
+            reservedips_repository=ReservedIPsRepository(self._context),
+        )
+
+    def _build_resource_pools(self) -> ResourcePoolsService:
+        return ResourcePoolsService(
+            context=self._context,
+            resource_pools_repository=ResourcePoolRepository(self._context),
+        )
+
+    def _build_scriptresults(self) -> ScriptResultsService:
+        return ScriptResultsService(
+            context=self._context,
+            scriptresults_repository=ScriptResultsRepository(self._context),
+        )
+
+    def _build_service_status(self) -> ServiceStatusService:
+        return ServiceStatusService(
+            context=self._context,
+            service_status_repository=ServiceStatusRepository(self._context),
+        )
+
+    def _build_spaces(self) -> SpacesService:
+        return SpacesService(
+            context=self._context,
+            vlans_service=self.vlans,
+            spaces_repository=SpacesRepository(self._context),
+        )
+
+    def _build_sshkeys(self) -> SshKeysService:
+        return SshKeysService(
+            context=self._context,
+            sshkeys_repository=SshKeysRepository(self._context),
+            cache=self._get_cache(SshKeysService),
+        )
+
+    def _build_sslkeys(self) -> SSLKeysService:
+        return SSLKeysService(
+            context=self._context,
+            sslkey_repository=SSLKeysRepository(self._context),
+        )
+
+    def _build_staticipaddress(self) -> StaticIPAddressService:
+        return StaticIPAddressService(
+            context=self._context,
+            temporal_service=self.temporal,
+            staticipaddress_repository=StaticIPAddressRepository(
+                self._context
+            ),
+        )
+
+    def _build_staticroutes(self) -> StaticRoutesService:
+        return StaticRoutesService(
+            context=self._context,
+            staticroutes_repository=StaticRoutesRepository(self._context),
+        )
+
+    def _build_subnets(self) -> SubnetsService:
+        return SubnetsService(
+            context=self._context,
+            temporal_service=self.temporal,
+            staticipaddress_service=self.staticipaddress,
+            ipranges_service=self.ipranges,
+            staticroutes_service=self.staticroutes,
+            reservedips_service=self.reservedips,
+            dhcpsnippets_service=self.dhcpsnippets,
+            dnspublications_service=self.dnspublications,
+            nodegrouptorackcontrollers_service=self.nodegrouptorackcontrollers,
+            subnets_repository=SubnetsRepository(self._context),
+        )
+
+    def _build_table_generations(self) -> TableGenerationsService:
+        return TableGenerationsService(
+            context=self._context,
+            table_generations_repository=TableGenerationsRepository(
+                self._context
+            ),
+        )
+
+    def _build_tags(self) -> TagsService:
+        return TagsService(
+            context=self._context,
+            repository=TagsRepository(self._context),
+            events_service=self.events,
+            temporal_service=self.temporal,
+        )
+
+    def _build_temporal(self) -> TemporalService:
+        return TemporalService(
+            context=self._context,
+            cache=self._get_cache(TemporalService),
+        )
+
+    def _build_tokens(self) -> TokensService:
+        return TokensService(
+            context=self._context, repository=TokensRepository(self._context)
+        )
+
+    def _build_ui_subnets(self) -> UISubnetsService:
+        return UISubnetsService(
+            context=self._context,
+            ui_subnets_repository=UISubnetsRepository(self._context),
+        )
+
+    def _build_users(self) -> UsersService:
+        return UsersService(
+            context=self._context,
+            users_repository=UsersRepository(self._context),
+            staticipaddress_service=self.staticipaddress,
+            ipranges_service=self.ipranges,
+            nodes_service=self.nodes,
+            sshkey_service=self.sshkeys,
+            sslkey_service=self.sslkeys,
+            notification_service=self.notifications,
+            filestorage_service=self.filestorage,
+            consumers_service=self.consumers,
+            tokens_service=self.tokens,
+        )
+
+    def _build_v3dnsrrsets(self) -> V3DNSResourceRecordSetsService:
+        return V3DNSResourceRecordSetsService(
+            context=self._context,
+            domains_service=self.domains,
+            dnsresource_service=self.dnsresources,
+            dnsdata_service=self.dnsdata,
+            staticipaddress_service=self.staticipaddress,
+            subnets_service=self.subnets,
+        )
+
+    def _build_v3subnet_utilization(self) -> V3SubnetUtilizationService:
+        return V3SubnetUtilizationService(
+            context=self._context,
+            subnets_service=self.subnets,
+            subnet_utilization_repository=SubnetUtilizationRepository(
+                self._context
+            ),
+        )
+
+    def _build_vlans(self) -> VlansService:
+        return VlansService(
+            context=self._context,
+            temporal_service=self.temporal,
+            nodes_service=self.nodes,
+            vlans_repository=VlansRepository(self._context),
+        )
+
+    def _build_vmclusters(self) -> VmClustersService:
+        return VmClustersService(
+            context=self._context,
+            vmcluster_repository=VmClustersRepository(self._context),
+        )
+
+    def _build_zones(self) -> ZonesService:
+        return ZonesService(
+            context=self._context,
+            nodes_service=self.nodes,
+            vmcluster_service=self.vmclusters,
+            zones_repository=ZonesRepository(self._context),
+            cache=self._get_cache(ZonesService),
         )
-        return services
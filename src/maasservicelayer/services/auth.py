@@ -73,6 +73,14 @@ class AuthService(Service):
         jwt_key = await self._get_or_create_cached_jwt_key()
         return JWT.decode(jwt_key, token)
 
+    async def load_jwt_key(self) -> None:
+        """Load the key used to sign the tokens, creating it if it doesn't exist yet.
+
+        The requests that only read are served in read-only transactions, which can't create the key, so it's loaded
+        in a read-write transaction when the API server starts.
+        """
+        await self._get_or_create_cached_jwt_key()
+
     async def _get_or_create_cached_jwt_key(self) -> str:
         """This private method fetches the jwt key from the database if the key was not loaded yet. If the key does not exist,
         it simply creates it.
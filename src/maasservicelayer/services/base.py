@@ -3,7 +3,9 @@
 
 from abc import ABC
 from dataclasses import dataclass
-from typing import Generic, List, Tuple, TypeVar
+from typing import AsyncIterator, Generic, List, Sequence, Tuple, TypeVar
+
+from sqlalchemy import Column
 
 from maasservicelayer.context import Context
 from maasservicelayer.db.filters import QuerySpec
@@ -21,9 +23,11 @@ from maasservicelayer.exceptions.constants import (
     UNEXISTING_RESOURCE_VIOLATION_TYPE,
 )
 from maasservicelayer.models.base import (
+    ListCount,
     ListResult,
     MaasBaseModel,
     ResourceBuilder,
+    TokenListResult,
 )
 
 
@@ -125,11 +129,32 @@ class ReadOnlyService(Service, Generic[M, ROR]):
     async def get_by_id(self, id: int) -> M | None:
         return await self.repository.get_by_id(id=id)
 
+    async def get_by_ids(self, ids: Sequence[int]) -> List[M]:
+        return await self.repository.get_by_ids(ids=ids)
+
     async def list(
         self, page: int, size: int, query: QuerySpec | None = None
     ) -> ListResult[M]:
         return await self.repository.list(page=page, size=size, query=query)
 
+    async def stream(self, query: QuerySpec | None = None) -> AsyncIterator[M]:
+        async for item in self.repository.stream(query=query):
+            yield item
+
+    def get_source_tables(self, query: QuerySpec | None = None) -> set[str]:
+        return self.repository.get_source_tables(query=query)
+
+    async def list_by_token(
+        self,
+        token: str | None,
+        size: int,
+        query: QuerySpec | None = None,
+        count: ListCount = ListCount.NONE,
+    ) -> TokenListResult[M]:
+        return await self.repository.list_by_token(
+            token=token, size=size, query=query, count=count
+        )
+
 
 class BaseService(ReadOnlyService[M, BR], ABC, Generic[M, BR, B]):
     """The base class for all the services that have a `BaseRepository`.
@@ -171,6 +196,61 @@ class BaseService(ReadOnlyService[M, BR], ABC, Generic[M, BR, B]):
         await self.post_create_hook(created_resource)
         return created_resource
 
+    async def pre_create_many_hook(self, builders: List[B]) -> None:
+        """
+        Override this function in your Service to perform pre-hooks with the builders of the objects to be created in
+        bulk. By default it runs the `pre_create_hook` for each builder.
+        """
+        for builder in builders:
+            await self.pre_create_hook(builder)
+
+    async def post_create_many_hook(self, resources: List[M]) -> None:
+        """
+        Override this function in your Service to perform post-hooks with the objects created in bulk. By default it runs
+        the `post_create_hook` for each object.
+        """
+        for resource in resources:
+            await self.post_create_hook(resource)
+
+    async def create_many(self, builders: List[B]) -> List[M]:
+        """
+        Creates the resources with as few statements as possible. The created resources are returned in the same order as
+        the builders.
+        """
+        if not builders:
+            return []
+        await self.pre_create_many_hook(builders)
+        created_resources = await self.repository.create_many(
+            builders=builders
+        )
+        await self.post_create_many_hook(created_resources)
+        return created_resources
+
+    async def post_upsert_many_hook(self, resources: List[M]) -> None:
+        """
+        Override this function in your Service to perform post-hooks with the objects created or updated in bulk.
+        """
+        return None
+
+    async def upsert_many(
+        self, builders: List[B], conflict_columns: Sequence[Column]
+    ) -> List[M]:
+        """
+        Creates the resources, or updates the existing ones that conflict with them on `conflict_columns`, with as few
+        statements as possible.
+
+        The `pre_create_many_hook` is run with the builders. The `post_create_hook` can't be run since the resources might
+        have been updated, the `post_upsert_many_hook` is run instead.
+        """
+        if not builders:
+            return []
+        await self.pre_create_many_hook(builders)
+        resources = await self.repository.upsert_many(
+            builders=builders, conflict_columns=conflict_columns
+        )
+        await self.post_upsert_many_hook(resources)
+        return resources
+
     async def get_or_create(
         self, query: QuerySpec, builder: B
     ) -> Tuple[M, bool]:
@@ -2,8 +2,12 @@
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
 from contextlib import suppress
+from copy import deepcopy
+from dataclasses import dataclass, field
+import time
 from typing import Any, TypeVar
 
+from asyncpg import Connection
 import structlog
 
 from maasservicelayer.builders.configurations import (
@@ -11,6 +15,7 @@ from maasservicelayer.builders.configurations import (
 )
 from maasservicelayer.context import Context
 from maasservicelayer.db.filters import QuerySpec
+from maasservicelayer.db.listeners import PostgresListener
 from maasservicelayer.db.repositories.database_configurations import (
     DatabaseConfigurationsClauseFactory,
 )
@@ -19,7 +24,8 @@ from maasservicelayer.models.configurations import (
     ConfigFactory,
     UUIDConfig,
 )
-from maasservicelayer.services.base import Service
+from maasservicelayer.models.secrets import SecretModel
+from maasservicelayer.services.base import Service, ServiceCache
 from maasservicelayer.services.database_configurations import (
     DatabaseConfigurationNotFound,
     DatabaseConfigurationsService,
@@ -32,6 +38,94 @@ T = TypeVar("T", bound=Config)
 
 logger = structlog.getLogger()
 
+# Channel of the notifications sent by the database when a configuration is
+# changed. The payload is the id of the transaction that changed it.
+CONFIG_CHANNEL = "sys_config"
+
+# Default time (in seconds) the configurations stored as secrets are cached.
+DEFAULT_SECRETS_TTL = 60
+
+
+@dataclass(slots=True)
+class ConfigurationsServiceCache(ServiceCache):
+    """
+    Process-wide cache of the configurations.
+
+    All the configurations stored in the database are loaded at once on the first miss. The cache is only used while
+    it's enabled by the `ConfigurationsPostgresListener`, which drops them whenever a configuration is changed. The
+    changes to the secrets aren't notified, so the configurations stored as secrets are cached for `secrets_ttl`
+    seconds only.
+    """
+
+    enabled: bool = False
+    secrets_ttl: float = DEFAULT_SECRETS_TTL
+    configs: dict[str, Any] | None = None
+    secrets: dict[str, tuple[Any, float]] = field(default_factory=dict)
+    # Incremented whenever the configurations are dropped, so that the ones
+    # being loaded at that time are not stored.
+    generation: int = 0
+    # The id of the last transaction that changed the configurations. The
+    # configurations are stored only if they're loaded by a transaction that
+    # sees its changes.
+    last_txid: int | None = None
+    hits: dict[str, int] = field(
+        default_factory=lambda: {"database": 0, "secret": 0}
+    )
+    misses: dict[str, int] = field(
+        default_factory=lambda: {"database": 0, "secret": 0}
+    )
+
+    def enable(self, secrets_ttl: float = DEFAULT_SECRETS_TTL) -> None:
+        self.secrets_ttl = secrets_ttl
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        self.clear()
+
+    def invalidate(self, txid: int | None = None) -> None:
+        """Drop the configurations stored in the database.
+
+        Args:
+            txid: the id of the transaction that changed them, if known.
+        """
+        if txid is not None:
+            self.last_txid = max(txid, self.last_txid or 0)
+        self.configs = None
+        self.generation += 1
+
+    def clear(self):
+        self.invalidate()
+        self.secrets.clear()
+
+
+class ConfigurationsPostgresListener(PostgresListener):
+    """Enable the configurations cache while the notifications about the
+    changes to the configurations are received."""
+
+    def __init__(
+        self,
+        cache: ConfigurationsServiceCache,
+        secrets_ttl: float = DEFAULT_SECRETS_TTL,
+    ):
+        super().__init__(CONFIG_CHANNEL)
+        self.cache = cache
+        self.secrets_ttl = secrets_ttl
+
+    def handler(
+        self, connection: Connection, pid: int, channel: str, payload: str
+    ):
+        self.cache.invalidate(int(payload) if payload else None)
+
+    def registered(self):
+        self.cache.enable(self.secrets_ttl)
+
+    def terminated(self):
+        logger.warn(
+            "The connection listening for configuration changes has been closed. Disabling the configurations cache."
+        )
+        self.cache.disable()
+
 
 class ConfigurationsService(Service):
     """
@@ -46,6 +140,8 @@ class ConfigurationsService(Service):
     It is also designed to be used by the Django application, and may return
     raw values (not strictly instances of `Config`), allowing flexible usage
     even for configurations not explicitly modeled.
+
+    The values are read through the `ConfigurationsServiceCache` when it's enabled.
     """
 
     def __init__(
@@ -54,11 +150,69 @@ class ConfigurationsService(Service):
         database_configurations_service: DatabaseConfigurationsService,
         secrets_service: SecretsService,
         events_service: EventsService,
+        cache: ConfigurationsServiceCache | None = None,
     ):
-        super().__init__(context)
+        super().__init__(context, cache)
         self.database_configurations_service = database_configurations_service
         self.secrets_service = secrets_service
         self.events_service = events_service
+        # Set when a configuration is changed in the current transaction.
+        # From then on, the cache is bypassed: the change isn't visible to
+        # the other transactions yet.
+        self._changed = False
+
+    @staticmethod
+    def build_cache_object() -> ConfigurationsServiceCache:
+        return ConfigurationsServiceCache()
+
+    def _use_cache(self) -> bool:
+        return (
+            isinstance(self.cache, ConfigurationsServiceCache)
+            and self.cache.enabled
+            and not self._changed
+        )
+
+    async def _get_database_configs(self) -> dict[str, Any]:
+        """Return all the configurations stored in the database."""
+        assert isinstance(self.cache, ConfigurationsServiceCache)
+        if self.cache.configs is not None:
+            self.cache.hits["database"] += 1
+            return self.cache.configs
+        self.cache.misses["database"] += 1
+        generation = self.cache.generation
+        last_txid = self.cache.last_txid
+        configs = await self.database_configurations_service.get_many(
+            query=QuerySpec()
+        )
+        if generation == self.cache.generation and (
+            last_txid is None
+            or await self.database_configurations_service.is_transaction_visible(
+                last_txid
+            )
+        ):
+            self.cache.configs = configs
+        return configs
+
+    async def _get_secret(self, model: SecretModel) -> Any:
+        if not self._use_cache():
+            return await self.secrets_service.get_simple_secret(model)
+        assert isinstance(self.cache, ConfigurationsServiceCache)
+        path = model.get_secret_path()
+        now = time.monotonic()
+        cached = self.cache.secrets.get(path)
+        if cached is not None and cached[1] > now:
+            self.cache.hits["secret"] += 1
+            value = cached[0]
+        else:
+            self.cache.misses["secret"] += 1
+            try:
+                value = await self.secrets_service.get_simple_secret(model)
+            except SecretNotFound as e:
+                value = e
+            self.cache.secrets[path] = (value, now + self.cache.secrets_ttl)
+        if isinstance(value, SecretNotFound):
+            raise SecretNotFound(value.path)
+        return deepcopy(value)
 
     async def get(self, name: str, default=None) -> Any:
         """
@@ -92,9 +246,13 @@ class ConfigurationsService(Service):
         try:
             if config_model and config_model.stored_as_secret:
                 assert config_model.secret_model is not None
-                return await self.secrets_service.get_simple_secret(
-                    config_model.secret_model
-                )
+                return await self._get_secret(config_model.secret_model)
+            if self._use_cache():
+                configs = await self._get_database_configs()
+                if name not in configs:
+                    raise DatabaseConfigurationNotFound(name)
+                # Don't let the callers change the cached values.
+                return deepcopy(configs[name])
             return await self.database_configurations_service.get(name=name)
         except (DatabaseConfigurationNotFound, SecretNotFound):
             return default_value
@@ -135,15 +293,21 @@ class ConfigurationsService(Service):
             if model.stored_as_secret:
                 with suppress(SecretNotFound):
                     assert model.secret_model is not None
-                    configs[
-                        name
-                    ] = await self.secrets_service.get_simple_secret(
-                        model.secret_model
-                    )
+                    configs[name] = await self._get_secret(model.secret_model)
                     # The config was found and added to the result: remove it from the regular config.
                     regular_configs.remove(name)
 
         # Lookup the remaining configs from the DB.
+        if self._use_cache():
+            database_configs = await self._get_database_configs()
+            configs.update(
+                {
+                    name: deepcopy(database_configs[name])
+                    for name in regular_configs
+                    if name in database_configs
+                }
+            )
+            return configs
         configs.update(
             await self.database_configurations_service.get_many(
                 query=QuerySpec(
@@ -169,11 +333,19 @@ class ConfigurationsService(Service):
             raise RuntimeError(
                 f"The configuration '{name}' requires a hook but the check is not bypassed. This is likely to be a programming error. Please use HookedConfigurationService instead."
             )
+        self._changed = True
         if config_model and config_model.stored_as_secret:
             await self.secrets_service.set_simple_secret(
                 config_model.secret_model,  # pyright: ignore[reportArgumentType]
                 value,
             )
+            if isinstance(self.cache, ConfigurationsServiceCache):
+                # The changes to the secrets aren't notified, drop the value
+                # cached by this process at least.
+                self.cache.secrets.pop(
+                    config_model.secret_model.get_secret_path(),  # pyright: ignore[reportOptionalMemberAccess]
+                    None,
+                )
         else:
             await self.database_configurations_service.create_or_update(
                 DatabaseConfigurationBuilder(name=name, value=value)
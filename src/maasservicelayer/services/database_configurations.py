@@ -55,6 +55,11 @@ class DatabaseConfigurationsService(Service):
             for configuration in configurations
         }
 
+    async def is_transaction_visible(self, txid: int) -> bool:
+        return await self.database_configurations_repository.is_transaction_visible(
+            txid
+        )
+
     async def create_or_update(
         self, builder: DatabaseConfigurationBuilder
     ) -> DatabaseConfiguration:
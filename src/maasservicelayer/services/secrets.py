@@ -194,6 +194,14 @@ class SecretsServiceFactory:
         If the application configuration changes, a cleanup of the cache or a restart of the application
         is required to re-evaluate the Vault settings.
         """
+        await cls.detect(database_configurations_service)
+        return cls.build(context, cache)
+
+    @classmethod
+    async def detect(
+        cls, database_configurations_service: DatabaseConfigurationsService
+    ) -> None:
+        """Read whether Vault integration is enabled, unless it's already cached."""
         if cls.IS_VAULT_ENABLED is None:
             try:
                 result = await database_configurations_service.get(
@@ -202,6 +210,16 @@ class SecretsServiceFactory:
             except DatabaseConfigurationNotFound:
                 result = VaultEnabledConfig.default
             cls.IS_VAULT_ENABLED = result
+
+    @classmethod
+    def build(
+        cls, context: Context, cache: SecretsServiceCache | None = None
+    ) -> SecretsService:
+        """Build the `SecretService` for the backend found by `detect`."""
+        if cls.IS_VAULT_ENABLED is None:
+            raise RuntimeError(
+                "The secrets backend has not been detected. This is likely to be a programming error."
+            )
         if cls.IS_VAULT_ENABLED:
             return VaultSecretsService(context=context, cache=cache)
         return LocalSecretsStorageService(context=context, cache=cache)
@@ -110,7 +110,6 @@ class SshKeysService(BaseService[SshKey, SshKeysRepository, SshKeyBuilder]):
     async def import_keys(
         self, protocol: SshKeysProtocolType, auth_id: str, user_id: int
     ) -> list[SshKey]:
-        imported_keys = []
         match protocol:
             case SshKeysProtocolType.LP:
                 keys = await self._get_ssh_key_from_launchpad(auth_id)
@@ -139,15 +138,18 @@ class SshKeysService(BaseService[SshKey, SshKeysRepository, SshKeyBuilder]):
         )
 
         existing_keys_values = [k.key for k in existing_keys]
-        for key in keys:
-            if key not in existing_keys_values:
-                builder = SshKeyBuilder(
+        imported_keys = await self.create_many(
+            [
+                SshKeyBuilder(
                     key=key,
                     protocol=protocol,
                     auth_id=auth_id,
                     user_id=user_id,
                 )
-                imported_keys.append(await self.create(builder))
+                for key in keys
+                if key not in existing_keys_values
+            ]
+        )
 
         imported_keys.extend(existing_keys)
         return imported_keys
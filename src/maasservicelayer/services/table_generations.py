@@ -0,0 +1,39 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+import hashlib
+
+from maasservicelayer.context import Context
+from maasservicelayer.db.repositories.table_generations import (
+    TableGenerationsRepository,
+)
+from maasservicelayer.services.base import Service
+
+
+class TableGenerationsService(Service):
+    def __init__(
+        self,
+        context: Context,
+        table_generations_repository: TableGenerationsRepository,
+    ):
+        super().__init__(context)
+        self.repository = table_generations_repository
+
+    async def get_collection_etag(
+        self, table_names: set[str], key: str
+    ) -> str | None:
+        """
+        Return the ETag of a collection read from `table_names`, which changes every time that one of the tables
+        changes. `key` identifies the collection and what it's made of, e.g. the URL it's listed at.
+
+        None is returned if any of the tables is not tracked, since the collection might change without the ETag
+        changing.
+        """
+        generations = await self.repository.get_generations(table_names)
+        if generations.keys() != table_names:
+            return None
+        m = hashlib.sha256()
+        m.update(key.encode("utf-8"))
+        for table_name in sorted(generations):
+            m.update(f"\0{table_name}:{generations[table_name]}".encode())
+        return m.hexdigest()
@@ -10,9 +10,13 @@ import structlog
 from maasapiserver.settings import read_config
 from maascommon.worker import set_max_workers_count
 from maasservicelayer.db import Database
+from maasservicelayer.db.listeners import PostgresListenersTaskFactory
 from maasservicelayer.db.locks import wait_for_startup
 from maasservicelayer.logging.configure import configure_logging
-from maasservicelayer.services import CacheForServices
+from maasservicelayer.services import CacheForServices, ConfigurationsService
+from maasservicelayer.services.configurations import (
+    ConfigurationsPostgresListener,
+)
 from maastemporalworker.worker import REGION_TASK_QUEUE
 from maastemporalworker.worker import Worker as TemporalWorker
 from maastemporalworker.workflow.bootresource import (
@@ -120,6 +124,21 @@ async def main() -> None:
 
     maas_id = await get_maas_id()
     services_cache = CacheForServices()
+    # Use the configurations cache, which is dropped whenever the
+    # configurations change.
+    register_listeners = await PostgresListenersTaskFactory.create(
+        db.engine,
+        [
+            ConfigurationsPostgresListener(
+                services_cache.get(
+                    ConfigurationsService.__name__,
+                    ConfigurationsService.build_cache_object,
+                ),  # type: ignore
+                secrets_ttl=config.config_cache_secrets_ttl,
+            )
+        ],
+    )
+    await register_listeners
 
     boot_res_activity = BootResourcesActivity(db, services_cache)
     await boot_res_activity.init(region_id=maas_id)
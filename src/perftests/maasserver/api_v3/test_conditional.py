@@ -0,0 +1,37 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+from maasapiserver.v3.constants import V3_API_PREFIX
+
+# Dashboards poll the machine listing every few seconds, while it rarely
+# changes between two polls.
+
+
+async def test_perf_poll_machines_APIv3_endpoint(
+    perf, authenticated_admin_api_client_v3
+):
+    api_client = authenticated_admin_api_client_v3
+    with perf.record("test_perf_poll_machines_APIv3_endpoint"):
+        for _ in range(100):
+            response = await api_client.get(
+                f"{V3_API_PREFIX}/machines", params={"size": 50}
+            )
+            assert response.status_code == 200
+
+
+async def test_perf_poll_machines_APIv3_endpoint_not_modified(
+    perf, authenticated_admin_api_client_v3
+):
+    api_client = authenticated_admin_api_client_v3
+    response = await api_client.get(
+        f"{V3_API_PREFIX}/machines", params={"size": 50}
+    )
+    etag = response.headers["ETag"]
+    with perf.record("test_perf_poll_machines_APIv3_endpoint_not_modified"):
+        for _ in range(100):
+            response = await api_client.get(
+                f"{V3_API_PREFIX}/machines",
+                params={"size": 50},
+                headers={"If-None-Match": etag},
+            )
+            assert response.status_code == 304
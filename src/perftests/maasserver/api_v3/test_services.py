@@ -0,0 +1,29 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+from maasapiserver.v3.constants import V3_API_PREFIX
+from maasservicelayer.context import Context
+from maasservicelayer.services import CacheForServices, ServiceCollectionV3
+
+# The services are produced for every request, so that the cost of building
+# them matters for the cheap endpoints.
+
+
+async def test_perf_produce_services(perf, db_connection):
+    cache = CacheForServices()
+    with perf.record("test_perf_produce_services"):
+        for _ in range(1000):
+            services = await ServiceCollectionV3.produce(
+                context=Context(connection=db_connection), cache=cache
+            )
+            services.zones  # noqa: B018
+
+
+async def test_perf_list_zones_APIv3_endpoint(
+    perf, authenticated_admin_api_client_v3
+):
+    api_client = authenticated_admin_api_client_v3
+    with perf.record("test_perf_list_zones_APIv3_endpoint"):
+        for _ in range(100):
+            response = await api_client.get(f"{V3_API_PREFIX}/zones")
+            assert response.status_code == 200
@@ -0,0 +1,66 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+from sqlalchemy import text
+
+from maasapiserver.v3.api.public.models.requests.query import MAX_PAGE_SIZE
+from maasapiserver.v3.api.public.models.responses.base import NDJSON_MEDIA_TYPE
+from maasapiserver.v3.constants import V3_API_PREFIX
+
+COUNT = 100000
+
+EVENTS_FIXTURE = [
+    """
+    INSERT INTO maasserver_eventtype
+        (id, created, updated, name, description, level)
+    VALUES (1000000, now(), now(), 'PERF', 'Perf', 20)
+    """,
+    """
+    INSERT INTO maasserver_event
+        (created, updated, description, action, type_id, node_hostname,
+         username, ip_address, user_agent, endpoint)
+    SELECT now(), now(), 'Perf event', 'perf', 1000000, 'host-' || i,
+         'admin', '10.0.0.0'::inet + i, 'perf', 0
+    FROM generate_series(1, :count) AS i
+    """,
+]
+
+
+async def _create_events(db_connection):
+    for statement in EVENTS_FIXTURE:
+        await db_connection.execute(text(statement), {"count": COUNT})
+
+
+async def test_perf_export_events_APIv3_endpoint_pages(
+    perf, authenticated_admin_api_client_v3, db_connection
+):
+    await _create_events(db_connection)
+    api_client = authenticated_admin_api_client_v3
+    items = 0
+    with perf.record("test_perf_export_events_APIv3_endpoint_pages"):
+        next_link = f"{V3_API_PREFIX}/events?size={MAX_PAGE_SIZE}&count=none"
+        while next_link:
+            response = await api_client.get(next_link)
+            assert response.status_code == 200
+            body = response.json()
+            items += len(body["items"])
+            next_link = body.get("next")
+    assert items >= COUNT
+
+
+async def test_perf_export_events_APIv3_endpoint_stream(
+    perf, authenticated_admin_api_client_v3, db_connection
+):
+    await _create_events(db_connection)
+    api_client = authenticated_admin_api_client_v3
+    items = 0
+    with perf.record("test_perf_export_events_APIv3_endpoint_stream"):
+        async with api_client.stream(
+            "GET",
+            f"{V3_API_PREFIX}/events",
+            headers={"Accept": NDJSON_MEDIA_TYPE},
+        ) as response:
+            assert response.status_code == 200
+            async for _ in response.aiter_lines():
+                items += 1
+    assert items >= COUNT
@@ -0,0 +1,62 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+import asyncio
+import socket
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+from httpx import AsyncClient
+import pytest
+import uvicorn
+
+from maasapiserver.v3.constants import V3_API_PREFIX
+
+# The number of requests sent to measure the throughput of the API server,
+# which is REQUESTS / elapsed time. They are sent one at a time, since the
+# test application shares a single database connection.
+REQUESTS = 1000
+
+
+@pytest.fixture
+async def api_server_url(api_app: FastAPI) -> AsyncIterator[str]:
+    """Serve the API application with uvicorn, on a random port."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(
+        uvicorn.Config(
+            api_app, lifespan="off", log_level="warning", access_log=False
+        )
+    )
+    task = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.01)
+    host, port = sock.getsockname()
+    yield f"http://{host}:{port}"
+    server.should_exit = True
+    await task
+
+
+async def _send_requests(api_server_url, headers, path):
+    async with AsyncClient(base_url=api_server_url, headers=headers) as client:
+        for _ in range(REQUESTS):
+            response = await client.get(path)
+            assert response.status_code == 200
+
+
+async def test_perf_zones_throughput_APIv3_uvicorn(
+    perf, api_server_url, authenticated_admin_api_client_v3
+):
+    headers = authenticated_admin_api_client_v3.headers
+    with perf.record("test_perf_zones_throughput_APIv3_uvicorn"):
+        await _send_requests(api_server_url, headers, f"{V3_API_PREFIX}/zones")
+
+
+async def test_perf_machines_throughput_APIv3_uvicorn(
+    perf, api_server_url, authenticated_admin_api_client_v3
+):
+    headers = authenticated_admin_api_client_v3.headers
+    with perf.record("test_perf_machines_throughput_APIv3_uvicorn"):
+        await _send_requests(
+            api_server_url, headers, f"{V3_API_PREFIX}/machines?size=50"
+        )
@@ -0,0 +1,41 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+from fastapi import FastAPI
+import pytest
+
+from maasapiserver.common.middlewares.db import TransactionMiddleware
+from maasapiserver.v3.api.public.models.requests.query import MAX_PAGE_SIZE
+from maasservicelayer.context import Context
+from maasservicelayer.services import CacheForServices, ServiceCollectionV3
+
+# The transactions are run as the TransactionMiddleware runs them for the
+# /api/v3/machines and /api/v3/events requests, read-only for GET requests.
+# The test connection from the fixtures isn't used, since it's already in a
+# read-write transaction.
+
+
+async def _list(db, read_only, service_name):
+    middleware = TransactionMiddleware(FastAPI(), db=db)
+    async with middleware.get_connection(read_only=read_only) as conn:
+        services = await ServiceCollectionV3.produce(
+            context=Context(connection=conn), cache=CacheForServices()
+        )
+        service = getattr(services, service_name)
+        return await service.list(page=1, size=MAX_PAGE_SIZE)
+
+
+@pytest.mark.parametrize("read_only", [False, True])
+async def test_perf_list_machines_transaction(perf, db, read_only):
+    name = f"test_perf_list_machines_transaction_read_only_{read_only}"
+    with perf.record(name):
+        for _ in range(10):
+            await _list(db, read_only, "machines")
+
+
+@pytest.mark.parametrize("read_only", [False, True])
+async def test_perf_list_events_transaction(perf, db, read_only):
+    name = f"test_perf_list_events_transaction_read_only_{read_only}"
+    with perf.record(name):
+        for _ in range(10):
+            await _list(db, read_only, "events")
@@ -0,0 +1,10 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+from tests.maasapiserver.fixtures.db import db, db_connection, test_config
+
+__all__ = [
+    "db",
+    "db_connection",
+    "test_config",
+]
@@ -0,0 +1,48 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+from maasservicelayer.builders.events import EventTypeBuilder
+from maasservicelayer.context import Context
+from maasservicelayer.db.repositories.events import EventTypesRepository
+from maasservicelayer.db.tables import EventTypeTable
+from maasservicelayer.models.events import LoggingLevelEnum
+
+COUNT = 10000
+
+
+def _make_builders(prefix):
+    return [
+        EventTypeBuilder(
+            name=f"{prefix}-{i}",
+            description="A bulk event type",
+            level=LoggingLevelEnum.INFO,
+        )
+        for i in range(COUNT)
+    ]
+
+
+async def test_perf_create_single(perf, db_connection):
+    repository = EventTypesRepository(Context(connection=db_connection))
+    builders = _make_builders("single")
+    with perf.record("test_perf_create_single"):
+        for builder in builders:
+            await repository.create(builder)
+
+
+async def test_perf_create_many(perf, db_connection):
+    repository = EventTypesRepository(Context(connection=db_connection))
+    builders = _make_builders("many")
+    with perf.record("test_perf_create_many"):
+        created = await repository.create_many(builders)
+    assert len(created) == COUNT
+
+
+async def test_perf_upsert_many(perf, db_connection):
+    repository = EventTypesRepository(Context(connection=db_connection))
+    builders = _make_builders("upsert")
+    await repository.create_many(builders[: COUNT // 2])
+    with perf.record("test_perf_upsert_many"):
+        upserted = await repository.upsert_many(
+            builders, conflict_columns=[EventTypeTable.c.name]
+        )
+    assert len(upserted) == COUNT
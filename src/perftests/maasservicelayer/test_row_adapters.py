@@ -0,0 +1,72 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+import pytest
+from sqlalchemy import text
+
+from maasservicelayer.context import Context
+from maasservicelayer.db.mappers.rows import get_trusted_row_adapter
+from maasservicelayer.db.repositories.events import EventsRepository
+from maasservicelayer.db.repositories.staticipaddress import (
+    StaticIPAddressRepository,
+)
+
+COUNT = 100000
+
+FIXTURES = {
+    EventsRepository: [
+        """
+        INSERT INTO maasserver_eventtype
+            (id, created, updated, name, description, level)
+        VALUES (1000000, now(), now(), 'PERF', 'Perf', 20)
+        """,
+        """
+        INSERT INTO maasserver_event
+            (created, updated, description, action, type_id, node_hostname,
+             username, ip_address, user_agent, endpoint)
+        SELECT now(), now(), 'Perf event', 'perf', 1000000, 'host-' || i,
+             'admin', '10.0.0.0'::inet + i, 'perf', 0
+        FROM generate_series(1, :count) AS i
+        """,
+    ],
+    StaticIPAddressRepository: [
+        """
+        INSERT INTO maasserver_staticipaddress
+            (created, updated, ip, alloc_type, lease_time)
+        SELECT now(), now(), '10.0.0.0'::inet + i, 1, 0
+        FROM generate_series(1, :count) AS i
+        """,
+    ],
+}
+
+
+async def _fetch_rows(db_connection, repository_class):
+    for statement in FIXTURES[repository_class]:
+        await db_connection.execute(text(statement), {"count": COUNT})
+    repository = repository_class(Context(connection=db_connection))
+    result = await db_connection.execute(repository.select_all_statement())
+    return repository, [row._asdict() for row in result]
+
+
+@pytest.mark.parametrize("repository_class", list(FIXTURES))
+async def test_perf_build_models_validated(
+    perf, db_connection, repository_class
+):
+    repository, rows = await _fetch_rows(db_connection, repository_class)
+    model_factory = repository.get_model_factory()
+    name = f"test_perf_build_models_validated_{repository_class.__name__}"
+    with perf.record(name):
+        models = [model_factory(**row) for row in rows]
+    assert len(models) == COUNT
+
+
+@pytest.mark.parametrize("repository_class", list(FIXTURES))
+async def test_perf_build_models_trusted(
+    perf, db_connection, repository_class
+):
+    repository, rows = await _fetch_rows(db_connection, repository_class)
+    adapter = get_trusted_row_adapter(repository.get_model_factory())
+    name = f"test_perf_build_models_trusted_{repository_class.__name__}"
+    with perf.record(name):
+        models = [adapter(row) for row in rows]
+    assert len(models) == COUNT
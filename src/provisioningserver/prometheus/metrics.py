@@ -40,6 +40,12 @@ METRICS_DEFINITIONS = [
         _HTTP_REQUEST_LABELS,
         buckets=[5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000],
     ),
+    MetricDefinition(
+        "Counter",
+        "maas_http_response_compression_saved_bytes",
+        "HTTP response bytes saved by compression",
+        ["encoding"],
+    ),
     MetricDefinition(
         "Histogram",
         "maas_http_request_query_count",
@@ -78,6 +84,54 @@ METRICS_DEFINITIONS = [
         "HTTP request query latency",
         _WEBSOCKET_CALL_LABELS,
     ),
+    MetricDefinition(
+        "Counter",
+        "maas_websocket_notify_groups",
+        "Websocket notifications processed once per group of clients",
+        ["handler"],
+    ),
+    MetricDefinition(
+        "Counter",
+        "maas_websocket_notify_clients",
+        "Websocket clients a notification was processed for",
+        ["handler"],
+    ),
+    MetricDefinition(
+        "Counter",
+        "maas_websocket_dehydrate_cache_hits",
+        "Websocket handler objects found in the dehydrate cache",
+        ["handler"],
+    ),
+    MetricDefinition(
+        "Counter",
+        "maas_websocket_dehydrate_cache_misses",
+        "Websocket handler objects not found in the dehydrate cache",
+        ["handler"],
+    ),
+    MetricDefinition(
+        "Gauge",
+        "maas_websocket_dehydrate_cache_size",
+        "Size (in bytes) of the websocket dehydrate cache",
+    ),
+    MetricDefinition(
+        "Counter",
+        "maas_websocket_notify_skipped_clients",
+        "Websocket clients skipped for a notification they can't be "
+        "interested in",
+        ["handler"],
+    ),
+    MetricDefinition(
+        "Counter",
+        "maas_listener_notifications_received",
+        "Database notifications received by the listener",
+        ["channel"],
+    ),
+    MetricDefinition(
+        "Counter",
+        "maas_listener_notifications_dispatched",
+        "Database notifications dispatched to handlers after coalescing",
+        ["channel"],
+    ),
     MetricDefinition(
         "Counter",
         "maas_virsh_fetch_description_failure",
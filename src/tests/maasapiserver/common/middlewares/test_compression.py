@@ -0,0 +1,163 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+import json
+from typing import AsyncIterator, Iterator
+
+from fastapi import FastAPI, Header, Response
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient
+import pytest
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from maasapiserver.common.middlewares.compression import CompressionMiddleware
+
+PAYLOAD = [{"id": i, "hostname": f"machine-{i}"} for i in range(100)]
+
+
+class CaptureState:
+    """Keep the state of the last request, to check the metrics."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.state = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await self.app(scope, receive, send)
+        self.state = scope.get("state", {})
+
+
+@pytest.fixture
+def app() -> Iterator[FastAPI]:
+    app = FastAPI()
+
+    @app.get("/large")
+    async def large() -> Response:
+        return Response(
+            content=json.dumps(PAYLOAD),
+            media_type="application/json",
+            headers={"ETag": '"abc"'},
+        )
+
+    @app.delete("/large")
+    async def delete_large(
+        etag_if_match: str | None = Header(  # noqa: B008
+            alias="if-match", default=None
+        ),
+    ) -> Response:
+        # Like the v3 handlers, that compare the ETags as they are.
+        if etag_if_match is not None and etag_if_match != '"abc"':
+            return Response(status_code=412)
+        return Response(status_code=204)
+
+    @app.get("/small")
+    async def small() -> dict[str, int]:
+        return {"count": 1}
+
+    @app.get("/image")
+    async def image() -> Response:
+        return Response(content=b"\x89PNG" * 1000, media_type="image/png")
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def lines():
+            for item in PAYLOAD:
+                yield json.dumps(item) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, level=6)
+    yield app
+
+
+@pytest.fixture
+async def client(app: FastAPI) -> AsyncIterator[AsyncClient]:
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+class TestCompressionMiddleware:
+    async def test_compress(self, client: AsyncClient) -> None:
+        response = await client.get(
+            "/large", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert response.headers["ETag"] == '"abc"'
+        assert int(response.headers["Content-Length"]) < len(
+            json.dumps(PAYLOAD)
+        )
+        # httpx decodes the gzip payload
+        assert response.json() == PAYLOAD
+
+    async def test_compress_keeps_etag_for_if_match(
+        self, client: AsyncClient
+    ) -> None:
+        response = await client.get(
+            "/large", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.headers["Content-Encoding"] == "gzip"
+        response = await client.delete(
+            "/large", headers={"If-Match": response.headers["ETag"]}
+        )
+        assert response.status_code == 204
+
+    async def test_compress_records_saved_bytes(self, app: FastAPI) -> None:
+        capture = CaptureState(app)
+        async with AsyncClient(app=capture, base_url="http://test") as client:
+            response = await client.get(
+                "/large", headers={"Accept-Encoding": "gzip"}
+            )
+        metrics = capture.state["compression_metrics"]
+        assert metrics["encoding"] == "gzip"
+        assert metrics["saved"] == len(json.dumps(PAYLOAD)) - int(
+            response.headers["Content-Length"]
+        )
+
+    async def test_compress_zstd(self, client: AsyncClient) -> None:
+        zstandard = pytest.importorskip("zstandard")
+        response = await client.get(
+            "/large", headers={"Accept-Encoding": "gzip, zstd"}
+        )
+        assert response.headers["Content-Encoding"] == "zstd"
+        payload = (
+            zstandard.ZstdDecompressor()
+            .decompressobj()
+            .decompress(response.content)
+        )
+        assert json.loads(payload) == PAYLOAD
+
+    async def test_not_accepted(self, client: AsyncClient) -> None:
+        response = await client.get(
+            "/large", headers={"Accept-Encoding": "identity"}
+        )
+        assert "Content-Encoding" not in response.headers
+        assert response.headers["ETag"] == '"abc"'
+        assert response.json() == PAYLOAD
+
+    async def test_below_minimum_size(self, client: AsyncClient) -> None:
+        response = await client.get(
+            "/small", headers={"Accept-Encoding": "gzip"}
+        )
+        assert "Content-Encoding" not in response.headers
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert response.json() == {"count": 1}
+
+    async def test_not_compressible(self, client: AsyncClient) -> None:
+        response = await client.get(
+            "/image", headers={"Accept-Encoding": "gzip"}
+        )
+        assert "Content-Encoding" not in response.headers
+        assert response.content == b"\x89PNG" * 1000
+
+    async def test_stream(self, client: AsyncClient) -> None:
+        response = await client.get(
+            "/stream", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        assert [
+            json.loads(line) for line in response.text.splitlines()
+        ] == PAYLOAD
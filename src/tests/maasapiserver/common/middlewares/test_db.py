@@ -1,13 +1,22 @@
+from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import Any, AsyncIterator, Iterator
+from unittest.mock import AsyncMock, Mock
 
 from fastapi import FastAPI, Request
 from httpx import AsyncClient
 import pytest
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncConnection
+from starlette.types import Message, Receive, Scope, Send
 
-from maasapiserver.common.middlewares.db import DatabaseMetricsMiddleware
+from maasapiserver.common.middlewares.db import (
+    DatabaseMetricsMiddleware,
+    TransactionMiddleware,
+)
 from maasapiserver.v3.middlewares.context import ContextMiddleware
+from maascommon.utils.slowqueries import SlowQueryLog
+from maasservicelayer.context import Context
 from maasservicelayer.db import Database
 
 
@@ -49,3 +58,231 @@ class TestDatabaseMetricsMiddleware:
         metrics = (await query_count_client.get(f"/{count}")).json()
         assert metrics["count"] == count
         assert metrics["latency"] > 0.0
+
+    @pytest.mark.parametrize("count", [1, 3])
+    async def test_statement_cache_metrics(
+        self, query_count_client: AsyncClient, count: int
+    ) -> None:
+        metrics = (await query_count_client.get(f"/{count}")).json()
+        hits = metrics["cache_hits"]
+        misses = metrics["cache_misses"]
+        assert hits["compiled"] + misses["compiled"] == count
+        assert hits["prepared"] + misses["prepared"] == count
+        # The same statement is executed again on the same connection.
+        assert hits["compiled"] >= count - 1
+        assert hits["prepared"] >= count - 1
+
+
+@pytest.fixture
+def slow_query_log(tmp_path: Path) -> SlowQueryLog:
+    return SlowQueryLog(
+        tmp_path, "test", size=2, threshold=0, explain_rate=1.0
+    )
+
+
+@pytest.fixture
+def slow_query_app(
+    db: Database,
+    db_connection: AsyncConnection,
+    transaction_middleware_class: type,
+    slow_query_log: SlowQueryLog,
+) -> Iterator[FastAPI]:
+    app = FastAPI()
+    app.add_middleware(
+        DatabaseMetricsMiddleware, db=db, slow_query_log=slow_query_log
+    )
+    app.add_middleware(transaction_middleware_class, db=db)
+    app.add_middleware(ContextMiddleware)
+
+    @app.get("/{count}")
+    async def get(request: Request, count: int) -> Any:
+        for i in range(count):
+            await db_connection.execute(
+                text("SELECT count(*) FROM maasserver_zone WHERE id > :id"),
+                {"id": i},
+            )
+        return request.state.query_metrics
+
+    yield app
+
+
+@pytest.fixture
+async def slow_query_client(
+    slow_query_app: FastAPI,
+) -> AsyncIterator[AsyncClient]:
+    async with AsyncClient(
+        app=slow_query_app, base_url="http://test"
+    ) as client:
+        yield client
+
+
+class TestDatabaseMetricsMiddlewareSlowQueries:
+    async def test_record_slow_queries(
+        self, slow_query_client: AsyncClient, slow_query_log: SlowQueryLog
+    ) -> None:
+        metrics = (await slow_query_client.get("/3")).json()
+        # The statements executed to profile the slow ones aren't counted.
+        assert metrics["count"] == 3
+        [(endpoint, queries)] = slow_query_log.get_queries().items()
+        assert endpoint == "GET /{count}"
+        assert len(queries) == 2
+        for query in queries:
+            assert query.sql.startswith(
+                "SELECT count(*) FROM maasserver_zone WHERE id > "
+            )
+            assert query.bind_shape == "int"
+            assert query.explain is not None
+            assert "Aggregate" in query.explain
+        assert (slow_query_log.path / slow_query_log.filename).exists()
+
+
+@pytest.fixture
+def read_only_app(
+    db: Database, db_connection: AsyncConnection
+) -> Iterator[FastAPI]:
+    class RecordingTransactionMiddleware(TransactionMiddleware):
+        @asynccontextmanager
+        async def get_connection(
+            self, read_only: bool = False
+        ) -> AsyncIterator[AsyncConnection]:
+            self.read_only = read_only
+            yield db_connection
+
+    app = FastAPI()
+    app.add_middleware(RecordingTransactionMiddleware, db=db)
+    app.add_middleware(ContextMiddleware)
+
+    @app.get("/")
+    async def get(request: Request) -> Any:
+        request.state.services = services
+        return request.state.db_pool_metrics
+
+    @app.post("/")
+    async def post(request: Request) -> Any:
+        request.state.services = services
+        return request.state.db_pool_metrics
+
+    app.state.services = services = Mock(temporal=AsyncMock())
+
+    yield app
+
+
+@pytest.fixture
+async def read_only_client(
+    read_only_app: FastAPI,
+) -> AsyncIterator[AsyncClient]:
+    async with AsyncClient(
+        app=read_only_app, base_url="http://test"
+    ) as client:
+        yield client
+
+
+class TestTransactionMiddleware:
+    async def test_get_uses_read_pool(
+        self, read_only_client: AsyncClient
+    ) -> None:
+        metrics = (await read_only_client.get("/")).json()
+        assert metrics["pool"] == "read"
+        assert metrics["wait"] >= 0.0
+
+    async def test_post_uses_write_pool(
+        self, read_only_client: AsyncClient
+    ) -> None:
+        metrics = (await read_only_client.post("/")).json()
+        assert metrics["pool"] == "write"
+
+    async def test_macaroons_use_write_pool(
+        self, read_only_client: AsyncClient
+    ) -> None:
+        read_only_client.cookies["macaroon-maas"] = "value"
+        metrics = (await read_only_client.get("/")).json()
+        assert metrics["pool"] == "write"
+        del read_only_client.cookies["macaroon-maas"]
+        metrics = (
+            await read_only_client.get("/", headers={"Macaroons": "value"})
+        ).json()
+        assert metrics["pool"] == "write"
+
+    async def test_get_skips_post_commit(
+        self, read_only_app: FastAPI, read_only_client: AsyncClient
+    ) -> None:
+        temporal = read_only_app.state.services.temporal
+        await read_only_client.get("/")
+        temporal.post_commit.assert_not_awaited()
+        await read_only_client.post("/")
+        temporal.post_commit.assert_awaited_once()
+
+    @pytest.mark.parametrize(
+        "read_only,expected", [(True, "on"), (False, "off")]
+    )
+    async def test_get_connection_read_only(
+        self, db: Database, read_only: bool, expected: str
+    ) -> None:
+        middleware = TransactionMiddleware(FastAPI(), db=db)
+        async with middleware.get_connection(read_only=read_only) as conn:
+            result = await conn.execute(text("SHOW transaction_read_only"))
+            assert result.scalar() == expected
+
+
+class TestTransactionMiddlewareResponses:
+    def make_middleware(
+        self, body_chunks: list[bytes], events: list[str]
+    ) -> TransactionMiddleware:
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            await send(
+                {"type": "http.response.start", "status": 200, "headers": []}
+            )
+            for i, chunk in enumerate(body_chunks, start=1):
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": i < len(body_chunks),
+                    }
+                )
+
+        class RecordingTransactionMiddleware(TransactionMiddleware):
+            @asynccontextmanager
+            async def get_connection(
+                self, read_only: bool = False
+            ) -> AsyncIterator[AsyncConnection]:
+                yield Mock(AsyncConnection)
+                events.append("commit")
+
+        return RecordingTransactionMiddleware(app, db=Mock(Database))
+
+    async def call(
+        self, middleware: TransactionMiddleware, events: list[str]
+    ) -> None:
+        async def send(message: Message) -> None:
+            events.append(message["type"])
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [],
+            "state": {"context": Context()},
+        }
+        await middleware(scope, AsyncMock(), send)
+
+    async def test_response_sent_after_commit(self) -> None:
+        events = []
+        middleware = self.make_middleware([b"body"], events)
+        await self.call(middleware, events)
+        assert events == [
+            "commit",
+            "http.response.start",
+            "http.response.body",
+        ]
+
+    async def test_streaming_response_sent_before_commit(self) -> None:
+        events = []
+        middleware = self.make_middleware([b"first", b"second"], events)
+        await self.call(middleware, events)
+        assert events == [
+            "http.response.start",
+            "http.response.body",
+            "http.response.body",
+            "commit",
+        ]
@@ -1,4 +1,5 @@
 from typing import AsyncIterator, Iterator, Optional
+from unittest.mock import AsyncMock
 
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
@@ -6,6 +7,7 @@ from httpx import AsyncClient
 from pydantic import BaseModel
 import pytest
 from sqlalchemy.ext.asyncio import AsyncConnection
+from starlette.types import Message, Receive, Scope, Send
 
 from maasapiserver.common.middlewares.exceptions import (
     ExceptionHandlers,
@@ -55,6 +57,27 @@ class TestExceptionMiddleware:
         assert response.status_code == 500
         assert response.json()["code"] == 500
 
+    async def test_exception_after_response_start(self) -> None:
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            await send(
+                {"type": "http.response.start", "status": 200, "headers": []}
+            )
+            raise Exception("Unhandled exception.")
+
+        messages = []
+
+        async def send(message: Message) -> None:
+            messages.append(message)
+
+        middleware = ExceptionMiddleware(app)
+        scope = {"type": "http", "method": "GET", "path": "/", "headers": []}
+        with pytest.raises(Exception, match="Unhandled exception."):
+            await middleware(scope, AsyncMock(), send)
+        # The error response can't be sent anymore.
+        assert [message["type"] for message in messages] == [
+            "http.response.start"
+        ]
+
 
 @pytest.mark.asyncio
 class TestExceptionHandlers:
@@ -10,9 +10,13 @@ from sqlalchemy.ext.asyncio import AsyncConnection
 from maasapiserver.common.api.handlers import APICommon
 from maasapiserver.common.constants import API_PREFIX
 from maasapiserver.common.middlewares.db import DatabaseMetricsMiddleware
-from maasapiserver.common.middlewares.prometheus import PrometheusMiddleware
+from maasapiserver.common.middlewares.prometheus import (
+    ConfigurationsCacheCollector,
+    PrometheusMiddleware,
+)
 from maasapiserver.v3.middlewares.context import ContextMiddleware
 from maasservicelayer.db import Database
+from maasservicelayer.services import CacheForServices, ConfigurationsService
 
 
 @pytest.fixture
@@ -55,3 +59,31 @@ class TestPrometheusMiddleware:
             rf'maas_apiserver_request_query_count_total{{handler="/{{count}}",.*,method="GET",status="200"}} {count}.0',
             response.text,
         )
+
+
+class TestConfigurationsCacheCollector:
+    def test_collect(self) -> None:
+        services_cache = CacheForServices()
+        collector = ConfigurationsCacheCollector(services_cache)
+        # Nothing is collected until the cache is used.
+        assert list(collector.collect()) == []
+        cache = services_cache.get(
+            ConfigurationsService.__name__,
+            ConfigurationsService.build_cache_object,
+        )
+        cache.hits["database"] = 3
+        cache.misses["secret"] = 1
+        metrics = {
+            metric.name: {
+                sample.labels["source"]: sample.value
+                for sample in metric.samples
+            }
+            for metric in collector.collect()
+        }
+        assert metrics == {
+            "maas_apiserver_config_cache_hits": {"database": 3, "secret": 0},
+            "maas_apiserver_config_cache_misses": {
+                "database": 0,
+                "secret": 1,
+            },
+        }
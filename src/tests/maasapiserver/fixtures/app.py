@@ -33,6 +33,7 @@ from maasservicelayer.db import Database
 from maasservicelayer.models.users import User
 from maasservicelayer.services import ServiceCollectionV3
 from maasservicelayer.services.external_auth import ExternalAuthService
+from maasservicelayer.services.table_generations import TableGenerationsService
 from maasservicelayer.utils.date import utcnow
 from tests.fixtures.factories.user import create_test_user
 from tests.maasapiserver.fixtures.db import Fixture
@@ -98,7 +99,11 @@ def create_app_with_mocks(
 
 @pytest.fixture
 def services_mock():
-    yield Mock(ServiceCollectionV3)
+    services = Mock(ServiceCollectionV3)
+    # The listings are not conditional unless a test says otherwise.
+    services.table_generations = Mock(TableGenerationsService)
+    services.table_generations.get_collection_etag.return_value = None
+    yield services
 
 
 @pytest.fixture
@@ -33,7 +33,7 @@ async def db(
 ) -> Iterator[Database]:
     db = Database(test_config.db, echo=test_config.debug_queries)
     yield db
-    await db.engine.dispose()
+    await db.dispose()
 
 
 @pytest.fixture
@@ -42,7 +42,9 @@ def transaction_middleware_class(
 ) -> Iterator[type]:
     class ConnectionReusingTransactionMiddleware(TransactionMiddleware):
         @asynccontextmanager
-        async def get_connection(self) -> AsyncIterator[AsyncConnection]:
+        async def get_connection(
+            self, read_only: bool = False
+        ) -> AsyncIterator[AsyncConnection]:
             yield db_connection
 
     yield ConnectionReusingTransactionMiddleware
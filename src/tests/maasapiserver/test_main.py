@@ -0,0 +1,43 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from maasapiserver.main import load_jwt_key
+from maasservicelayer.auth.jwt import UserRole
+from maasservicelayer.context import Context
+from maasservicelayer.models.auth import AuthenticatedUser
+from maasservicelayer.services import (
+    AuthService,
+    CacheForServices,
+    ServiceCollectionV3,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_jwt_key():
+    AuthService.JWT_TOKEN_KEY = None
+    yield
+    AuthService.JWT_TOKEN_KEY = None
+
+
+@pytest.mark.usefixtures("ensuremaasdb")
+@pytest.mark.asyncio
+class TestLoadJWTKey:
+    async def test_access_token_read_only(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        # The key doesn't exist yet, it's created at startup.
+        await load_jwt_key(db_connection, CacheForServices())
+        # Load the key again in a read-only transaction, as a GET does.
+        AuthService.JWT_TOKEN_KEY = None
+        await db_connection.execute(text("SET TRANSACTION READ ONLY"))
+        services = await ServiceCollectionV3.produce(
+            Context(connection=db_connection), cache=CacheForServices()
+        )
+        token = await services.auth.access_token(
+            AuthenticatedUser(id=1, username="admin", roles={UserRole.ADMIN})
+        )
+        assert token.subject == "admin"
@@ -74,6 +74,49 @@ class TestGetDefaultDBConfig:
         assert config.password == "pass"
         assert config.port == 12345
 
+    @pytest.mark.asyncio
+    async def test_pool_options(self):
+        region_config = RegionConfiguration(
+            {
+                "database_host": "host",
+                "database_pool_size": 10,
+                "database_pool_max_overflow": 5,
+                "database_pool_recycle": 3600,
+                "database_pool_timeout": 2,
+            }
+        )
+        config = await _get_default_db_config(region_config)
+        assert config.pool_size == 10
+        assert config.max_overflow == 5
+        assert config.pool_recycle == 3600
+        assert config.pool_timeout == 2
+        assert config.read_only is None
+
+    @pytest.mark.asyncio
+    async def test_read_only_pool(self):
+        region_config = RegionConfiguration(
+            {
+                "database_name": "maasdb",
+                "database_user": "user",
+                "database_pass": "pass",
+                "database_host": "host",
+                "database_port": 12345,
+                "database_pool_size": 10,
+                "database_read_pool_size": 4,
+                "database_read_host": "replica",
+            }
+        )
+        config = await _get_default_db_config(region_config)
+        read_only = config.read_only
+        assert read_only is not None
+        assert read_only.name == "maasdb"
+        assert read_only.host == "replica"
+        assert read_only.port == 12345
+        assert read_only.username == "user"
+        assert read_only.pool_size == 4
+        assert read_only.max_overflow == 10
+        assert read_only.read_only is None
+
     @pytest.mark.asyncio
     async def test_vault(self, mocker):
         MAAS_ID.set("asdf")
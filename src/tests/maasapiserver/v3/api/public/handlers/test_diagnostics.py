@@ -0,0 +1,83 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+from pathlib import Path
+
+from httpx import AsyncClient
+import pytest
+
+from maasapiserver.v3.api.public.handlers import diagnostics
+from maasapiserver.v3.api.public.models.responses.diagnostics import (
+    SlowQueriesListResponse,
+)
+from maasapiserver.v3.constants import V3_API_PREFIX
+from maascommon.utils.slowqueries import SlowQueryLog
+from maasservicelayer.services import ServiceCollectionV3
+
+
+@pytest.fixture
+def slow_queries_path(tmp_path: Path, monkeypatch) -> Path:
+    path = tmp_path / "slow-queries"
+    monkeypatch.setattr(diagnostics, "get_slow_queries_path", lambda: path)
+    return path
+
+
+@pytest.mark.asyncio
+class TestDiagnosticsApi:
+    BASE_PATH = f"{V3_API_PREFIX}/diagnostics"
+
+    async def test_list_slow_queries_forbidden_for_users(
+        self,
+        services_mock: ServiceCollectionV3,
+        mocked_api_client_user: AsyncClient,
+        slow_queries_path: Path,
+    ) -> None:
+        response = await mocked_api_client_user.get(
+            f"{self.BASE_PATH}/slow_queries"
+        )
+        assert response.status_code == 403
+
+    async def test_list_slow_queries_empty(
+        self,
+        services_mock: ServiceCollectionV3,
+        mocked_api_client_admin: AsyncClient,
+        slow_queries_path: Path,
+    ) -> None:
+        response = await mocked_api_client_admin.get(
+            f"{self.BASE_PATH}/slow_queries"
+        )
+        assert response.status_code == 200
+        slow_queries = SlowQueriesListResponse(**response.json())
+        assert slow_queries.kind == "SlowQueriesList"
+        assert slow_queries.items == []
+
+    async def test_list_slow_queries(
+        self,
+        services_mock: ServiceCollectionV3,
+        mocked_api_client_admin: AsyncClient,
+        slow_queries_path: Path,
+    ) -> None:
+        log = SlowQueryLog(slow_queries_path, "test", threshold=0)
+        log.record(
+            "GET /MAAS/a/v3/machines",
+            [
+                ("SELECT * FROM node WHERE id = %s", (1,), 0.1),
+                ("SELECT * FROM node WHERE id = %s", (2,), 0.3),
+            ],
+        )
+        log.record("machine.list", [("SELECT * FROM node", None, 0.2)])
+        log.flush()
+
+        response = await mocked_api_client_admin.get(
+            f"{self.BASE_PATH}/slow_queries?size=1"
+        )
+        assert response.status_code == 200
+        slow_queries = SlowQueriesListResponse(**response.json())
+        assert [
+            (item.endpoint, item.duration, item.bind_shape)
+            for item in slow_queries.items
+        ] == [
+            ("GET /MAAS/a/v3/machines", 0.3, "int"),
+            ("machine.list", 0.2, ""),
+        ]
+        assert slow_queries.items[0].sql == "SELECT * FROM node WHERE id = %s"
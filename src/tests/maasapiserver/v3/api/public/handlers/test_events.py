@@ -1,17 +1,19 @@
 #  Copyright 2024-2025 Canonical Ltd.  This software is licensed under the
 #  GNU Affero General Public License version 3 (see the file LICENSE).
 
+import json
 from unittest.mock import Mock
 from urllib.parse import parse_qs, urlparse
 
 from httpx import AsyncClient
 import pytest
 
+from maasapiserver.v3.api.public.models.responses.base import NDJSON_MEDIA_TYPE
 from maasapiserver.v3.api.public.models.responses.events import (
     EventsListResponse,
 )
 from maasapiserver.v3.constants import V3_API_PREFIX
-from maasservicelayer.models.base import ListResult
+from maasservicelayer.models.base import ListCount, ListResult, TokenListResult
 from maasservicelayer.models.events import (
     EndpointChoicesEnum,
     Event,
@@ -135,3 +137,199 @@ class TestEventsApi(ApiCommonTests):
             TEST_EVENT_2.node_system_id,
         }
         assert next_link_params["size"][0] == "1"
+
+    async def test_list_by_token(
+        self,
+        services_mock: ServiceCollectionV3,
+        mocked_api_client_user: AsyncClient,
+    ) -> None:
+        services_mock.events = Mock(EventsService)
+        services_mock.events.list_by_token.side_effect = [
+            TokenListResult[Event](items=[TEST_EVENT_2], next_token="next"),
+            TokenListResult[Event](items=[TEST_EVENT], next_token=None),
+        ]
+
+        response = await mocked_api_client_user.get(
+            f"{self.BASE_PATH}?count=none&size=1&system_id=1"
+        )
+        assert response.status_code == 200
+        events_response = EventsListResponse(**response.json())
+        assert [event.id for event in events_response.items] == [2]
+        assert events_response.total is None
+        next_link_params = parse_qs(urlparse(events_response.next).query)
+        assert next_link_params == {
+            "token": ["next"],
+            "size": ["1"],
+            "count": ["none"],
+            "system_id": ["1"],
+        }
+        services_mock.events.list.assert_not_called()
+        kwargs = services_mock.events.list_by_token.call_args.kwargs
+        assert kwargs["token"] is None
+        assert kwargs["size"] == 1
+        assert kwargs["count"] == ListCount.NONE
+
+        response = await mocked_api_client_user.get(events_response.next)
+        assert response.status_code == 200
+        events_response = EventsListResponse(**response.json())
+        assert [event.id for event in events_response.items] == [1]
+        assert events_response.next is None
+        kwargs = services_mock.events.list_by_token.call_args.kwargs
+        assert kwargs["token"] == "next"
+
+    async def test_list_by_token_with_estimated_count(
+        self,
+        services_mock: ServiceCollectionV3,
+        mocked_api_client_user: AsyncClient,
+    ) -> None:
+        services_mock.events = Mock(EventsService)
+        services_mock.events.list_by_token.return_value = TokenListResult[
+            Event
+        ](
+            items=[TEST_EVENT],
+            next_token=None,
+            total=10000,
+            total_is_estimate=True,
+        )
+        response = await mocked_api_client_user.get(
+            f"{self.BASE_PATH}?count=estimate"
+        )
+        assert response.status_code == 200
+        events_response = EventsListResponse(**response.json())
+        assert events_response.total == 10000
+        assert events_response.total_is_estimate
+        kwargs = services_mock.events.list_by_token.call_args.kwargs
+        assert kwargs["count"] == ListCount.ESTIMATE
+
+    async def test_list_stream(
+        self,
+        services_mock: ServiceCollectionV3,
+        mocked_api_client_user: AsyncClient,
+    ) -> None:
+        async def stream(query):
+            for event in (TEST_EVENT_2, TEST_EVENT):
+                yield event
+
+        services_mock.events = Mock(EventsService)
+        services_mock.events.stream = stream
+
+        response = await mocked_api_client_user.get(
+            f"{self.BASE_PATH}?size=1",
+            headers={"Accept": NDJSON_MEDIA_TYPE},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == NDJSON_MEDIA_TYPE
+        events = [json.loads(line) for line in response.text.splitlines()]
+        # The pagination parameters are ignored.
+        assert [event["id"] for event in events] == [2, 1]
+        assert events[0]["_links"]["self"]["href"] == f"{self.BASE_PATH}/2"
+        services_mock.events.list.assert_not_called()
+
+    async def test_list_etag(
+        self,
+        services_mock: ServiceCollectionV3,
+        mocked_api_client_user: AsyncClient,
+    ) -> None:
+        services_mock.events = Mock(EventsService)
+        services_mock.events.get_source_tables.return_value = {
+            "maasserver_event"
+        }
+        services_mock.events.list.return_value = ListResult[Event](
+            items=[TEST_EVENT], total=1
+        )
+        services_mock.table_generations.get_collection_etag.return_value = (
+            "abc"
+        )
+
+        response = await mocked_api_client_user.get(f"{self.BASE_PATH}")
+        assert response.status_code == 200
+        assert response.headers["ETag"] == "abc"
+        table_names, key = (
+            services_mock.table_generations.get_collection_etag.call_args.args
+        )
+        assert table_names == {"maasserver_event"}
+        assert self.BASE_PATH in key
+
+    @pytest.mark.parametrize(
+        "if_none_match", ["abc", '"abc"', 'W/"abc"', '"def", "abc"', "*"]
+    )
+    async def test_list_not_modified(
+        self,
+        services_mock: ServiceCollectionV3,
+        mocked_api_client_user: AsyncClient,
+        if_none_match: str,
+    ) -> None:
+        services_mock.events = Mock(EventsService)
+        services_mock.table_generations.get_collection_etag.return_value = (
+            "abc"
+        )
+
+        response = await mocked_api_client_user.get(
+            f"{self.BASE_PATH}", headers={"If-None-Match": if_none_match}
+        )
+        assert response.status_code == 304
+        assert response.headers["ETag"] == "abc"
+        assert response.content == b""
+        services_mock.events.list.assert_not_called()
+
+    async def test_list_modified(
+        self,
+        services_mock: ServiceCollectionV3,
+        mocked_api_client_user: AsyncClient,
+    ) -> None:
+        services_mock.events = Mock(EventsService)
+        services_mock.events.list.return_value = ListResult[Event](
+            items=[TEST_EVENT], total=1
+        )
+        services_mock.table_generations.get_collection_etag.return_value = (
+            "abc"
+        )
+
+        response = await mocked_api_client_user.get(
+            f"{self.BASE_PATH}", headers={"If-None-Match": "def"}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] == "abc"
+        services_mock.events.list.assert_called_once()
+
+    async def test_list_untracked_tables(
+        self,
+        services_mock: ServiceCollectionV3,
+        mocked_api_client_user: AsyncClient,
+    ) -> None:
+        services_mock.events = Mock(EventsService)
+        services_mock.events.list.return_value = ListResult[Event](
+            items=[TEST_EVENT], total=1
+        )
+
+        response = await mocked_api_client_user.get(
+            f"{self.BASE_PATH}", headers={"If-None-Match": "*"}
+        )
+        assert response.status_code == 200
+        assert "ETag" not in response.headers
+
+    async def test_list_stream_etag(
+        self,
+        services_mock: ServiceCollectionV3,
+        mocked_api_client_user: AsyncClient,
+    ) -> None:
+        async def stream(query):
+            yield TEST_EVENT
+
+        services_mock.events = Mock(EventsService)
+        services_mock.events.stream = stream
+        services_mock.table_generations.get_collection_etag.return_value = (
+            "abc"
+        )
+
+        response = await mocked_api_client_user.get(
+            f"{self.BASE_PATH}", headers={"Accept": NDJSON_MEDIA_TYPE}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] == "abc"
+        # The streamed listing doesn't have the same ETag as the paginated
+        # one.
+        _, key = (
+            services_mock.table_generations.get_collection_etag.call_args.args
+        )
+        assert NDJSON_MEDIA_TYPE in key
@@ -1,6 +1,7 @@
 #  Copyright 2024-2025 Canonical Ltd.  This software is licensed under the
 #  GNU Affero General Public License version 3 (see the file LICENSE).
 
+import json
 from unittest.mock import Mock
 
 from httpx import AsyncClient
@@ -325,6 +326,50 @@ class TestMachinesApi(ApiCommonTests):
             ),
         )
 
+    async def test_list_rbac_etag_key(
+        self,
+        services_mock: ServiceCollectionV3,
+        mocked_api_client_user_rbac: AsyncClient,
+    ) -> None:
+        services_mock.external_auth = Mock(ExternalAuthService)
+        rbac_client_mock = Mock(RbacAsyncClient)
+        rbac_client_mock.get_resource_pool_ids.return_value = [
+            PermissionResourcesMapping(
+                permission=RbacPermission.VIEW, resources=[0, 1]
+            ),
+            PermissionResourcesMapping(
+                permission=RbacPermission.VIEW_ALL, resources=[0]
+            ),
+            PermissionResourcesMapping(
+                permission=RbacPermission.ADMIN_MACHINES, resources=[]
+            ),
+        ]
+        services_mock.external_auth.get_rbac_client.return_value = (
+            rbac_client_mock
+        )
+        services_mock.machines = Mock(MachinesService)
+        services_mock.machines.get_source_tables.return_value = {
+            "maasserver_node"
+        }
+        services_mock.machines.list.return_value = ListResult[Machine](
+            items=[TEST_MACHINE], total=1
+        )
+        services_mock.table_generations.get_collection_etag.return_value = (
+            "abc"
+        )
+
+        response = await mocked_api_client_user_rbac.get(self.BASE_PATH)
+        assert response.status_code == 200
+        assert response.headers["ETag"] == "abc"
+        _, key = (
+            services_mock.table_generations.get_collection_etag.call_args.args
+        )
+        # The pools the user can see are part of the key.
+        _, where, params = json.loads(key)
+        assert "maasserver_node.pool_id IN" in where
+        assert [0] in params.values()
+        assert [0, 1] in params.values()
+
     async def test_get_machine_power_parameters(
         self,
         services_mock: ServiceCollectionV3,
@@ -0,0 +1,65 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+import json
+from typing import AsyncIterator
+
+import pytest
+
+from maasapiserver.v3.api.public.models.responses import base
+from maasapiserver.v3.api.public.models.responses.base import (
+    BaseHal,
+    BaseHref,
+    HalResponse,
+    NDJSON_MEDIA_TYPE,
+    NDJSONResponse,
+)
+
+
+class ItemResponse(HalResponse[BaseHal]):
+    kind = "Item"
+    id: int
+    description: str | None
+
+
+async def make_items(count: int) -> AsyncIterator[ItemResponse]:
+    for i in range(count):
+        yield ItemResponse(
+            id=i,
+            description=None,
+            hal_links=BaseHal(  # pyright: ignore [reportCallIssue]
+                self=BaseHref(href=f"/items/{i}")
+            ),
+        )
+
+
+@pytest.mark.asyncio
+class TestNDJSONResponse:
+    async def test_lines(self) -> None:
+        response = NDJSONResponse(make_items(2))
+        assert response.media_type == NDJSON_MEDIA_TYPE
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        assert [json.loads(line) for line in body.splitlines()] == [
+            {
+                "kind": "Item",
+                "id": 0,
+                "_links": {"self": {"href": "/items/0"}},
+            },
+            {
+                "kind": "Item",
+                "id": 1,
+                "_links": {"self": {"href": "/items/1"}},
+            },
+        ]
+
+    async def test_chunks(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(base, "STREAMING_CHUNK_SIZE", 100)
+        response = NDJSONResponse(make_items(10))
+        chunks = [chunk async for chunk in response.body_iterator]
+        assert len(chunks) > 1
+        assert all(chunk.endswith(b"\n") for chunk in chunks)
+        assert len(b"".join(chunks).splitlines()) == 10
+
+    async def test_empty(self) -> None:
+        response = NDJSONResponse(make_items(0))
+        assert [chunk async for chunk in response.body_iterator] == []
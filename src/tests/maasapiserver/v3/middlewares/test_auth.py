@@ -2,7 +2,7 @@
 #  GNU Affero General Public License version 3 (see the file LICENSE).
 
 from datetime import timedelta
-from typing import Any, AsyncIterator, Callable, Iterator
+from typing import Any, AsyncIterator, Iterator
 from unittest.mock import AsyncMock, Mock
 
 from fastapi import FastAPI, Request
@@ -272,14 +272,24 @@ class TestV3AuthenticationMiddleware:
             app=None, providers_cache=authentication_providers_cache
         )
 
-        request_mock = Mock(Request)
-        request_mock.headers = {}
-        request_mock.cookies = {}
-        call_next_mock = AsyncMock(Callable)
+        app_mock = AsyncMock()
+        auth_middleware.app = app_mock
+        request = Request(
+            {
+                "type": "http",
+                "method": "GET",
+                "path": f"{V3_API_PREFIX}/users/me",
+                "headers": [],
+                "query_string": b"",
+            }
+        )
+        send_mock = AsyncMock()
 
-        await auth_middleware.dispatch(request_mock, call_next_mock)
-        assert request_mock.state.authenticated_user == authenticated_user
-        call_next_mock.assert_called_once_with(request_mock)
+        await auth_middleware.handle(request, send_mock)
+        assert request.state.authenticated_user == authenticated_user
+        app_mock.assert_called_once_with(
+            request.scope, request.receive, send_mock
+        )
         macaroon_auth_provider_mock.authenticate.assert_called_once()
 
 
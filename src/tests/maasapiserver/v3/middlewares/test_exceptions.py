@@ -1,11 +1,10 @@
 # Copyright 2024-2025 Canonical Ltd.  This software is licensed under the
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
-from unittest.mock import MagicMock, Mock
+from unittest.mock import Mock
 
 from macaroonbakery.bakery import Macaroon
 import pytest
-from starlette.requests import Request
 from starlette.types import ASGIApp
 
 from maasapiserver.common.api.models.responses.errors import (
@@ -108,11 +107,6 @@ class TestExceptionMiddleware:
     async def test_exception_middleware(
         self, exception_to_raise, expected_response
     ):
-        async def mock_call_next(request):
-            raise exception_to_raise
-
         middleware = ExceptionMiddleware(app=Mock(ASGIApp))
-        request = MagicMock(spec=Request)
-
-        response = await middleware.dispatch(request, mock_call_next)
+        response = middleware.get_error_response(exception_to_raise)
         assert isinstance(response, expected_response)
@@ -0,0 +1,130 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+import gzip
+import zlib
+
+import pytest
+
+from maascommon.utils import compression
+from maascommon.utils.compression import (
+    is_compressible,
+    negotiate_encoding,
+    StreamCompressor,
+    weaken_etag,
+)
+
+
+class TestNegotiateEncoding:
+    @pytest.fixture(autouse=True)
+    def supported_encodings(self, monkeypatch):
+        monkeypatch.setattr(
+            compression, "SUPPORTED_ENCODINGS", ("zstd", "gzip")
+        )
+
+    @pytest.mark.parametrize(
+        "accept_encoding,encoding",
+        [
+            (None, None),
+            ("", None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("GZIP", "gzip"),
+            ("gzip, deflate, br", "gzip"),
+            ("gzip, zstd", "zstd"),
+            ("gzip;q=1.0, zstd;q=0.5", "gzip"),
+            ("zstd;q=0, gzip", "gzip"),
+            ("gzip;q=0", None),
+            ("*", "zstd"),
+            ("*, zstd;q=0", "gzip"),
+            ("gzip;q=invalid", None),
+        ],
+    )
+    def test_negotiate(
+        self, accept_encoding: str | None, encoding: str | None
+    ) -> None:
+        assert negotiate_encoding(accept_encoding) == encoding
+
+    def test_negotiate_without_zstd(self, monkeypatch) -> None:
+        monkeypatch.setattr(compression, "SUPPORTED_ENCODINGS", ("gzip",))
+        assert negotiate_encoding("zstd") is None
+        assert negotiate_encoding("zstd, gzip") == "gzip"
+
+
+class TestIsCompressible:
+    @pytest.mark.parametrize(
+        "content_type,compressible",
+        [
+            (None, False),
+            ("application/json", True),
+            ("application/json; charset=utf-8", True),
+            ("application/x-ndjson", True),
+            ("application/problem+json", True),
+            ("text/plain", True),
+            ("text/html; charset=utf-8", True),
+            ("image/png", False),
+            ("application/gzip", False),
+            ("application/octet-stream", False),
+        ],
+    )
+    def test_is_compressible(
+        self, content_type: str | None, compressible: bool
+    ) -> None:
+        assert is_compressible(content_type) == compressible
+
+
+class TestStreamCompressor:
+    def test_gzip(self) -> None:
+        compressor = StreamCompressor("gzip", 6)
+        chunks = [b"a" * 1000, b"b" * 1000, b"c" * 1000]
+        compressed = b"".join(compressor.compress(chunk) for chunk in chunks)
+        compressed += compressor.finish()
+        assert gzip.decompress(compressed) == b"".join(chunks)
+        assert compressor.original_size == 3000
+        assert compressor.compressed_size == len(compressed)
+        assert compressor.saved_size == 3000 - len(compressed)
+
+    def test_saved_size_not_negative(self) -> None:
+        compressor = StreamCompressor("gzip", 6)
+        compressor.finish(b"a")
+        assert compressor.compressed_size > compressor.original_size
+        assert compressor.saved_size == 0
+
+    def test_gzip_chunks_are_flushed(self) -> None:
+        compressor = StreamCompressor("gzip", 6)
+        first = compressor.compress(b'{"id": 1}\n')
+        decompressor = zlib.decompressobj(31)
+        assert decompressor.decompress(first) == b'{"id": 1}\n'
+
+    def test_gzip_finish_with_data(self) -> None:
+        compressor = StreamCompressor("gzip", 6)
+        compressed = compressor.finish(b"a" * 1000)
+        assert gzip.decompress(compressed) == b"a" * 1000
+        assert compressor.original_size == 1000
+
+    def test_zstd(self) -> None:
+        zstandard = pytest.importorskip("zstandard")
+        compressor = StreamCompressor("zstd", 6)
+        compressed = compressor.compress(b"a" * 1000)
+        compressed += compressor.finish(b"b" * 1000)
+        decompressed = zstandard.ZstdDecompressor().decompressobj()
+        assert decompressed.decompress(compressed) == b"a" * 1000 + (
+            b"b" * 1000
+        )
+
+    def test_unsupported(self) -> None:
+        with pytest.raises(ValueError):
+            StreamCompressor("br", 6)
+
+
+class TestWeakenETag:
+    @pytest.mark.parametrize(
+        "etag,weak",
+        [
+            ('"abc"', 'W/"abc"'),
+            ("abc", 'W/"abc"'),
+            ('W/"abc"', 'W/"abc"'),
+        ],
+    )
+    def test_weaken_etag(self, etag: str, weak: str) -> None:
+        assert weaken_etag(etag) == weak
@@ -0,0 +1,216 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from maascommon.utils import slowqueries
+from maascommon.utils.slowqueries import (
+    clear_slow_queries,
+    get_bind_shape,
+    is_explainable,
+    normalize_sql,
+    prune_slow_queries,
+    read_slow_queries,
+    SlowQueryLog,
+)
+
+
+class TestNormalizeSQL:
+    @pytest.mark.parametrize(
+        "sql,normalized",
+        [
+            (
+                "SELECT *\n  FROM node\n  WHERE id = 42",
+                "SELECT * FROM node WHERE id = ?",
+            ),
+            (
+                "SELECT * FROM node WHERE hostname = 'it''s' AND cpu > 1.5",
+                "SELECT * FROM node WHERE hostname = ? AND cpu > ?",
+            ),
+            (
+                "SELECT * FROM node WHERE id IN (%s, %s, %s)",
+                "SELECT * FROM node WHERE id IN (...)",
+            ),
+            (
+                "SELECT * FROM node WHERE id IN ($1, $2) AND zone_id = $3",
+                "SELECT * FROM node WHERE id IN (...) AND zone_id = $3",
+            ),
+            (
+                "SELECT anon_1.id FROM t1 AS anon_1 LIMIT %(param_1)s",
+                "SELECT anon_1.id FROM t1 AS anon_1 LIMIT %(param_1)s",
+            ),
+        ],
+    )
+    def test_normalize(self, sql: str, normalized: str) -> None:
+        assert normalize_sql(sql) == normalized
+
+
+class TestGetBindShape:
+    @pytest.mark.parametrize(
+        "params,shape",
+        [
+            (None, ""),
+            ((), ""),
+            ((1, "a", None), "int, str, null"),
+            ({"id": 1, "ids": [1, 2, 3]}, "id: int, ids: list[3]"),
+        ],
+    )
+    def test_get_bind_shape(self, params, shape: str) -> None:
+        assert get_bind_shape(params) == shape
+
+
+class TestIsExplainable:
+    @pytest.mark.parametrize(
+        "sql,explainable",
+        [
+            ("SELECT 1", True),
+            ("  select * from node", True),
+            ("(SELECT 1) UNION (SELECT 2)", True),
+            ("UPDATE node SET hostname = 'foo'", False),
+            ("INSERT INTO node VALUES (1)", False),
+            ("SELECT pg_try_advisory_xact_lock(%s)", False),
+            ("SELECT nextval('maasserver_zone_serial_seq')", False),
+            ("SELECT * FROM node WHERE id = %s FOR UPDATE", False),
+            ("SELECT * FROM node FOR NO KEY UPDATE OF node", False),
+            ("SELECT * INTO node_copy FROM node", False),
+        ],
+    )
+    def test_is_explainable(self, sql: str, explainable: bool) -> None:
+        assert is_explainable(sql) == explainable
+
+
+class TestSlowQueryLog:
+    def test_statements_threshold(self, tmp_path: Path) -> None:
+        log = SlowQueryLog(tmp_path, "test", threshold=0.5)
+        statements = log.statements()
+        statements.add("SELECT 1", None, 0.1)
+        statements.add("SELECT 2", None, 0.5)
+        assert statements.statements == [("SELECT 2", None, 0.5)]
+
+    def test_record_keeps_slowest(self, tmp_path: Path) -> None:
+        log = SlowQueryLog(tmp_path, "test", size=2, threshold=0)
+        log.record(
+            "GET /machines",
+            [
+                ("SELECT 1", None, 0.1),
+                ("SELECT 2", None, 0.3),
+                ("SELECT 3", None, 0.2),
+            ],
+        )
+        log.record("GET /zones", [("SELECT 4", {"id": 1}, 0.4)])
+        queries = log.get_queries()
+        assert [
+            (query.sql, query.duration) for query in queries["GET /machines"]
+        ] == [("SELECT ?", 0.3), ("SELECT ?", 0.2)]
+        [zone_query] = queries["GET /zones"]
+        assert zone_query.bind_shape == "id: int"
+
+    def test_record_samples(self, tmp_path: Path) -> None:
+        log = SlowQueryLog(tmp_path, "test", threshold=0, explain_rate=1.0)
+        samples = log.record(
+            "GET /machines",
+            [
+                ("SELECT * FROM node WHERE id = %s", (1,), 0.1),
+                ("UPDATE node SET hostname = %s", ("foo",), 0.1),
+            ],
+        )
+        [(query, sql, params)] = samples
+        assert query.sql == "SELECT * FROM node WHERE id = %s"
+        assert sql == "SELECT * FROM node WHERE id = %s"
+        assert params == (1,)
+
+    def test_record_no_samples(self, tmp_path: Path) -> None:
+        log = SlowQueryLog(tmp_path, "test", threshold=0, explain_rate=0)
+        assert log.record("GET /machines", [("SELECT 1", None, 0.1)]) == []
+
+    def test_flush(self, tmp_path: Path) -> None:
+        log = SlowQueryLog(tmp_path, "test", threshold=0, explain_rate=1.0)
+        [(query, _, _)] = log.record(
+            "GET /machines", [("SELECT 1", None, 0.1)]
+        )
+        log.set_explain(query, "Result")
+        log.flush()
+        snapshot = json.loads(
+            (tmp_path / f"test-{os.getpid()}.json").read_text()
+        )
+        [saved] = snapshot["GET /machines"]
+        assert saved["sql"] == "SELECT ?"
+        assert saved["explain"] == "Result"
+
+    def test_flush_unchanged(self, tmp_path: Path) -> None:
+        log = SlowQueryLog(tmp_path / "slow-queries", "test")
+        log.flush()
+        assert not (tmp_path / "slow-queries").exists()
+
+    def test_flush_prunes_dead_processes(
+        self, tmp_path: Path, monkeypatch
+    ) -> None:
+        dead = tmp_path / "test-99999.json"
+        dead.write_text("{}")
+        monkeypatch.setattr(
+            slowqueries, "_pid_exists", lambda pid: pid == os.getpid()
+        )
+        log = SlowQueryLog(tmp_path, "test", threshold=0)
+        log.record("GET /machines", [("SELECT 1", None, 0.1)])
+        log.flush()
+        assert not dead.exists()
+        assert (tmp_path / f"test-{os.getpid()}.json").exists()
+
+    def test_record_discards_cleared(
+        self, tmp_path: Path, monkeypatch
+    ) -> None:
+        log = SlowQueryLog(tmp_path, "test", threshold=0)
+        log.record("GET /machines", [("SELECT 1", None, 0.1)])
+        cleared_at = log.get_queries()["GET /machines"][0].timestamp + 1
+        monkeypatch.setattr(
+            slowqueries, "_get_cleared_at", lambda path: cleared_at
+        )
+        monkeypatch.setattr(slowqueries.time, "time", lambda: cleared_at + 1)
+        log.record("GET /zones", [("SELECT 2", None, 0.1)])
+        assert list(log.get_queries()) == ["GET /zones"]
+
+
+class TestReadSlowQueries:
+    def test_merge(self, tmp_path: Path) -> None:
+        first = SlowQueryLog(tmp_path, "first", threshold=0)
+        first.record("GET /machines", [("SELECT 1", None, 0.1)])
+        first.flush()
+        second = SlowQueryLog(tmp_path, "second", threshold=0)
+        second.record(
+            "GET /machines",
+            [("SELECT 2", None, 0.3), ("SELECT 3", None, 0.2)],
+        )
+        second.record("machine.list", [("SELECT 4", None, 0.1)])
+        second.flush()
+
+        slow_queries = read_slow_queries(tmp_path, size=2)
+        assert list(slow_queries) == ["GET /machines", "machine.list"]
+        assert [query.duration for query in slow_queries["GET /machines"]] == [
+            0.3,
+            0.2,
+        ]
+
+    def test_prune(self, tmp_path: Path) -> None:
+        alive = tmp_path / f"test-{os.getpid()}.json"
+        alive.write_text("{}")
+        # Pid numbers are bounded by pid_max, which is at most 2^22.
+        dead = tmp_path / f"test-{2**22 + 1}.json"
+        dead.write_text("{}")
+        prune_slow_queries(tmp_path)
+        assert alive.exists()
+        assert not dead.exists()
+
+    def test_missing_directory(self, tmp_path: Path) -> None:
+        assert read_slow_queries(tmp_path / "missing") == {}
+
+    def test_clear(self, tmp_path: Path) -> None:
+        log = SlowQueryLog(tmp_path, "test", threshold=0)
+        log.record("GET /machines", [("SELECT 1", None, 0.1)])
+        log.flush()
+        clear_slow_queries(tmp_path)
+        assert read_slow_queries(tmp_path) == {}
+        assert (tmp_path / slowqueries.CLEARED_MARKER).exists()
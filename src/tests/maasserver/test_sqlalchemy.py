@@ -2,12 +2,13 @@
 # GNU Affero General Public License version 3 (see the file LICENSE).
 
 import asyncio
+from ipaddress import IPv4Address, IPv4Network
 from unittest.mock import Mock
 
 from django.db import connection as django_connection
 from django.db import transaction
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.sql.expression import func
 
 from maasserver.sqlalchemy import (
@@ -37,6 +38,25 @@ class TestGetSqlalchemyConnection:
             django_txid = rows[0][0]
         assert sqlalchemy_txid == django_txid
 
+    def test_service_layer_types(self):
+        sql = (
+            "SELECT '{\"a\": 1}'::jsonb, '10.0.0.1'::inet, '10.0.0.0/24'::cidr"
+        )
+        conn = get_sqlalchemy_django_connection()
+        assert tuple(conn.execute(text(sql)).one()) == (
+            {"a": 1},
+            IPv4Address("10.0.0.1"),
+            IPv4Network("10.0.0.0/24"),
+        )
+        # The cursors of django on the same connection are not affected.
+        with django_connection.cursor() as cursor:
+            cursor.execute(sql)
+            assert cursor.fetchone() == (
+                '{"a": 1}',
+                "10.0.0.1",
+                "10.0.0.0/24",
+            )
+
     def test_no_transaction_handling(self):
         conn = get_sqlalchemy_django_connection()
         with pytest.raises(NotImplementedError):
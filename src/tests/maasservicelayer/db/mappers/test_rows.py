@@ -0,0 +1,118 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+from ipaddress import IPv4Address, IPv6Address
+
+from netaddr import IPAddress
+from pydantic import IPvAnyAddress, root_validator, ValidationError, validator
+import pytest
+
+from maasservicelayer.db.mappers.rows import (
+    get_trusted_row_adapter,
+    TrustedRowAdapter,
+)
+from maasservicelayer.models.base import MaasBaseModel
+from maasservicelayer.models.events import (
+    EndpointChoicesEnum,
+    Event,
+    LoggingLevelEnum,
+)
+from maasservicelayer.utils.date import utcnow
+
+NOW = utcnow()
+
+EVENT_ROW = {
+    "id": 1,
+    "created": NOW,
+    "updated": NOW,
+    "type": {
+        "id": 2,
+        "created": NOW,
+        "updated": NOW,
+        "name": "TYPE_TEST",
+        "description": "A test type",
+        "level": 20,
+    },
+    "node_id": None,
+    "node_system_id": "abcdef",
+    "node_hostname": "foo",
+    "user_id": None,
+    "owner": "",
+    "ip_address": IPAddress("10.0.0.1"),
+    "endpoint": 0,
+    "user_agent": "",
+    "description": "",
+    "action": "test",
+}
+
+
+class ModelWithValidator(MaasBaseModel):
+    name: str
+
+    @validator("name")
+    def upper_name(cls, v):
+        return v.upper()
+
+
+class ModelWithRootValidator(MaasBaseModel):
+    name: str
+
+    @root_validator
+    def upper_name(cls, values):
+        values["name"] = values["name"].upper()
+        return values
+
+
+class TestTrustedRowAdapter:
+    def test_same_as_validation(self) -> None:
+        event = TrustedRowAdapter(Event)(EVENT_ROW)
+        assert event == Event(**EVENT_ROW)
+        assert event.__fields_set__ == Event(**EVENT_ROW).__fields_set__
+        assert event.endpoint is EndpointChoicesEnum.API
+        assert event.type.level is LoggingLevelEnum.INFO
+        assert event.ip_address == IPv4Address("10.0.0.1")
+
+    @pytest.mark.parametrize(
+        "ip,expected",
+        [
+            (IPAddress("10.0.0.1"), IPv4Address("10.0.0.1")),
+            (IPAddress("::1"), IPv6Address("::1")),
+            ("10.0.0.1", IPv4Address("10.0.0.1")),
+            (None, None),
+        ],
+    )
+    def test_ip_addresses(
+        self, ip: IPAddress | str | None, expected: IPvAnyAddress | None
+    ) -> None:
+        event = TrustedRowAdapter(Event)({**EVENT_ROW, "ip_address": ip})
+        assert event.ip_address == expected
+        assert type(event.ip_address) is type(expected)
+
+    def test_ignores_extra_values(self) -> None:
+        event = TrustedRowAdapter(Event)({**EVENT_ROW, "extra": 1})
+        assert "extra" not in event.dict()
+
+    def test_invalid_value(self) -> None:
+        with pytest.raises(ValidationError):
+            TrustedRowAdapter(Event)({**EVENT_ROW, "endpoint": 99})
+        with pytest.raises(ValidationError):
+            TrustedRowAdapter(Event)({**EVENT_ROW, "ip_address": "invalid"})
+
+    def test_missing_value(self) -> None:
+        row = dict(EVENT_ROW)
+        del row["action"]
+        with pytest.raises(ValidationError):
+            TrustedRowAdapter(Event)(row)
+
+    def test_runs_field_validators(self) -> None:
+        obj = TrustedRowAdapter(ModelWithValidator)({"id": 1, "name": "foo"})
+        assert obj.name == "FOO"
+
+    def test_runs_root_validators(self) -> None:
+        obj = TrustedRowAdapter(ModelWithRootValidator)(
+            {"id": 1, "name": "foo"}
+        )
+        assert obj.name == "FOO"
+
+    def test_get_trusted_row_adapter_cached(self) -> None:
+        assert get_trusted_row_adapter(Event) is get_trusted_row_adapter(Event)
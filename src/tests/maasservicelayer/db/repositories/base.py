@@ -85,6 +85,33 @@ class ReadOnlyRepositoryCommonTests(abc.ABC, Generic[T]):
                 for _ in range(page_size):
                     assert created_objects.pop() in objects_results.items
 
+    @pytest.mark.parametrize("num_objects", [10])
+    @pytest.mark.parametrize("page_size", [1, 3, 10, 11])
+    async def test_list_by_token(
+        self,
+        page_size: int,
+        repository_instance: BaseRepository,
+        _setup_test_list: Sequence[T],
+        num_objects: int,
+    ):
+        created_objects = list(_setup_test_list)
+        repository = repository_instance
+        listed_objects = []
+        token = None
+        while True:
+            objects_results = await repository.list_by_token(
+                token=token, size=page_size
+            )
+            assert len(objects_results.items) <= page_size
+            assert objects_results.total is None
+            listed_objects.extend(objects_results.items)
+            token = objects_results.next_token
+            if token is None:
+                break
+        assert len(listed_objects) == num_objects
+        for created_object in created_objects:
+            assert created_object in listed_objects
+
     async def test_exists_found(
         self, repository_instance, created_instance: T
     ):
@@ -1,11 +1,13 @@
 #  Copyright 2024-2025 Canonical Ltd.  This software is licensed under the
 #  GNU Affero General Public License version 3 (see the file LICENSE).
 
+import asyncio
 from datetime import datetime
 from operator import eq
 from typing import Type
+from unittest.mock import Mock
 
-from pydantic import Field
+from pydantic import Field, IPvAnyAddress
 import pytest
 from sqlalchemy import (
     BigInteger,
@@ -14,20 +16,32 @@ from sqlalchemy import (
     ForeignKey,
     join,
     MetaData,
+    select,
     Table,
     Text,
+    text,
 )
+from sqlalchemy.dialects.postgresql import INET
 from sqlalchemy.ext.asyncio import AsyncConnection
 
 from maasservicelayer.context import Context
 from maasservicelayer.db import Database
 from maasservicelayer.db.filters import Clause, ClauseFactory, QuerySpec
+from maasservicelayer.db.repositories import base
 from maasservicelayer.db.repositories.base import (
     BaseRepository,
+    decode_list_token,
+    encode_list_token,
     MultipleResultsException,
 )
-from maasservicelayer.exceptions.catalog import NotFoundException
+from maasservicelayer.exceptions.catalog import (
+    AlreadyExistsException,
+    NotFoundException,
+    ValidationException,
+)
 from maasservicelayer.models.base import (
+    ListCount,
+    MaasBaseModel,
     MaasTimestampedBaseModel,
     ResourceBuilder,
     UNSET,
@@ -60,6 +74,24 @@ C = Table(
     Column("id", BigInteger, primary_key=True),
 )
 
+D = Table(
+    "test_table_d",
+    METADATA,
+    Column("id", BigInteger, primary_key=True),
+    Column("name", Text, nullable=False, unique=True),
+    Column("data", Text),
+    Column("created", DateTime(timezone=True), nullable=False),
+    Column("updated", DateTime(timezone=True), nullable=False),
+)
+
+E = Table(
+    "test_table_e",
+    METADATA,
+    Column("id", BigInteger, primary_key=True),
+    Column("ip", INET, nullable=False, unique=True),
+    Column("data", Text),
+)
+
 
 @pytest.fixture(autouse=True)
 async def setup(db: Database):
@@ -103,6 +135,19 @@ async def setup(db: Database):
         await conn.run_sync(METADATA.drop_all)
 
 
+class TestListToken:
+    def test_encode_decode(self) -> None:
+        assert decode_list_token(encode_list_token(1234)) == 1234
+
+    @pytest.mark.parametrize(
+        "token",
+        ["", "invalid", encode_list_token("1")],  # type: ignore
+    )
+    def test_decode_invalid(self, token: str) -> None:
+        with pytest.raises(ValidationException):
+            decode_list_token(token)
+
+
 class AModel(MaasTimestampedBaseModel):
     id: int
     data: str
@@ -123,6 +168,32 @@ class MyRepository(BaseRepository[AModel]):
         return AModel
 
 
+class TestStatementTemplates:
+    def test_built_once(self) -> None:
+        build = Mock(return_value=select(A))
+        repo = MyRepository(Context())
+        stmt = repo.get_statement_template("test_built_once", build)
+        assert repo.get_statement_template("test_built_once", build) is stmt
+        # The templates are shared by the instances of the repository.
+        other_repo = MyRepository(Context())
+        assert (
+            other_repo.get_statement_template("test_built_once", build) is stmt
+        )
+        build.assert_called_once_with()
+
+    def test_by_repository(self) -> None:
+        class OtherRepository(MyRepository):
+            pass
+
+        stmt = MyRepository(Context()).get_statement_template(
+            "test_by_repository", lambda: select(A)
+        )
+        other_stmt = OtherRepository(Context()).get_statement_template(
+            "test_by_repository", lambda: select(A)
+        )
+        assert other_stmt is not stmt
+
+
 @pytest.mark.usefixtures("ensuremaasdb")
 @pytest.mark.asyncio
 class TestMyRepository:
@@ -205,6 +276,143 @@ class TestMyRepository:
         assert a_obj.id == 1
         assert a_obj.data == "foo"
 
+    async def test_list_by_token(self, db_connection: AsyncConnection) -> None:
+        repo = MyRepository(Context(connection=db_connection))
+        result = await repo.list_by_token(token=None, size=1)
+        assert [a_obj.id for a_obj in result.items] == [2]
+        assert result.next_token is not None
+        assert result.total is None
+        result = await repo.list_by_token(token=result.next_token, size=1)
+        assert [a_obj.id for a_obj in result.items] == [1]
+        assert result.next_token is None
+
+    async def test_list_by_token_invalid_token(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        repo = MyRepository(Context(connection=db_connection))
+        with pytest.raises(ValidationException):
+            await repo.list_by_token(token="invalid", size=1)
+
+    @pytest.mark.parametrize(
+        "count,where,total,total_is_estimate",
+        [
+            (ListCount.NONE, None, None, None),
+            (ListCount.EXACT, None, 2, False),
+            (ListCount.EXACT, Clause(eq(A.c.data, "foo")), 1, False),
+            # The table has never been analyzed, so it's counted.
+            (ListCount.ESTIMATE, None, 2, False),
+            (ListCount.ESTIMATE, Clause(eq(A.c.data, "foo")), 1, False),
+        ],
+    )
+    async def test_list_by_token_count(
+        self,
+        db_connection: AsyncConnection,
+        count: ListCount,
+        where: Clause | None,
+        total: int | None,
+        total_is_estimate: bool | None,
+    ) -> None:
+        repo = MyRepository(Context(connection=db_connection))
+        result = await repo.list_by_token(
+            token=None, size=1, query=QuerySpec(where=where), count=count
+        )
+        assert result.total == total
+        assert result.total_is_estimate == total_is_estimate
+
+    async def test_list_by_token_estimated_count(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        await db_connection.execute(text("ANALYZE test_table_a"))
+        repo = MyRepository(Context(connection=db_connection))
+        result = await repo.list_by_token(
+            token=None, size=1, count=ListCount.ESTIMATE
+        )
+        assert result.total == 2
+        assert result.total_is_estimate
+
+    async def test_list_by_token_capped_count(
+        self, db_connection: AsyncConnection, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(base, "ESTIMATED_COUNT_CAP", 1)
+        repo = MyRepository(Context(connection=db_connection))
+        result = await repo.list_by_token(
+            token=None,
+            size=1,
+            query=QuerySpec(where=Clause(eq(A.c.id, A.c.id))),
+            count=ListCount.ESTIMATE,
+        )
+        # There are more items than the count.
+        assert result.total == 1
+        assert result.total_is_estimate
+
+    async def test_trusted_rows(self, db_connection: AsyncConnection) -> None:
+        class TrustedRepository(MyRepository):
+            trusted_rows = True
+
+        context = Context(connection=db_connection)
+        trusted_objs = await TrustedRepository(context).get_many(QuerySpec())
+        objs = await MyRepository(context).get_many(QuerySpec())
+        assert trusted_objs == objs
+
+    async def test_stream(self, db_connection: AsyncConnection) -> None:
+        repo = MyRepository(Context(connection=db_connection))
+        objs = [obj async for obj in repo.stream()]
+        assert [obj.id for obj in objs] == [2, 1]
+        objs = [
+            obj
+            async for obj in repo.stream(
+                QuerySpec(where=Clause(condition=eq(A.c.data, "foo")))
+            )
+        ]
+        assert [obj.id for obj in objs] == [1]
+
+    async def test_get_source_tables(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        repo = MyRepository(Context(connection=db_connection))
+        assert repo.get_source_tables() == {"test_table_a"}
+        query = QuerySpec(
+            where=Clause(
+                condition=eq(B.c.c_id, 1),
+                joins=[join(A, B, eq(A.c.b_id, B.c.id))],
+            )
+        )
+        assert repo.get_source_tables(query) == {
+            "test_table_a",
+            "test_table_b",
+        }
+
+    async def test_get_by_ids(self, db_connection: AsyncConnection) -> None:
+        repo = MyRepository(Context(connection=db_connection))
+        objs = await repo.get_by_ids([2, 100, 1])
+        assert [obj.id for obj in objs] == [2, 1]
+
+    async def test_get_by_ids_batch_loading(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        context = Context(connection=db_connection, batch_loading=True)
+        repo = MyRepository(context)
+        objs = await asyncio.gather(
+            repo.get_by_id(1), repo.get_by_id(2), repo.get_by_id(100)
+        )
+        assert [obj.id if obj else None for obj in objs] == [1, 2, None]
+        assert [obj.id for obj in await repo.get_by_ids([2, 1])] == [2, 1]
+        # Only the first load queried the database.
+        assert context.get_saved_queries() == 3
+
+    async def test_batch_loading_cleared_on_write(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        context = Context(connection=db_connection, batch_loading=True)
+        repo = MyRepository(context)
+        obj = await repo.get_by_id(1)
+        assert obj is not None
+        assert obj.data == "foo"
+        await repo.update_by_id(1, AResourceBuilder(data="test"))
+        obj = await repo.get_by_id(1)
+        assert obj is not None
+        assert obj.data == "test"
+
     async def test_update_one(self, db_connection: AsyncConnection) -> None:
         repo = MyRepository(Context(connection=db_connection))
         builder = AResourceBuilder(data="test")
@@ -336,3 +544,174 @@ class TestMyRepository:
         repo = MyRepository(Context(connection=db_connection))
         deleted_resources = await repo.delete_many(QuerySpec())
         assert len(deleted_resources) == 2
+
+
+class DModel(MaasTimestampedBaseModel):
+    id: int
+    name: str
+    data: str | None
+
+
+class DResourceBuilder(ResourceBuilder):
+    name: str | Unset = Field(default=UNSET, required=False)
+    data: str | None | Unset = Field(default=UNSET, required=False)
+    created: datetime | Unset = Field(default=UNSET, required=False)
+
+
+class DRepository(BaseRepository[DModel]):
+    def get_repository_table(self) -> Table:
+        return D
+
+    def get_model_factory(self) -> Type[DModel]:
+        return DModel
+
+
+class EModel(MaasBaseModel):
+    id: int
+    ip: IPvAnyAddress
+    data: str | None
+
+
+class EResourceBuilder(ResourceBuilder):
+    ip: str | Unset = Field(default=UNSET, required=False)
+    data: str | None | Unset = Field(default=UNSET, required=False)
+
+
+class ERepository(BaseRepository[EModel]):
+    def get_repository_table(self) -> Table:
+        return E
+
+    def get_model_factory(self) -> Type[EModel]:
+        return EModel
+
+
+@pytest.mark.usefixtures("ensuremaasdb")
+@pytest.mark.asyncio
+class TestBulkRepository:
+    async def test_create_many(self, db_connection: AsyncConnection) -> None:
+        repo = DRepository(Context(connection=db_connection))
+        # The builders set different columns.
+        builders = [
+            DResourceBuilder(name="a", data="foo"),
+            DResourceBuilder(name="b"),
+            DResourceBuilder(name="c", data="bar"),
+        ]
+        created = await repo.create_many(builders)
+        assert [(d.name, d.data) for d in created] == [
+            ("a", "foo"),
+            ("b", None),
+            ("c", "bar"),
+        ]
+        assert sorted(d.id for d in await repo.get_many(QuerySpec())) == (
+            sorted(d.id for d in created)
+        )
+
+    async def test_create_many_in_batches(
+        self, db_connection: AsyncConnection, monkeypatch
+    ) -> None:
+        # Two rows per statement, since each row has 3 parameters and room
+        # is left for a fourth one.
+        monkeypatch.setattr(base, "MAX_BIND_PARAMETERS", 9)
+        repo = DRepository(Context(connection=db_connection))
+        names = [f"name-{i}" for i in range(5)]
+        created = await repo.create_many(
+            [DResourceBuilder(name=name) for name in names]
+        )
+        assert [d.name for d in created] == names
+
+    async def test_create_many_empty(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        repo = DRepository(Context(connection=db_connection))
+        assert await repo.create_many([]) == []
+
+    async def test_create_many_duplicated(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        repo = DRepository(Context(connection=db_connection))
+        with pytest.raises(AlreadyExistsException):
+            await repo.create_many(
+                [DResourceBuilder(name="a"), DResourceBuilder(name="a")]
+            )
+
+    async def test_upsert_many(self, db_connection: AsyncConnection) -> None:
+        repo = DRepository(Context(connection=db_connection))
+        [existing] = await repo.create_many(
+            [DResourceBuilder(name="a", data="foo")]
+        )
+        upserted = await repo.upsert_many(
+            [
+                DResourceBuilder(name="b", data="bar"),
+                DResourceBuilder(name="a", data="baz"),
+            ],
+            conflict_columns=[D.c.name],
+        )
+        assert [(d.name, d.data) for d in upserted] == [
+            ("b", "bar"),
+            ("a", "baz"),
+        ]
+        assert upserted[1].id == existing.id
+        assert upserted[1].created == existing.created
+        assert len(await repo.get_many(QuerySpec())) == 2
+
+    async def test_upsert_many_only_conflict_columns(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        repo = DRepository(Context(connection=db_connection))
+        [existing] = await repo.create_many(
+            [DResourceBuilder(name="a", data="foo")]
+        )
+        # Only the timestamp is updated, and the existing row is returned.
+        [upserted] = await repo.upsert_many(
+            [DResourceBuilder(name="a")], conflict_columns=[D.c.name]
+        )
+        assert upserted.id == existing.id
+        assert upserted.data == "foo"
+
+    async def test_upsert_many_conflicting_builders(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        repo = DRepository(Context(connection=db_connection))
+        upserted = await repo.upsert_many(
+            [
+                DResourceBuilder(name="a", data="foo"),
+                DResourceBuilder(name="b", data="bar"),
+                DResourceBuilder(name="a", data="baz"),
+            ],
+            conflict_columns=[D.c.name],
+        )
+        assert [(d.name, d.data) for d in upserted] == [
+            ("b", "bar"),
+            ("a", "baz"),
+        ]
+
+    async def test_upsert_many_normalized_conflict_columns(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        repo = ERepository(Context(connection=db_connection))
+        [existing] = await repo.create_many(
+            [EResourceBuilder(ip="10.0.0.1", data="foo")]
+        )
+        # The addresses are stored without the netmask of a single host.
+        upserted = await repo.upsert_many(
+            [
+                EResourceBuilder(ip="10.0.0.2/32", data="bar"),
+                EResourceBuilder(ip="10.0.0.1/32", data="baz"),
+            ],
+            conflict_columns=[E.c.ip],
+        )
+        assert [(str(e.ip), e.data) for e in upserted] == [
+            ("10.0.0.2", "bar"),
+            ("10.0.0.1", "baz"),
+        ]
+        assert upserted[1].id == existing.id
+
+    async def test_upsert_many_unset_conflict_columns(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        repo = DRepository(Context(connection=db_connection))
+        with pytest.raises(ValueError):
+            await repo.upsert_many(
+                [DResourceBuilder(data="foo")], conflict_columns=[D.c.name]
+            )
+        assert await repo.get_many(QuerySpec()) == []
@@ -4,6 +4,7 @@
 from typing import Any
 
 import pytest
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncConnection
 
 from maasservicelayer.builders.configurations import (
@@ -80,3 +81,25 @@ class TestDatabaseConfigurationsRepository:
         assert created_dbconfig.id == updated_dbconfig.id
         assert created_dbconfig.name == updated_dbconfig.name
         assert updated_dbconfig.value == "newbar"
+
+    async def test_is_transaction_visible(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        database_configuration_repository = DatabaseConfigurationsRepository(
+            Context(connection=db_connection)
+        )
+        [xmin] = (
+            await db_connection.execute(
+                text("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+            )
+        ).one()
+        # The transactions completed before the snapshot are visible, the
+        # ones started after it aren't.
+        assert await database_configuration_repository.is_transaction_visible(
+            xmin - 1
+        )
+        assert not (
+            await database_configuration_repository.is_transaction_visible(
+                xmin + 1000
+            )
+        )
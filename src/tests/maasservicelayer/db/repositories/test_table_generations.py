@@ -0,0 +1,50 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from maasservicelayer.context import Context
+from maasservicelayer.db.repositories.table_generations import (
+    TableGenerationsRepository,
+)
+from tests.fixtures.factories.zone import create_test_zone
+from tests.maasapiserver.fixtures.db import Fixture
+
+
+@pytest.mark.usefixtures("ensuremaasdb")
+@pytest.mark.asyncio
+class TestTableGenerationsRepository:
+    async def test_get_generations_untracked(
+        self, db_connection: AsyncConnection
+    ) -> None:
+        repository = TableGenerationsRepository(
+            Context(connection=db_connection)
+        )
+        generations = await repository.get_generations(
+            {"maasserver_zone", "maasserver_untracked"}
+        )
+        assert generations.keys() == {"maasserver_zone"}
+
+    async def test_get_generations_changes(
+        self, db_connection: AsyncConnection, fixture: Fixture
+    ) -> None:
+        repository = TableGenerationsRepository(
+            Context(connection=db_connection)
+        )
+        before = await repository.get_generations({"maasserver_zone"})
+        zone = await create_test_zone(fixture, name="zone-a")
+        after_insert = await repository.get_generations({"maasserver_zone"})
+        assert after_insert["maasserver_zone"] > before["maasserver_zone"]
+
+        # A transaction bumps the generation once, however many statements
+        # change the table.
+        await db_connection.execute(
+            text("UPDATE maasserver_zone SET name = name WHERE id = :id"),
+            {"id": zone.id},
+        )
+        after_update = await repository.get_generations({"maasserver_zone"})
+        assert (
+            after_update["maasserver_zone"] == after_insert["maasserver_zone"]
+        )
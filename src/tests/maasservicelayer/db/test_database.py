@@ -0,0 +1,67 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+from unittest.mock import Mock
+
+from sqlalchemy.util import LRUCache
+
+from maasservicelayer.db import Database, DatabaseConfig, is_statement_prepared
+
+
+class TestDatabase:
+    def test_engine_pool_options(self) -> None:
+        db = Database(
+            DatabaseConfig("maasdb", host="host", pool_size=5, max_overflow=2)
+        )
+        assert db.engine.pool.size() == 5
+        assert db.engine.pool._max_overflow == 2
+        assert db.read_only_engine is None
+
+    def test_engine_statement_cache_options(self) -> None:
+        db = Database(
+            DatabaseConfig(
+                "maasdb",
+                host="host",
+                query_cache_size=10,
+                prepared_statement_cache_size=20,
+            )
+        )
+        assert db.engine.sync_engine._compiled_cache.capacity == 10
+
+    def test_get_engine_without_read_only_pool(self) -> None:
+        db = Database(DatabaseConfig("maasdb", host="host"))
+        assert db.get_engine() is db.engine
+        assert db.get_engine(read_only=True) is db.engine
+
+    def test_get_engine_with_read_only_pool(self) -> None:
+        db = Database(
+            DatabaseConfig(
+                "maasdb",
+                host="host",
+                read_only=DatabaseConfig(
+                    "maasdb", host="replica", pool_size=7
+                ),
+            )
+        )
+        assert db.get_engine() is db.engine
+        assert db.get_engine(read_only=True) is db.read_only_engine
+        assert db.read_only_engine.url.host == "replica"
+        assert db.read_only_engine.pool.size() == 7
+
+    def test_get_pool_usage(self) -> None:
+        db = Database(
+            DatabaseConfig("maasdb", host="host", pool_size=3, max_overflow=1)
+        )
+        assert db.get_pool_usage() == 0.0
+
+
+class TestIsStatementPrepared:
+    def test_prepared(self) -> None:
+        dbapi_connection = Mock(_prepared_statement_cache=LRUCache(10))
+        dbapi_connection._prepared_statement_cache["SELECT 1"] = Mock()
+        assert is_statement_prepared(dbapi_connection, "SELECT 1")
+        assert not is_statement_prepared(dbapi_connection, "SELECT 2")
+
+    def test_without_cache(self) -> None:
+        dbapi_connection = Mock(_prepared_statement_cache=None)
+        assert is_statement_prepared(dbapi_connection, "SELECT 1") is None
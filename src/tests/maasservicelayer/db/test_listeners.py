@@ -16,12 +16,16 @@ class PostgresListenerStub(PostgresListener):
     def __init__(self, channel: str):
         super().__init__(channel)
         self.messages = []
+        self.is_registered = False
 
     def handler(
         self, connection: Connection, pid: int, channel: str, payload: str
     ):
         self.messages.append(payload)
 
+    def registered(self):
+        self.is_registered = True
+
 
 class TestPostgresListenersTaskFactory:
     @pytest.mark.asyncio
@@ -35,6 +39,8 @@ class TestPostgresListenersTaskFactory:
             db.engine, [first_stub, second_stub]
         )
         await register_task
+        assert first_stub.is_registered
+        assert second_stub.is_registered
 
         await self._send_pg_notify(db.engine, first_channel, "test")
         await self._send_pg_notify(db.engine, second_channel, "a")
@@ -0,0 +1,108 @@
+#  Copyright 2025 Canonical Ltd.  This software is licensed under the
+#  GNU Affero General Public License version 3 (see the file LICENSE).
+
+import asyncio
+
+import pytest
+
+from maasservicelayer.db.loaders import BatchLoader, BatchLoaders
+from maasservicelayer.models.base import MaasBaseModel
+
+
+class Item(MaasBaseModel):
+    name: str
+
+
+class FakeLoadMany:
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, ids: list[int]) -> list[Item]:
+        self.calls.append(ids)
+        if self.fail:
+            raise Exception("Failed")
+        return [Item(id=id, name=f"item-{id}") for id in ids if id < 100]
+
+
+@pytest.mark.asyncio
+class TestBatchLoader:
+    async def test_load_batches_same_tick(self) -> None:
+        load_many = FakeLoadMany()
+        loader = BatchLoader(load_many)
+        items = await asyncio.gather(
+            loader.load(1), loader.load(2), loader.load(100)
+        )
+        assert items == [
+            Item(id=1, name="item-1"),
+            Item(id=2, name="item-2"),
+            None,
+        ]
+        assert load_many.calls == [[1, 2, 100]]
+
+    async def test_load_memoized(self) -> None:
+        load_many = FakeLoadMany()
+        loader = BatchLoader(load_many)
+        first = await loader.load(1)
+        second = await loader.load(1)
+        assert first == second
+        # Each caller gets its own copy.
+        assert first is not second
+        assert load_many.calls == [[1]]
+
+    async def test_load_many(self) -> None:
+        load_many = FakeLoadMany()
+        loader = BatchLoader(load_many)
+        await loader.load(1)
+        items = await loader.load_many([2, 1, 100])
+        assert items == [
+            Item(id=2, name="item-2"),
+            Item(id=1, name="item-1"),
+            None,
+        ]
+        assert load_many.calls == [[1], [2, 100]]
+        assert loader.requests == 2
+        assert loader.queries == 2
+
+    async def test_clear(self) -> None:
+        load_many = FakeLoadMany()
+        loader = BatchLoader(load_many)
+        await loader.load(1)
+        loader.clear()
+        await loader.load(1)
+        assert load_many.calls == [[1], [1]]
+
+    async def test_load_failure_not_memoized(self) -> None:
+        load_many = FakeLoadMany(fail=True)
+        loader = BatchLoader(load_many)
+        with pytest.raises(Exception, match="Failed"):
+            await loader.load(1)
+        load_many.fail = False
+        assert await loader.load(1) == Item(id=1, name="item-1")
+        assert load_many.calls == [[1], [1]]
+
+
+@pytest.mark.asyncio
+class TestBatchLoaders:
+    async def test_get(self) -> None:
+        loaders = BatchLoaders()
+        load_many = FakeLoadMany()
+        loader = loaders.get("key", load_many)
+        assert loaders.get("key", load_many) is loader
+        assert loaders.get("other", load_many) is not loader
+
+    async def test_clear(self) -> None:
+        loaders = BatchLoaders()
+        load_many = FakeLoadMany()
+        await loaders.get("key", load_many).load(1)
+        loaders.clear()
+        await loaders.get("key", load_many).load(1)
+        assert load_many.calls == [[1], [1]]
+
+    async def test_get_saved_queries(self) -> None:
+        loaders = BatchLoaders()
+        load_many = FakeLoadMany()
+        loader = loaders.get("key", load_many)
+        await asyncio.gather(loader.load(1), loader.load(2))
+        await loader.load(1)
+        assert loaders.get_saved_queries() == 2
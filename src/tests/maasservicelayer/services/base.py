@@ -2,6 +2,7 @@
 #  GNU Affero General Public License version 3 (see the file LICENSE).
 
 import abc
+from unittest.mock import AsyncMock, call
 
 import pytest
 
@@ -10,7 +11,11 @@ from maasservicelayer.exceptions.catalog import (
     NotFoundException,
     PreconditionFailedException,
 )
-from maasservicelayer.models.base import MaasBaseModel, ResourceBuilder
+from maasservicelayer.models.base import (
+    ListCount,
+    MaasBaseModel,
+    ResourceBuilder,
+)
 from maasservicelayer.services.base import BaseService, ReadOnlyService
 
 
@@ -79,6 +84,69 @@ class ServiceCommonTests(ReadOnlyServiceCommonTests):
             builder=builder
         )
 
+    async def test_create_many(
+        self, service_instance, test_instance, builder_model
+    ):
+        service_instance.repository.create_many.return_value = [test_instance]
+        # The hooks are tested in the next test
+        service_instance.pre_create_many_hook = AsyncMock()
+        service_instance.post_create_many_hook = AsyncMock()
+        builder = builder_model()
+        objs = await service_instance.create_many([builder])
+        assert objs == [test_instance]
+        service_instance.repository.create_many.assert_awaited_once_with(
+            builders=[builder]
+        )
+        service_instance.pre_create_many_hook.assert_awaited_once_with(
+            [builder]
+        )
+        service_instance.post_create_many_hook.assert_awaited_once_with(
+            [test_instance]
+        )
+
+    async def test_create_many_hooks(
+        self, service_instance, test_instance, builder_model
+    ):
+        service_instance.pre_create_hook = AsyncMock()
+        service_instance.post_create_hook = AsyncMock()
+        builders = [builder_model(), builder_model()]
+        await service_instance.pre_create_many_hook(builders)
+        await service_instance.post_create_many_hook([test_instance])
+        service_instance.pre_create_hook.assert_has_awaits(
+            [call(builder) for builder in builders]
+        )
+        service_instance.post_create_hook.assert_awaited_once_with(
+            test_instance
+        )
+
+    async def test_create_many_empty(self, service_instance):
+        assert await service_instance.create_many([]) == []
+        service_instance.repository.create_many.assert_not_called()
+
+    async def test_upsert_many(
+        self, service_instance, test_instance, builder_model
+    ):
+        service_instance.repository.upsert_many.return_value = [test_instance]
+        service_instance.pre_create_many_hook = AsyncMock()
+        service_instance.post_upsert_many_hook = AsyncMock()
+        builder = builder_model()
+        conflict_columns = [
+            service_instance.repository.get_repository_table().c.id
+        ]
+        objs = await service_instance.upsert_many(
+            [builder], conflict_columns=conflict_columns
+        )
+        assert objs == [test_instance]
+        service_instance.repository.upsert_many.assert_awaited_once_with(
+            builders=[builder], conflict_columns=conflict_columns
+        )
+        service_instance.pre_create_many_hook.assert_awaited_once_with(
+            [builder]
+        )
+        service_instance.post_upsert_many_hook.assert_awaited_once_with(
+            [test_instance]
+        )
+
     async def test_list(self, service_instance):
         service_instance.repository.list.return_value = []
         objects = await service_instance.list(
@@ -89,6 +157,16 @@ class ServiceCommonTests(ReadOnlyServiceCommonTests):
             page=1, size=10, query=QuerySpec()
         )
 
+    async def test_list_by_token(self, service_instance):
+        service_instance.repository.list_by_token.return_value = []
+        objects = await service_instance.list_by_token(
+            token="token", size=10, query=QuerySpec(), count=ListCount.NONE
+        )
+        assert objects == []
+        service_instance.repository.list_by_token.assert_awaited_once_with(
+            token="token", size=10, query=QuerySpec(), count=ListCount.NONE
+        )
+
     async def test_update_many(
         self, service_instance, test_instance: MaasBaseModel, builder_model
     ):
@@ -28,6 +28,10 @@ from maasservicelayer.services import (
     SecretsService,
     ServiceCollectionV3,
 )
+from maasservicelayer.services.configurations import (
+    ConfigurationsPostgresListener,
+    ConfigurationsServiceCache,
+)
 from maasservicelayer.services.database_configurations import (
     DatabaseConfigurationNotFound,
     DatabaseConfigurationsService,
@@ -361,3 +365,198 @@ class TestConfigurationsService:
             VCenterPasswordConfig.secret_model, "bar"
         )
         service.database_configurations_service.create_or_update.assert_not_called()
+
+
+@pytest.mark.asyncio
+class TestConfigurationsServiceCache:
+    def _make_service(
+        self, cache: ConfigurationsServiceCache
+    ) -> ConfigurationsService:
+        service = ConfigurationsService(
+            context=Context(),
+            database_configurations_service=Mock(
+                DatabaseConfigurationsService
+            ),
+            secrets_service=Mock(SecretsService),
+            events_service=Mock(EventsService),
+            cache=cache,
+        )
+        service.database_configurations_service.get_many.return_value = {
+            ThemeConfig.name: "mytheme",
+            MAASProxyPortConfig.name: 1234,
+        }
+        service.database_configurations_service.is_transaction_visible.return_value = True
+        return service
+
+    def _make_cache(self, **kwargs) -> ConfigurationsServiceCache:
+        cache = ConfigurationsServiceCache()
+        cache.enable(**kwargs)
+        return cache
+
+    async def test_not_used_when_disabled(self):
+        service = self._make_service(ConfigurationsServiceCache())
+        service.database_configurations_service.get.return_value = "mytheme"
+        assert (await service.get(ThemeConfig.name)) == "mytheme"
+        service.database_configurations_service.get.assert_called_once_with(
+            name=ThemeConfig.name
+        )
+        service.database_configurations_service.get_many.assert_not_called()
+
+    async def test_get_loads_all_configs(self):
+        cache = self._make_cache()
+        service = self._make_service(cache)
+        assert (await service.get(ThemeConfig.name)) == "mytheme"
+        assert (await service.get(MAASProxyPortConfig.name)) == 1234
+        # Not stored in the database.
+        assert (
+            await service.get(MAASNameConfig.name)
+        ) == MAASNameConfig.default
+        service.database_configurations_service.get_many.assert_called_once_with(
+            query=QuerySpec()
+        )
+        service.database_configurations_service.get.assert_not_called()
+        assert cache.misses["database"] == 1
+        assert cache.hits["database"] == 2
+
+    async def test_get_many(self):
+        service = self._make_service(self._make_cache())
+        assert (
+            await service.get_many({ThemeConfig.name, MAASNameConfig.name})
+        ) == {
+            ThemeConfig.name: "mytheme",
+            MAASNameConfig.name: MAASNameConfig.default,
+        }
+        assert (await service.get_many({MAASProxyPortConfig.name})) == {
+            MAASProxyPortConfig.name: 1234
+        }
+        service.database_configurations_service.get_many.assert_called_once_with(
+            query=QuerySpec()
+        )
+
+    async def test_shared_between_services(self):
+        cache = self._make_cache()
+        first_service = self._make_service(cache)
+        second_service = self._make_service(cache)
+        await first_service.get(ThemeConfig.name)
+        assert (await second_service.get(ThemeConfig.name)) == "mytheme"
+        second_service.database_configurations_service.get_many.assert_not_called()
+
+    async def test_invalidate(self):
+        cache = self._make_cache()
+        service = self._make_service(cache)
+        await service.get(ThemeConfig.name)
+        cache.invalidate(1234)
+        assert cache.last_txid == 1234
+        service.database_configurations_service.get_many.return_value = {
+            ThemeConfig.name: "newtheme"
+        }
+        assert (await service.get(ThemeConfig.name)) == "newtheme"
+        service.database_configurations_service.is_transaction_visible.assert_called_once_with(
+            1234
+        )
+
+    async def test_not_stored_if_change_not_visible(self):
+        cache = self._make_cache()
+        cache.invalidate(1234)
+        service = self._make_service(cache)
+        service.database_configurations_service.is_transaction_visible.return_value = False
+        assert (await service.get(ThemeConfig.name)) == "mytheme"
+        assert cache.configs is None
+
+    async def test_not_stored_if_invalidated_while_loading(self):
+        cache = self._make_cache()
+        service = self._make_service(cache)
+
+        async def get_many(query):
+            cache.invalidate()
+            return {ThemeConfig.name: "mytheme"}
+
+        service.database_configurations_service.get_many.side_effect = get_many
+        assert (await service.get(ThemeConfig.name)) == "mytheme"
+        assert cache.configs is None
+
+    async def test_returns_copies(self):
+        cache = self._make_cache()
+        service = self._make_service(cache)
+        service.database_configurations_service.get_many.return_value = {
+            "myconfig": {"foo": "bar"}
+        }
+        value = await service.get("myconfig")
+        value["foo"] = "baz"
+        assert (await service.get("myconfig")) == {"foo": "bar"}
+
+    async def test_bypassed_after_set(self):
+        cache = self._make_cache()
+        service = self._make_service(cache)
+        await service.get(ThemeConfig.name)
+        await service.set(ThemeConfig.name, "newtheme")
+        service.database_configurations_service.get.return_value = "newtheme"
+        assert (await service.get(ThemeConfig.name)) == "newtheme"
+        service.database_configurations_service.get.assert_called_once_with(
+            name=ThemeConfig.name
+        )
+
+    async def test_secrets_cached(self):
+        cache = self._make_cache()
+        service = self._make_service(cache)
+        service.secrets_service.get_simple_secret.return_value = "mypassword"
+        assert (await service.get(VCenterPasswordConfig.name)) == "mypassword"
+        assert (await service.get(VCenterPasswordConfig.name)) == "mypassword"
+        service.secrets_service.get_simple_secret.assert_called_once_with(
+            VCenterPasswordConfig.secret_model
+        )
+        assert cache.misses["secret"] == 1
+        assert cache.hits["secret"] == 1
+
+    async def test_secrets_not_found_cached(self):
+        service = self._make_service(self._make_cache())
+        service.secrets_service.get_simple_secret.side_effect = SecretNotFound(
+            VCenterPasswordConfig.secret_model.secret_name
+        )
+        assert (await service.get(VCenterPasswordConfig.name)) == ""
+        assert (await service.get(VCenterPasswordConfig.name)) == ""
+        service.secrets_service.get_simple_secret.assert_called_once()
+
+    async def test_secrets_expire(self):
+        service = self._make_service(self._make_cache(secrets_ttl=0))
+        service.secrets_service.get_simple_secret.return_value = "mypassword"
+        await service.get(VCenterPasswordConfig.name)
+        await service.get(VCenterPasswordConfig.name)
+        assert service.secrets_service.get_simple_secret.call_count == 2
+
+    async def test_set_secret_drops_cached_secret(self):
+        cache = self._make_cache()
+        service = self._make_service(cache)
+        service.secrets_service.get_simple_secret.return_value = "mypassword"
+        await service.get(VCenterPasswordConfig.name)
+        await service.set(VCenterPasswordConfig.name, "newpassword")
+        assert cache.secrets == {}
+
+
+class TestConfigurationsPostgresListener:
+    def test_enables_cache_when_registered(self):
+        cache = ConfigurationsServiceCache()
+        listener = ConfigurationsPostgresListener(cache, secrets_ttl=10)
+        assert listener.channel == "sys_config"
+        assert not cache.enabled
+        listener.registered()
+        assert cache.enabled
+        assert cache.secrets_ttl == 10
+
+    def test_handler_invalidates_cache(self):
+        cache = ConfigurationsServiceCache(configs={"foo": "bar"})
+        listener = ConfigurationsPostgresListener(cache)
+        listener.handler(Mock(), 1, "sys_config", "1234")
+        assert cache.configs is None
+        assert cache.last_txid == 1234
+        assert cache.generation == 1
+
+    def test_disables_cache_when_terminated(self):
+        cache = ConfigurationsServiceCache(configs={"foo": "bar"})
+        cache.secrets["foo"] = ("bar", 0)
+        listener = ConfigurationsPostgresListener(cache)
+        listener.registered()
+        listener.terminated()
+        assert not cache.enabled
+        assert cache.configs is None
+        assert cache.secrets == {}
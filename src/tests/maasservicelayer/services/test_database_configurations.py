@@ -69,3 +69,17 @@ class TestDatabaseConfigurationsService:
             builder
         )
         assert dbconfig == expected_dbconfig
+
+    async def test_is_transaction_visible(self) -> None:
+        database_configurations_repository_mock = Mock(
+            DatabaseConfigurationsRepository
+        )
+        database_configurations_repository_mock.is_transaction_visible.return_value = True
+        configurations_service = DatabaseConfigurationsService(
+            context=Context(),
+            database_configurations_repository=database_configurations_repository_mock,
+        )
+        assert await configurations_service.is_transaction_visible(1234)
+        database_configurations_repository_mock.is_transaction_visible.assert_awaited_once_with(
+            1234
+        )
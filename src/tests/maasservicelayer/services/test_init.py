@@ -0,0 +1,70 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from maasservicelayer.context import Context
+from maasservicelayer.services import (
+    CacheForServices,
+    ServiceCollectionV3,
+    ZonesService,
+)
+from maasservicelayer.services.secrets import (
+    LocalSecretsStorageService,
+    SecretsServiceFactory,
+)
+
+
+@pytest.fixture(autouse=True)
+def prepare():
+    SecretsServiceFactory.IS_VAULT_ENABLED = False
+    yield
+    SecretsServiceFactory.clear()
+
+
+@pytest.mark.asyncio
+class TestServiceCollectionV3:
+    async def _produce(self) -> ServiceCollectionV3:
+        return await ServiceCollectionV3.produce(
+            Context(connection=Mock(AsyncConnection)), CacheForServices()
+        )
+
+    async def test_services_built_on_access(self) -> None:
+        services = await self._produce()
+        assert "zones" not in vars(services)
+        zones = services.zones
+        assert isinstance(zones, ZonesService)
+        assert services.zones is zones
+        # The dependencies are built as well, and shared.
+        assert zones.nodes_service is services.nodes
+        assert "machines" not in vars(services)
+
+    async def test_all_services_can_be_built(self) -> None:
+        services = await self._produce()
+        for name, service_type in ServiceCollectionV3.__annotations__.items():
+            assert isinstance(getattr(services, name), service_type)
+
+    async def test_secrets(self) -> None:
+        services = await self._produce()
+        assert isinstance(services.secrets, LocalSecretsStorageService)
+
+    async def test_caches_shared(self) -> None:
+        cache = CacheForServices()
+        context = Context(connection=Mock(AsyncConnection))
+        first = await ServiceCollectionV3.produce(context, cache)
+        second = await ServiceCollectionV3.produce(context, cache)
+        assert first.zones.cache is second.zones.cache
+
+    async def test_unknown_attribute(self) -> None:
+        services = await self._produce()
+        with pytest.raises(AttributeError):
+            services.unknown  # noqa: B018
+
+    async def test_services_can_be_replaced(self) -> None:
+        services = await self._produce()
+        zones = Mock(ZonesService)
+        services.zones = zones
+        assert services.zones is zones
@@ -278,6 +278,22 @@ class TestSecretServiceFactory:
         assert SecretsServiceFactory.IS_VAULT_ENABLED is False
         assert isinstance(secrets_service, LocalSecretsStorageService)
 
+    async def test_detect_cached(self) -> None:
+        database_configuration_service_mock = Mock(
+            DatabaseConfigurationsService
+        )
+        database_configuration_service_mock.get.return_value = True
+        await SecretsServiceFactory.detect(database_configuration_service_mock)
+        await SecretsServiceFactory.detect(database_configuration_service_mock)
+        database_configuration_service_mock.get.assert_called_once_with(
+            VaultEnabledConfig.name
+        )
+        assert SecretsServiceFactory.IS_VAULT_ENABLED is True
+
+    async def test_build_requires_detect(self) -> None:
+        with pytest.raises(RuntimeError):
+            SecretsServiceFactory.build(Context())
+
     async def test_with_vault_enabled(self) -> None:
         db_connection = Mock(AsyncConnection)
         context = Context(connection=db_connection)
@@ -273,7 +273,7 @@ class TestSshKeysService:
 
         keys = await sshkeys_service.import_keys(protocol, "foo", 1)
         assert keys == [sshkey]
-        repository.create.assert_not_called()
+        repository.create_many.assert_not_called()
 
     @pytest.mark.parametrize(
         "protocol", [SshKeysProtocolType.LP, SshKeysProtocolType.GH]
@@ -293,7 +293,7 @@ class TestSshKeysService:
         )
         repository = Mock(SshKeysRepository)
         repository.get_many.return_value = [sshkey]
-        repository.create.return_value = sshkey_created
+        repository.create_many.return_value = [sshkey_created]
         sshkeys_service = SshKeysService(
             context=Context(), sshkeys_repository=repository
         )
@@ -316,7 +316,7 @@ class TestSshKeysService:
         assert len(keys) == 2
         assert sshkey in keys
         assert sshkey_created in keys
-        repository.create.assert_called_once_with(builder=builder)
+        repository.create_many.assert_called_once_with(builders=[builder])
 
     @pytest.mark.parametrize(
         "keys", [[], [TEST_ED25519_KEY], [TEST_ED25519_KEY, TEST_RSA_KEY]]
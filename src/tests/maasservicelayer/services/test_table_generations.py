@@ -0,0 +1,53 @@
+# Copyright 2025 Canonical Ltd.  This software is licensed under the
+# GNU Affero General Public License version 3 (see the file LICENSE).
+
+from unittest.mock import Mock
+
+import pytest
+
+from maasservicelayer.context import Context
+from maasservicelayer.db.repositories.table_generations import (
+    TableGenerationsRepository,
+)
+from maasservicelayer.services.table_generations import TableGenerationsService
+
+
+@pytest.mark.asyncio
+class TestTableGenerationsService:
+    @pytest.fixture
+    def repository_mock(self) -> Mock:
+        repository = Mock(TableGenerationsRepository)
+        repository.get_generations.return_value = {"a": 1, "b": 2}
+        return repository
+
+    @pytest.fixture
+    def service(self, repository_mock: Mock) -> TableGenerationsService:
+        return TableGenerationsService(
+            context=Context(), table_generations_repository=repository_mock
+        )
+
+    async def test_get_collection_etag(
+        self, service: TableGenerationsService, repository_mock: Mock
+    ) -> None:
+        etag = await service.get_collection_etag({"a", "b"}, "key")
+        assert etag is not None
+        repository_mock.get_generations.assert_called_once_with({"a", "b"})
+        assert await service.get_collection_etag({"a", "b"}, "key") == etag
+
+    async def test_get_collection_etag_changes_with_generations(
+        self, service: TableGenerationsService, repository_mock: Mock
+    ) -> None:
+        etag = await service.get_collection_etag({"a", "b"}, "key")
+        repository_mock.get_generations.return_value = {"a": 1, "b": 3}
+        assert await service.get_collection_etag({"a", "b"}, "key") != etag
+
+    async def test_get_collection_etag_changes_with_key(
+        self, service: TableGenerationsService
+    ) -> None:
+        etag = await service.get_collection_etag({"a", "b"}, "key")
+        assert await service.get_collection_etag({"a", "b"}, "other") != etag
+
+    async def test_get_collection_etag_untracked_table(
+        self, service: TableGenerationsService
+    ) -> None:
+        assert await service.get_collection_etag({"a", "c"}, "key") is None